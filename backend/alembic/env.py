@@ -26,6 +26,7 @@ from app.models.home_assistant import (  # noqa: F401
     BreakerActivityLog, BreakerControlQueue
 )
 from app.models.system_setting import SystemSetting  # noqa: F401
+from app.models.daily_occupancy import DailyOccupancy  # noqa: F401
 
 # this is the Alembic Config object
 config = context.config
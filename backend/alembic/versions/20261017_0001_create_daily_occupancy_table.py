@@ -0,0 +1,44 @@
+"""create daily_occupancy table
+
+Revision ID: 20261017_0001
+Revises: 20260207_0001
+Create Date: 2026-10-17 00:01:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0001'
+down_revision: Union[str, None] = '20260207_0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create daily_occupancy fact table
+
+    Holds one row per day with the number of occupied stays. Populated by the
+    nightly `report.backfill_daily_occupancy` task and refreshed on
+    check-in / check-out.
+    """
+    op.create_table(
+        'daily_occupancy',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stat_date', sa.Date(), nullable=False),
+        sa.Column('occupied_rooms', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_index('ix_daily_occupancy_id', 'daily_occupancy', ['id'], unique=False)
+    op.create_index('ix_daily_occupancy_stat_date', 'daily_occupancy', ['stat_date'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_occupancy_stat_date', table_name='daily_occupancy')
+    op.drop_index('ix_daily_occupancy_id', table_name='daily_occupancy')
+    op.drop_table('daily_occupancy')
@@ -0,0 +1,52 @@
+"""create breaker_command_outbox table
+
+Revision ID: 20261017_0002
+Revises: 20261017_0001
+Create Date: 2026-10-17 00:02:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0002'
+down_revision: Union[str, None] = '20261017_0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create breaker_command_outbox table
+
+    Written in the same transaction as a room status change and drained by
+    the `breaker.dispatch_command_outbox` task. Timestamps keep milliseconds
+    so dispatch delay can be measured.
+    """
+    op.create_table(
+        'breaker_command_outbox',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('room_id', sa.Integer(), nullable=False, comment='Room whose status changed'),
+        sa.Column('room_status_before', sa.String(50), nullable=True, comment='Room status before change'),
+        sa.Column('room_status_after', sa.String(50), nullable=False, comment='Room status after change'),
+        sa.Column('status', sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', name='outbox_status'), nullable=False, server_default='PENDING', comment='Outbox item status'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0', comment='Number of dispatch attempts'),
+        sa.Column('coalesced', sa.Boolean(), nullable=False, server_default='0', comment='Superseded by a later change for the same room'),
+        sa.Column('error_message', sa.Text(), nullable=True, comment='Error details if failed'),
+        sa.Column('dispatch_delay_ms', sa.Integer(), nullable=True, comment='Milliseconds from enqueue to command completion'),
+        sa.Column('created_at', mysql.DATETIME(fsp=3), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP(3)')),
+        sa.Column('processed_at', mysql.DATETIME(fsp=3), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+        sa.Index('idx_outbox_room_id', 'room_id'),
+        sa.Index('idx_outbox_status_id', 'status', 'id'),
+        sa.Index('idx_outbox_created_at', 'created_at'),
+        mysql_charset='utf8mb4',
+        mysql_collate='utf8mb4_unicode_ci'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('breaker_command_outbox')
@@ -0,0 +1,46 @@
+"""create breaker_sync_rollups table
+
+Revision ID: 20261017_0003
+Revises: 20261017_0002
+Create Date: 2026-10-17 00:03:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0003'
+down_revision: Union[str, None] = '20261017_0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create breaker_sync_rollups table
+
+    Hourly per-breaker sync counters and latency, upserted by every sync run
+    so unchanged STATUS_SYNC results no longer need an activity log row.
+    """
+    op.create_table(
+        'breaker_sync_rollups',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('breaker_id', sa.Integer(), nullable=False, comment='Reference to home_assistant_breakers'),
+        sa.Column('hour_start', sa.DateTime(), nullable=False, comment='Start of the hour (local time)'),
+        sa.Column('sync_count', sa.Integer(), nullable=False, server_default='0', comment='Syncs in this hour'),
+        sa.Column('failed_count', sa.Integer(), nullable=False, server_default='0', comment='Failed syncs in this hour'),
+        sa.Column('changed_count', sa.Integer(), nullable=False, server_default='0', comment='Syncs that changed state or availability'),
+        sa.Column('total_latency_ms', sa.BigInteger(), nullable=False, server_default='0', comment='Sum of sync latencies'),
+        sa.Column('max_latency_ms', sa.Integer(), nullable=False, server_default='0', comment='Slowest sync in this hour'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['breaker_id'], ['home_assistant_breakers.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('breaker_id', 'hour_start', name='uq_breaker_sync_rollup_hour'),
+        sa.Index('idx_sync_rollup_hour_start', 'hour_start'),
+        mysql_charset='utf8mb4',
+        mysql_collate='utf8mb4_unicode_ci'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('breaker_sync_rollups')
@@ -0,0 +1,56 @@
+"""add composite indexes for report, dashboard and overtime queries
+
+Revision ID: 20261017_0004
+Revises: 20261017_0003
+Create Date: 2026-10-17 00:04:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0004'
+down_revision: Union[str, None] = '20261017_0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add composite / covering indexes
+
+    - check_ins (status, check_in_time, stay_type, total_amount):
+      dashboard "today" counts by stay type and revenue, index-only
+    - check_ins (status, stay_type, is_overtime, expected_check_out_time):
+      the per-minute overtime scan
+    - check_ins (status, actual_check_out_time): daily check-out counts
+    - payments (payment_time, payment_method, check_in_id, amount):
+      revenue reports grouped by day and method, index-only
+    """
+    op.create_index(
+        'idx_check_ins_status_time',
+        'check_ins',
+        ['status', 'check_in_time', 'stay_type', 'total_amount']
+    )
+    op.create_index(
+        'idx_check_ins_overtime_scan',
+        'check_ins',
+        ['status', 'stay_type', 'is_overtime', 'expected_check_out_time']
+    )
+    op.create_index(
+        'idx_check_ins_status_checkout',
+        'check_ins',
+        ['status', 'actual_check_out_time']
+    )
+    op.create_index(
+        'idx_payments_time_method',
+        'payments',
+        ['payment_time', 'payment_method', 'check_in_id', 'amount']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_payments_time_method', table_name='payments')
+    op.drop_index('idx_check_ins_status_checkout', table_name='check_ins')
+    op.drop_index('idx_check_ins_overtime_scan', table_name='check_ins')
+    op.drop_index('idx_check_ins_status_time', table_name='check_ins')
@@ -0,0 +1,47 @@
+"""create public_holidays table
+
+Revision ID: 20261017_0005
+Revises: 20261017_0004
+Create Date: 2026-10-17 00:05:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0005'
+down_revision: Union[str, None] = '20261017_0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create public_holidays table
+
+    Local store for the booking calendar's public holidays, refreshed per
+    year by the holidays.refresh_public_holidays task instead of calling
+    the holiday API on every calendar load.
+    """
+    op.create_table(
+        'public_holidays',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('year', sa.Integer(), nullable=False, comment='Calendar year of the holiday'),
+        sa.Column('holiday_date', sa.Date(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False, comment='Thai name'),
+        sa.Column('name_en', sa.String(length=255), nullable=False, comment='English name'),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False, comment='When the year was last fetched'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('holiday_date', 'name_en', name='uq_public_holiday_date_name'),
+        mysql_charset='utf8mb4',
+        mysql_collate='utf8mb4_unicode_ci'
+    )
+    op.create_index('ix_public_holidays_id', 'public_holidays', ['id'])
+    op.create_index('ix_public_holidays_year', 'public_holidays', ['year'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_public_holidays_year', table_name='public_holidays')
+    op.drop_index('ix_public_holidays_id', table_name='public_holidays')
+    op.drop_table('public_holidays')
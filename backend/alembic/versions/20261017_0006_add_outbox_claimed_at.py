@@ -0,0 +1,35 @@
+"""add claimed_at to breaker_command_outbox
+
+Revision ID: 20261017_0006
+Revises: 20261017_0005
+Create Date: 2026-10-17 00:06:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0006'
+down_revision: Union[str, None] = '20261017_0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add breaker_command_outbox.claimed_at
+
+    Set when the dispatcher moves a row to PROCESSING; a row is only
+    reclaimed as stuck once its claim (not its creation) is older than the
+    processing timeout.
+    """
+    op.add_column(
+        'breaker_command_outbox',
+        sa.Column('claimed_at', mysql.DATETIME(fsp=3), nullable=True, comment='When the dispatcher last claimed the row')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('breaker_command_outbox', 'claimed_at')
@@ -0,0 +1,35 @@
+"""add state_changed_at to home_assistant_breakers
+
+Revision ID: 20261017_0007
+Revises: 20261017_0006
+Create Date: 2026-10-17 00:07:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0007'
+down_revision: Union[str, None] = '20261017_0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add home_assistant_breakers.state_changed_at
+
+    Set only when current_state changes; enforce_room_state times manual
+    overrides from it. Existing rows start from last_state_update, the
+    closest value available.
+    """
+    op.add_column(
+        'home_assistant_breakers',
+        sa.Column('state_changed_at', sa.TIMESTAMP(), nullable=True, comment='When current_state last changed')
+    )
+    op.execute("UPDATE home_assistant_breakers SET state_changed_at = last_state_update")
+
+
+def downgrade() -> None:
+    op.drop_column('home_assistant_breakers', 'state_changed_at')
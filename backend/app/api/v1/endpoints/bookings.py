@@ -2,14 +2,16 @@
 Booking API Endpoints (Phase 7)
 Handles booking creation, updates, calendar view, and availability checks
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
-from datetime import date
+from datetime import date, timedelta
 
 from app.core.dependencies import get_db, get_current_user, require_admin_or_reception
 from app.models.user import User
 from app.services.booking_service import BookingService
+from app.services.availability_service import AvailabilityService
+from app.core.report_cache import report_cache
 from app.schemas.booking import (
     BookingCreate,
     BookingUpdate,
@@ -18,7 +20,11 @@ from app.schemas.booking import (
     BookingCalendarEvent,
     PublicHoliday,
     RoomAvailabilityCheck,
-    RoomAvailabilityResponse
+    RoomAvailabilityResponse,
+    BookingQuoteResponse,
+    AvailabilityMatrixResponse,
+    CalendarProjectionResponse,
+    CalendarHeatResponse
 )
 
 import logging
@@ -139,6 +145,71 @@ async def get_bookings(
         raise HTTPException(status_code=500, detail=f"เกิดข้อผิดพลาด: {str(e)}")
 
 
+@router.get("/availability", response_model=AvailabilityMatrixResponse)
+async def get_availability_matrix(
+    start_date: date = Query(..., description="First night"),
+    end_date: date = Query(..., description="Day after the last night"),
+    room_ids: Optional[List[int]] = Query(None, description="Limit to these rooms"),
+    room_type_id: Optional[int] = Query(None, gt=0),
+    current_user: User = Depends(require_admin_or_reception),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Room x night availability for many rooms in one call
+
+    **Required role**: Admin, Reception
+
+    **Query Parameters**:
+    - start_date / end_date: Nights [start_date, end_date), up to 366
+    - room_ids: Repeat to select rooms (default: all active rooms)
+    - room_type_id: Only rooms of this type
+
+    **Returns**: Per room, the status of each night (free / booked /
+    occupied), whether the whole range is free, and the blocking bookings
+    and stays
+    """
+    try:
+        service = AvailabilityService(db)
+        return await service.get_matrix(start_date, end_date, room_ids, room_type_id)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error getting availability: %s", str(e))
+        raise HTTPException(status_code=500, detail=f"เกิดข้อผิดพลาด: {str(e)}")
+
+
+@router.get("/quote", response_model=BookingQuoteResponse)
+async def quote_booking(
+    room_id: int = Query(..., gt=0),
+    check_in_date: date = Query(...),
+    check_out_date: date = Query(...),
+    current_user: User = Depends(require_admin_or_reception),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Price an overnight stay night by night from the effective room rates
+
+    **Required role**: Admin, Reception
+
+    **Query Parameters**:
+    - room_id: Room to price
+    - check_in_date: First night
+    - check_out_date: Departure day
+
+    **Returns**: Nightly rates and total (null total if a night has no rate)
+    """
+    try:
+        service = BookingService(db)
+        return await service.quote_stay(room_id, check_in_date, check_out_date)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error quoting booking: %s", str(e))
+        raise HTTPException(status_code=500, detail=f"เกิดข้อผิดพลาด: {str(e)}")
+
+
 @router.get("/{booking_id}", response_model=BookingResponse)
 async def get_booking(
     booking_id: int,
@@ -274,6 +345,134 @@ async def get_calendar_events(
         raise HTTPException(status_code=500, detail=f"เกิดข้อผิดพลาด: {str(e)}")
 
 
+def _month_range(month: str):
+    """'YYYY-MM' -> (first day, first day of the next month)"""
+    try:
+        year, month_number = (int(part) for part in month.split("-"))
+        start = date(year, month_number, 1)
+    except ValueError:
+        raise ValueError("รูปแบบเดือนต้องเป็น YYYY-MM")
+    end = date(year + 1, 1, 1) if month_number == 12 else date(year, month_number + 1, 1)
+    return start, end
+
+
+async def _cached_calendar_view(
+    view: str,
+    response_model,
+    compute,
+    start: date,
+    end: date,
+    response: Response,
+    if_none_match: Optional[str]
+):
+    """
+    Serve a calendar view from the report cache with an ETag
+
+    The ETag is (view, range, generation): the generation changes with
+    every booking write (and, for ranges reaching today, every check-in or
+    check-out), so a matching If-None-Match is answered with 304 without
+    touching the database.
+    """
+    try:
+        generation = await report_cache.get_generation(end - timedelta(days=1), depends_on_bookings=True)
+    except Exception as e:
+        logger.warning("Calendar ETag unavailable: %s", e)
+        return await compute()
+
+    etag = f'W/"{view}-{start}-{end}-{generation}"'
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    result = await report_cache.get_or_compute(
+        view, response_model, compute,
+        start_date=start, end_date=end - timedelta(days=1),
+        depends_on_bookings=True
+    )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return result
+
+
+@router.get("/calendar/projection", response_model=CalendarProjectionResponse)
+async def get_calendar_projection(
+    response: Response,
+    month: str = Query(..., description="Month (YYYY-MM)"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(require_admin_or_reception),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Compact month view of the booking calendar
+
+    **Required role**: Admin, Reception
+
+    **Query Parameters**:
+    - month: Month to show (YYYY-MM)
+
+    **Returns**: Column-oriented events (parallel arrays of id, room index,
+    start offset, nights, status index, customer, amounts) with rooms and
+    statuses as lookup tables. Sends an ETag; repeat the request with
+    If-None-Match to get 304 when nothing changed.
+    """
+    try:
+        start, end = _month_range(month)
+        service = BookingService(db)
+        return await _cached_calendar_view(
+            "calendar_projection", CalendarProjectionResponse,
+            lambda: service.get_calendar_projection(start, end),
+            start, end, response, if_none_match
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error getting calendar projection: %s", str(e))
+        raise HTTPException(status_code=500, detail=f"เกิดข้อผิดพลาด: {str(e)}")
+
+
+@router.get("/calendar/heat", response_model=CalendarHeatResponse)
+async def get_calendar_heat(
+    response: Response,
+    year: Optional[int] = Query(None, ge=2000, le=2100, description="Whole year"),
+    month: Optional[str] = Query(None, description="Single month (YYYY-MM)"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(require_admin_or_reception),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Occupancy heat: per-day booking counts only
+
+    **Required role**: Admin, Reception
+
+    **Query Parameters**:
+    - year: Year view (e.g. 2026), or
+    - month: Month view (YYYY-MM)
+
+    **Returns**: For each day, rooms booked for the night, arrivals and
+    departures. Sends an ETag like /calendar/projection.
+    """
+    try:
+        if (year is None) == (month is None):
+            raise ValueError("ต้องระบุ year หรือ month อย่างใดอย่างหนึ่ง")
+        if year is not None:
+            start, end = date(year, 1, 1), date(year + 1, 1, 1)
+        else:
+            start, end = _month_range(month)
+
+        service = BookingService(db)
+        return await _cached_calendar_view(
+            "calendar_heat", CalendarHeatResponse,
+            lambda: service.get_calendar_heat(start, end),
+            start, end, response, if_none_match
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error getting calendar heat: %s", str(e))
+        raise HTTPException(status_code=500, detail=f"เกิดข้อผิดพลาด: {str(e)}")
+
+
 @router.get("/calendar/public-holidays/{year}", response_model=List[PublicHoliday])
 async def get_public_holidays(
     year: int,
@@ -10,6 +10,7 @@ from datetime import datetime
 
 from app.core.dependencies import get_db, require_role, get_current_user_id
 from app.services.breaker_service import BreakerService
+from app.services.breaker_outbox_service import BreakerOutboxService
 from app.models.home_assistant import (
     BreakerState,
     BreakerAction,
@@ -536,3 +537,20 @@ async def get_breaker_statistics(
         return BreakerStatistics(**stats)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/outbox/metrics", response_model=dict)
+async def get_outbox_metrics(
+    window_minutes: int = Query(60, ge=1, le=1440, description="ช่วงเวลาที่ใช้คำนวณ delay (นาที)"),
+    db: AsyncSession = Depends(get_db),
+    _current_user_id: int = Depends(require_role(["ADMIN"]))
+):
+    """
+    ดึงสถิติคิวคำสั่ง breaker อัตโนมัติ (outbox)
+
+    **สิทธิ์**: ADMIN เท่านั้น
+
+    **Returns**: จำนวนคำสั่งที่รอ/ล้มเหลว และ delay ตั้งแต่ commit สถานะห้องจนสั่ง breaker เสร็จ (p50/p95/max)
+    """
+    service = BreakerOutboxService(db)
+    return await service.get_metrics(window_minutes=window_minutes)
@@ -9,6 +9,7 @@ from typing import List
 
 from app.core.dependencies import get_db, get_current_user
 from app.core.datetime_utils import now_thailand
+from app.core.room_state_stream import room_state_stream
 from app.models import User
 from app.services import DashboardService
 from app.schemas.dashboard import DashboardResponse, DashboardRoomCard, DashboardStats, OvertimeAlertsResponse
@@ -30,9 +31,13 @@ async def get_dashboard(
         - rooms: List of all rooms with current status and check-in details
         - stats: Dashboard statistics (occupancy, revenue, etc.)
         - last_updated: Timestamp of when data was fetched
+        - seq: Room delta seq the snapshot covers; resume with /ws/dashboard?since=seq
     """
     service = DashboardService(db)
 
+    # Read the seq first: deltas racing with the snapshot are replayed, not lost
+    seq = await room_state_stream.current_seq()
+
     # Get rooms and stats in parallel
     rooms = await service.get_all_rooms_with_details()
     stats = await service.get_dashboard_stats()
@@ -40,7 +45,8 @@ async def get_dashboard(
     return DashboardResponse(
         rooms=rooms,
         stats=stats,
-        last_updated=now_thailand()
+        last_updated=now_thailand(),
+        seq=seq
     )
 
 
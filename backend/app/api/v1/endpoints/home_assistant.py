@@ -25,6 +25,7 @@ from app.schemas.home_assistant import (
     HomeAssistantEntityResponse
 )
 from app.core.encryption import encrypt_value, mask_token
+from app.core.home_assistant_client import ha_client, ha_config_cache
 from app.core.exceptions import HomeAssistantNotConfiguredError
 from sqlalchemy import select
 
@@ -138,6 +139,7 @@ async def create_or_update_home_assistant_config(
 
     await db.commit()
     await db.refresh(config)
+    await ha_config_cache.invalidate()
 
     masked_token = mask_token(data.access_token)
 
@@ -213,6 +215,7 @@ async def update_home_assistant_config(
 
     await db.commit()
     await db.refresh(config)
+    await ha_config_cache.invalidate()
 
     masked_token = mask_token(test_token)
 
@@ -251,6 +254,7 @@ async def delete_home_assistant_config(
 
     config.is_active = False
     await db.commit()
+    await ha_config_cache.invalidate()
 
     return None
 
@@ -379,3 +383,19 @@ async def get_home_assistant_entities(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"ไม่สามารถดึงรายการ entities ได้: {str(e)}"
         )
+
+
+@router.get("/metrics")
+async def get_home_assistant_metrics(
+    _current_user_id: int = Depends(require_role(["ADMIN"]))
+):
+    """
+    สถิติเวลาตอบสนองของ Home Assistant (เฉพาะ process นี้)
+
+    **สิทธิ์**: ADMIN เท่านั้น
+
+    **Returns**:
+    - latency: histogram ต่อ operation (test_connection, get_entity_state,
+      get_all_states, call_service, get_all_entities) แยกตามผล ok/error
+    """
+    return {"latency": ha_client.latency.snapshot()}
@@ -2,13 +2,14 @@
 Reports API Endpoints (Phase 8)
 Admin/Reception endpoints for viewing reports and analytics
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, timedelta
 
 from app.core.dependencies import get_db, require_role
 from app.models.user import User
 from app.services.reports_service import ReportsService
+from app.core.report_cache import report_cache
 from app.schemas.reports import (
     RevenueReportResponse,
     OccupancyReportResponse,
@@ -27,6 +28,7 @@ async def get_revenue_report(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
     group_by: str = Query("day", description="Group by: day or month"),
+    no_cache: bool = Query(False, description="Bypass the report cache (debugging)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN", "RECEPTION"]))
 ):
@@ -39,6 +41,7 @@ async def get_revenue_report(
     - start_date: Start date for report (YYYY-MM-DD)
     - end_date: End date for report (YYYY-MM-DD)
     - group_by: Group data by "day" or "month"
+    - no_cache: Bypass the report cache (debugging)
 
     **Returns**:
     - Total revenue
@@ -47,13 +50,19 @@ async def get_revenue_report(
     - Revenue trend over time (chart data)
     """
     service = ReportsService(db)
-    return await service.get_revenue_report(start_date, end_date, group_by)
+    return await report_cache.get_or_compute(
+        "revenue", RevenueReportResponse,
+        lambda: service.get_revenue_report(start_date, end_date, group_by),
+        start_date=start_date, end_date=end_date, params={"group_by": group_by},
+        bypass=no_cache
+    )
 
 
 @router.get("/occupancy", response_model=OccupancyReportResponse)
 async def get_occupancy_report(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
+    no_cache: bool = Query(False, description="Bypass the report cache (debugging)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN", "RECEPTION"]))
 ):
@@ -65,6 +74,7 @@ async def get_occupancy_report(
     **Query Parameters**:
     - start_date: Start date for report (YYYY-MM-DD)
     - end_date: End date for report (YYYY-MM-DD)
+    - no_cache: Bypass the report cache (debugging)
 
     **Returns**:
     - Overall occupancy rate (%)
@@ -72,13 +82,20 @@ async def get_occupancy_report(
     - Occupancy trend over time (chart data)
     """
     service = ReportsService(db)
-    return await service.get_occupancy_report(start_date, end_date)
+    return await report_cache.get_or_compute(
+        "occupancy", OccupancyReportResponse,
+        lambda: service.get_occupancy_report(start_date, end_date),
+        start_date=start_date, end_date=end_date,
+        closed_ranges_immutable=False,  # includes current room status
+        bypass=no_cache
+    )
 
 
 @router.get("/bookings", response_model=BookingReportResponse)
 async def get_booking_report(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
+    no_cache: bool = Query(False, description="Bypass the report cache (debugging)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN", "RECEPTION"]))
 ):
@@ -90,6 +107,7 @@ async def get_booking_report(
     **Query Parameters**:
     - start_date: Start date for report (YYYY-MM-DD)
     - end_date: End date for report (YYYY-MM-DD)
+    - no_cache: Bypass the report cache (debugging)
 
     **Returns**:
     - Total bookings
@@ -99,12 +117,19 @@ async def get_booking_report(
     - Booking trend over time (chart data)
     """
     service = ReportsService(db)
-    return await service.get_booking_report(start_date, end_date)
+    return await report_cache.get_or_compute(
+        "bookings", BookingReportResponse,
+        lambda: service.get_booking_report(start_date, end_date),
+        start_date=start_date, end_date=end_date,
+        depends_on_bookings=True,
+        bypass=no_cache
+    )
 
 
 @router.get("/customers", response_model=CustomerReportResponse)
 async def get_customer_report(
     limit: int = Query(10, ge=1, le=100, description="Number of top customers"),
+    no_cache: bool = Query(False, description="Bypass the report cache (debugging)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN", "RECEPTION"]))
 ):
@@ -115,6 +140,7 @@ async def get_customer_report(
 
     **Query Parameters**:
     - limit: Number of top customers to return (default: 10, max: 100)
+    - no_cache: Bypass the report cache (debugging)
 
     **Returns**:
     - Top customers by total spending
@@ -123,13 +149,19 @@ async def get_customer_report(
     - Returning customers
     """
     service = ReportsService(db)
-    return await service.get_customer_report(limit)
+    return await report_cache.get_or_compute(
+        "customers", CustomerReportResponse,
+        lambda: service.get_customer_report(limit),
+        params={"limit": limit},
+        bypass=no_cache
+    )
 
 
 @router.get("/summary", response_model=SummaryReportResponse)
 async def get_summary_report(
     start_date: date = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(None, description="End date (YYYY-MM-DD)"),
+    no_cache: bool = Query(False, description="Bypass the report cache (debugging)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN", "RECEPTION"]))
 ):
@@ -141,6 +173,7 @@ async def get_summary_report(
     **Query Parameters**:
     - start_date: Start date (default: 7 days ago)
     - end_date: End date (default: today)
+    - no_cache: Bypass the report cache (debugging)
 
     **Returns**:
     - Key metrics summary:
@@ -158,13 +191,20 @@ async def get_summary_report(
         start_date = end_date - timedelta(days=7)
 
     service = ReportsService(db)
-    return await service.get_summary_report(start_date, end_date)
+    return await report_cache.get_or_compute(
+        "summary", SummaryReportResponse,
+        lambda: service.get_summary_report(start_date, end_date),
+        start_date=start_date, end_date=end_date,
+        closed_ranges_immutable=False,  # includes current occupancy and customer totals
+        bypass=no_cache
+    )
 
 
 @router.get("/check-ins", response_model=CheckInsListResponse)
 async def get_checkins_list(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
+    no_cache: bool = Query(False, description="Bypass the report cache (debugging)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN", "RECEPTION"]))
 ):
@@ -176,6 +216,7 @@ async def get_checkins_list(
     **Query Parameters**:
     - start_date: Start date for report (YYYY-MM-DD)
     - end_date: End date for report (YYYY-MM-DD)
+    - no_cache: Bypass the report cache (debugging)
 
     **Returns**:
     - List of check-ins with customer and room details
@@ -183,13 +224,20 @@ async def get_checkins_list(
     - Sortable and filterable table data
     """
     service = ReportsService(db)
-    return await service.get_checkins_list(start_date, end_date)
+    return await report_cache.get_or_compute(
+        "check_ins", CheckInsListResponse,
+        lambda: service.get_checkins_list(start_date, end_date),
+        start_date=start_date, end_date=end_date,
+        closed_ranges_immutable=False,  # rows show the current stay status
+        bypass=no_cache
+    )
 
 
 @router.get("/check-ins/stats", response_model=CheckInStatsResponse)
 async def get_checkin_stats(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
+    no_cache: bool = Query(False, description="Bypass the report cache (debugging)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN", "RECEPTION"]))
 ):
@@ -201,6 +249,7 @@ async def get_checkin_stats(
     **Query Parameters**:
     - start_date: Start date for report (YYYY-MM-DD)
     - end_date: End date for report (YYYY-MM-DD)
+    - no_cache: Bypass the report cache (debugging)
 
     **Returns**:
     - Daily check-in counts separated by stay type (overnight/temporary)
@@ -208,4 +257,28 @@ async def get_checkin_stats(
     - Suitable for bar chart visualization
     """
     service = ReportsService(db)
-    return await service.get_checkin_stats(start_date, end_date)
+    return await report_cache.get_or_compute(
+        "check_ins_stats", CheckInStatsResponse,
+        lambda: service.get_checkin_stats(start_date, end_date),
+        start_date=start_date, end_date=end_date,
+        bypass=no_cache
+    )
+
+
+@router.get("/cache-stats")
+async def get_report_cache_stats(
+    current_user: User = Depends(require_role(["ADMIN"]))
+):
+    """
+    Get report cache hit/miss counters
+
+    **Permissions**: Admin
+
+    **Returns**:
+    - Per report: hits, misses and bypassed requests
+    - 503 if Redis is unavailable
+    """
+    try:
+        return await report_cache.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Report cache stats unavailable: {e}")
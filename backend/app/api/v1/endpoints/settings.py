@@ -13,6 +13,7 @@ from app.schemas.settings import (
 )
 from app.services.settings_service import SettingsService
 from app.services.telegram_service import TelegramService
+from app.core.telegram_dispatcher import telegram_dispatcher
 from app.models.user import User
 
 router = APIRouter()
@@ -95,3 +96,39 @@ async def test_telegram_connection(
         message=message,
         bot_info=bot_info
     )
+
+
+@router.get("/telegram/outbox-metrics")
+async def get_telegram_outbox_metrics(
+    current_user: User = Depends(require_admin)
+):
+    """
+    Telegram dispatcher counters and queue depth (Admin only)
+
+    Returns:
+        sent / coalesced / retried / dropped totals plus pending and
+        delayed message counts
+    """
+    try:
+        return await telegram_dispatcher.get_metrics()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Telegram outbox metrics unavailable: {e}")
+
+
+@router.get("/hotel-tick/metrics")
+async def get_hotel_tick_metrics(
+    current_user: User = Depends(require_admin)
+):
+    """
+    Per-stage timings of the per-minute hotel tick (Admin only)
+
+    Returns:
+        runs / last_ms / avg_ms / max_ms per stage (snapshot, overtime,
+        reconcile, dispatch, total) plus the number of skipped ticks
+    """
+    from app.tasks.hotel_tick_tasks import get_tick_metrics
+
+    try:
+        return await get_tick_metrics()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Hotel tick metrics unavailable: {e}")
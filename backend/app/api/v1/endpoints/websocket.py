@@ -3,31 +3,107 @@ WebSocket API Endpoints (Phase 3)
 Real-time communication for dashboard updates
 """
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from typing import Optional
+from sqlalchemy import select
+from typing import Iterable, List, Optional, Set
 import logging
 import uuid
 
-from app.core.websocket import manager
+from app.core.security import decode_access_token
+from app.core.websocket import manager, Subscription
+from app.core.room_state_stream import room_state_stream
+from app.db.session import AsyncSessionLocal
+from app.models.room import Room
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _split_csv(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated query parameter (None if absent)"""
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _role_from_token(token: Optional[str]) -> Optional[str]:
+    """
+    Staff role from a JWT access token (None without a token)
+
+    Raises:
+        ValueError: If the token is invalid or expired
+    """
+    if token is None:
+        return None
+    payload = decode_access_token(token)
+    if payload is None:
+        raise ValueError("invalid token")
+    return payload.get("role")
+
+
+async def _build_subscription(
+    role: Optional[str] = None,
+    events: Optional[Iterable[str]] = None,
+    rooms: Optional[Iterable[int]] = None,
+    floors: Optional[Iterable[int]] = None,
+    deltas: bool = False
+) -> Subscription:
+    """
+    Build a Subscription, expanding floors into their room IDs
+
+    An empty rooms/floors list means no filter, like leaving it out.
+    """
+    room_ids: Optional[Set[int]] = {int(r) for r in rooms} if rooms else None
+    floor_set: Optional[Set[int]] = {int(f) for f in floors} if floors else None
+
+    if floor_set:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Room.id).where(Room.floor.in_(floor_set)))
+            room_ids = (room_ids or set()) | set(result.scalars().all())
+
+    return Subscription(
+        role=role,
+        events=set(events) if events is not None else None,
+        rooms=room_ids,
+        floors=floor_set,
+        deltas=deltas
+    )
+
+
 @router.websocket("/dashboard")
 async def websocket_dashboard_endpoint(
     websocket: WebSocket,
-    client_id: Optional[str] = Query(None, description="Optional client ID for reconnection")
+    client_id: Optional[str] = Query(None, description="Optional client ID for reconnection"),
+    token: Optional[str] = Query(None, description="JWT access token; the staff role comes from it"),
+    events: Optional[str] = Query(None, description="Comma-separated event types (fnmatch patterns)"),
+    rooms: Optional[str] = Query(None, description="Comma-separated room IDs"),
+    floors: Optional[str] = Query(None, description="Comma-separated floors"),
+    deltas: bool = Query(False, description="Receive room_delta instead of full room events"),
+    since: Optional[int] = Query(None, ge=0, description="Resume room deltas after this seq")
 ):
     """
     WebSocket endpoint for dashboard real-time updates
 
     Events sent to clients:
-        - room_status_changed: Room status updated
+        - room_status_changed: Room status updated (not sent with deltas=1)
+        - room_transferred: Guest moved to another room (not sent with deltas=1)
         - overtime_alert: Guest exceeded expected checkout time
         - check_in: New check-in completed
         - check_out: Guest checked out
         - notification: New notification created
+        - room_delta: Changed room-card fields, {"seq": n, "data": {"room_id", "changes"}}
+          (only with deltas=1)
+        - resync_required: Missed or unrecorded deltas; reload /api/v1/dashboard/
+          (only with deltas=1)
+
+    Room deltas:
+        Opt-in with ?deltas=1 (or ?since=). A delta client gets room_delta in
+        place of room_status_changed/room_transferred; a transfer yields two
+        deltas, the cleared old card and the full stay on the new card.
+        `seq` increases by one per delta across the hotel. The dashboard
+        snapshot (/api/v1/dashboard/) returns the seq it is current to.
+        Clients apply deltas with seq > last applied, ignore older ones,
+        and on a gap reconnect with ?since=<last applied seq>.
 
     Message format:
     {
@@ -38,13 +114,42 @@ async def websocket_dashboard_endpoint(
 
     Query Parameters:
         - client_id: Optional client ID for reconnection tracking
+        - token: Access token of the signed-in user. Its role
+          (ADMIN/RECEPTION/HOUSEKEEPING/MAINTENANCE) selects the default
+          event set when `events` is not given, and role-targeted
+          notifications only reach matching roles. An invalid token closes
+          the connection (1008)
+        - events: Only these event types, e.g. "room_status_changed,housekeeping_task_*"
+        - rooms: Only events about these room IDs (empty: all rooms)
+        - floors: Only events about rooms on these floors (empty: all floors)
+        - deltas: Switch to the room-delta stream
+        - since: Replay room deltas after this seq before going live (implies deltas)
+
+    Client messages:
+        - {"type": "ping"} -> {"type": "pong"}
+        - {"type": "subscribe", "events": [...], "rooms": [...], "floors": [...], "deltas": bool}
+          replaces the filter (the role stays the token's) -> {"type": "subscribed", "data": {...}}
+        - {"type": "unsubscribe"} removes the filter (receive everything sent to the role)
     """
     # Generate client ID if not provided
     if not client_id:
         client_id = str(uuid.uuid4())
 
+    try:
+        role = _role_from_token(token)
+        subscription = await _build_subscription(
+            role=role,
+            events=_split_csv(events),
+            rooms=_split_csv(rooms),
+            floors=_split_csv(floors),
+            deltas=deltas or since is not None
+        )
+    except ValueError:
+        await websocket.close(code=1008)
+        return
+
     # Accept connection
-    await manager.connect(websocket, client_id)
+    await manager.connect(websocket, client_id, subscription, hold_for_replay=since is not None)
 
     # Send welcome message
     await manager.send_personal_message(
@@ -52,12 +157,18 @@ async def websocket_dashboard_endpoint(
             "event": "connected",
             "data": {
                 "client_id": client_id,
-                "message": "เชื่อมต่อสำเร็จ"
+                "message": "เชื่อมต่อสำเร็จ",
+                "subscription": subscription.to_dict(),
+                "seq": await room_state_stream.current_seq()
             }
         },
         client_id=client_id
     )
 
+    # Catch up on missed room deltas
+    if since is not None:
+        await manager.replay_room_deltas(client_id, since)
+
     try:
         # Keep connection alive and handle incoming messages
         while True:
@@ -72,7 +183,34 @@ async def websocket_dashboard_endpoint(
                 )
                 continue
 
-            # Log other messages (future: could handle client commands)
+            # Change the broadcast filter
+            if data.get("type") in ("subscribe", "unsubscribe"):
+                try:
+                    if data["type"] == "subscribe":
+                        subscription = await _build_subscription(
+                            role=role,
+                            events=data.get("events"),
+                            rooms=data.get("rooms"),
+                            floors=data.get("floors"),
+                            deltas=bool(data.get("deltas"))
+                        )
+                    else:
+                        subscription = Subscription(role=role, events={"*"})
+                except (TypeError, ValueError):
+                    await manager.send_personal_message(
+                        message={"type": "error", "data": {"message": "รูปแบบการสมัครรับข้อมูลไม่ถูกต้อง"}},
+                        client_id=client_id
+                    )
+                    continue
+
+                manager.subscribe(client_id, subscription)
+                await manager.send_personal_message(
+                    message={"type": "subscribed", "data": subscription.to_dict()},
+                    client_id=client_id
+                )
+                continue
+
+            # Log other messages
             logger.info(f"Received message from {client_id}: {data}")
 
     except WebSocketDisconnect:
@@ -95,3 +233,18 @@ async def get_active_connections():
         {"active_connections": int}
     """
     return {"active_connections": manager.get_active_connections_count()}
+
+
+@router.get("/connections/metrics")
+async def get_connection_metrics():
+    """
+    Get per-client outbound queue metrics for this API worker
+
+    Returns:
+        {"active_connections": int, "clients": [{client_id, queue_depth,
+        oldest_queued_ms, last_lag_ms, max_lag_ms, sent, coalesced, dropped}]}
+    """
+    return {
+        "active_connections": manager.get_active_connections_count(),
+        "clients": manager.get_client_metrics()
+    }
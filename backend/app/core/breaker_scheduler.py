@@ -0,0 +1,349 @@
+"""
+Breaker Command Scheduler
+Event-driven execution of BreakerControlQueue commands
+
+Pending commands live in a Redis sorted set (member = breaker_id,
+score = due time) with a hash holding the queue item to run for each
+breaker. One breaker has at most one pending command, so a newer ON/OFF
+replaces an older one that has not run yet (the replaced row is closed in
+BreakerControlQueue with a "superseded" note).
+
+The scheduler loop runs in the API process. It blocks on a wake-up list
+with a timeout equal to the time until the next due command, so it runs
+commands exactly when they are due and costs nothing while the queue is
+empty. Claiming due commands is a single Lua call, so several API workers
+can run the loop side by side.
+
+BreakerControlQueue stays the durable audit record: rows are written before
+they are scheduled, and PENDING rows are re-scheduled from the database on
+startup and, while running, every SWEEP_INTERVAL_SECONDS for rows that are
+overdue (scheduling failed after the commit, or Redis lost them).
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select
+
+from app.core.redis import get_redis
+from app.db.session import AsyncSessionLocal
+from app.models.home_assistant import BreakerControlQueue, QueueStatus, TargetState
+
+logger = logging.getLogger(__name__)
+
+DUE_KEY = "breaker:cmd:due"
+PENDING_KEY = "breaker:cmd:pending"
+WAKE_KEY = "breaker:cmd:wake"
+
+# Longest the loop sleeps without a wake-up (also bounds recovery time
+# after a lost wake-up)
+IDLE_WAIT_SECONDS = 30
+CLAIM_BATCH_SIZE = 50
+ERROR_RETRY_SECONDS = 5
+
+# Retry backoff after a failed command: RETRY_BACKOFF_SECONDS * attempt
+RETRY_BACKOFF_SECONDS = 3
+
+# How often the loop looks for PENDING rows Redis does not know about, and
+# how long past due a row must be before it counts as lost (a row that is
+# due right now may simply be about to run)
+SWEEP_INTERVAL_SECONDS = 60
+SWEEP_GRACE_SECONDS = 30
+
+# Replace (or, with ARGV[4] = "1", only add when absent) the pending command
+# for a breaker and wake a scheduler. Returns the replaced queue item id.
+_SCHEDULE_SCRIPT = """
+local previous = redis.call('HGET', KEYS[2], ARGV[1])
+if ARGV[4] == '1' and previous and previous ~= ARGV[2] then
+    return -1
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+redis.call('LPUSH', KEYS[3], '1')
+redis.call('LTRIM', KEYS[3], 0, 0)
+if previous and previous ~= ARGV[2] then
+    return tonumber(previous)
+end
+return 0
+"""
+
+# Pop every command due at ARGV[1]; returns a flat list of
+# breaker_id, queue_item_id pairs
+_CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local claimed = {}
+for _, breaker_id in ipairs(due) do
+    local item_id = redis.call('HGET', KEYS[2], breaker_id)
+    redis.call('ZREM', KEYS[1], breaker_id)
+    redis.call('HDEL', KEYS[2], breaker_id)
+    if item_id then
+        table.insert(claimed, breaker_id)
+        table.insert(claimed, item_id)
+    end
+end
+return claimed
+"""
+
+
+class BreakerCommandScheduler:
+    """Redis delay queue and runner for breaker commands"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def schedule(
+        self,
+        breaker_id: int,
+        queue_item_id: int,
+        due_at: datetime,
+        only_if_absent: bool = False
+    ) -> Optional[int]:
+        """
+        Schedule a queue item as the next command for its breaker
+
+        Args:
+            breaker_id: Breaker ID
+            queue_item_id: BreakerControlQueue row to execute
+            due_at: When to execute (naive local time, like scheduled_at)
+            only_if_absent: Do nothing if another command is already pending
+                (used for retries, so they never override a newer command)
+
+        Returns:
+            ID of the queue item this one replaced, -1 if not scheduled
+            because another command is pending, otherwise None
+        """
+        replaced = await get_redis().eval(
+            _SCHEDULE_SCRIPT, 3, DUE_KEY, PENDING_KEY, WAKE_KEY,
+            breaker_id, queue_item_id, due_at.timestamp(), "1" if only_if_absent else "0"
+        )
+        replaced = int(replaced)
+        return replaced if replaced != 0 else None
+
+    async def start(self):
+        """Re-schedule pending rows and start the loop (API startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the loop and wait for running commands (API shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def resync_from_db(self) -> int:
+        """
+        Schedule every PENDING BreakerControlQueue row (latest per breaker)
+
+        Returns:
+            Number of rows scheduled
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(BreakerControlQueue)
+                .where(BreakerControlQueue.status == QueueStatus.PENDING)
+                .order_by(BreakerControlQueue.created_at, BreakerControlQueue.id)
+            )
+            items = list(result.scalars().all())
+
+        latest = {}
+        for item in items:
+            latest[item.breaker_id] = item
+        for item in latest.values():
+            await self.schedule(item.breaker_id, item.id, item.scheduled_at)
+
+        stale = [item.id for item in items if latest[item.breaker_id] is not item]
+        if stale:
+            await self.mark_superseded(stale, None)
+        return len(latest)
+
+    async def sweep_overdue(self) -> int:
+        """
+        Re-schedule PENDING rows that should have run SWEEP_GRACE_SECONDS ago
+
+        Only the latest overdue row per breaker is scheduled, and never over
+        a newer command that is already waiting in Redis.
+
+        Returns:
+            Number of rows scheduled
+        """
+        overdue_before = datetime.now() - timedelta(seconds=SWEEP_GRACE_SECONDS)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(BreakerControlQueue)
+                .where(
+                    BreakerControlQueue.status == QueueStatus.PENDING,
+                    BreakerControlQueue.scheduled_at <= overdue_before
+                )
+                .order_by(BreakerControlQueue.created_at, BreakerControlQueue.id)
+            )
+            items = list(result.scalars().all())
+
+        latest = {}
+        for item in items:
+            latest[item.breaker_id] = item
+
+        stale = [item.id for item in items if latest[item.breaker_id] is not item]
+        scheduled = 0
+        for item in latest.values():
+            replaced = await self.schedule(item.breaker_id, item.id, item.scheduled_at, only_if_absent=True)
+            if replaced == -1:
+                stale.append(item.id)
+            else:
+                scheduled += 1
+
+        if stale:
+            await self.mark_superseded(stale, None)
+        if scheduled:
+            logger.warning("Breaker scheduler re-scheduled %s overdue command(s)", scheduled)
+        return scheduled
+
+    async def mark_superseded(self, queue_item_ids: List[int], replaced_by: Optional[int]):
+        """Close queue rows that a newer command for the same breaker replaced"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(BreakerControlQueue).where(
+                    BreakerControlQueue.id.in_(queue_item_ids),
+                    BreakerControlQueue.status == QueueStatus.PENDING
+                )
+            )
+            for item in result.scalars().all():
+                item.status = QueueStatus.COMPLETED
+                item.error_message = (
+                    f"Superseded by queue item #{replaced_by}" if replaced_by
+                    else "Superseded by a newer command"
+                )
+            await db.commit()
+
+    async def _run(self):
+        """Wait for the next due command, run it, repeat"""
+        while True:
+            try:
+                scheduled = await self.resync_from_db()
+                logger.info("Breaker scheduler started, %s pending command(s)", scheduled)
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Breaker scheduler resync failed, retrying in %ss: %s", ERROR_RETRY_SECONDS, e)
+                await asyncio.sleep(ERROR_RETRY_SECONDS)
+
+        loop = asyncio.get_running_loop()
+        next_sweep = loop.time() + SWEEP_INTERVAL_SECONDS
+        while True:
+            try:
+                if loop.time() >= next_sweep:
+                    next_sweep = loop.time() + SWEEP_INTERVAL_SECONDS
+                    await self.sweep_overdue()
+
+                redis = get_redis()
+                for breaker_id, queue_item_id in await self._claim_due():
+                    task = asyncio.create_task(self._execute(breaker_id, queue_item_id))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+
+                head = await redis.zrange(DUE_KEY, 0, 0, withscores=True)
+                wait = IDLE_WAIT_SECONDS
+                if head:
+                    wait = min(wait, max(head[0][1] - time.time(), 0))
+                if wait > 0:
+                    await redis.blpop(WAKE_KEY, timeout=max(wait, 0.01))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Breaker scheduler error, retrying in %ss: %s", ERROR_RETRY_SECONDS, e)
+                await asyncio.sleep(ERROR_RETRY_SECONDS)
+
+    async def _claim_due(self) -> List[Tuple[int, int]]:
+        """Atomically take every command that is due now"""
+        flat = await get_redis().eval(
+            _CLAIM_SCRIPT, 2, DUE_KEY, PENDING_KEY, time.time(), CLAIM_BATCH_SIZE
+        )
+        return [(int(flat[i]), int(flat[i + 1])) for i in range(0, len(flat), 2)]
+
+    async def _execute(self, breaker_id: int, queue_item_id: int):
+        """Run one queue item and record the outcome on its row"""
+        from app.services.breaker_service import BreakerService
+        from app.core.websocket import websocket_manager
+
+        async with AsyncSessionLocal() as db:
+            queue_item = await db.get(BreakerControlQueue, queue_item_id)
+            if queue_item is None or queue_item.status != QueueStatus.PENDING:
+                return
+
+            queue_item.status = QueueStatus.PROCESSING
+            await db.commit()
+
+            breaker_service = BreakerService(db)
+            try:
+                breaker = await breaker_service.get_by_id(breaker_id)
+                room_status = breaker.room.status.value if breaker and breaker.room else None
+
+                if queue_item.target_state == TargetState.ON:
+                    await breaker_service.turn_on(
+                        breaker_id=breaker_id,
+                        trigger_type=queue_item.trigger_type,
+                        triggered_by=queue_item.triggered_by,
+                        room_status_before=room_status,
+                        room_status_after=room_status
+                    )
+                else:
+                    await breaker_service.turn_off(
+                        breaker_id=breaker_id,
+                        trigger_type=queue_item.trigger_type,
+                        triggered_by=queue_item.triggered_by,
+                        room_status_before=room_status,
+                        room_status_after=room_status
+                    )
+
+                queue_item.status = QueueStatus.COMPLETED
+                queue_item.error_message = None
+                await db.commit()
+
+                await websocket_manager.broadcast({
+                    "event": "breaker_state_changed",
+                    "data": {
+                        "breaker_id": breaker_id,
+                        "entity_id": breaker.entity_id if breaker else None,
+                        "new_state": queue_item.target_state.value,
+                        "trigger_type": queue_item.trigger_type.value,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                })
+
+            except Exception as e:
+                await db.rollback()
+                await db.refresh(queue_item)
+                queue_item.retry_count += 1
+                queue_item.error_message = str(e)
+
+                if queue_item.retry_count >= queue_item.max_retries:
+                    queue_item.status = QueueStatus.FAILED
+                    await db.commit()
+                    logger.warning("Breaker command #%s failed permanently: %s", queue_item_id, e)
+                    return
+
+                queue_item.status = QueueStatus.PENDING
+                queue_item.scheduled_at = datetime.now() + timedelta(
+                    seconds=RETRY_BACKOFF_SECONDS * (queue_item.retry_count + 1)
+                )
+                await db.commit()
+
+                replaced = await self.schedule(
+                    breaker_id, queue_item_id, queue_item.scheduled_at, only_if_absent=True
+                )
+                if replaced == -1:
+                    # A newer command for this breaker is already waiting
+                    await self.mark_superseded([queue_item_id], None)
+
+
+# Global breaker command scheduler instance
+breaker_scheduler = BreakerCommandScheduler()
@@ -39,6 +39,30 @@ class Settings(BaseSettings):
     TELEGRAM_RECEPTION_GROUP_ID: Optional[str] = None
     TELEGRAM_HOUSEKEEPING_GROUP_ID: Optional[str] = None
     TELEGRAM_MAINTENANCE_GROUP_ID: Optional[str] = None
+    # Outbound dispatcher, see app/core/telegram_dispatcher.py
+    TELEGRAM_CHAT_RATE_PER_MINUTE: int = 20  # Telegram's limit for groups
+    TELEGRAM_CHAT_BURST: int = 3
+    TELEGRAM_GLOBAL_RATE_PER_SECOND: int = 25
+    TELEGRAM_MAX_ATTEMPTS: int = 5
+
+    # Public holidays (booking calendar), see app/services/holiday_service.py
+    PUBLIC_HOLIDAY_API_URL: str = "https://date.nager.at/api/v3/PublicHolidays/{year}/TH"
+    PUBLIC_HOLIDAY_TTL_DAYS: int = 30  # refresh a stored year after this many days
+
+    # Breaker activity logging
+    # "changes": log STATUS_SYNC only when state/availability changes or the
+    #            sync fails (every sync is still counted in breaker_sync_rollups)
+    # "all": log every sync (debugging)
+    BREAKER_SYNC_LOG_MODE: str = "changes"
+
+    # Data retention (days to keep; 0 = keep forever), see app/tasks/retention.py
+    RETENTION_BREAKER_QUEUE_DAYS: int = 7
+    RETENTION_BREAKER_SYNC_LOG_DAYS: int = 7
+    RETENTION_BREAKER_ACTIVITY_LOG_DAYS: int = 90
+    RETENTION_NOTIFICATION_DAYS: int = 90  # read notifications only
+    RETENTION_ORDER_DAYS: int = 0  # completed orders; kept for accounting by default
+    RETENTION_BATCH_SIZE: int = 5000  # id range per DELETE
+    RETENTION_MAX_SECONDS: int = 60  # per run; the task re-queues itself for the rest
 
     # Upload
     MAX_UPLOAD_SIZE: int = 5242880  # 5MB
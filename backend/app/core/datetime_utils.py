@@ -5,7 +5,8 @@ All timestamps use Asia/Bangkok timezone as specified in CLAUDE.md
 Note: Returns naive datetime (without timezone info) for database compatibility
 while calculating time in Bangkok timezone.
 """
-from datetime import datetime, timezone
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Tuple
 from zoneinfo import ZoneInfo
 
 # Thailand timezone
@@ -69,3 +70,23 @@ def make_aware(dt: datetime) -> datetime:
 
     # Treat as Bangkok time
     return dt.replace(tzinfo=BANGKOK_TZ)
+
+
+def day_range_bounds(start_date: date, end_date: date) -> Tuple[datetime, datetime]:
+    """
+    Half-open datetime bounds covering whole days [start_date, end_date]
+
+    Use as `column >= lower AND column < upper` instead of
+    `CAST(column AS DATE) BETWEEN ...` so the column index stays usable.
+
+    Args:
+        start_date: First day (inclusive)
+        end_date: Last day (inclusive)
+
+    Returns:
+        (midnight of start_date, midnight of the day after end_date)
+    """
+    return (
+        datetime.combine(start_date, time.min),
+        datetime.combine(end_date + timedelta(days=1), time.min)
+    )
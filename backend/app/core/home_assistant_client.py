@@ -0,0 +1,208 @@
+"""
+Home Assistant HTTP Client
+
+Process-wide pieces shared by every HomeAssistantService instance:
+- A pooled aiohttp session with keep-alive, so breaker commands reuse open
+  TCP/TLS connections instead of handshaking on every call
+- A cache of the decrypted active configuration
+- Per-operation request latency histograms
+"""
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Connection pool
+POOL_SIZE = 20
+KEEPALIVE_SECONDS = 60
+
+# Config cache: entries are re-validated against the Redis version at most
+# this often, and never live longer than the TTL
+CONFIG_VERSION_KEY = "ha:config:version"
+CONFIG_VERSION_CHECK_SECONDS = 5
+CONFIG_TTL_SECONDS = 300
+
+# Histogram bucket upper bounds in milliseconds (last bucket is +inf)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram per operation and outcome"""
+
+    def __init__(self, buckets_ms: Tuple[int, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._series: Dict[Tuple[str, str], dict] = {}
+
+    def observe(self, operation: str, outcome: str, elapsed_ms: float):
+        """Record one request"""
+        series = self._series.get((operation, outcome))
+        if series is None:
+            series = {"counts": [0] * (len(self.buckets_ms) + 1), "count": 0, "sum_ms": 0.0, "max_ms": 0.0}
+            self._series[(operation, outcome)] = series
+
+        index = len(self.buckets_ms)
+        for i, bound in enumerate(self.buckets_ms):
+            if elapsed_ms <= bound:
+                index = i
+                break
+
+        series["counts"][index] += 1
+        series["count"] += 1
+        series["sum_ms"] += elapsed_ms
+        series["max_ms"] = max(series["max_ms"], elapsed_ms)
+
+    def snapshot(self) -> List[dict]:
+        """Serializable view of every series"""
+        labels = [f"le_{bound}ms" for bound in self.buckets_ms] + ["le_inf"]
+        return [
+            {
+                "operation": operation,
+                "outcome": outcome,
+                "count": series["count"],
+                "avg_ms": round(series["sum_ms"] / series["count"], 1) if series["count"] else 0.0,
+                "max_ms": round(series["max_ms"], 1),
+                "buckets": dict(zip(labels, series["counts"], strict=True)),
+            }
+            for (operation, outcome), series in sorted(self._series.items())
+        ]
+
+
+class HomeAssistantClient:
+    """
+    Pooled aiohttp session shared by the whole process
+
+    aiohttp sessions are bound to the event loop that created them. Celery
+    tasks that run each invocation in a fresh loop get a fresh session; the
+    previous loop's session is released when that happens.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.latency = LatencyHistogram()
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the keep-alive session for the running loop (created lazily)"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            if self._session is not None and not self._session.closed:
+                self._release(self._session, self._session_loop)
+            connector = aiohttp.TCPConnector(limit=POOL_SIZE, keepalive_timeout=KEEPALIVE_SECONDS)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+        return self._session
+
+    @asynccontextmanager
+    async def timed(self, operation: str):
+        """Record the latency of the wrapped request under `operation`"""
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            self.latency.observe(operation, outcome, (time.perf_counter() - started) * 1000)
+
+    async def close(self):
+        """Close the pooled session (application shutdown)"""
+        session, session_loop = self._session, self._session_loop
+        self._session = None
+        self._session_loop = None
+        if session is None or session.closed:
+            return
+        if session_loop is asyncio.get_running_loop():
+            await session.close()
+        else:
+            self._release(session, session_loop)
+
+    @staticmethod
+    def _release(session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]):
+        """
+        Let go of a session that belongs to another event loop
+
+        A loop still running in another thread closes the session itself.
+        A closed or stopped loop can no longer close it gracefully: the
+        session is detached and its sockets are released when the
+        transports are collected.
+        """
+        try:
+            if loop is not None and loop.is_running() and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+            else:
+                session.detach()
+        except Exception as e:
+            logger.warning("Failed to release Home Assistant session: %s", e)
+            session.detach()
+
+
+class HomeAssistantConfigCache:
+    """
+    Decrypted active Home Assistant configuration, cached per process
+
+    invalidate() clears this process's copy and bumps a version in Redis so
+    other API workers and Celery drop theirs within a few seconds.
+    """
+
+    def __init__(self):
+        self._entry: Optional[dict] = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._version: Optional[str] = None
+
+    async def get(self) -> Optional[dict]:
+        """Cached {"base_url", "access_token"} or None if absent/stale"""
+        if self._entry is None:
+            return None
+
+        now = time.monotonic()
+        if now - self._loaded_at > CONFIG_TTL_SECONDS:
+            self._entry = None
+            return None
+
+        if now - self._checked_at > CONFIG_VERSION_CHECK_SECONDS:
+            try:
+                version = await get_redis().get(CONFIG_VERSION_KEY)
+            except Exception as e:
+                logger.warning("Cannot verify Home Assistant config version: %s", e)
+                version = self._version
+            if version != self._version:
+                self._entry = None
+                return None
+            self._checked_at = now
+
+        return self._entry
+
+    async def set(self, base_url: str, access_token: str):
+        """Store a freshly loaded and decrypted configuration"""
+        try:
+            version = await get_redis().get(CONFIG_VERSION_KEY)
+        except Exception:
+            version = None
+
+        now = time.monotonic()
+        self._entry = {"base_url": base_url, "access_token": access_token}
+        self._version = version
+        self._loaded_at = now
+        self._checked_at = now
+
+    async def invalidate(self):
+        """Drop the cached configuration in every process"""
+        self._entry = None
+        try:
+            await get_redis().incr(CONFIG_VERSION_KEY)
+        except Exception as e:
+            logger.warning("Failed to publish Home Assistant config invalidation: %s", e)
+
+
+# Global instances
+ha_client = HomeAssistantClient()
+ha_config_cache = HomeAssistantConfigCache()
@@ -0,0 +1,116 @@
+"""
+Room Rate Interval Index
+
+All active room_rates rows grouped by (room_type_id, stay_type), each group
+sorted by effective_from, so "rate on day D" is a bisect and the nightly
+prices of a stay are one pass over the group instead of one query per
+night.
+
+Resolution matches the SQL predicate used before:
+    effective_from <= D AND (effective_to IS NULL OR effective_to >= D)
+and, if periods overlap, the rate with the latest effective_from wins.
+
+The index is immutable; RoomRateService builds it and keeps it in
+room_rate_cache (app/core/snapshot_cache.py), which rate CRUD invalidates.
+"""
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.models.room_rate import StayType
+
+
+class RateEntry(NamedTuple):
+    """One room_rates row, detached from the session"""
+    id: int
+    room_type_id: int
+    stay_type: StayType
+    rate: Decimal
+    effective_from: date
+    effective_to: Optional[date]
+
+
+class RoomRateIndex:
+    """In-memory interval index over active room rates"""
+
+    def __init__(self, entries: Iterable[RateEntry]):
+        self._groups: Dict[Tuple[int, StayType], List[RateEntry]] = {}
+        for entry in entries:
+            self._groups.setdefault((entry.room_type_id, entry.stay_type), []).append(entry)
+
+        self._starts: Dict[Tuple[int, StayType], List[date]] = {}
+        for key, group in self._groups.items():
+            group.sort(key=lambda entry: (entry.effective_from, entry.id))
+            self._starts[key] = [entry.effective_from for entry in group]
+
+        self.loaded_at = datetime.now()
+        self.size = sum(len(group) for group in self._groups.values())
+
+    def rate_on(self, room_type_id: int, stay_type: StayType, day: date) -> Optional[RateEntry]:
+        """
+        Rate effective on `day`
+
+        Returns:
+            The entry, or None if no active rate covers the day
+        """
+        key = (room_type_id, stay_type)
+        group = self._groups.get(key)
+        if not group:
+            return None
+
+        # Latest period starting on or before the day that has not ended
+        for position in range(bisect_right(self._starts[key], day) - 1, -1, -1):
+            entry = group[position]
+            if entry.effective_to is None or entry.effective_to >= day:
+                return entry
+        return None
+
+    def nightly_rates(
+        self,
+        room_type_id: int,
+        stay_type: StayType,
+        start: date,
+        end: date
+    ) -> List[Optional[Decimal]]:
+        """
+        Price of every night in [start, end)
+
+        Returns:
+            One rate per night (None for nights no active rate covers)
+        """
+        rates: List[Optional[Decimal]] = []
+        day = start
+        while day < end:
+            entry = self.rate_on(room_type_id, stay_type, day)
+            if entry is None:
+                rates.append(None)
+                day += timedelta(days=1)
+                continue
+
+            # The entry covers every night up to its end (or the stay's end)
+            # unless a later period starts first
+            run_end = end if entry.effective_to is None else min(end, entry.effective_to + timedelta(days=1))
+            starts = self._starts[(room_type_id, stay_type)]
+            next_start = bisect_right(starts, day)
+            if next_start < len(starts):
+                run_end = min(run_end, starts[next_start])
+
+            nights = (run_end - day).days
+            rates.extend([entry.rate] * nights)
+            day = run_end
+        return rates
+
+    def rates_on(self, day: date) -> Dict[int, Dict[StayType, Decimal]]:
+        """
+        Every room type's rates on `day`
+
+        Returns:
+            {room_type_id: {stay_type: rate}}
+        """
+        rates: Dict[int, Dict[StayType, Decimal]] = {}
+        for room_type_id, stay_type in self._groups:
+            entry = self.rate_on(room_type_id, stay_type, day)
+            if entry is not None:
+                rates.setdefault(room_type_id, {})[stay_type] = entry.rate
+        return rates
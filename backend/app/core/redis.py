@@ -0,0 +1,70 @@
+"""
+Redis Client
+Shared asyncio Redis connection pool
+"""
+import asyncio
+import logging
+import weakref
+
+import redis.asyncio as aioredis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSE_TIMEOUT_SECONDS = 5
+
+# One client per event loop; an entry disappears with its loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> aioredis.Redis:
+    """
+    Get the Redis client for the running event loop (created lazily)
+
+    The client owns a connection pool, so it is safe to share between
+    requests and background coroutines. Connections are bound to the loop
+    they were opened on, so each loop gets its own client; clients of loops
+    that have been closed are dropped here.
+
+    Must be called from inside a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        for old_loop in [old_loop for old_loop in list(_clients.keys()) if old_loop.is_closed()]:
+            _discard(_clients.pop(old_loop))
+        client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        _clients[loop] = client
+    return client
+
+
+async def close_redis():
+    """
+    Close every client and its pool (application / worker shutdown)
+
+    The running loop's client is closed here. A client of a loop running in
+    another thread is closed on that loop. Connections of a loop that is
+    closed or not running can no longer be closed gracefully; they are
+    dropped and their sockets released when the transports are collected.
+    """
+    current = asyncio.get_running_loop()
+    clients = list(_clients.items())
+    _clients.clear()
+
+    for loop, client in clients:
+        try:
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running() and not loop.is_closed():
+                future = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                await asyncio.wait_for(asyncio.wrap_future(future), CLOSE_TIMEOUT_SECONDS)
+            else:
+                _discard(client)
+        except Exception as e:
+            logger.warning("Failed to close Redis client: %s", e)
+            _discard(client)
+
+
+def _discard(client: aioredis.Redis):
+    """Forget the pooled connections of a client whose loop is gone"""
+    client.connection_pool.reset()
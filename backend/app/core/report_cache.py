@@ -0,0 +1,217 @@
+"""
+Report Cache (Phase 8)
+Redis-backed cache for /api/v1/reports responses
+
+Keys are (report, date range, params). A range that ends before today is
+"closed": its numbers only change when a back-dated check-in/check-out or
+a booking edit touches the past, so the entry is stored with a long TTL.
+Ranges that include today, and reports that depend on current room or
+customer state, live under a generation counter that is bumped after
+check-outs, payments, check-ins and booking changes, which orphans every
+live entry in O(1).
+
+Redis being unavailable never fails a report: the cache logs a warning and
+the report is computed directly.
+"""
+from datetime import date
+from typing import Awaitable, Callable, Dict, Optional, Type, TypeVar
+from pydantic import BaseModel
+import logging
+
+from app.core.redis import get_redis
+from app.core.datetime_utils import today_thailand
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+KEY_PREFIX = "reports"
+LIVE_GENERATION_KEY = f"{KEY_PREFIX}:gen:live"
+HISTORY_GENERATION_KEY = f"{KEY_PREFIX}:gen:history"
+BOOKINGS_GENERATION_KEY = f"{KEY_PREFIX}:gen:bookings"
+STATS_KEY = f"{KEY_PREFIX}:stats"
+
+LIVE_TTL_SECONDS = 5 * 60
+CLOSED_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+class ReportCache:
+    """
+    Report result cache
+
+    Usage:
+        return await report_cache.get_or_compute(
+            "revenue", RevenueReportResponse,
+            lambda: service.get_revenue_report(start_date, end_date, group_by),
+            start_date=start_date, end_date=end_date, params={"group_by": group_by}
+        )
+    """
+
+    async def get_or_compute(
+        self,
+        report: str,
+        response_model: Type[ModelT],
+        compute: Callable[[], Awaitable[ModelT]],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        params: Optional[Dict[str, object]] = None,
+        closed_ranges_immutable: bool = True,
+        depends_on_bookings: bool = False,
+        bypass: bool = False
+    ) -> ModelT:
+        """
+        Return the cached report or compute and store it
+
+        Args:
+            report: Report name (part of the key and of the stats)
+            response_model: Pydantic model used to (de)serialize the entry
+            compute: Coroutine factory that builds the report
+            start_date: Range start (None for reports without a range)
+            end_date: Range end (None for reports without a range)
+            params: Extra parameters that change the output (e.g. group_by)
+            closed_ranges_immutable: False for reports that also show current
+                state (room status, customer totals), which are always live
+            depends_on_bookings: Booking changes also invalidate closed ranges
+            bypass: Skip the cache entirely (debugging)
+
+        Returns:
+            The report model
+        """
+        if bypass:
+            await self._count(report, "bypass")
+            return await compute()
+
+        try:
+            key, ttl = await self._build_key(
+                report, start_date, end_date, params,
+                closed_ranges_immutable, depends_on_bookings
+            )
+            cached = await get_redis().get(key)
+        except Exception as e:
+            logger.warning("Report cache unavailable for %s: %s", report, e)
+            return await compute()
+
+        if cached is not None:
+            await self._count(report, "hits")
+            return response_model.model_validate_json(cached)
+
+        await self._count(report, "misses")
+        result = await compute()
+
+        try:
+            await get_redis().set(key, result.model_dump_json(), ex=ttl)
+        except Exception as e:
+            logger.warning("Failed to store %s report in cache: %s", report, e)
+
+        return result
+
+    async def invalidate_live(self, affected_day: Optional[date] = None):
+        """
+        Drop every entry whose range includes today (or that is always live)
+
+        Args:
+            affected_day: Day the change applies to; a back-dated change
+                (before today) also drops closed-range entries
+        """
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.incr(LIVE_GENERATION_KEY)
+            if affected_day is not None and affected_day < today_thailand():
+                pipe.incr(HISTORY_GENERATION_KEY)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("Failed to invalidate live report cache: %s", e)
+
+    async def invalidate_bookings(self):
+        """Drop booking-derived entries, including closed ranges, plus live ones"""
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.incr(BOOKINGS_GENERATION_KEY)
+            pipe.incr(LIVE_GENERATION_KEY)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("Failed to invalidate booking report cache: %s", e)
+
+    async def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Hit/miss/bypass counters per report since the counters were created
+
+        Returns:
+            {"revenue": {"hits": 10, "misses": 2, "bypass": 0}, ...}
+
+        Raises:
+            Exception: If Redis is unavailable
+        """
+        raw = await get_redis().hgetall(STATS_KEY)
+        stats: Dict[str, Dict[str, int]] = {}
+        for field, value in raw.items():
+            report, _, counter = field.rpartition(":")
+            stats.setdefault(report, {"hits": 0, "misses": 0, "bypass": 0})[counter] = int(value)
+        return stats
+
+    async def _build_key(
+        self,
+        report: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        params: Optional[Dict[str, object]],
+        closed_ranges_immutable: bool,
+        depends_on_bookings: bool
+    ):
+        """Build the cache key and TTL for a request"""
+        generation, ttl = await self._generation(end_date, closed_ranges_immutable, depends_on_bookings)
+        param_part = ",".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        key = f"{KEY_PREFIX}:{report}:{generation}:{start_date}:{end_date}:{param_part}"
+        return key, ttl
+
+    async def get_generation(
+        self,
+        end_date: Optional[date],
+        closed_ranges_immutable: bool = True,
+        depends_on_bookings: bool = False
+    ) -> str:
+        """
+        Generation tag an entry for this range would be stored under
+
+        Changes whenever such an entry would be invalidated, so it can serve
+        as an HTTP validator (ETag) for the cached response.
+
+        Raises:
+            Exception: If Redis is unavailable
+        """
+        generation, _ = await self._generation(end_date, closed_ranges_immutable, depends_on_bookings)
+        return generation
+
+    async def _generation(
+        self,
+        end_date: Optional[date],
+        closed_ranges_immutable: bool,
+        depends_on_bookings: bool
+    ):
+        """Generation tag and TTL for a range"""
+        redis = get_redis()
+        closed = (
+            closed_ranges_immutable
+            and end_date is not None
+            and end_date < today_thailand()
+        )
+
+        if closed:
+            history, bookings = await redis.mget(HISTORY_GENERATION_KEY, BOOKINGS_GENERATION_KEY)
+            generation = f"closed{history or 0}"
+            if depends_on_bookings:
+                generation += f".b{bookings or 0}"
+            return generation, CLOSED_TTL_SECONDS
+
+        return f"live{await redis.get(LIVE_GENERATION_KEY) or 0}", LIVE_TTL_SECONDS
+
+    async def _count(self, report: str, counter: str):
+        """Increment a stats counter, ignoring Redis errors"""
+        try:
+            await get_redis().hincrby(STATS_KEY, f"{report}:{counter}", 1)
+        except Exception:
+            pass
+
+
+# Global report cache instance
+report_cache = ReportCache()
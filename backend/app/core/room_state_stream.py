@@ -0,0 +1,194 @@
+"""
+Room State Stream
+Sequenced room-card deltas with a short Redis replay buffer
+
+Every change to a dashboard room card is recorded as a `room_delta` message
+carrying a hotel-wide, monotonically increasing `seq` and only the card
+fields that changed. The last REPLAY_BUFFER_SIZE deltas are kept in a Redis
+sorted set (score = seq), so a dashboard that reconnects with
+`/ws/dashboard?since=<seq>` catches up by replaying the missed deltas
+instead of reloading the full dashboard.
+
+Deltas are opt-in per connection (`/ws/dashboard?deltas=1`, implied by
+`?since=`). Such a client receives `room_delta` in place of the full events
+listed in DELTA_REPLACED_EVENTS; every other client keeps receiving those
+full events and no deltas, so turning the stream on adds no traffic for
+dashboards that do not use it.
+"""
+from typing import List, Optional
+import json
+import logging
+
+from app.core.redis import get_redis
+from app.core.datetime_utils import now_thailand
+
+logger = logging.getLogger(__name__)
+
+SEQ_KEY = "ws:room_state:seq"
+LOG_KEY = "ws:room_state:log"
+REPLAY_BUFFER_SIZE = 1000
+REPLAY_BUFFER_TTL_SECONDS = 24 * 60 * 60
+
+# Assign the next seq and append the delta atomically, so the buffer order
+# always matches seq order even with several publishing processes.
+# ARGV[1] is the message JSON without seq; the script splices it in.
+_APPEND_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local payload = '{"seq":' .. seq .. ',' .. string.sub(ARGV[1], 2)
+redis.call('ZADD', KEYS[2], seq, payload)
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -(tonumber(ARGV[2]) + 1))
+redis.call('EXPIRE', KEYS[2], tonumber(ARGV[3]))
+return seq
+"""
+
+# Full events a delta subscriber does not receive: the deltas derived from
+# them carry everything the room card needs
+DELTA_REPLACED_EVENTS = {
+    "room_status_changed",
+    "room_transferred",
+}
+
+# Events only delta subscribers receive. resync_required tells them to
+# reload the dashboard: sent on a replay the buffer cannot cover, and live
+# when a delta could not be recorded (Redis down)
+DELTA_STREAM_EVENTS = {
+    "room_delta",
+    "resync_required",
+}
+
+# Card fields that describe the current stay; cleared on check-out
+STAY_FIELDS_CLEARED = {
+    "check_in_id": None,
+    "customer_name": None,
+    "customer_phone": None,
+    "stay_type": None,
+    "check_in_time": None,
+    "expected_check_out_time": None,
+    "is_overtime": False,
+    "overtime_minutes": None,
+}
+
+
+def room_deltas_for_event(message: dict) -> List[tuple]:
+    """
+    Translate a broadcast event into room-card deltas
+
+    Returns:
+        List of (room_id, changed card fields)
+    """
+    event = message.get("event")
+    data = message.get("data") or {}
+    room_id = data.get("room_id")
+
+    if event == "room_status_changed" and room_id is not None:
+        return [(room_id, {"status": data.get("new_status")})]
+
+    if event == "check_in_created" and room_id is not None:
+        return [(room_id, {
+            "check_in_id": data.get("check_in_id"),
+            "customer_name": data.get("customer_name"),
+            "customer_phone": data.get("customer_phone"),
+            "stay_type": data.get("stay_type"),
+            "check_in_time": data.get("check_in_time"),
+            "expected_check_out_time": data.get("expected_check_out_time"),
+            "is_overtime": False,
+            "overtime_minutes": None,
+        })]
+
+    if event == "check_out_completed" and room_id is not None:
+        return [(room_id, dict(STAY_FIELDS_CLEARED))]
+
+    if event == "room_transferred":
+        # The stay moves as a whole: the old card is cleared, the new card
+        # gets every stay field, and both get their new status
+        return [
+            (data.get("old_room_id"), {
+                "status": data.get("old_room_status"),
+                **STAY_FIELDS_CLEARED,
+            }),
+            (data.get("new_room_id"), {
+                "status": data.get("new_room_status"),
+                **{field: data.get(field) for field in STAY_FIELDS_CLEARED},
+                "is_overtime": bool(data.get("is_overtime")),
+            }),
+        ]
+
+    if event == "overtime_alert" and room_id is not None:
+        return [(room_id, {"is_overtime": True, "overtime_minutes": data.get("overtime_minutes")})]
+
+    if event == "overtime_auto_cutoff" and room_id is not None:
+        return [(room_id, {
+            "status": data.get("new_status"),
+            "is_overtime": True,
+            "overtime_minutes": data.get("overtime_minutes"),
+        })]
+
+    return []
+
+
+class RoomStateStream:
+    """Sequence counter and replay buffer for room-card deltas"""
+
+    async def append(self, room_id: int, changes: dict) -> Optional[dict]:
+        """
+        Record a room-card delta
+
+        Returns:
+            The sequenced `room_delta` message, or None if Redis is unavailable
+        """
+        message = {
+            "event": "room_delta",
+            "data": {"room_id": room_id, "changes": changes},
+            "timestamp": now_thailand().isoformat()
+        }
+        body = json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+        try:
+            seq = await get_redis().eval(
+                _APPEND_SCRIPT, 2, SEQ_KEY, LOG_KEY,
+                body, REPLAY_BUFFER_SIZE, REPLAY_BUFFER_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.warning("Failed to record room delta for room %s: %s", room_id, e)
+            return None
+
+        return {"seq": int(seq), **json.loads(body)}
+
+    async def current_seq(self) -> Optional[int]:
+        """Latest assigned seq (0 before the first delta, None if Redis is down)"""
+        try:
+            return int(await get_redis().get(SEQ_KEY) or 0)
+        except Exception as e:
+            logger.warning("Failed to read room state seq: %s", e)
+            return None
+
+    async def replay_since(self, since: int) -> Optional[List[dict]]:
+        """
+        Deltas after `since`, oldest first
+
+        Returns:
+            The missed deltas, or None when they cannot all be replayed (the
+            buffer no longer reaches back that far, the counter was reset,
+            or Redis is down); the client must then reload the dashboard
+        """
+        try:
+            redis = get_redis()
+            current = int(await redis.get(SEQ_KEY) or 0)
+            if since > current:
+                return None
+            if since == current:
+                return []
+
+            payloads = await redis.zrangebyscore(LOG_KEY, since + 1, "+inf")
+        except Exception as e:
+            logger.warning("Failed to replay room deltas since %s: %s", since, e)
+            return None
+
+        deltas = [json.loads(payload) for payload in payloads]
+        if not deltas or deltas[0]["seq"] != since + 1:
+            return None
+        return deltas
+
+
+# Global room state stream instance
+room_state_stream = RoomStateStream()
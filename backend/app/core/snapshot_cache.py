@@ -0,0 +1,95 @@
+"""
+Versioned Snapshot Caches
+
+Per-process snapshots of small, rarely written tables that are read on hot
+paths:
+- settings_cache: every system_settings row as {key: value}; read on every
+  temporary check-in and every Telegram message
+- room_rate_cache: the room rate interval index (app/core/rate_index.py);
+  read by check-in, booking quotes and the dashboard
+
+Each snapshot is loaded with one query and re-validated against a version
+counter in Redis at most every few seconds; the owning service bumps the
+counter after each write, so every API worker and Celery process reloads
+on its next read. If Redis is unavailable a snapshot is still bounded by a
+TTL.
+"""
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+import logging
+import time
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+VERSION_CHECK_SECONDS = 5
+SNAPSHOT_TTL_SECONDS = 300
+
+
+class SnapshotCache(Generic[T]):
+    """
+    One cached snapshot, invalidated through a Redis version key
+
+    Usage:
+        snapshot = await settings_cache.get_snapshot(load_all_settings)
+    """
+
+    def __init__(self, version_key: str):
+        self.version_key = version_key
+        self._snapshot: Optional[T] = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._version: Optional[str] = None
+
+    async def get_snapshot(self, loader: Callable[[], Awaitable[T]]) -> T:
+        """
+        Return the cached snapshot, reloading it when stale
+
+        Args:
+            loader: Coroutine factory that builds the snapshot in one query
+
+        Returns:
+            The snapshot
+        """
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._loaded_at <= SNAPSHOT_TTL_SECONDS:
+            if now - self._checked_at <= VERSION_CHECK_SECONDS:
+                return self._snapshot
+            version = await self._read_version()
+            if version == self._version:
+                self._checked_at = now
+                return self._snapshot
+
+        # Read the version before loading: a write racing with the load bumps
+        # it again, and the next check reloads
+        version = await self._read_version()
+        snapshot = await loader()
+
+        now = time.monotonic()
+        self._snapshot = snapshot
+        self._version = version
+        self._loaded_at = now
+        self._checked_at = now
+        return snapshot
+
+    async def invalidate(self):
+        """Drop the snapshot in every process"""
+        self._snapshot = None
+        try:
+            await get_redis().incr(self.version_key)
+        except Exception as e:
+            logger.warning("Failed to publish %s invalidation: %s", self.version_key, e)
+
+    async def _read_version(self) -> Optional[str]:
+        try:
+            return await get_redis().get(self.version_key)
+        except Exception as e:
+            logger.warning("Cannot verify %s: %s", self.version_key, e)
+            return self._version
+
+
+# Global snapshot caches
+settings_cache: SnapshotCache = SnapshotCache("settings:version")
+room_rate_cache: SnapshotCache = SnapshotCache("room_rates:version")
@@ -0,0 +1,493 @@
+"""
+Telegram Outbound Dispatcher
+
+Request handlers and tasks only enqueue notifications; a Celery task
+(telegram.dispatch_outbox) drains the queue and talks to the Bot API.
+
+- Queue: Redis list telegram:outbox of JSON messages, addressed either to a
+  role (admin / reception / housekeeping / maintenance, resolved through
+  the cached Telegram settings at send time) or to an explicit chat_id
+- Coalescing: queued messages for the same chat with the same coalesce key
+  go out as one digest (e.g. one message for N overtime rooms), split only
+  to stay under Telegram's message length limit; a single text over the
+  limit is split at line breaks, never mid-tag
+- Rate limiting: a token bucket per chat (Telegram allows ~20 messages a
+  minute in a group) and a global bucket; the drain waits for a token
+  instead of being rejected with 429
+- Retry: failed sends go to the sorted set telegram:outbox:delayed with an
+  exponential backoff (or Telegram's retry_after) and are dropped after
+  TELEGRAM_MAX_ATTEMPTS
+- One pooled aiohttp session per process, like the Home Assistant client
+
+Messages popped by a worker that crashes mid-drain are lost; these are
+staff notifications, not records.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_KEY = "telegram:outbox"
+DELAYED_KEY = "telegram:outbox:delayed"
+METRICS_KEY = "telegram:outbox:metrics"
+
+API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+REQUEST_TIMEOUT_SECONDS = 10
+POOL_SIZE = 10
+
+DRAIN_BATCH_SIZE = 100
+# Telegram rejects messages over 4096 characters
+MAX_MESSAGE_LENGTH = 4000
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 600
+
+ROLE_SETTINGS_FIELDS = {
+    "admin": "admin_chat_id",
+    "reception": "reception_chat_id",
+    "housekeeping": "housekeeping_chat_id",
+    "maintenance": "maintenance_chat_id",
+}
+
+# Move due retries back onto the outbox
+_PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, payload in ipairs(due) do
+    redis.call('RPUSH', KEYS[2], payload)
+    redis.call('ZREM', KEYS[1], payload)
+end
+return #due
+"""
+
+
+def _split_text(text: str, limit: int) -> List[str]:
+    """
+    Split a text into parts of at most `limit` characters at line breaks
+
+    Notification markup is per line (<b>...</b>), so line breaks are safe
+    cut points. Only a single line longer than `limit` is cut inside the
+    line, at its last space before the limit.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    parts: List[str] = []
+    current: Optional[str] = None
+    for line in text.split("\n"):
+        while len(line) > limit:
+            cut = line.rfind(" ", 0, limit + 1)
+            if cut <= 0:
+                cut = limit
+            if current is not None:
+                parts.append(current)
+                current = None
+            parts.append(line[:cut])
+            line = line[cut:].lstrip(" ")
+        if current is None:
+            current = line
+        elif len(current) + 1 + len(line) <= limit:
+            current += "\n" + line
+        else:
+            parts.append(current)
+            current = line
+    if current is not None:
+        parts.append(current)
+    return [part for part in parts if part.strip()]
+
+
+class TokenBucket:
+    """Token bucket that waits for a token instead of rejecting"""
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns seconds waited"""
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds: float):
+        """Telegram asked us to back off: empty the bucket for `seconds`"""
+        self.tokens = -seconds * self.rate
+        self.updated = time.monotonic()
+
+
+class TelegramDispatcher:
+    """
+    Queue and rate-limited sender for Telegram notifications
+
+    Usage:
+        await telegram_dispatcher.enqueue(
+            "🧹 ...", target="housekeeping", coalesce_key="housekeeping_task"
+        )
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        self._global_bucket: Optional[TokenBucket] = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the keep-alive session for the running loop (created lazily)"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=POOL_SIZE)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """Close the pooled session (shutdown)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def enqueue(
+        self,
+        text: str,
+        target: Optional[str] = None,
+        chat_id: Optional[str] = None,
+        parse_mode: Optional[str] = "HTML",
+        coalesce_key: Optional[str] = None,
+        title: Optional[str] = None,
+        footer: Optional[str] = None
+    ) -> bool:
+        """
+        Queue one message (see enqueue_many)
+
+        Args:
+            text: Message body
+            target: Role to send to (admin, reception, housekeeping, maintenance)
+            chat_id: Explicit chat instead of a role
+            parse_mode: Telegram parse mode
+            coalesce_key: Messages with the same key for the same chat are
+                sent as one digest
+            title: Heading shown once above the body (or the digest)
+            footer: Text shown once below the body (or the digest)
+
+        Returns:
+            True if the message was queued
+        """
+        return await self.enqueue_many(
+            [text], target=target, chat_id=chat_id, parse_mode=parse_mode,
+            coalesce_key=coalesce_key, title=title, footer=footer
+        ) > 0
+
+    async def enqueue_many(
+        self,
+        texts: Iterable[str],
+        target: Optional[str] = None,
+        chat_id: Optional[str] = None,
+        parse_mode: Optional[str] = "HTML",
+        coalesce_key: Optional[str] = None,
+        title: Optional[str] = None,
+        footer: Optional[str] = None
+    ) -> int:
+        """
+        Queue several messages with one Redis round trip and one worker kick
+
+        Returns:
+            Number of messages queued (0 if Redis is unavailable)
+        """
+        if not target and not chat_id:
+            raise ValueError("Telegram message needs a target role or a chat_id")
+
+        payloads = [
+            json.dumps({
+                "id": uuid.uuid4().hex,
+                "target": target.lower() if target else None,
+                "chat_id": chat_id,
+                "text": text,
+                "parse_mode": parse_mode,
+                "coalesce_key": coalesce_key,
+                "title": title,
+                "footer": footer,
+                "attempts": 0,
+            }, ensure_ascii=False)
+            for text in texts
+        ]
+        if not payloads:
+            return 0
+
+        try:
+            await get_redis().rpush(OUTBOX_KEY, *payloads)
+        except Exception as e:
+            logger.warning("Failed to queue %d Telegram messages: %s", len(payloads), e)
+            return 0
+
+        await self.notify_worker()
+        return len(payloads)
+
+    @staticmethod
+    async def notify_worker():
+        """
+        Ask a Celery worker to drain the outbox
+
+        Publishing runs in a thread so a slow broker never blocks the event
+        loop; if it fails the periodic dispatch run picks the messages up.
+        """
+        try:
+            from app.tasks.telegram_tasks import dispatch_outbox
+            await asyncio.to_thread(dispatch_outbox.apply_async, retry=False)
+        except Exception as e:
+            logger.warning("Failed to notify Telegram dispatcher: %s", e)
+
+    async def drain(self, max_seconds: float = 50) -> Dict[str, Any]:
+        """
+        Send everything queued (and every retry that is due)
+
+        Keeps popping until the outbox is empty or `max_seconds` have passed,
+        so messages queued while sending are picked up in the same run. The
+        deadline is also checked before every send: a batch slowed down by
+        the rate limits stops there and pushes its unsent messages back to
+        the front of the outbox for the next run.
+
+        Args:
+            max_seconds: Stop sending after this long
+
+        Returns:
+            Counters for this run
+        """
+        from app.db.session import AsyncSessionLocal
+        from app.services.settings_service import SettingsService
+
+        redis = get_redis()
+        deadline = time.monotonic() + max_seconds
+        stats = {"queued": 0, "sent": 0, "coalesced": 0, "retried": 0, "dropped": 0, "requeued": 0}
+
+        await redis.eval(_PROMOTE_SCRIPT, 2, DELAYED_KEY, OUTBOX_KEY, time.time(), DRAIN_BATCH_SIZE)
+
+        while time.monotonic() < deadline:
+            raw = await redis.lpop(OUTBOX_KEY, DRAIN_BATCH_SIZE)
+            if not raw:
+                break
+
+            messages = []
+            for payload in raw:
+                try:
+                    messages.append(json.loads(payload))
+                except ValueError:
+                    logger.error("Dropping malformed Telegram outbox entry: %s", payload[:200])
+                    stats["dropped"] += 1
+            stats["queued"] += len(messages)
+
+            async with AsyncSessionLocal() as db:
+                telegram_settings = await SettingsService(db).get_telegram_settings()
+
+            if not telegram_settings.enabled or not telegram_settings.bot_token:
+                logger.debug("Telegram disabled or not configured, dropping %d messages", len(messages))
+                stats["dropped"] += len(messages)
+                continue
+
+            outgoing = self._coalesce(messages, telegram_settings)
+            for position, (chat_id, parse_mode, text, originals) in enumerate(outgoing):
+                if time.monotonic() >= deadline:
+                    unsent = [message for *_, chunk in outgoing[position:] for message in chunk]
+                    await redis.lpush(OUTBOX_KEY, *(json.dumps(message, ensure_ascii=False) for message in reversed(unsent)))
+                    stats["requeued"] += len(unsent)
+                    break
+                stats["coalesced"] += len(originals) - 1
+                ok, retry_after, permanent = await self._send(telegram_settings.bot_token, chat_id, text, parse_mode)
+                if ok:
+                    stats["sent"] += 1
+                    continue
+                if permanent:
+                    stats["dropped"] += len(originals)
+                    continue
+                retried, dropped = await self._schedule_retry(originals, retry_after)
+                stats["retried"] += retried
+                stats["dropped"] += dropped
+
+        await self._record_stats(stats)
+        return stats
+
+    async def get_metrics(self) -> Dict[str, int]:
+        """Lifetime counters plus current queue depth"""
+        redis = get_redis()
+        raw = await redis.hgetall(METRICS_KEY)
+        metrics = {field: int(value) for field, value in raw.items()}
+        metrics["pending"] = await redis.llen(OUTBOX_KEY)
+        metrics["delayed"] = await redis.zcard(DELAYED_KEY)
+        return metrics
+
+    def _coalesce(self, messages: List[dict], telegram_settings) -> List[Tuple[str, Optional[str], str, List[dict]]]:
+        """
+        Group messages by chat and coalesce key, in first-seen order
+
+        Returns:
+            (chat_id, parse_mode, text, original messages) per outgoing message
+        """
+        groups: Dict[Tuple, List[dict]] = {}
+        for index, message in enumerate(messages):
+            chat_id = message.get("chat_id")
+            if not chat_id and message.get("target") in ROLE_SETTINGS_FIELDS:
+                chat_id = getattr(telegram_settings, ROLE_SETTINGS_FIELDS[message["target"]])
+            if not chat_id:
+                logger.warning("No Telegram chat configured for target %s, dropping message", message.get("target"))
+                continue
+            key = (
+                chat_id,
+                message.get("parse_mode"),
+                message.get("coalesce_key") or f"single:{index}",
+                message.get("title"),
+                message.get("footer"),
+            )
+            group = groups.setdefault(key, [])
+            # The same text to the same chat (e.g. admin and reception share
+            # a group) is sent once
+            if all(queued["text"] != message["text"] for queued in group):
+                group.append(message)
+
+        outgoing = []
+        for (chat_id, parse_mode, _, title, footer), group in groups.items():
+            for chunk in self._chunk(group, title, footer):
+                outgoing.append((chat_id, parse_mode, self._render(chunk, title, footer), chunk))
+        return outgoing
+
+    @staticmethod
+    def _chunk(group: List[dict], title: Optional[str], footer: Optional[str]) -> List[List[dict]]:
+        """
+        Split a group into digests that render within MAX_MESSAGE_LENGTH
+
+        A text too long for one message by itself is split into parts
+        (see _split_text) that go out as consecutive messages.
+        """
+        # Title with its "(n รายการ)" count, footer and the blank lines between
+        overhead = len(title or "") + len(footer or "") + 32
+        limit = max(MAX_MESSAGE_LENGTH - overhead, 1)
+        chunks, current, length = [], [], 0
+        for message in group:
+            for text in _split_text(message["text"], limit):
+                part = message if text == message["text"] else {**message, "text": text}
+                size = len(text) + (len(DIGEST_SEPARATOR) if current else 0)
+                if current and length + size > limit:
+                    chunks.append(current)
+                    current, length, size = [], 0, len(text)
+                current.append(part)
+                length += size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _render(chunk: List[dict], title: Optional[str], footer: Optional[str]) -> str:
+        parts = []
+        if title:
+            parts.append(f"{title} ({len(chunk)} รายการ)" if len(chunk) > 1 else title)
+        parts.append(DIGEST_SEPARATOR.join(message["text"] for message in chunk))
+        if footer:
+            parts.append(footer)
+        return "\n\n".join(parts)
+
+    async def _send(
+        self,
+        bot_token: str,
+        chat_id: str,
+        text: str,
+        parse_mode: Optional[str]
+    ) -> Tuple[bool, Optional[float], bool]:
+        """
+        Send one message after taking a chat and a global token
+
+        Returns:
+            (sent, retry_after seconds requested by Telegram or None,
+             permanent failure that retrying cannot fix)
+        """
+        await self._global().acquire()
+        bucket = self._chat_bucket(chat_id)
+        await bucket.acquire()
+
+        payload = {"chat_id": chat_id, "text": text}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+
+        try:
+            async with self.get_session().post(API_URL.format(token=bot_token), json=payload) as response:
+                data = await response.json(content_type=None)
+        except Exception as e:
+            logger.warning("Telegram send to %s failed: %s", chat_id, e)
+            return False, None, False
+
+        if data.get("ok"):
+            return True, None, False
+
+        retry_after = (data.get("parameters") or {}).get("retry_after")
+        if retry_after:
+            bucket.penalize(retry_after)
+        # 400/403: bad markup, unknown chat, bot removed from the group
+        permanent = data.get("error_code") in (400, 403)
+        logger.warning("Telegram API error for chat %s: %s", chat_id, data.get("description", "Unknown error"))
+        return False, retry_after, permanent
+
+    async def _schedule_retry(self, originals: List[dict], retry_after: Optional[float]) -> Tuple[int, int]:
+        """Put failed messages on the delayed set; returns (retried, dropped)"""
+        retried = dropped = 0
+        redis = get_redis()
+        for message in originals:
+            message["attempts"] = message.get("attempts", 0) + 1
+            if message["attempts"] >= settings.TELEGRAM_MAX_ATTEMPTS:
+                logger.error(
+                    "Dropping Telegram message after %d attempts (target=%s, key=%s)",
+                    message["attempts"], message.get("target") or message.get("chat_id"), message.get("coalesce_key")
+                )
+                dropped += 1
+                continue
+            delay = retry_after or min(RETRY_BASE_SECONDS * 2 ** (message["attempts"] - 1), RETRY_MAX_SECONDS)
+            await redis.zadd(DELAYED_KEY, {json.dumps(message, ensure_ascii=False): time.time() + delay})
+            retried += 1
+        return retried, dropped
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(settings.TELEGRAM_CHAT_RATE_PER_MINUTE / 60, settings.TELEGRAM_CHAT_BURST)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _global(self) -> TokenBucket:
+        if self._global_bucket is None:
+            rate = settings.TELEGRAM_GLOBAL_RATE_PER_SECOND
+            self._global_bucket = TokenBucket(rate, rate)
+        return self._global_bucket
+
+    async def _record_stats(self, stats: Dict[str, int]):
+        """Add this run's counters to the lifetime metrics, ignoring Redis errors"""
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for field, value in stats.items():
+                if value:
+                    pipe.hincrby(METRICS_KEY, field, value)
+            await pipe.execute()
+        except Exception:
+            pass
+
+
+# Global dispatcher instance
+telegram_dispatcher = TelegramDispatcher()
@@ -0,0 +1,74 @@
+"""
+Bundled Thai Public Holidays
+
+Fallback used by HolidayService when the local store has no rows for a
+year yet (fresh install, no internet): the fixed-date holidays for any
+year, plus the Buddhist lunar holidays for the years listed below.
+Substitution days are not included; the refreshed data from the holiday
+API has them.
+"""
+import logging
+from datetime import date
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (month, day, Thai name, English name)
+FIXED_HOLIDAYS: List[Tuple[int, int, str, str]] = [
+    (1, 1, "วันขึ้นปีใหม่", "New Year's Day"),
+    (4, 6, "วันจักรี", "Chakri Memorial Day"),
+    (4, 13, "วันสงกรานต์", "Songkran Festival"),
+    (4, 14, "วันสงกรานต์", "Songkran Festival"),
+    (4, 15, "วันสงกรานต์", "Songkran Festival"),
+    (5, 1, "วันแรงงานแห่งชาติ", "National Labour Day"),
+    (5, 4, "วันฉัตรมงคล", "Coronation Day"),
+    (6, 3, "วันเฉลิมพระชนมพรรษาสมเด็จพระราชินี", "Queen Suthida's Birthday"),
+    (7, 28, "วันเฉลิมพระชนมพรรษาพระบาทสมเด็จพระเจ้าอยู่หัว", "King Vajiralongkorn's Birthday"),
+    (8, 12, "วันแม่แห่งชาติ", "The Queen Mother's Birthday"),
+    (10, 13, "วันนวมินทรมหาราช", "King Bhumibol Adulyadej Memorial Day"),
+    (10, 23, "วันปิยมหาราช", "King Chulalongkorn Day"),
+    (12, 5, "วันพ่อแห่งชาติ", "King Bhumibol Adulyadej's Birthday"),
+    (12, 10, "วันรัฐธรรมนูญ", "Constitution Day"),
+    (12, 31, "วันสิ้นปี", "New Year's Eve"),
+]
+
+# Lunar holidays in LUNAR_NAMES order: Makha Bucha, Visakha Bucha,
+# Asanha Bucha, Buddhist Lent. A year may list only the first few.
+# 2027 onwards follow the Thai lunar calendar (extra month in 2029, extra
+# day in 2030) ahead of the official announcement; the holiday API data
+# replaces them once a year is refreshed.
+LUNAR_HOLIDAYS = {
+    2024: [date(2024, 2, 24), date(2024, 5, 22), date(2024, 7, 20), date(2024, 7, 21)],
+    2025: [date(2025, 2, 12), date(2025, 5, 11), date(2025, 7, 10), date(2025, 7, 11)],
+    2026: [date(2026, 3, 3), date(2026, 5, 31), date(2026, 7, 29), date(2026, 7, 30)],
+    2027: [date(2027, 2, 21), date(2027, 5, 20), date(2027, 7, 18), date(2027, 7, 19)],
+    2028: [date(2028, 2, 10), date(2028, 5, 8), date(2028, 7, 6), date(2028, 7, 7)],
+    2029: [date(2029, 2, 27), date(2029, 5, 27), date(2029, 7, 25), date(2029, 7, 26)],
+    2030: [date(2030, 2, 17), date(2030, 5, 16), date(2030, 7, 15), date(2030, 7, 16)],
+}
+
+LUNAR_NAMES: List[Tuple[str, str]] = [
+    ("วันมาฆบูชา", "Makha Bucha"),
+    ("วันวิสาขบูชา", "Visakha Bucha"),
+    ("วันอาสาฬหบูชา", "Asanha Bucha"),
+    ("วันเข้าพรรษา", "Buddhist Lent Day"),
+]
+
+
+def bundled_holidays(year: int) -> List[Tuple[date, str, str]]:
+    """
+    Bundled holidays of a year
+
+    A year missing from LUNAR_HOLIDAYS gets the fixed-date holidays only,
+    with a warning so the table is extended.
+
+    Returns:
+        [(date, Thai name, English name)] sorted by date
+    """
+    holidays = [(date(year, month, day), name, name_en) for month, day, name, name_en in FIXED_HOLIDAYS]
+    if year not in LUNAR_HOLIDAYS:
+        logger.warning("No bundled lunar holidays for %s; add them to LUNAR_HOLIDAYS", year)
+    for index, day in enumerate(LUNAR_HOLIDAYS.get(year, [])):
+        name, name_en = LUNAR_NAMES[index]
+        holidays.append((day, name, name_en))
+    return sorted(holidays)
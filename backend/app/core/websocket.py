@@ -2,15 +2,253 @@
 WebSocket Manager (Phase 3)
 Manages WebSocket connections and broadcasts for real-time updates
 """
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 from fastapi import WebSocket
+import asyncio
 import json
 import logging
+import uuid
+from collections import deque
+from fnmatch import fnmatchcase
 from datetime import datetime
 from app.core.datetime_utils import now_thailand
+from app.core.redis import get_redis
+from app.core.room_state_stream import (
+    DELTA_REPLACED_EVENTS,
+    DELTA_STREAM_EVENTS,
+    room_state_stream,
+    room_deltas_for_event,
+)
 
 logger = logging.getLogger(__name__)
 
+# Redis pub/sub channel shared by every API and Celery process
+BROADCAST_CHANNEL = "ws:broadcast"
+RELAY_RETRY_SECONDS = 2
+
+
+# Per-client outbound queue bound; beyond it the oldest message is dropped
+CLIENT_QUEUE_SIZE = 256
+
+# Events where only the latest message per key matters. While a message is
+# still queued for a client, a newer one with the same key replaces it.
+COALESCE_KEYS = {
+    "room_status_changed": "room_id",
+    "breaker_status_changed": "breaker_id",
+}
+
+
+# Events each staff role receives when it does not pick its own list
+# (None = every event). Patterns use fnmatch syntax.
+ROLE_DEFAULT_EVENTS = {
+    "ADMIN": None,
+    "RECEPTION": None,
+    "HOUSEKEEPING": {
+        "room_status_changed",
+        "room_delta",
+        "room_transferred",
+        "check_out",
+        "check_out_completed",
+        "housekeeping_task_*",
+        "notification",
+    },
+    "MAINTENANCE": {
+        "room_status_changed",
+        "room_delta",
+        "maintenance_task_*",
+        "breaker_error",
+        "notification",
+    },
+}
+
+
+class Subscription:
+    """
+    Server-side filter deciding which broadcasts a client receives
+
+    Every field left as None means "no filter". `rooms` holds the effective
+    room IDs, i.e. explicit rooms plus every room on the subscribed floors.
+    Messages that are not about a specific room pass the room filter.
+
+    `deltas` switches the client to the room-delta stream: it then receives
+    `room_delta` instead of the full events the deltas replace. Without it
+    the client gets the full events and no deltas.
+    """
+
+    def __init__(
+        self,
+        role: Optional[str] = None,
+        events: Optional[Set[str]] = None,
+        rooms: Optional[Set[int]] = None,
+        floors: Optional[Set[int]] = None,
+        deltas: bool = False
+    ):
+        self.role = role.upper() if role else None
+        if events is None and self.role is not None:
+            events = ROLE_DEFAULT_EVENTS.get(self.role)
+        self.events = set(events) if events is not None else None
+        self.rooms = set(rooms) if rooms is not None else None
+        self.floors = set(floors) if floors is not None else None
+        self.deltas = deltas
+
+    def matches(self, event: Optional[str], room_ids: Set[int], target_role: Optional[str]) -> bool:
+        """Check a broadcast against this subscription"""
+        if event in DELTA_STREAM_EVENTS and not self.deltas:
+            return False
+        if self.deltas and event in DELTA_REPLACED_EVENTS:
+            return False
+        if event == "resync_required":
+            return True
+
+        if self.events is not None and not any(fnmatchcase(event or "", pattern) for pattern in self.events):
+            return False
+
+        if self.rooms is not None and room_ids and not (room_ids & self.rooms):
+            return False
+
+        # Role-targeted notifications only go to that role (admins see all)
+        if (
+            self.role is not None
+            and self.role != "ADMIN"
+            and target_role is not None
+            and str(target_role).upper() != self.role
+        ):
+            return False
+
+        return True
+
+    def to_dict(self) -> dict:
+        """Serializable view sent back to the client"""
+        return {
+            "role": self.role,
+            "events": sorted(self.events) if self.events is not None else None,
+            "rooms": sorted(self.rooms) if self.rooms is not None else None,
+            "floors": sorted(self.floors) if self.floors is not None else None,
+            "deltas": self.deltas,
+        }
+
+
+def message_room_ids(data: dict) -> Set[int]:
+    """Room IDs a message is about (room_id, or both rooms of a transfer)"""
+    return {
+        data[field]
+        for field in ("room_id", "old_room_id", "new_room_id")
+        if data.get(field) is not None
+    }
+
+
+def serialize_message(message: dict) -> str:
+    """Serialize a message once for every recipient (same format as send_json)"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def coalesce_key(message: dict) -> Optional[tuple]:
+    """Key identifying messages that supersede each other, or None"""
+    event = message.get("event")
+    field = COALESCE_KEYS.get(event)
+    if field is None:
+        return None
+    value = (message.get("data") or {}).get(field)
+    return (event, value) if value is not None else None
+
+
+class ClientConnection:
+    """
+    One WebSocket client with its own bounded outbound queue and writer task
+
+    Broadcasting only appends to the queue, so a slow client delays nobody
+    but itself.
+    """
+
+    def __init__(self, websocket: WebSocket, client_id: str, subscription: Optional[Subscription] = None):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.subscription = subscription or Subscription()
+        # Entries are [text, coalesce_key, enqueued_at (loop time)]
+        self.queue: deque = deque()
+        self.pending_by_key: Dict[tuple, list] = {}
+        self.wakeup = asyncio.Event()
+        self.writer_task: Optional[asyncio.Task] = None
+        # While a ?since= replay is running, live broadcasts wait here
+        self.held: Optional[list] = None
+        self.connected_at = now_thailand()
+
+        # Metrics
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    def offer(self, text: str, key: Optional[tuple] = None):
+        """Queue a live broadcast, or hold it back while a replay is running"""
+        if self.held is not None:
+            self.held.append((text, key))
+            return
+        self.enqueue(text, key)
+
+    def enqueue(self, text: str, key: Optional[tuple] = None):
+        """Queue a serialized message without waiting for the socket"""
+        if key is not None and key in self.pending_by_key:
+            # Newer state for the same room/breaker replaces the queued one
+            self.pending_by_key[key][0] = text
+            self.coalesced += 1
+            return
+
+        if len(self.queue) >= CLIENT_QUEUE_SIZE:
+            dropped = self.queue.popleft()
+            if dropped[1] is not None:
+                self.pending_by_key.pop(dropped[1], None)
+            self.dropped += 1
+
+        entry = [text, key, asyncio.get_running_loop().time()]
+        self.queue.append(entry)
+        if key is not None:
+            self.pending_by_key[key] = entry
+        self.wakeup.set()
+
+    async def run_writer(self, on_error):
+        """Send queued messages in order until the socket fails"""
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            text, key, enqueued_at = self.queue.popleft()
+            if key is not None:
+                self.pending_by_key.pop(key, None)
+
+            try:
+                await self.websocket.send_text(text)
+            except Exception as e:
+                on_error(self, e)
+                return
+
+            self.sent += 1
+            self.last_lag_ms = (loop.time() - enqueued_at) * 1000
+            self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+
+    def metrics(self) -> dict:
+        """Lag and queue metrics for monitoring"""
+        oldest_wait_ms = 0.0
+        if self.queue:
+            oldest_wait_ms = (asyncio.get_running_loop().time() - self.queue[0][2]) * 1000
+
+        return {
+            "client_id": self.client_id,
+            "subscription": self.subscription.to_dict(),
+            "connected_at": self.connected_at.isoformat(),
+            "queue_depth": len(self.queue),
+            "oldest_queued_ms": round(oldest_wait_ms, 1),
+            "last_lag_ms": round(self.last_lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
 
 class ConnectionManager:
     """
@@ -20,39 +258,118 @@ class ConnectionManager:
 
     def __init__(self):
         # Store active connections by connection ID
-        self.active_connections: Dict[str, WebSocket] = {}
-        # Store connections by room (for future use)
-        self.room_connections: Dict[str, Set[str]] = {}
+        self.active_connections: Dict[str, ClientConnection] = {}
+        # Identifies this process's own messages on the fan-out channel
+        self.process_id = uuid.uuid4().hex
+        self._relay_task: Optional[asyncio.Task] = None
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        subscription: Optional[Subscription] = None,
+        hold_for_replay: bool = False
+    ):
+        """
+        Accept a new WebSocket connection
 
-    async def connect(self, websocket: WebSocket, client_id: str):
-        """Accept a new WebSocket connection"""
+        Args:
+            websocket: The socket
+            client_id: Client ID
+            subscription: Broadcast filter (default: receive everything)
+            hold_for_replay: Hold live broadcasts until replay_room_deltas runs
+        """
         await websocket.accept()
-        self.active_connections[client_id] = websocket
+
+        # A reconnect with the same client ID replaces the stale connection
+        self.disconnect(client_id)
+
+        connection = ClientConnection(websocket, client_id, subscription)
+        if hold_for_replay:
+            connection.held = []
+        connection.writer_task = asyncio.create_task(connection.run_writer(self._on_send_error))
+        self.active_connections[client_id] = connection
         logger.info(f"WebSocket connected: {client_id}. Total connections: {len(self.active_connections)}")
 
-    def disconnect(self, client_id: str):
-        """Remove a WebSocket connection"""
-        if client_id in self.active_connections:
+    def disconnect(self, client_id: str, connection: Optional[ClientConnection] = None):
+        """
+        Remove a WebSocket connection
+
+        Args:
+            client_id: Client to remove
+            connection: Only remove if this is still the registered connection
+        """
+        current = self.active_connections.get(client_id)
+        if current is not None and (connection is None or current is connection):
             del self.active_connections[client_id]
+            if current.writer_task is not None and current.writer_task is not asyncio.current_task():
+                current.writer_task.cancel()
             logger.info(f"WebSocket disconnected: {client_id}. Total connections: {len(self.active_connections)}")
 
-        # Remove from all rooms
-        for room_id, connections in self.room_connections.items():
-            if client_id in connections:
-                connections.remove(client_id)
+    def subscribe(self, client_id: str, subscription: Subscription) -> bool:
+        """
+        Replace a client's broadcast filter
+
+        Returns:
+            False if the client is not connected to this process
+        """
+        connection = self.active_connections.get(client_id)
+        if connection is None:
+            return False
+        connection.subscription = subscription
+        logger.info(f"WebSocket {client_id} subscribed: {subscription.to_dict()}")
+        return True
+
+    async def replay_room_deltas(self, client_id: str, since: int):
+        """
+        Send a reconnecting client the room deltas it missed, then resume live
+
+        If the replay buffer cannot cover `since`, the client gets a
+        `resync_required` event and should reload /api/v1/dashboard/.
+        Live broadcasts held during the replay follow it; they may repeat a
+        replayed seq, which clients skip (seq <= last applied).
+        """
+        connection = self.active_connections.get(client_id)
+        if connection is None:
+            return
+
+        deltas = await room_state_stream.replay_since(since)
+
+        if deltas is None:
+            connection.enqueue(serialize_message({
+                "event": "resync_required",
+                "data": {"seq": await room_state_stream.current_seq()},
+                "timestamp": now_thailand().isoformat()
+            }))
+        else:
+            for delta in deltas:
+                data = delta.get("data") or {}
+                if connection.subscription.matches(delta.get("event"), message_room_ids(data), None):
+                    connection.enqueue(serialize_message(delta))
+
+        held, connection.held = connection.held or [], None
+        for text, key in held:
+            connection.enqueue(text, key)
+
+    def _on_send_error(self, connection: ClientConnection, error: Exception):
+        """Writer task callback when a socket send fails"""
+        logger.error(f"Error sending to {connection.client_id}: {error}")
+        self.disconnect(connection.client_id, connection)
 
     async def send_personal_message(self, message: dict, client_id: str):
         """Send a message to a specific client"""
-        if client_id in self.active_connections:
-            try:
-                await self.active_connections[client_id].send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {e}")
-                self.disconnect(client_id)
+        connection = self.active_connections.get(client_id)
+        if connection is not None:
+            connection.enqueue(serialize_message(message))
 
     async def broadcast(self, message: dict, exclude_client: str = None):
         """
-        Broadcast a message to all connected clients
+        Broadcast a message to all connected clients in every process
+
+        The message is delivered to this process's sockets directly and
+        published on the Redis fan-out channel, where the relay of every
+        other API worker picks it up. Celery workers have no sockets, so for
+        them this only publishes.
 
         Args:
             message: Dictionary containing the message data
@@ -62,21 +379,100 @@ class ConnectionManager:
         if "timestamp" not in message:
             message["timestamp"] = now_thailand().isoformat()
 
-        disconnected_clients = []
+        await self._deliver_local(message, exclude_client)
+        await self._publish(message, exclude_client)
+
+        # Record the room-card changes this event implies on the seq stream
+        deltas_lost = False
+        for room_id, changes in room_deltas_for_event(message):
+            if room_id is None:
+                continue
+            delta = await room_state_stream.append(room_id, changes)
+            if delta is None:
+                deltas_lost = True
+            else:
+                await self.broadcast(delta)
+
+        # Delta clients skip the full room events, so a change whose delta
+        # could not be recorded would never reach them: have them reload
+        if deltas_lost:
+            await self.broadcast({
+                "event": "resync_required",
+                "data": {"seq": await room_state_stream.current_seq()}
+            })
+
+    async def _deliver_local(self, message: dict, exclude_client: str = None):
+        """Queue a message for the sockets connected to this process"""
+        if not self.active_connections:
+            return
 
-        for client_id, connection in self.active_connections.items():
+        event = message.get("event")
+        data = message.get("data") or {}
+        room_ids = message_room_ids(data)
+        target_role = data.get("target_role")
+
+        text = None
+        key = coalesce_key(message)
+
+        for client_id, connection in list(self.active_connections.items()):
             if exclude_client and client_id == exclude_client:
                 continue
+            if not connection.subscription.matches(event, room_ids, target_role):
+                continue
+
+            # Serialize once, not once per client
+            if text is None:
+                text = serialize_message(message)
+            connection.offer(text, key)
+
+    async def _publish(self, message: dict, exclude_client: str = None):
+        """Publish a message for the other processes' relays"""
+        envelope = {
+            "origin": self.process_id,
+            "exclude_client": exclude_client,
+            "message": message
+        }
+        try:
+            await get_redis().publish(BROADCAST_CHANNEL, json.dumps(envelope))
+        except Exception as e:
+            # Local clients already have the message; remote ones miss it
+            logger.warning(f"Failed to publish WebSocket broadcast: {e}")
 
+    async def start_relay(self):
+        """Start relaying broadcasts published by other processes (API startup)"""
+        if self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._relay_loop())
+
+    async def stop_relay(self):
+        """Stop the relay task (API shutdown)"""
+        if self._relay_task is not None:
+            self._relay_task.cancel()
             try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
-                disconnected_clients.append(client_id)
+                await self._relay_task
+            except asyncio.CancelledError:
+                pass
+            self._relay_task = None
 
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            self.disconnect(client_id)
+    async def _relay_loop(self):
+        """Subscribe to the fan-out channel and deliver to local sockets"""
+        while True:
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(BROADCAST_CHANNEL)
+                logger.info(f"WebSocket relay subscribed to {BROADCAST_CHANNEL}")
+                try:
+                    async for raw in pubsub.listen():
+                        envelope = json.loads(raw["data"])
+                        if envelope.get("origin") == self.process_id:
+                            continue
+                        await self._deliver_local(envelope["message"], envelope.get("exclude_client"))
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WebSocket relay error, resubscribing in {RELAY_RETRY_SECONDS}s: {e}")
+                await asyncio.sleep(RELAY_RETRY_SECONDS)
 
     async def broadcast_room_status_change(self, room_id: int, old_status: str, new_status: str, room_data: dict = None):
         """
@@ -280,6 +676,10 @@ class ConnectionManager:
         """Get the number of active connections"""
         return len(self.active_connections)
 
+    def get_client_metrics(self) -> list:
+        """Get per-client queue depth, lag and drop counters"""
+        return [connection.metrics() for connection in self.active_connections.values()]
+
 
 # Global connection manager instance
 manager = ConnectionManager()
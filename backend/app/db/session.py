@@ -2,17 +2,22 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-# Create async engine with UTF-8MB4 charset for Thai language support
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    connect_args={
-        "charset": "utf8mb4",
-        "init_command": "SET NAMES utf8mb4; SET SESSION sql_mode='STRICT_TRANS_TABLES'",
-    },
-)
+
+def create_engine():
+    """Create the async engine with UTF-8MB4 charset for Thai language support"""
+    return create_async_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        connect_args={
+            "charset": "utf8mb4",
+            "init_command": "SET NAMES utf8mb4; SET SESSION sql_mode='STRICT_TRANS_TABLES'",
+        },
+    )
+
+
+engine = create_engine()
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
@@ -22,3 +27,19 @@ AsyncSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
 )
+
+
+def rebind_engine():
+    """
+    Replace the engine behind AsyncSessionLocal (Celery worker process init)
+
+    A forked worker must not reuse connections opened by its parent, and the
+    aiomysql pool is bound to the event loop that first uses it. The old
+    pool is dropped without closing the parent's sockets.
+    """
+    global engine
+    old_engine = engine
+    engine = create_engine()
+    AsyncSessionLocal.configure(bind=engine)
+    old_engine.sync_engine.dispose(close=False)
+    return engine
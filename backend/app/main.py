@@ -3,6 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
 from app.api.v1.router import api_router
+from app.core.redis import close_redis
+from app.core.websocket import manager as websocket_manager
+from app.core.home_assistant_client import ha_client
+from app.core.breaker_scheduler import breaker_scheduler
+from app.core.telegram_dispatcher import telegram_dispatcher
 import os
 
 app = FastAPI(
@@ -25,6 +30,28 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def start_websocket_relay():
+    """Relay WebSocket broadcasts published by other workers and Celery"""
+    await websocket_manager.start_relay()
+
+
+@app.on_event("startup")
+async def start_breaker_scheduler():
+    """Run queued breaker commands when they are due"""
+    await breaker_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_redis():
+    """Stop background loops and release the shared Redis and HTTP pools"""
+    await websocket_manager.stop_relay()
+    await breaker_scheduler.stop()
+    await ha_client.close()
+    await telegram_dispatcher.close()
+    await close_redis()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
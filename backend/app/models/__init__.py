@@ -25,6 +25,8 @@ from .home_assistant import (
     HomeAssistantBreaker,
     BreakerActivityLog,
     BreakerControlQueue,
+    BreakerCommandOutbox,
+    BreakerSyncRollup,
     BreakerState,
     BreakerAction,
     TriggerType,
@@ -33,3 +35,5 @@ from .home_assistant import (
     TargetState
 )
 from .system_setting import SystemSetting, SettingDataTypeEnum
+from .daily_occupancy import DailyOccupancy
+from .public_holiday import PublicHolidayRecord
@@ -2,7 +2,7 @@
 Check-In Model (Phase 3)
 Handles both overnight and temporary stays
 """
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, Enum, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, Enum, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -34,6 +34,14 @@ class CheckIn(Base):
     Supports both overnight and temporary stays
     """
     __tablename__ = "check_ins"
+    __table_args__ = (
+        # Dashboard counts / revenue for today (covers stay_type and total_amount)
+        Index("idx_check_ins_status_time", "status", "check_in_time", "stay_type", "total_amount"),
+        # Overtime scan: equality columns first, checkout time as the range
+        Index("idx_check_ins_overtime_scan", "status", "stay_type", "is_overtime", "expected_check_out_time"),
+        # Check-out counts per day
+        Index("idx_check_ins_status_checkout", "status", "actual_check_out_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
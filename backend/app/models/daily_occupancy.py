@@ -0,0 +1,31 @@
+"""
+Daily Occupancy Model (Phase 8)
+Materialized daily occupancy series for reports
+"""
+from sqlalchemy import Column, Integer, Date, DateTime
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class DailyOccupancy(Base):
+    """
+    DailyOccupancy Model
+    One row per calendar day with the number of occupied stays on that day
+
+    A stay counts as occupied on a day when it checked in on or before that
+    day and is still checked in, or checked out on or after that day.
+    Rows are refreshed incrementally on check-in and check-out (a room
+    transfer moves a stay without changing the count), and re-derived
+    nightly by the backfill task. Report requests only read.
+    """
+    __tablename__ = "daily_occupancy"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stat_date = Column(Date, nullable=False, unique=True, index=True)
+    occupied_rooms = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DailyOccupancy(date={self.stat_date}, occupied={self.occupied_rooms})>"
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, Boolean, ForeignKey, TIMESTAMP, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Enum, Boolean, ForeignKey, TIMESTAMP, DateTime, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime
 from app.db.base import Base
 import enum
 
@@ -132,6 +133,7 @@ class HomeAssistantBreaker(Base):
     is_available = Column(Boolean, default=False, nullable=False, comment="Breaker available in Home Assistant")
     current_state = Column(Enum(BreakerState), default=BreakerState.UNAVAILABLE, nullable=False, index=True, comment="Current breaker state")
     last_state_update = Column(TIMESTAMP, nullable=True, comment="Last state sync timestamp")
+    state_changed_at = Column(TIMESTAMP, nullable=True, comment="When current_state last changed")
     ha_attributes = Column(JSON, nullable=True, comment="Additional attributes from Home Assistant")
     consecutive_errors = Column(Integer, default=0, nullable=False, comment="Number of consecutive command failures")
     last_error_message = Column(Text, nullable=True, comment="Last error message")
@@ -220,3 +222,72 @@ class BreakerControlQueue(Base):
 
     def __repr__(self):
         return f"<BreakerControlQueue(id={self.id}, breaker_id={self.breaker_id}, target='{self.target_state.value}', status='{self.status.value}')>"
+
+
+class BreakerCommandOutbox(Base):
+    """
+    Breaker Command Outbox Model
+
+    Transactional outbox for breaker auto-control. A room status change
+    inserts one row in the same commit as the status update; the outbox
+    dispatcher (Celery) later turns the breaker ON/OFF, so check-in,
+    check-out and bookings never wait on Home Assistant.
+
+    Business Rules:
+    - Rows for the same room are coalesced: the dispatcher applies the
+      first row's old status and the last row's new status once, and marks
+      the earlier rows as coalesced
+    - dispatch_delay_ms = time from commit to command completion
+    - status transitions: PENDING → PROCESSING → COMPLETED/FAILED
+    - claimed_at = when the row last moved to PROCESSING; a row PROCESSING
+      for longer than the timeout (worker died) is claimed again
+    """
+    __tablename__ = "breaker_command_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False, index=True, comment="Room whose status changed")
+    room_status_before = Column(String(50), nullable=True, comment="Room status before change")
+    room_status_after = Column(String(50), nullable=False, comment="Room status after change")
+    status = Column(Enum(QueueStatus), default=QueueStatus.PENDING, nullable=False, index=True, comment="Outbox item status")
+    attempts = Column(Integer, default=0, nullable=False, comment="Number of dispatch attempts")
+    coalesced = Column(Boolean, default=False, nullable=False, comment="Superseded by a later change for the same room")
+    error_message = Column(Text, nullable=True, comment="Error details if failed")
+    dispatch_delay_ms = Column(Integer, nullable=True, comment="Milliseconds from enqueue to command completion")
+    created_at = Column(DateTime, default=datetime.now, nullable=False, index=True)
+    claimed_at = Column(DateTime, nullable=True, comment="When the dispatcher last claimed the row")
+    processed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<BreakerCommandOutbox(id={self.id}, room_id={self.room_id}, after='{self.room_status_after}', status='{self.status.value}')>"
+
+
+class BreakerSyncRollup(Base):
+    """
+    Breaker Sync Rollup Model
+
+    Hourly per-breaker counters for status syncs. Successful syncs that do
+    not change the breaker state are not written to BreakerActivityLog (see
+    BREAKER_SYNC_LOG_MODE); this table keeps their count and latency.
+
+    Business Rules:
+    - One row per (breaker_id, hour_start), upserted by every sync run
+    - avg latency = total_latency_ms / sync_count
+    """
+    __tablename__ = "breaker_sync_rollups"
+    __table_args__ = (
+        # Also serves lookups by breaker_id (leading column)
+        UniqueConstraint("breaker_id", "hour_start", name="uq_breaker_sync_rollup_hour"),
+        Index("idx_sync_rollup_hour_start", "hour_start"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    breaker_id = Column(Integer, ForeignKey("home_assistant_breakers.id", ondelete="CASCADE"), nullable=False, comment="Reference to home_assistant_breakers")
+    hour_start = Column(DateTime, nullable=False, comment="Start of the hour (local time)")
+    sync_count = Column(Integer, default=0, nullable=False, comment="Syncs in this hour")
+    failed_count = Column(Integer, default=0, nullable=False, comment="Failed syncs in this hour")
+    changed_count = Column(Integer, default=0, nullable=False, comment="Syncs that changed state or availability")
+    total_latency_ms = Column(BigInteger, default=0, nullable=False, comment="Sum of sync latencies")
+    max_latency_ms = Column(Integer, default=0, nullable=False, comment="Slowest sync in this hour")
+
+    def __repr__(self):
+        return f"<BreakerSyncRollup(breaker_id={self.breaker_id}, hour='{self.hour_start}', syncs={self.sync_count})>"
@@ -0,0 +1,31 @@
+"""
+Public Holiday Model
+Local copy of Thai public holidays, one row per holiday
+"""
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class PublicHolidayRecord(Base):
+    """
+    PublicHolidayRecord Model
+    Holidays of one year are replaced together by the refresh task
+    (app/tasks/holiday_tasks.py); fetched_at tells the provider when the
+    year is due for another refresh.
+    """
+    __tablename__ = "public_holidays"
+    __table_args__ = (
+        UniqueConstraint("holiday_date", "name_en", name="uq_public_holiday_date_name"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    year = Column(Integer, nullable=False, index=True)
+    holiday_date = Column(Date, nullable=False)
+    name = Column(String(255), nullable=False)  # Thai name
+    name_en = Column(String(255), nullable=False)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PublicHolidayRecord(date={self.holiday_date}, name={self.name_en})>"
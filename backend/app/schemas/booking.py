@@ -110,6 +110,43 @@ class BookingCalendarEvent(BaseModel):
         from_attributes = True
 
 
+class CalendarRoomColumns(BaseModel):
+    """Rooms referenced by a calendar projection, column-oriented"""
+    id: List[int] = []
+    room_number: List[str] = []
+
+
+class CalendarEventColumns(BaseModel):
+    """Bookings of a calendar projection, one list per field, aligned by position"""
+    id: List[int] = []
+    room: List[int] = []  # index into rooms
+    start: List[int] = []  # days from start_date (negative if before)
+    nights: List[int] = []
+    status: List[int] = []  # index into statuses
+    customer_name: List[str] = []
+    total_amount: List[Decimal] = []
+    deposit_amount: List[Decimal] = []
+
+
+class CalendarProjectionResponse(BaseModel):
+    """Schema for the compact calendar month view"""
+    start_date: date
+    end_date: date  # exclusive
+    statuses: List[BookingStatusEnum]
+    status_colors: List[str]
+    rooms: CalendarRoomColumns
+    events: CalendarEventColumns
+
+
+class CalendarHeatResponse(BaseModel):
+    """Schema for per-day booking counts (occupancy heat)"""
+    start_date: date
+    end_date: date  # exclusive
+    booked: List[int]  # rooms booked for the night, aligned with days from start_date
+    arrivals: List[int]
+    departures: List[int]
+
+
 class PublicHoliday(BaseModel):
     """Schema for Thai public holiday"""
     date: date
@@ -136,6 +173,51 @@ class RoomAvailabilityResponse(BaseModel):
     conflicting_bookings: List[BookingResponse] = []
 
 
+class NightlyRate(BaseModel):
+    """Price of one night of a stay"""
+    date: date
+    rate: Optional[Decimal] = None  # None when no active rate covers the night
+
+
+class BookingQuoteResponse(BaseModel):
+    """Schema for an overnight stay price quote"""
+    room_id: int
+    room_type_id: int
+    check_in_date: date
+    check_out_date: date
+    number_of_nights: int
+    nights: List[NightlyRate]
+    total_amount: Optional[Decimal] = None  # None if any night has no rate
+    complete: bool
+
+
+class AvailabilityBlock(BaseModel):
+    """Nights [start, end) held by a booking or a current stay"""
+    start: date
+    end: date
+    kind: str  # booked / occupied
+    booking_id: Optional[int] = None
+    check_in_id: Optional[int] = None
+
+
+class RoomAvailabilityRow(BaseModel):
+    """Availability of one room over the requested nights"""
+    room_id: int
+    room_number: str
+    room_type_id: int
+    free_all: bool
+    nights: List[str]  # free / booked / occupied, aligned with `dates`
+    blocks: List[AvailabilityBlock] = []
+
+
+class AvailabilityMatrixResponse(BaseModel):
+    """Schema for the room x night availability matrix"""
+    start_date: date
+    end_date: date
+    dates: List[date]
+    rooms: List[RoomAvailabilityRow]
+
+
 class BookingConfirmRequest(BaseModel):
     """Schema for confirming a booking"""
     booking_id: int
@@ -81,6 +81,7 @@ class DashboardResponse(BaseModel):
     rooms: list[DashboardRoomCard]
     stats: DashboardStats
     last_updated: datetime
+    seq: Optional[int] = None  # Room delta seq this snapshot is current to (resume with /ws/dashboard?since=seq)
 
 
 class OvertimeAlert(BaseModel):
@@ -0,0 +1,248 @@
+"""
+Availability Service
+Room x night availability from per-room interval lists
+
+Loads every active booking and every current stay that overlaps the
+requested range with one query each, turns them into half-open night
+intervals [first night, departure day) and keeps them sorted per room.
+Availability of any set of rooms over any range is then answered in
+memory: a bisect for "is this room free", a sweep for the room x date
+matrix.
+
+Blocking intervals:
+- bookings that are PENDING, CONFIRMED or CHECKED_IN:
+  [check_in_date, check_out_date)
+- CHECKED_IN stays: [check-in day, expected check-out day); a stay past its
+  expected check-out time still holds today's night. Temporary stays that
+  are not overdue hold no night.
+"""
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.datetime_utils import now_thailand
+from app.models.booking import Booking, BookingStatusEnum
+from app.models.check_in import CheckIn, CheckInStatusEnum
+from app.models.room import Room
+
+ACTIVE_BOOKING_STATUSES = (
+    BookingStatusEnum.PENDING,
+    BookingStatusEnum.CONFIRMED,
+    BookingStatusEnum.CHECKED_IN,
+)
+
+# Night status codes in the availability matrix
+FREE = "free"
+BOOKED = "booked"
+OCCUPIED = "occupied"
+
+MAX_RANGE_DAYS = 366
+
+
+class StayInterval(NamedTuple):
+    """Nights [start, end) held in one room"""
+    start: date
+    end: date
+    kind: str  # BOOKED or OCCUPIED
+    booking_id: Optional[int] = None
+    check_in_id: Optional[int] = None
+
+
+class AvailabilityIndex:
+    """Sorted blocking intervals per room"""
+
+    def __init__(self, intervals_by_room: Dict[int, List[StayInterval]]):
+        self._intervals = {
+            room_id: sorted(intervals, key=lambda interval: (interval.start, interval.end)) for room_id, intervals in intervals_by_room.items()
+        }
+        # Running max of interval ends, so a bisect on start finds every
+        # interval that can still reach a given night
+        self._starts: Dict[int, List[date]] = {}
+        self._max_ends: Dict[int, List[date]] = {}
+        for room_id, intervals in self._intervals.items():
+            self._starts[room_id] = [interval.start for interval in intervals]
+            max_ends, current = [], date.min
+            for interval in intervals:
+                current = max(current, interval.end)
+                max_ends.append(current)
+            self._max_ends[room_id] = max_ends
+
+    def conflicts(
+        self,
+        room_id: int,
+        start: date,
+        end: date,
+        exclude_booking_id: Optional[int] = None
+    ) -> List[StayInterval]:
+        """Intervals of a room overlapping [start, end)"""
+        intervals = self._intervals.get(room_id)
+        if not intervals:
+            return []
+
+        # Only intervals starting before `end` can overlap
+        upper = bisect_left(self._starts[room_id], end)
+        found = []
+        for position in range(upper - 1, -1, -1):
+            if self._max_ends[room_id][position] <= start:
+                break
+            interval = intervals[position]
+            if interval.end > start and (exclude_booking_id is None or interval.booking_id != exclude_booking_id):
+                found.append(interval)
+        found.reverse()
+        return found
+
+    def is_free(
+        self,
+        room_id: int,
+        start: date,
+        end: date,
+        exclude_booking_id: Optional[int] = None
+    ) -> bool:
+        """True if no interval of the room overlaps [start, end)"""
+        return not self.conflicts(room_id, start, end, exclude_booking_id)
+
+    def night_statuses(self, room_id: int, start: date, end: date) -> List[str]:
+        """
+        Status of every night in [start, end) for one room
+
+        An occupied night (guest in the room) wins over a booked one.
+        """
+        days = (end - start).days
+        statuses = [FREE] * days
+        for interval in self.conflicts(room_id, start, end):
+            first = max((interval.start - start).days, 0)
+            last = min((interval.end - start).days, days)
+            for offset in range(first, last):
+                if statuses[offset] != OCCUPIED:
+                    statuses[offset] = interval.kind
+        return statuses
+
+    def free_rooms(self, room_ids: Iterable[int], start: date, end: date) -> List[int]:
+        """Rooms with no blocking interval in [start, end)"""
+        return [room_id for room_id in room_ids if self.is_free(room_id, start, end)]
+
+
+class AvailabilityService:
+    """Builds availability indexes from bookings and current stays"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_index(
+        self,
+        start: date,
+        end: date,
+        room_ids: Optional[Sequence[int]] = None
+    ) -> AvailabilityIndex:
+        """
+        Load every interval overlapping [start, end) (two queries)
+
+        Args:
+            start: First night
+            end: Day after the last night
+            room_ids: Limit to these rooms (default: all)
+
+        Returns:
+            AvailabilityIndex for the range
+        """
+        intervals: Dict[int, List[StayInterval]] = {}
+
+        booking_stmt = select(
+            Booking.id, Booking.room_id, Booking.check_in_date, Booking.check_out_date
+        ).where(
+            and_(
+                Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                Booking.check_in_date < end,
+                Booking.check_out_date > start
+            )
+        )
+        if room_ids is not None:
+            booking_stmt = booking_stmt.where(Booking.room_id.in_(room_ids))
+
+        for booking_id, room_id, check_in_date, check_out_date in (await self.db.execute(booking_stmt)).all():
+            intervals.setdefault(room_id, []).append(
+                StayInterval(check_in_date, check_out_date, BOOKED, booking_id=booking_id)
+            )
+
+        stay_stmt = select(
+            CheckIn.id, CheckIn.room_id, CheckIn.booking_id,
+            CheckIn.check_in_time, CheckIn.expected_check_out_time
+        ).where(CheckIn.status == CheckInStatusEnum.CHECKED_IN)
+        if room_ids is not None:
+            stay_stmt = stay_stmt.where(CheckIn.room_id.in_(room_ids))
+
+        now = now_thailand()
+        today = now.date()
+        for check_in_id, room_id, booking_id, check_in_time, expected_check_out_time in (await self.db.execute(stay_stmt)).all():
+            stay_end = expected_check_out_time.date()
+            if expected_check_out_time <= now:
+                # Overdue: the guest still holds tonight
+                stay_end = max(stay_end, today + timedelta(days=1))
+            stay_start = check_in_time.date()
+            if stay_end <= stay_start or stay_end <= start or stay_start >= end:
+                continue
+            intervals.setdefault(room_id, []).append(
+                StayInterval(stay_start, stay_end, OCCUPIED, booking_id=booking_id, check_in_id=check_in_id)
+            )
+
+        return AvailabilityIndex(intervals)
+
+    async def get_matrix(
+        self,
+        start: date,
+        end: date,
+        room_ids: Optional[Sequence[int]] = None,
+        room_type_id: Optional[int] = None
+    ) -> dict:
+        """
+        Room x night availability matrix
+
+        Args:
+            start: First night
+            end: Day after the last night
+            room_ids: Limit to these rooms
+            room_type_id: Limit to one room type
+
+        Returns:
+            {"start_date", "end_date", "dates", "rooms": [{"room_id",
+             "room_number", "room_type_id", "free_all", "nights", "blocks"}]}
+
+        Raises:
+            ValueError: If the range is empty or longer than MAX_RANGE_DAYS
+        """
+        days = (end - start).days
+        if days <= 0:
+            raise ValueError("วันที่สิ้นสุดต้องหลังวันที่เริ่มต้น")
+        if days > MAX_RANGE_DAYS:
+            raise ValueError(f"ช่วงวันที่ต้องไม่เกิน {MAX_RANGE_DAYS} วัน")
+
+        room_stmt = select(Room.id, Room.room_number, Room.room_type_id).where(Room.is_active == True)
+        if room_ids is not None:
+            room_stmt = room_stmt.where(Room.id.in_(room_ids))
+        if room_type_id is not None:
+            room_stmt = room_stmt.where(Room.room_type_id == room_type_id)
+        rooms = (await self.db.execute(room_stmt.order_by(Room.room_number))).all()
+
+        index = await self.load_index(start, end, [room.id for room in rooms])
+
+        matrix = []
+        for room_id, room_number, room_type in rooms:
+            blocks = index.conflicts(room_id, start, end)
+            matrix.append({
+                "room_id": room_id,
+                "room_number": room_number,
+                "room_type_id": room_type,
+                "free_all": not blocks,
+                "nights": index.night_statuses(room_id, start, end),
+                "blocks": [interval._asdict() for interval in blocks],
+            })
+
+        return {
+            "start_date": start,
+            "end_date": end,
+            "dates": [start + timedelta(days=offset) for offset in range(days)],
+            "rooms": matrix,
+        }
@@ -6,25 +6,31 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func, Date, cast
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
-from datetime import date, datetime, timedelta
-import httpx
+from datetime import date, timedelta
 import logging
 
 from app.models.booking import Booking, BookingStatusEnum
 from app.models.room import Room, RoomStatus
 from app.models.customer import Customer
 from app.models.user import User
-from app.models.room_rate import RoomRate
+from app.models.room_rate import RoomRate, StayType
 from app.schemas.booking import (
     BookingCreate,
     BookingUpdate,
     BookingResponse,
     BookingCalendarEvent,
     PublicHoliday,
-    RoomAvailabilityResponse
+    RoomAvailabilityResponse,
+    BookingQuoteResponse,
+    NightlyRate,
+    CalendarProjectionResponse,
+    CalendarHeatResponse
 )
 from app.core.websocket import websocket_manager
+from app.core.report_cache import report_cache
 from app.core.datetime_utils import now_thailand
+from app.services.room_rate_service import RoomRateService
+from app.services.availability_service import ACTIVE_BOOKING_STATUSES
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +49,9 @@ class BookingService:
         """
         Create a new booking
 
+        Commits on success and rolls back on a validation error; call it
+        with no uncommitted writes in the session (see _begin_room_write).
+
         Args:
             booking_data: Booking creation data
             created_by_user_id: User ID creating the booking
@@ -52,16 +61,21 @@ class BookingService:
 
         Raises:
             ValueError: If room not available or validation fails
+            RuntimeError: If the session has pending changes
         """
-        # 1. Validate room exists and is not out of service
-        room = await self.db.get(Room, booking_data.room_id)
+        # 1. Validate room exists and is not out of service. The room row
+        # stays locked until commit/rollback, so concurrent bookings for the
+        # same room queue here while other rooms proceed in parallel.
+        room = await self._begin_room_write(booking_data.room_id)
         if not room:
+            await self.db.rollback()
             raise ValueError("ไม่พบห้องที่ระบุ")
 
         if room.status == RoomStatus.OUT_OF_SERVICE:
+            await self.db.rollback()
             raise ValueError("ห้องนี้ไม่พร้อมให้บริการ")
 
-        # 2. Check room availability
+        # 2. Check room availability (under the room lock)
         is_available = await self.check_room_availability(
             room_id=booking_data.room_id,
             check_in_date=booking_data.check_in_date,
@@ -69,17 +83,20 @@ class BookingService:
         )
 
         if not is_available:
+            await self.db.rollback()
             raise ValueError("ห้องนี้ไม่ว่างในช่วงเวลาที่เลือก")
 
         # 3. Validate customer exists
         customer = await self.db.get(Customer, booking_data.customer_id)
         if not customer:
+            await self.db.rollback()
             raise ValueError("ไม่พบข้อมูลลูกค้า")
 
         # 4. Calculate number of nights
         number_of_nights = (booking_data.check_out_date - booking_data.check_in_date).days
 
         if number_of_nights <= 0:
+            await self.db.rollback()
             raise ValueError("จำนวนคืนต้องมากกว่า 0")
 
         # 5. Create booking
@@ -101,6 +118,7 @@ class BookingService:
         self.db.add(booking)
         await self.db.commit()
         await self.db.refresh(booking)
+        await report_cache.invalidate_bookings()
 
         # 6. If booking is for today, update room status to reserved using RoomService (triggers breaker automation)
         today = date.today()
@@ -210,6 +228,9 @@ class BookingService:
         """
         Update booking
 
+        A date change locks the room in a new transaction; call it with no
+        uncommitted writes in the session (see _begin_room_write).
+
         Args:
             booking_id: Booking ID
             booking_data: Update data
@@ -220,7 +241,17 @@ class BookingService:
 
         Raises:
             ValueError: If booking not found or validation fails
+            RuntimeError: If a date change finds pending changes in the session
         """
+        changes_dates = bool(booking_data.check_in_date or booking_data.check_out_date)
+        if changes_dates:
+            # Lock the room before reading the booking, so the booking and
+            # the availability check below both see the latest commits
+            room_id = await self.db.scalar(select(Booking.room_id).where(Booking.id == booking_id))
+            if room_id is None:
+                raise ValueError("ไม่พบการจองที่ระบุ")
+            await self._begin_room_write(room_id)
+
         booking = await self.get_booking_by_id(booking_id, include_relations=False)
         if not booking:
             raise ValueError("ไม่พบการจองที่ระบุ")
@@ -230,7 +261,7 @@ class BookingService:
             raise ValueError(f"ไม่สามารถแก้ไขการจองที่มีสถานะ {booking.status.value} ได้")
 
         # If changing dates, check availability
-        if booking_data.check_in_date or booking_data.check_out_date:
+        if changes_dates:
             new_check_in = booking_data.check_in_date or booking.check_in_date
             new_check_out = booking_data.check_out_date or booking.check_out_date
 
@@ -238,7 +269,7 @@ class BookingService:
             if new_check_out <= new_check_in:
                 raise ValueError("วันเช็คเอาท์ต้องหลังวันเช็คอิน")
 
-            # Check availability (exclude current booking)
+            # Check availability (exclude current booking) under the room lock
             is_available = await self.check_room_availability(
                 room_id=booking.room_id,
                 check_in_date=new_check_in,
@@ -247,6 +278,7 @@ class BookingService:
             )
 
             if not is_available:
+                await self.db.rollback()
                 raise ValueError("ห้องนี้ไม่ว่างในช่วงเวลาที่เลือก")
 
             # Update fields
@@ -270,6 +302,7 @@ class BookingService:
 
         await self.db.commit()
         await self.db.refresh(booking)
+        await report_cache.invalidate_bookings()
 
         return booking
 
@@ -332,6 +365,7 @@ class BookingService:
 
         await self.db.commit()
         await self.db.refresh(booking)
+        await report_cache.invalidate_bookings()
 
         return booking
 
@@ -345,6 +379,10 @@ class BookingService:
         """
         Check if room is available for given date range
 
+        A plain read: after _begin_room_write its snapshot is taken under
+        the room lock, so it already includes every committed booking for
+        the room without locking (and gap-locking) booking index ranges.
+
         Returns:
             True if available, False otherwise
         """
@@ -352,28 +390,10 @@ class BookingService:
         stmt = select(Booking).where(
             and_(
                 Booking.room_id == room_id,
-                Booking.status.in_([
-                    BookingStatusEnum.PENDING,
-                    BookingStatusEnum.CONFIRMED,
-                    BookingStatusEnum.CHECKED_IN
-                ]),
-                or_(
-                    # New booking starts during existing booking
-                    and_(
-                        Booking.check_in_date <= check_in_date,
-                        Booking.check_out_date > check_in_date
-                    ),
-                    # New booking ends during existing booking
-                    and_(
-                        Booking.check_in_date < check_out_date,
-                        Booking.check_out_date >= check_out_date
-                    ),
-                    # New booking completely contains existing booking
-                    and_(
-                        Booking.check_in_date >= check_in_date,
-                        Booking.check_out_date <= check_out_date
-                    )
-                )
+                Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                # Half-open ranges [check_in, check_out) overlap
+                Booking.check_in_date < check_out_date,
+                Booking.check_out_date > check_in_date
             )
         )
 
@@ -386,6 +406,56 @@ class BookingService:
 
         return len(conflicting_bookings) == 0
 
+    async def quote_stay(
+        self,
+        room_id: int,
+        check_in_date: date,
+        check_out_date: date
+    ) -> BookingQuoteResponse:
+        """
+        Price an overnight stay night by night
+
+        All nights are resolved from the in-memory rate index, so a long
+        stay costs one lookup instead of one rate query per night.
+
+        Args:
+            room_id: Room to price
+            check_in_date: First night
+            check_out_date: Departure day (not charged)
+
+        Returns:
+            BookingQuoteResponse with the nightly prices and their total
+
+        Raises:
+            ValueError: If the room does not exist or the dates are invalid
+        """
+        if check_out_date <= check_in_date:
+            raise ValueError("วันที่ check-out ต้องหลังวันที่ check-in")
+
+        room = await self.db.get(Room, room_id)
+        if not room:
+            raise ValueError(f"ไม่พบห้อง ID {room_id}")
+
+        rates = await RoomRateService(self.db).get_nightly_rates(
+            room.room_type_id, StayType.OVERNIGHT, check_in_date, check_out_date
+        )
+        nights = [
+            NightlyRate(date=check_in_date + timedelta(days=offset), rate=rate)
+            for offset, rate in enumerate(rates)
+        ]
+        complete = all(rate is not None for rate in rates)
+
+        return BookingQuoteResponse(
+            room_id=room.id,
+            room_type_id=room.room_type_id,
+            check_in_date=check_in_date,
+            check_out_date=check_out_date,
+            number_of_nights=len(nights),
+            nights=nights,
+            total_amount=sum(rates) if complete else None,
+            complete=complete
+        )
+
     async def get_conflicting_bookings(
         self,
         room_id: int,
@@ -402,25 +472,10 @@ class BookingService:
         ).where(
             and_(
                 Booking.room_id == room_id,
-                Booking.status.in_([
-                    BookingStatusEnum.PENDING,
-                    BookingStatusEnum.CONFIRMED,
-                    BookingStatusEnum.CHECKED_IN
-                ]),
-                or_(
-                    and_(
-                        Booking.check_in_date <= check_in_date,
-                        Booking.check_out_date > check_in_date
-                    ),
-                    and_(
-                        Booking.check_in_date < check_out_date,
-                        Booking.check_out_date >= check_out_date
-                    ),
-                    and_(
-                        Booking.check_in_date >= check_in_date,
-                        Booking.check_out_date <= check_out_date
-                    )
-                )
+                Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                # Half-open ranges [check_in, check_out) overlap
+                Booking.check_in_date < check_out_date,
+                Booking.check_out_date > check_in_date
             )
         )
 
@@ -487,6 +542,135 @@ class BookingService:
 
         return events
 
+    async def get_calendar_projection(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> CalendarProjectionResponse:
+        """
+        Compact calendar view of [start_date, end_date)
+
+        Same bookings as get_calendar_events (not cancelled, any day
+        including the departure day inside the window) in one column-only
+        query, returned as parallel arrays with rooms and statuses as
+        lookup tables instead of one object per booking.
+
+        Args:
+            start_date: First day shown
+            end_date: Day after the last day shown
+
+        Returns:
+            CalendarProjectionResponse
+        """
+        stmt = select(
+            Booking.id, Booking.room_id, Room.room_number, Booking.check_in_date,
+            Booking.check_out_date, Booking.status, Customer.full_name,
+            Booking.total_amount, Booking.deposit_amount
+        ).join(
+            Room, Room.id == Booking.room_id
+        ).join(
+            Customer, Customer.id == Booking.customer_id
+        ).where(
+            and_(
+                Booking.status != BookingStatusEnum.CANCELLED,
+                Booking.check_in_date < end_date,
+                Booking.check_out_date >= start_date
+            )
+        ).order_by(Booking.check_in_date, Booking.id)
+
+        result = await self.db.execute(stmt)
+
+        statuses = list(BookingStatusEnum)
+        status_index = {status: position for position, status in enumerate(statuses)}
+        room_index = {}
+        rooms = {"id": [], "room_number": []}
+        events = {
+            "id": [], "room": [], "start": [], "nights": [], "status": [],
+            "customer_name": [], "total_amount": [], "deposit_amount": []
+        }
+
+        for (booking_id, room_id, room_number, check_in_date, check_out_date,
+             status, customer_name, total_amount, deposit_amount) in result.all():
+            if room_id not in room_index:
+                room_index[room_id] = len(rooms["id"])
+                rooms["id"].append(room_id)
+                rooms["room_number"].append(room_number)
+
+            events["id"].append(booking_id)
+            events["room"].append(room_index[room_id])
+            events["start"].append((check_in_date - start_date).days)
+            events["nights"].append((check_out_date - check_in_date).days)
+            events["status"].append(status_index[status])
+            events["customer_name"].append(customer_name or "")
+            events["total_amount"].append(total_amount)
+            events["deposit_amount"].append(deposit_amount)
+
+        return CalendarProjectionResponse(
+            start_date=start_date,
+            end_date=end_date,
+            statuses=statuses,
+            status_colors=[self._get_status_color(status) for status in statuses],
+            rooms=rooms,
+            events=events
+        )
+
+    async def get_calendar_heat(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> CalendarHeatResponse:
+        """
+        Per-day booking counts for [start_date, end_date)
+
+        One query for the stay dates, then a difference-array sweep, so a
+        whole year is a few hundred integers.
+
+        Args:
+            start_date: First day
+            end_date: Day after the last day
+
+        Returns:
+            CalendarHeatResponse (booked nights, arrivals, departures per day)
+        """
+        stmt = select(Booking.check_in_date, Booking.check_out_date).where(
+            and_(
+                Booking.status != BookingStatusEnum.CANCELLED,
+                Booking.check_in_date < end_date,
+                Booking.check_out_date >= start_date
+            )
+        )
+        result = await self.db.execute(stmt)
+
+        days = (end_date - start_date).days
+        delta = [0] * (days + 1)
+        arrivals = [0] * days
+        departures = [0] * days
+
+        for check_in_date, check_out_date in result.all():
+            first = (check_in_date - start_date).days
+            last = (check_out_date - start_date).days
+            if 0 <= first < days:
+                arrivals[first] += 1
+            if 0 <= last < days:
+                departures[last] += 1
+            first, last = max(first, 0), min(last, days)
+            if first < last:
+                delta[first] += 1
+                delta[last] -= 1
+
+        booked, running = [], 0
+        for offset in range(days):
+            running += delta[offset]
+            booked.append(running)
+
+        return CalendarHeatResponse(
+            start_date=start_date,
+            end_date=end_date,
+            booked=booked,
+            arrivals=arrivals,
+            departures=departures
+        )
+
     async def get_booking_by_room_and_date(
         self,
         room_id: int,
@@ -524,37 +708,18 @@ class BookingService:
 
     async def get_public_holidays(self, year: int) -> List[PublicHoliday]:
         """
-        Fetch Thai public holidays from external API
+        Get Thai public holidays from the local holiday store
+
+        Never waits on the holiday API; see HolidayService.
 
         Args:
-            year: Year to fetch holidays for
+            year: Year to get holidays for
 
         Returns:
             List of public holidays
         """
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"https://date.nager.at/api/v3/PublicHolidays/{year}/TH"
-                )
-                response.raise_for_status()
-                holidays_data = response.json()
-
-                holidays = []
-                for h in holidays_data:
-                    holiday = PublicHoliday(
-                        date=datetime.strptime(h['date'], '%Y-%m-%d').date(),
-                        name=h.get('localName', h['name']),
-                        name_en=h['name']
-                    )
-                    holidays.append(holiday)
-
-                return holidays
-
-        except Exception as e:
-            logger.warning("Error fetching public holidays: %s", str(e))
-            # Return empty list if API fails
-            return []
+        from app.services.holiday_service import HolidayService
+        return await HolidayService(self.db).get_holidays(year)
 
     # ==================== Helper Methods ====================
 
@@ -569,6 +734,48 @@ class BookingService:
         }
         return color_map.get(status, "#6B7280")
 
+    async def _begin_room_write(self, room_id: int) -> Optional[Room]:
+        """
+        Start a new transaction that begins by locking the room
+
+        Under REPEATABLE READ the snapshot is taken at the first plain read
+        of a transaction, and a savepoint keeps the snapshot it is opened
+        in. Booking writes therefore own their transaction: the lock has to
+        be the first statement, so the booking reads that follow see every
+        booking committed by the previous holder of the lock.
+
+        Precondition: the session holds no uncommitted writes. A transaction
+        that has only read (the request's current-user lookup, the room id
+        lookup in update_booking) is ended here; committing it writes
+        nothing and keeps the loaded objects usable.
+
+        Raises:
+            RuntimeError: If the session has pending changes, which would
+                otherwise be committed as part of the booking
+        """
+        if self.db.new or self.db.dirty or self.db.deleted:
+            raise RuntimeError("Booking writes start their own transaction; commit pending changes first")
+        if self.db.in_transaction():
+            await self.db.commit()
+        return await self._lock_room(room_id)
+
+    async def _lock_room(self, room_id: int) -> Optional[Room]:
+        """
+        Load a room with SELECT ... FOR UPDATE
+
+        Serializes booking writes per room: a second transaction booking
+        the same room waits here until the first commits or rolls back,
+        then sees its booking in the availability check.
+        """
+        stmt = (
+            select(Room)
+            .where(Room.id == room_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
     async def _has_other_booking_for_date(
         self,
         room_id: int,
@@ -0,0 +1,255 @@
+"""
+Breaker Outbox Service Layer
+
+Transactional outbox between room status changes and breaker auto-control.
+
+RoomService.update_status (and the overtime cutoff) add a
+BreakerCommandOutbox row before committing the status change, so the
+command exists if and only if the status change does. After the commit the
+caller only kicks the Celery dispatcher; turning the breaker ON/OFF (and
+any Home Assistant sync that needs) happens off the request path.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from app.models.home_assistant import BreakerCommandOutbox, QueueStatus
+from app.models.room import RoomStatus
+
+logger = logging.getLogger(__name__)
+
+# Rows claimed per dispatcher pass
+DISPATCH_BATCH_SIZE = 100
+
+# Attempts before a row is left FAILED
+MAX_DISPATCH_ATTEMPTS = 3
+
+# Rows claimed (PROCESSING) longer ago than this (worker died) are retried
+PROCESSING_TIMEOUT_SECONDS = 120
+
+
+class BreakerOutboxService:
+    """Service for the breaker command outbox"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def enqueue(
+        self,
+        room_id: int,
+        old_status: Optional[RoomStatus],
+        new_status: RoomStatus
+    ) -> BreakerCommandOutbox:
+        """
+        Add an outbox row to the current transaction (the caller commits)
+
+        Args:
+            room_id: Room ID
+            old_status: Previous room status
+            new_status: New room status
+        """
+        item = BreakerCommandOutbox(
+            room_id=room_id,
+            room_status_before=old_status.value if old_status else None,
+            room_status_after=new_status.value,
+            status=QueueStatus.PENDING,
+            created_at=datetime.now()
+        )
+        self.db.add(item)
+        return item
+
+    @staticmethod
+    async def notify_dispatcher():
+        """
+        Ask a Celery worker to drain the outbox (call after commit)
+
+        Publishing runs in a thread so a slow broker never blocks the event
+        loop; if it fails the periodic dispatch run picks the rows up.
+        """
+        try:
+            from app.tasks.breaker_tasks import dispatch_command_outbox
+            await asyncio.to_thread(dispatch_command_outbox.apply_async, retry=False)
+        except Exception as e:
+            logger.warning("Failed to notify breaker outbox dispatcher: %s", e)
+
+    async def dispatch_pending(self) -> Dict[str, Any]:
+        """
+        Execute every pending outbox row, coalescing rows per room
+
+        Rows for one room are applied as a single transition from the first
+        row's old status to the last row's new status, so a check-in quickly
+        followed by a room transfer or cancel sends at most one command.
+
+        Returns:
+            Counts of dispatched rooms, coalesced rows and failures
+        """
+        from app.services.breaker_service import BreakerService
+
+        breaker_service = BreakerService(self.db)
+        dispatched = 0
+        coalesced = 0
+        failed = 0
+
+        while True:
+            items = await self._claim_batch()
+            if not items:
+                break
+
+            by_room: Dict[int, List[BreakerCommandOutbox]] = {}
+            for item in items:
+                by_room.setdefault(item.room_id, []).append(item)
+
+            for room_id, room_items in by_room.items():
+                first, last = room_items[0], room_items[-1]
+                old_status = RoomStatus(first.room_status_before) if first.room_status_before else None
+                new_status = RoomStatus(last.room_status_after)
+
+                error = None
+                if old_status != new_status:
+                    try:
+                        await breaker_service.auto_control_on_room_status_change(
+                            room_id=room_id,
+                            old_status=old_status,
+                            new_status=new_status
+                        )
+                    except Exception as e:
+                        logger.error("Outbox dispatch failed for room %s: %s", room_id, e, exc_info=True)
+                        error = str(e)
+
+                now = datetime.now()
+                for item in room_items:
+                    item.attempts += 1
+                    item.processed_at = now
+                    item.dispatch_delay_ms = int((now - item.created_at).total_seconds() * 1000)
+                    if error is None:
+                        item.status = QueueStatus.COMPLETED
+                        item.coalesced = item is not last
+                        item.error_message = None
+                    else:
+                        item.status = (
+                            QueueStatus.FAILED if item.attempts >= MAX_DISPATCH_ATTEMPTS
+                            else QueueStatus.PENDING
+                        )
+                        item.error_message = error
+
+                await self.db.commit()
+
+                if error is None:
+                    dispatched += 1
+                    coalesced += len(room_items) - 1
+                else:
+                    failed += 1
+
+            if len(items) < DISPATCH_BATCH_SIZE or failed:
+                break
+
+        return {
+            "dispatched": dispatched,
+            "coalesced": coalesced,
+            "failed": failed
+        }
+
+    async def _claim_batch(self) -> List[BreakerCommandOutbox]:
+        """Mark the oldest pending (or stuck) rows PROCESSING and return them"""
+        now = datetime.now()
+        stuck_before = now - timedelta(seconds=PROCESSING_TIMEOUT_SECONDS)
+        result = await self.db.execute(
+            select(BreakerCommandOutbox)
+            .where(
+                (BreakerCommandOutbox.status == QueueStatus.PENDING)
+                | (
+                    (BreakerCommandOutbox.status == QueueStatus.PROCESSING)
+                    & (
+                        # Claimed before claimed_at was recorded
+                        BreakerCommandOutbox.claimed_at.is_(None)
+                        | (BreakerCommandOutbox.claimed_at < stuck_before)
+                    )
+                )
+            )
+            .order_by(BreakerCommandOutbox.id)
+            .limit(DISPATCH_BATCH_SIZE)
+        )
+        items = list(result.scalars().all())
+
+        for item in items:
+            item.status = QueueStatus.PROCESSING
+            item.claimed_at = now
+        if items:
+            await self.db.commit()
+        return items
+
+    async def has_pending(self) -> bool:
+        """True when at least one row is waiting for dispatch"""
+        result = await self.db.execute(
+            select(BreakerCommandOutbox.id)
+            .where(BreakerCommandOutbox.status == QueueStatus.PENDING)
+            .limit(1)
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def get_metrics(self, window_minutes: int = 60) -> Dict[str, Any]:
+        """
+        Outbox backlog and end-to-end command delay
+
+        Args:
+            window_minutes: Look-back window for delay statistics
+
+        Returns:
+            Pending/failed counts, oldest pending age and delay percentiles
+            (commit → breaker command completed) over the window
+        """
+        now = datetime.now()
+        since = now - timedelta(minutes=window_minutes)
+
+        backlog = await self.db.execute(
+            select(
+                BreakerCommandOutbox.status,
+                func.count(BreakerCommandOutbox.id),
+                func.min(BreakerCommandOutbox.created_at)
+            )
+            .where(BreakerCommandOutbox.status.in_([
+                QueueStatus.PENDING, QueueStatus.PROCESSING, QueueStatus.FAILED
+            ]))
+            .group_by(BreakerCommandOutbox.status)
+        )
+        counts = {status.value: 0 for status in QueueStatus}
+        oldest_pending = None
+        for status, count, oldest in backlog.all():
+            counts[status.value] = count
+            if status == QueueStatus.PENDING:
+                oldest_pending = oldest
+
+        delays_result = await self.db.execute(
+            select(BreakerCommandOutbox.dispatch_delay_ms)
+            .where(
+                BreakerCommandOutbox.status == QueueStatus.COMPLETED,
+                BreakerCommandOutbox.coalesced == False,
+                BreakerCommandOutbox.processed_at >= since
+            )
+        )
+        delays = sorted(d for d in delays_result.scalars().all() if d is not None)
+
+        def percentile(p: float) -> Optional[int]:
+            if not delays:
+                return None
+            return delays[min(len(delays) - 1, int(round(p * (len(delays) - 1))))]
+
+        return {
+            "pending": counts[QueueStatus.PENDING.value],
+            "processing": counts[QueueStatus.PROCESSING.value],
+            "failed": counts[QueueStatus.FAILED.value],
+            "oldest_pending_age_ms": (
+                int((now - oldest_pending).total_seconds() * 1000) if oldest_pending else None
+            ),
+            "window_minutes": window_minutes,
+            "dispatched": len(delays),
+            "delay_ms": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": delays[-1] if delays else None,
+                "avg": int(sum(delays) / len(delays)) if delays else None
+            }
+        }
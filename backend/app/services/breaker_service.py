@@ -5,16 +5,20 @@ Manages breaker devices, control logic, and activity logging.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func, desc
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.orm import selectinload
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import asyncio
+import logging
+import time
 
 from app.models.home_assistant import (
     HomeAssistantBreaker,
     BreakerActivityLog,
     BreakerControlQueue,
+    BreakerSyncRollup,
     BreakerState,
     BreakerAction,
     TriggerType,
@@ -25,15 +29,39 @@ from app.models.home_assistant import (
 from app.models.room import Room, RoomStatus
 from app.models.user import User
 from app.services.home_assistant_service import HomeAssistantService
+from app.services.breaker_helpers import ha_state_to_breaker_state
+from app.core.breaker_scheduler import breaker_scheduler
+from app.core.config import settings
 from app.core.exceptions import (
     BreakerNotFoundError,
     BreakerUnavailableError,
     BreakerControlError,
     BreakerAlreadyExistsError,
     BreakerRoomConflictError,
-    HomeAssistantException
+    HomeAssistantException,
+    HomeAssistantNotConfiguredError,
+    DecryptionError
 )
 
+logger = logging.getLogger(__name__)
+
+# Max in-flight per-entity requests when the bulk /api/states call fails
+SYNC_CONCURRENCY = 8
+
+# Minutes a breaker may stay ON in a room that should be OFF before the
+# enforcement pass turns it off (manual override window)
+ENFORCE_OVERRIDE_MINUTES = 10
+
+
+def _unavailable_state(entity_id: str) -> Dict[str, Any]:
+    """State dict for an entity Home Assistant does not report"""
+    return {
+        "entity_id": entity_id,
+        "state": "unavailable",
+        "attributes": {},
+        "available": False
+    }
+
 
 class BreakerService:
     """
@@ -327,6 +355,8 @@ class BreakerService:
             response_time_ms = result.get("response_time_ms")
 
             # Update breaker state
+            if breaker.current_state != BreakerState.ON:
+                breaker.state_changed_at = datetime.now()
             breaker.current_state = BreakerState.ON
             breaker.last_state_update = datetime.now()
             breaker.consecutive_errors = 0
@@ -425,6 +455,8 @@ class BreakerService:
             action_status = ActionStatus.SUCCESS
             response_time_ms = result.get("response_time_ms")
 
+            if breaker.current_state != BreakerState.OFF:
+                breaker.state_changed_at = datetime.now()
             breaker.current_state = BreakerState.OFF
             breaker.last_state_update = datetime.now()
             breaker.consecutive_errors = 0
@@ -495,8 +527,13 @@ class BreakerService:
         if not breaker:
             raise BreakerNotFoundError()
 
+        old_state = breaker.current_state
+        old_available = breaker.is_available
+        started = time.perf_counter()
+
         try:
             state_data = await self.ha_service.get_entity_state(breaker.entity_id)
+            latency_ms = int((time.perf_counter() - started) * 1000)
 
             # Update breaker
             ha_state = state_data.get("state", "unavailable").lower()
@@ -512,17 +549,27 @@ class BreakerService:
             else:
                 breaker.current_state = BreakerState.UNAVAILABLE
 
+            if breaker.current_state != old_state:
+                breaker.state_changed_at = breaker.last_state_update
+
             # Clear error info on successful sync
             breaker.consecutive_errors = 0
             breaker.last_error_message = None
 
-            # Log sync activity
-            await self._log_activity(
-                breaker_id=breaker_id,
-                action=BreakerAction.STATUS_SYNC,
-                trigger_type=TriggerType.SYSTEM,
-                status=ActionStatus.SUCCESS
+            # Log sync activity (only on change unless BREAKER_SYNC_LOG_MODE=all)
+            state_changed = (
+                breaker.current_state != old_state
+                or breaker.is_available != old_available
             )
+            if state_changed or settings.BREAKER_SYNC_LOG_MODE == "all":
+                await self._log_activity(
+                    breaker_id=breaker_id,
+                    action=BreakerAction.STATUS_SYNC,
+                    trigger_type=TriggerType.SYSTEM,
+                    status=ActionStatus.SUCCESS,
+                    response_time_ms=latency_ms
+                )
+            await self._record_sync_rollup([(breaker_id, True, state_changed, latency_ms)])
 
             await self.db.commit()
 
@@ -539,13 +586,16 @@ class BreakerService:
 
         except Exception as e:
             # Log failed sync
+            latency_ms = int((time.perf_counter() - started) * 1000)
             await self._log_activity(
                 breaker_id=breaker_id,
                 action=BreakerAction.STATUS_SYNC,
                 trigger_type=TriggerType.SYSTEM,
                 status=ActionStatus.FAILED,
-                error_message=str(e)
+                error_message=str(e),
+                response_time_ms=latency_ms
             )
+            await self._record_sync_rollup([(breaker_id, False, False, latency_ms)])
 
             # Update breaker error info
             breaker.consecutive_errors += 1
@@ -566,26 +616,180 @@ class BreakerService:
             }
 
     async def sync_all_breakers(self) -> Dict[str, Any]:
-        """Sync all active breakers"""
-        breakers = await self.get_all(is_active=True)
-        success_count = 0
+        """
+        Sync all active breakers from Home Assistant.
+
+        Fetches every entity state with one /api/states call, diffs it in
+        memory against the breaker rows and writes them in a single
+        transaction. If the bulk call fails, falls back to per-entity fetches
+        with at most SYNC_CONCURRENCY requests in flight.
+
+        Only breakers whose state, availability, attributes or error fields
+        changed are written (last_state_update included), so a quiet sync
+        issues no UPDATEs. state_changed_at is set only when current_state
+        actually changes; enforce_room_state times overrides from it.
+
+        Returns:
+            Dict with counts, the mode used ("bulk" or "fallback") and the
+            list of breakers whose state or availability changed
+        """
+        result = await self.db.execute(
+            select(HomeAssistantBreaker)
+            .options(selectinload(HomeAssistantBreaker.room))
+            .where(HomeAssistantBreaker.is_active == True)
+            .order_by(HomeAssistantBreaker.id)
+        )
+        breakers = list(result.scalars().all())
+
+        mode = "bulk"
+        errors: Dict[str, str] = {}
+        latencies: Dict[str, int] = {}
+        started = time.perf_counter()
+        try:
+            all_states = await self.ha_service.get_all_states()
+            bulk_ms = int((time.perf_counter() - started) * 1000)
+            latencies = {breaker.entity_id: bulk_ms for breaker in breakers}
+            states = {
+                breaker.entity_id: all_states.get(breaker.entity_id, _unavailable_state(breaker.entity_id))
+                for breaker in breakers
+            }
+        except (HomeAssistantNotConfiguredError, DecryptionError) as e:
+            # Per-entity fetches would fail the same way
+            states = {}
+            errors = {breaker.entity_id: str(e) for breaker in breakers}
+        except Exception as e:
+            logger.warning("Bulk Home Assistant state fetch failed, falling back to per-entity: %s", e)
+            mode = "fallback"
+            states, errors, latencies = await self._fetch_states_concurrently(breakers)
+
+        now = datetime.now(ZoneInfo("Asia/Bangkok"))
+        log_every_sync = settings.BREAKER_SYNC_LOG_MODE == "all"
+        changed = []
+        samples: List[Tuple[int, bool, bool, int]] = []
         failed_count = 0
 
         for breaker in breakers:
-            try:
-                await self.sync_breaker_state(breaker.id)
-                success_count += 1
-            except Exception:
+            latency_ms = latencies.get(breaker.entity_id, 0)
+            if breaker.entity_id in errors:
                 failed_count += 1
+                breaker.consecutive_errors += 1
+                breaker.last_error_message = errors[breaker.entity_id]
+                await self._log_activity(
+                    breaker_id=breaker.id,
+                    action=BreakerAction.STATUS_SYNC,
+                    trigger_type=TriggerType.SYSTEM,
+                    status=ActionStatus.FAILED,
+                    error_message=errors[breaker.entity_id],
+                    response_time_ms=latency_ms
+                )
+                samples.append((breaker.id, False, False, latency_ms))
+                continue
+
+            state_data = states[breaker.entity_id]
+            new_state = ha_state_to_breaker_state(state_data.get("state") or "unavailable")
+            new_available = state_data.get("available", False)
+            new_attributes = state_data.get("attributes", {})
+
+            state_changed = (
+                breaker.current_state != new_state
+                or breaker.is_available != new_available
+            )
+            samples.append((breaker.id, True, state_changed, latency_ms))
+            if log_every_sync and not state_changed:
+                await self._log_activity(
+                    breaker_id=breaker.id,
+                    action=BreakerAction.STATUS_SYNC,
+                    trigger_type=TriggerType.SYSTEM,
+                    status=ActionStatus.SUCCESS,
+                    response_time_ms=latency_ms
+                )
+            if (
+                not state_changed
+                and breaker.ha_attributes == new_attributes
+                and breaker.consecutive_errors == 0
+                and breaker.last_error_message is None
+            ):
+                continue
+
+            old_state = breaker.current_state
+            if old_state != new_state:
+                breaker.state_changed_at = now
+            breaker.current_state = new_state
+            breaker.is_available = new_available
+            breaker.last_state_update = now
+            breaker.ha_attributes = new_attributes
+            breaker.consecutive_errors = 0
+            breaker.last_error_message = None
 
+            if state_changed:
+                await self._log_activity(
+                    breaker_id=breaker.id,
+                    action=BreakerAction.STATUS_SYNC,
+                    trigger_type=TriggerType.SYSTEM,
+                    status=ActionStatus.SUCCESS,
+                    response_time_ms=latency_ms
+                )
+                changed.append({
+                    "breaker_id": breaker.id,
+                    "entity_id": breaker.entity_id,
+                    "room_id": breaker.room_id,
+                    "room_number": breaker.room.room_number if breaker.room else None,
+                    "old_state": old_state.value if hasattr(old_state, "value") else old_state,
+                    "new_state": new_state.value,
+                    "is_available": new_available
+                })
+
+        await self._record_sync_rollup(samples)
+        await self.db.commit()
+
+        success_count = len(breakers) - failed_count
         return {
             "success": True,
             "message": f"ซิงค์เสร็จสิ้น: สำเร็จ {success_count}, ล้มเหลว {failed_count}",
+            "mode": mode,
             "total": len(breakers),
             "success_count": success_count,
-            "failed_count": failed_count
+            "failed_count": failed_count,
+            "changed_count": len(changed),
+            "changed": changed
         }
 
+    async def _fetch_states_concurrently(
+        self,
+        breakers: List[HomeAssistantBreaker]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str], Dict[str, int]]:
+        """
+        Fetch breaker states one entity at a time, SYNC_CONCURRENCY at once.
+
+        Only HTTP calls run concurrently; the session is not touched here.
+
+        Returns:
+            (entity_id -> state dict, entity_id -> error message,
+             entity_id -> request latency in ms)
+        """
+        semaphore = asyncio.Semaphore(SYNC_CONCURRENCY)
+        latencies: Dict[str, int] = {}
+
+        async def fetch(entity_id: str):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    return await self.ha_service.get_entity_state(entity_id)
+                finally:
+                    latencies[entity_id] = int((time.perf_counter() - started) * 1000)
+
+        entity_ids = [breaker.entity_id for breaker in breakers]
+        results = await asyncio.gather(*(fetch(entity_id) for entity_id in entity_ids), return_exceptions=True)
+
+        states: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        for entity_id, result in zip(entity_ids, results, strict=True):
+            if isinstance(result, BaseException):
+                errors[entity_id] = str(result)
+            else:
+                states[entity_id] = result
+        return states, errors, latencies
+
     # ========================================================================
     # Auto Control Logic
     # ========================================================================
@@ -603,10 +807,18 @@ class BreakerService:
         - Turn ON IMMEDIATELY if new_status is OCCUPIED or CLEANING
         - Turn OFF IMMEDIATELY if new_status is AVAILABLE, RESERVED, or OUT_OF_SERVICE
 
+        Called by the breaker command outbox dispatcher, which retries the
+        command when this raises. A room without a breaker, or with auto
+        control disabled, needs no command and is not an error.
+
         Args:
             room_id: Room ID
             old_status: Previous room status
             new_status: New room status
+
+        Raises:
+            BreakerUnavailableError: Breaker still unavailable after a sync
+            BreakerControlError: Home Assistant rejected the command
         """
         import logging
         logger = logging.getLogger(__name__)
@@ -635,10 +847,12 @@ class BreakerService:
                     logger.info(f"[BREAKER AUTO-CONTROL] Sync succeeded, breaker {breaker.id} now available")
                 else:
                     logger.warning(f"[BREAKER AUTO-CONTROL] Sync completed but breaker {breaker.id} still unavailable in Home Assistant")
-                    return
+                    raise BreakerUnavailableError(f"Breaker {breaker.entity_id} ไม่พร้อมใช้งานใน Home Assistant")
+            except BreakerUnavailableError:
+                raise
             except Exception as sync_err:
                 logger.warning(f"[BREAKER AUTO-CONTROL] Sync failed for breaker {breaker.id}: {sync_err}")
-                return
+                raise BreakerUnavailableError(f"Breaker {breaker.entity_id} ไม่พร้อมใช้งานใน Home Assistant")
 
         # Determine target state and execute IMMEDIATELY
         try:
@@ -674,8 +888,115 @@ class BreakerService:
                 else:
                     logger.info(f"[BREAKER AUTO-CONTROL] Breaker {breaker.id} already OFF, skipping")
         except Exception as e:
-            # Log error but don't block room status update
+            # The outbox row stays pending for a retry
             logger.error(f"[BREAKER AUTO-CONTROL] Failed for room {room_id}: {str(e)}", exc_info=True)
+            raise
+
+    async def enforce_room_state(
+        self,
+        breakers: Optional[List[HomeAssistantBreaker]] = None,
+        rooms_by_id: Optional[Dict[int, Room]] = None
+    ) -> Dict[str, Any]:
+        """
+        Turn OFF breakers left ON (e.g. manually) in rooms that should be dark.
+
+        A breaker that is ON, auto-controlled and linked to an AVAILABLE,
+        RESERVED or OUT_OF_SERVICE room, and has been ON for
+        ENFORCE_OVERRIDE_MINUTES (timed from state_changed_at), is
+        turned OFF.
+
+        Args:
+            breakers: Preloaded active breakers (hotel tick snapshot); loaded
+                here when omitted
+            rooms_by_id: Rooms for `breakers`, used instead of breaker.room
+
+        Returns:
+            Dict with the number of breakers turned off
+        """
+        from app.core.websocket import websocket_manager
+
+        cutoff_time = datetime.now() - timedelta(minutes=ENFORCE_OVERRIDE_MINUTES)
+
+        if breakers is None:
+            result = await self.db.execute(
+                select(HomeAssistantBreaker)
+                .options(selectinload(HomeAssistantBreaker.room))
+                .where(and_(
+                    HomeAssistantBreaker.is_active == True,
+                    HomeAssistantBreaker.auto_control_enabled == True,
+                    HomeAssistantBreaker.is_available == True,
+                    HomeAssistantBreaker.current_state == BreakerState.ON,
+                    HomeAssistantBreaker.room_id.isnot(None),
+                    HomeAssistantBreaker.state_changed_at <= cutoff_time,
+                ))
+            )
+            breakers = list(result.scalars().all())
+
+        # Room statuses that require breaker OFF
+        off_statuses = [
+            RoomStatus.AVAILABLE,
+            RoomStatus.RESERVED,
+            RoomStatus.OUT_OF_SERVICE,
+        ]
+
+        turned_off_count = 0
+
+        for breaker in breakers:
+            if not (
+                breaker.is_active
+                and breaker.auto_control_enabled
+                and breaker.is_available
+                and breaker.current_state == BreakerState.ON
+                and breaker.room_id is not None
+                and breaker.state_changed_at is not None
+                and breaker.state_changed_at.replace(tzinfo=None) <= cutoff_time
+            ):
+                continue
+
+            room = rooms_by_id.get(breaker.room_id) if rooms_by_id is not None else breaker.room
+            if not room or room.status not in off_statuses:
+                continue
+
+            # Mismatch: breaker ON but room should be OFF, for > 10 min
+            logger.info(
+                "[BREAKER ENFORCE] Mismatch detected: breaker %s (entity=%s) is ON but room %s "
+                "is %s. ON since %s. Auto turning OFF after %s min override timeout.",
+                breaker.id, breaker.entity_id, room.room_number, room.status.value,
+                breaker.state_changed_at, ENFORCE_OVERRIDE_MINUTES
+            )
+
+            try:
+                await self.turn_off(
+                    breaker_id=breaker.id,
+                    trigger_type=TriggerType.SYSTEM,
+                    triggered_by=None,
+                    room_status_before=room.status.value,
+                    room_status_after=room.status.value,
+                )
+                turned_off_count += 1
+
+                await websocket_manager.broadcast({
+                    "event": "breaker_state_changed",
+                    "data": {
+                        "breaker_id": breaker.id,
+                        "entity_id": breaker.entity_id,
+                        "new_state": "OFF",
+                        "trigger_type": "SYSTEM",
+                        "reason": "enforce_room_state",
+                        "room_number": room.room_number,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                })
+
+            except Exception as e:
+                logger.error("[BREAKER ENFORCE] Failed to turn off breaker %s: %s", breaker.id, e, exc_info=True)
+
+        return {
+            "success": True,
+            "message": f"Enforced {turned_off_count} breakers",
+            "turned_off": turned_off_count,
+            "checked_at": datetime.now().isoformat()
+        }
 
     # ========================================================================
     # Activity Logs
@@ -746,6 +1067,65 @@ class BreakerService:
         )
         self.db.add(log)
 
+    async def _record_sync_rollup(self, samples: List[Tuple[int, bool, bool, int]]):
+        """
+        Add sync results to this hour's rollup rows (no commit)
+
+        On MySQL this is one INSERT ... ON DUPLICATE KEY UPDATE; other
+        databases read this hour's rows and update or add them.
+
+        Args:
+            samples: (breaker_id, success, state_changed, latency_ms) per sync
+        """
+        if not samples:
+            return
+
+        hour_start = datetime.now().replace(minute=0, second=0, microsecond=0)
+        rows = [
+            {
+                "breaker_id": breaker_id,
+                "hour_start": hour_start,
+                "sync_count": 1,
+                "failed_count": 0 if success else 1,
+                "changed_count": 1 if state_changed else 0,
+                "total_latency_ms": latency_ms,
+                "max_latency_ms": latency_ms
+            }
+            for breaker_id, success, state_changed, latency_ms in samples
+        ]
+
+        if self.db.get_bind().dialect.name == "mysql":
+            stmt = mysql_insert(BreakerSyncRollup).values(rows)
+            stmt = stmt.on_duplicate_key_update(
+                sync_count=BreakerSyncRollup.sync_count + stmt.inserted.sync_count,
+                failed_count=BreakerSyncRollup.failed_count + stmt.inserted.failed_count,
+                changed_count=BreakerSyncRollup.changed_count + stmt.inserted.changed_count,
+                total_latency_ms=BreakerSyncRollup.total_latency_ms + stmt.inserted.total_latency_ms,
+                max_latency_ms=func.greatest(BreakerSyncRollup.max_latency_ms, stmt.inserted.max_latency_ms)
+            )
+            await self.db.execute(stmt)
+            return
+
+        result = await self.db.execute(
+            select(BreakerSyncRollup).where(
+                BreakerSyncRollup.hour_start == hour_start,
+                BreakerSyncRollup.breaker_id.in_([row["breaker_id"] for row in rows])
+            )
+        )
+        existing = {rollup.breaker_id: rollup for rollup in result.scalars().all()}
+        for row in rows:
+            rollup = existing.get(row["breaker_id"])
+            if rollup is None:
+                rollup = BreakerSyncRollup(**row)
+                self.db.add(rollup)
+                existing[row["breaker_id"]] = rollup
+                continue
+            rollup.sync_count += row["sync_count"]
+            rollup.failed_count += row["failed_count"]
+            rollup.changed_count += row["changed_count"]
+            rollup.total_latency_ms += row["total_latency_ms"]
+            rollup.max_latency_ms = max(rollup.max_latency_ms, row["max_latency_ms"])
+
     # ========================================================================
     # Control Queue
     # ========================================================================
@@ -758,8 +1138,13 @@ class BreakerService:
         triggered_by: Optional[int] = None,
         priority: int = 5,
         debounce_seconds: int = 0
-    ):
-        """Add command to control queue"""
+    ) -> BreakerControlQueue:
+        """
+        Add command to control queue and hand it to the command scheduler
+
+        The row is the audit record; the scheduler runs it when due. A newer
+        command for the same breaker replaces one that has not run yet.
+        """
         scheduled_at = datetime.now()
         if debounce_seconds > 0:
             scheduled_at = scheduled_at + timedelta(seconds=debounce_seconds)
@@ -777,6 +1162,16 @@ class BreakerService:
         self.db.add(queue_item)
         await self.db.commit()
 
+        try:
+            replaced = await breaker_scheduler.schedule(breaker_id, queue_item.id, scheduled_at)
+            if replaced:
+                await breaker_scheduler.mark_superseded([replaced], queue_item.id)
+        except Exception as e:
+            # Row stays PENDING; the scheduler's overdue sweep picks it up
+            logger.warning("Failed to schedule breaker command #%s: %s", queue_item.id, e)
+
+        return queue_item
+
     # ========================================================================
     # Statistics
     # ========================================================================
@@ -839,6 +1234,19 @@ class BreakerService:
         success_today = success_today_result.scalar()
         success_rate = (success_today / total_actions_today * 100) if total_actions_today > 0 else 0
 
+        # Average sync latency today (from the hourly rollups)
+        latency_result = await self.db.execute(
+            select(
+                func.sum(BreakerSyncRollup.total_latency_ms),
+                func.sum(BreakerSyncRollup.sync_count)
+            )
+            .where(BreakerSyncRollup.hour_start >= today_start)
+        )
+        total_latency_ms, sync_count = latency_result.one()
+        avg_response_time_ms = (
+            round(float(total_latency_ms) / sync_count, 1) if sync_count else None
+        )
+
         return {
             "total_breakers": total_breakers,
             "online_breakers": online_breakers,
@@ -849,5 +1257,5 @@ class BreakerService:
             "breakers_with_errors": 0,  # TODO: implement error count
             "total_actions_today": total_actions_today,
             "success_rate_today": round(success_rate, 2),
-            "avg_response_time_ms": None  # TODO: calculate average
+            "avg_response_time_ms": avg_response_time_ms
         }
@@ -2,18 +2,22 @@
 Check-In Service (Phase 4)
 Handles check-in business logic for both overnight and temporary stays
 """
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import joinedload
 
-from app.models import CheckIn, Room, RoomRate, Customer, Booking, RoomStatus
+from app.models import CheckIn, Room, Customer, Booking, RoomStatus
 from app.models.check_in import StayTypeEnum, CheckInStatusEnum
 from app.schemas.check_in import CheckInCreate, CheckInResponse
 from app.core.websocket import manager as websocket_manager
+from app.core.report_cache import report_cache
 from app.core.datetime_utils import now_thailand
+from app.services.occupancy_service import OccupancyService
+from app.services.room_rate_service import RoomRateService
+from app.core.rate_index import RateEntry
 
 
 class CheckInService:
@@ -45,7 +49,8 @@ class CheckInService:
         # Get room rate for this room type and stay type
         room_rate = await self._get_room_rate(
             room.room_type_id,
-            check_in_data.stay_type
+            check_in_data.stay_type,
+            (check_in_data.check_in_time or now_thailand()).date()
         )
 
         if not room_rate:
@@ -125,6 +130,14 @@ class CheckInService:
         # Broadcast WebSocket event
         await self._broadcast_check_in_event(check_in, room)
 
+        # Keep the materialized occupancy series current (best-effort)
+        await OccupancyService.refresh_after_stay_change(since=check_in_time.date())
+
+        # Reports covering this stay are stale now
+        if check_in_data.booking_id:
+            await report_cache.invalidate_bookings()
+        await report_cache.invalidate_live(affected_day=check_in_time.date())
+
         return check_in
 
     async def get_check_in_by_id(
@@ -239,18 +252,11 @@ class CheckInService:
     async def _get_room_rate(
         self,
         room_type_id: int,
-        stay_type: StayTypeEnum
-    ) -> Optional[RoomRate]:
-        """Get room rate for room type and stay type"""
-        stmt = select(RoomRate).where(
-            and_(
-                RoomRate.room_type_id == room_type_id,
-                RoomRate.stay_type == stay_type,
-                RoomRate.is_active == True
-            )
-        )
-        result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
+        stay_type: StayTypeEnum,
+        check_in_date: date
+    ) -> Optional[RateEntry]:
+        """Get the room rate effective on the check-in date (from the rate index)"""
+        return await RoomRateService(self.db).resolve_rate(room_type_id, stay_type, check_in_date)
 
     async def _get_booking(self, booking_id: int) -> Optional[Booking]:
         """Get booking by ID"""
@@ -267,6 +273,7 @@ class CheckInService:
                 "room_id": room.id,
                 "room_number": room.room_number,
                 "customer_name": check_in.customer.full_name if check_in.customer else None,
+                "customer_phone": check_in.customer.phone_number if check_in.customer else None,
                 "stay_type": check_in.stay_type,
                 "check_in_time": check_in.check_in_time.isoformat(),
                 "expected_check_out_time": check_in.expected_check_out_time.isoformat(),
@@ -389,6 +396,9 @@ class CheckInService:
             reason=reason
         )
 
+        # Check-in list rows show the room number
+        await report_cache.invalidate_live()
+
         return check_in, old_room, new_room
 
     async def _broadcast_room_transfer_event(
@@ -400,19 +410,33 @@ class CheckInService:
         reason: Optional[str]
     ):
         """Broadcast room transfer event via WebSocket"""
-        # Room transfer event
+        now = now_thailand()
+        overtime_minutes = None
+        if check_in.expected_check_out_time and now > check_in.expected_check_out_time:
+            overtime_minutes = int((now - check_in.expected_check_out_time).total_seconds() / 60)
+
+        # Room transfer event; carries the whole stay so the new room's card
+        # can be rebuilt from this event alone
         await websocket_manager.broadcast({
             "event": "room_transferred",
             "data": {
                 "check_in_id": check_in.id,
                 "customer_name": check_in.customer.full_name if check_in.customer else None,
+                "customer_phone": check_in.customer.phone_number if check_in.customer else None,
+                "stay_type": check_in.stay_type,
+                "check_in_time": check_in.check_in_time.isoformat(),
+                "expected_check_out_time": check_in.expected_check_out_time.isoformat(),
+                "is_overtime": overtime_minutes is not None,
+                "overtime_minutes": overtime_minutes,
                 "old_room_id": old_room.id,
                 "old_room_number": old_room.room_number,
+                "old_room_status": old_room.status,
                 "new_room_id": new_room.id,
                 "new_room_number": new_room.room_number,
+                "new_room_status": new_room.status,
                 "transferred_by": transferred_by_user_id,
                 "reason": reason,
-                "timestamp": now_thailand().isoformat()
+                "timestamp": now.isoformat()
             }
         })
 
@@ -18,7 +18,9 @@ from app.models.notification import NotificationTypeEnum, TargetRoleEnum
 from app.schemas.check_in import CheckOutRequest, CheckOutSummary
 from app.schemas.notification import NotificationCreate
 from app.core.websocket import manager as websocket_manager
+from app.core.report_cache import report_cache
 from app.services.notification_service import NotificationService
+from app.services.occupancy_service import OccupancyService
 from app.core.datetime_utils import now_thailand
 
 
@@ -268,6 +270,12 @@ class CheckOutService:
             logger.warning("Failed to send Telegram notification: %s", e)
             # Don't fail the checkout if Telegram notification fails
 
+        # Keep the materialized occupancy series current (best-effort)
+        await OccupancyService.refresh_after_stay_change(since=actual_checkout_time.date())
+
+        # New payment and check-out: reports covering that day are stale now
+        await report_cache.invalidate_live(affected_day=actual_checkout_time.date())
+
         return check_in
 
     def _calculate_overtime_charge(
@@ -3,19 +3,43 @@ Dashboard Service (Phase 3)
 Business logic for dashboard operations
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import Select, select, func, and_
 from sqlalchemy.orm import joinedload
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from app.models import Room, RoomType, CheckIn, Customer, RoomRate, Booking
+from app.models import Room, RoomType, CheckIn, Customer, Booking
 from app.models.room import RoomStatus
 from app.models.check_in import CheckInStatusEnum, StayTypeEnum
 from app.models.room_rate import StayType
 from app.models.booking import BookingStatusEnum
 from app.schemas.dashboard import DashboardRoomCard, DashboardStats, OvertimeAlert
 from app.core.datetime_utils import now_thailand, today_thailand
+from app.services.room_rate_service import RoomRateService
+
+
+def stay_type_counts_query(today_start: datetime) -> Select:
+    """(stay type, count) of the stays checked in since today_start and still in"""
+    return (
+        select(CheckIn.stay_type, func.count(CheckIn.id))
+        .where(
+            CheckIn.check_in_time >= today_start,
+            CheckIn.status == CheckInStatusEnum.CHECKED_IN
+        )
+        .group_by(CheckIn.stay_type)
+    )
+
+
+def revenue_today_query(today_start: datetime) -> Select:
+    """Total amount of the stays checked in since today_start and checked out"""
+    return (
+        select(func.sum(CheckIn.total_amount))
+        .where(
+            CheckIn.check_in_time >= today_start,
+            CheckIn.status == CheckInStatusEnum.CHECKED_OUT
+        )
+    )
 
 
 class DashboardService:
@@ -31,41 +55,86 @@ class DashboardService:
         Returns:
             Tuple of (overnight_rate, temporary_rate)
         """
-        today = now_thailand().date()
+        rates = (await self._get_current_rates_by_room_type()).get(room_type_id, {})
+        return rates.get(StayType.OVERNIGHT), rates.get(StayType.TEMPORARY)
+
+    async def _get_current_rates_by_room_type(self) -> Dict[int, Dict[StayType, Decimal]]:
+        """
+        Get current active rates for every room type from the rate index
+
+        Returns:
+            Dict of room_type_id -> {stay_type: rate}
+        """
+        index = await RoomRateService(self.db).get_rate_index()
+        return index.rates_on(now_thailand().date())
+
+    async def _get_active_check_ins_by_room(self, room_ids: List[int]) -> Dict[int, CheckIn]:
+        """
+        Get the active (checked-in) stay for each room in a single query
+
+        Only CHECKED_IN rows are loaded, so the query cost does not grow
+        with the historical check-in volume.
+
+        Returns:
+            Dict of room_id -> CheckIn
+        """
+        if not room_ids:
+            return {}
 
-        # Query rates that are active and effective today
         stmt = (
-            select(RoomRate.stay_type, RoomRate.rate)
+            select(CheckIn)
+            .options(joinedload(CheckIn.customer))
             .where(
-                RoomRate.room_type_id == room_type_id,
-                RoomRate.is_active == True,
-                RoomRate.effective_from <= today,
-                or_(RoomRate.effective_to == None, RoomRate.effective_to >= today)
+                CheckIn.room_id.in_(room_ids),
+                CheckIn.status == CheckInStatusEnum.CHECKED_IN
             )
+            .order_by(CheckIn.check_in_time)
         )
 
         result = await self.db.execute(stmt)
-        rates = dict(result.all())
+        return {check_in.room_id: check_in for check_in in result.unique().scalars().all()}
 
-        overnight_rate = rates.get(StayType.OVERNIGHT)
-        temporary_rate = rates.get(StayType.TEMPORARY)
+    async def _get_todays_bookings_by_room(self, room_ids: List[int]) -> Dict[int, Booking]:
+        """
+        Get today's confirmed booking for each reserved room in a single query
+
+        Returns:
+            Dict of room_id -> Booking
+        """
+        if not room_ids:
+            return {}
+
+        stmt = (
+            select(Booking)
+            .options(joinedload(Booking.customer))
+            .where(
+                and_(
+                    Booking.room_id.in_(room_ids),
+                    Booking.status == BookingStatusEnum.CONFIRMED,
+                    Booking.check_in_date == today_thailand()
+                )
+            )
+            .order_by(Booking.id)
+        )
 
-        return overnight_rate, temporary_rate
+        result = await self.db.execute(stmt)
+        return {booking.room_id: booking for booking in result.unique().scalars().all()}
 
     async def get_all_rooms_with_details(self) -> List[DashboardRoomCard]:
         """
         Get all rooms with check-in details and booking information for dashboard display
 
+        The dashboard is assembled from a fixed number of queries regardless of
+        room count: rooms, current rates for all room types, active check-ins,
+        and today's bookings for reserved rooms.
+
         Returns:
             List of DashboardRoomCard with full information including bookings
         """
-        # Query rooms with room_type and current check_in
+        # Query rooms with room_type only (check-ins are loaded separately)
         stmt = (
             select(Room)
-            .options(
-                joinedload(Room.room_type),
-                joinedload(Room.check_ins).joinedload(CheckIn.customer)
-            )
+            .options(joinedload(Room.room_type))
             .where(Room.is_active == True)
             .order_by(Room.floor, Room.room_number)
         )
@@ -73,46 +142,34 @@ class DashboardService:
         result = await self.db.execute(stmt)
         rooms = result.unique().scalars().all()
 
-        # Get today's date in Thailand timezone
-        today = today_thailand()
+        room_ids = [room.id for room in rooms]
+        reserved_room_ids = [room.id for room in rooms if room.status == RoomStatus.RESERVED]
+
+        rates_by_room_type = await self._get_current_rates_by_room_type()
+        check_ins_by_room = await self._get_active_check_ins_by_room(room_ids)
+        bookings_by_room = await self._get_todays_bookings_by_room(reserved_room_ids)
+
+        # Use a single reference time for overtime calculation (Thailand timezone)
+        now = now_thailand()
 
         room_cards = []
         for room in rooms:
-            # Get current check-in (status = checked_in)
-            current_check_in = next(
-                (ci for ci in room.check_ins if ci.status == CheckInStatusEnum.CHECKED_IN),
-                None
-            )
-
-            # Get active booking for this room (if reserved)
-            current_booking = None
-            if room.status == RoomStatus.RESERVED:
-                booking_stmt = (
-                    select(Booking)
-                    .options(joinedload(Booking.customer))
-                    .where(
-                        and_(
-                            Booking.room_id == room.id,
-                            Booking.status == BookingStatusEnum.CONFIRMED,
-                            Booking.check_in_date == today
-                        )
-                    )
-                )
-                booking_result = await self.db.execute(booking_stmt)
-                current_booking = booking_result.unique().scalar_one_or_none()
+            current_check_in = check_ins_by_room.get(room.id)
+            current_booking = bookings_by_room.get(room.id)
 
-            # Calculate overtime if applicable using Thailand timezone
+            # Calculate overtime if applicable
             is_overtime = False
             overtime_minutes = None
             if current_check_in and current_check_in.expected_check_out_time:
-                now = now_thailand()
                 if now > current_check_in.expected_check_out_time:
                     is_overtime = True
                     overtime_delta = now - current_check_in.expected_check_out_time
                     overtime_minutes = int(overtime_delta.total_seconds() / 60)
 
             # Get current rates for this room type
-            overnight_rate, temporary_rate = await self._get_current_rates_for_room_type(room.room_type_id)
+            rates = rates_by_room_type.get(room.room_type_id, {})
+            overnight_rate = rates.get(StayType.OVERNIGHT)
+            temporary_rate = rates.get(StayType.TEMPORARY)
 
             room_card = DashboardRoomCard(
                 id=room.id,
@@ -176,14 +233,7 @@ class DashboardService:
         total_check_ins_today = result.scalar() or 0
 
         # Count by stay type
-        stmt = (
-            select(CheckIn.stay_type, func.count(CheckIn.id))
-            .where(
-                CheckIn.check_in_time >= today_start,
-                CheckIn.status == CheckInStatusEnum.CHECKED_IN
-            )
-            .group_by(CheckIn.stay_type)
-        )
+        stmt = stay_type_counts_query(today_start)
         result = await self.db.execute(stmt)
         stay_type_counts = dict(result.all())
 
@@ -191,13 +241,7 @@ class DashboardService:
         temporary_stays = stay_type_counts.get(StayTypeEnum.TEMPORARY, 0)
 
         # Calculate revenue today (completed check-ins)
-        stmt = (
-            select(func.sum(CheckIn.total_amount))
-            .where(
-                CheckIn.check_in_time >= today_start,
-                CheckIn.status == CheckInStatusEnum.CHECKED_OUT
-            )
-        )
+        stmt = revenue_today_query(today_start)
         result = await self.db.execute(stmt)
         revenue_today = result.scalar() or Decimal(0)
 
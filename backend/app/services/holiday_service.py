@@ -0,0 +1,136 @@
+"""
+Holiday Service
+Public holidays for the booking calendar, served from the local store
+
+Reads never touch the network:
+- stored year, fresh: return the rows
+- stored year, older than PUBLIC_HOLIDAY_TTL_DAYS: return the rows and
+  queue a refresh
+- year not stored yet: return the bundled dataset (app/core/thai_holidays.py)
+  and queue a refresh
+
+The refresh (holidays.refresh_public_holidays) fetches a year from the
+holiday API and replaces that year's rows; a failed or empty fetch keeps
+the old rows.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.datetime_utils import now_thailand
+from app.core.redis import get_redis
+from app.core.thai_holidays import bundled_holidays
+from app.models.public_holiday import PublicHolidayRecord
+from app.schemas.booking import PublicHoliday
+
+logger = logging.getLogger(__name__)
+
+FETCH_TIMEOUT_SECONDS = 10.0
+# At most one queued refresh per year in this window
+REFRESH_THROTTLE_KEY = "holidays:refresh:{year}"
+REFRESH_THROTTLE_SECONDS = 15 * 60
+
+
+class HolidayService:
+    """Local public holiday store and its refresh"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_holidays(self, year: int) -> List[PublicHoliday]:
+        """
+        Public holidays of a year (no network access)
+
+        Args:
+            year: Year
+
+        Returns:
+            Holidays sorted by date
+        """
+        stmt = select(PublicHolidayRecord).where(
+            PublicHolidayRecord.year == year
+        ).order_by(PublicHolidayRecord.holiday_date)
+        records = (await self.db.execute(stmt)).scalars().all()
+
+        if not records:
+            await self.request_refresh(year)
+            return [
+                PublicHoliday(date=day, name=name, name_en=name_en)
+                for day, name, name_en in bundled_holidays(year)
+            ]
+
+        fetched_at = min(record.fetched_at for record in records)
+        if now_thailand() - fetched_at > timedelta(days=settings.PUBLIC_HOLIDAY_TTL_DAYS):
+            await self.request_refresh(year)
+
+        return [
+            PublicHoliday(date=record.holiday_date, name=record.name, name_en=record.name_en)
+            for record in records
+        ]
+
+    async def refresh_year(self, year: int) -> int:
+        """
+        Fetch a year from the holiday API and replace its stored rows
+
+        An empty answer never replaces stored rows: no year has zero
+        public holidays, so it is treated as a failed fetch.
+
+        Args:
+            year: Year
+
+        Returns:
+            Number of holidays stored
+
+        Raises:
+            httpx.HTTPError: If the API cannot be reached or fails
+            ValueError: If the API returns no holidays for the year
+        """
+        async with httpx.AsyncClient(timeout=FETCH_TIMEOUT_SECONDS) as client:
+            response = await client.get(settings.PUBLIC_HOLIDAY_API_URL.format(year=year))
+            response.raise_for_status()
+            holidays_data = response.json()
+
+        if not holidays_data:
+            raise ValueError(f"Holiday API returned no holidays for {year}")
+
+        fetched_at = now_thailand()
+        records = {}
+        for h in holidays_data:
+            holiday_date = datetime.strptime(h['date'], '%Y-%m-%d').date()
+            # The API lists some holidays once per region; keep one row each
+            records[(holiday_date, h['name'])] = PublicHolidayRecord(
+                year=year,
+                holiday_date=holiday_date,
+                name=h.get('localName', h['name']),
+                name_en=h['name'],
+                fetched_at=fetched_at
+            )
+
+        await self.db.execute(delete(PublicHolidayRecord).where(PublicHolidayRecord.year == year))
+        self.db.add_all(records.values())
+        await self.db.commit()
+
+        return len(records)
+
+    async def request_refresh(self, year: int):
+        """Queue a background refresh of a year, at most once per throttle window"""
+        try:
+            queued = await get_redis().set(
+                REFRESH_THROTTLE_KEY.format(year=year), 1,
+                ex=REFRESH_THROTTLE_SECONDS, nx=True
+            )
+            if not queued:
+                return
+
+            from app.tasks.holiday_tasks import refresh_public_holidays
+            await asyncio.to_thread(
+                refresh_public_holidays.apply_async, kwargs={"years": [year]}, retry=False
+            )
+        except Exception as e:
+            logger.warning("Failed to queue public holiday refresh for %s: %s", year, e)
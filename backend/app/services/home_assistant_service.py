@@ -13,6 +13,7 @@ import time
 
 from app.models.home_assistant import HomeAssistantConfig
 from app.core.encryption import encrypt_value, decrypt_value
+from app.core.home_assistant_client import ha_client, ha_config_cache
 from app.core.exceptions import (
     HomeAssistantNotConfiguredError,
     HomeAssistantConnectionError,
@@ -71,21 +72,40 @@ class HomeAssistantService:
 
         try:
             # Decrypt token
-            self.access_token = decrypt_value(config.access_token)
-            self.base_url = config.base_url.rstrip('/')
-            self.headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": "application/json"
-            }
-            self._config_loaded = True
-            return config
+            access_token = decrypt_value(config.access_token)
         except Exception as e:
             raise DecryptionError(f"ไม่สามารถถอดรหัส Access Token ได้: {str(e)}")
 
+        self._apply_config(config.base_url, access_token)
+        await ha_config_cache.set(self.base_url, self.access_token)
+        return config
+
+    def _apply_config(self, base_url: str, access_token: str):
+        """Set connection fields from a (decrypted) configuration"""
+        self.access_token = access_token
+        self.base_url = base_url.rstrip('/')
+        self.headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json"
+        }
+        self._config_loaded = True
+
     async def _ensure_config_loaded(self):
-        """Ensure configuration is loaded before making API calls"""
-        if not self._config_loaded:
-            await self._load_config()
+        """
+        Ensure configuration is loaded before making API calls
+
+        Uses the process-wide decrypted config cache; only a cache miss
+        queries the database and decrypts the token.
+        """
+        if self._config_loaded:
+            return
+
+        cached = await ha_config_cache.get()
+        if cached is not None:
+            self._apply_config(cached["base_url"], cached["access_token"])
+            return
+
+        await self._load_config()
 
     async def test_connection(self) -> Dict[str, Any]:
         """
@@ -104,7 +124,8 @@ class HomeAssistantService:
         start_time = time.time()
 
         try:
-            async with aiohttp.ClientSession() as session:
+            session = ha_client.get_session()
+            async with ha_client.timed("test_connection"):
                 async with session.get(
                     f"{self.base_url}/api/",
                     headers=self.headers,
@@ -161,7 +182,8 @@ class HomeAssistantService:
         start_time = time.time()
 
         try:
-            async with aiohttp.ClientSession() as session:
+            session = ha_client.get_session()
+            async with ha_client.timed("test_connection"):
                 # Test basic connection
                 async with session.get(
                     f"{base_url}/api/",
@@ -220,7 +242,8 @@ class HomeAssistantService:
         await self._ensure_config_loaded()
 
         try:
-            async with aiohttp.ClientSession() as session:
+            session = ha_client.get_session()
+            async with ha_client.timed("get_entity_state"):
                 async with session.get(
                     f"{self.base_url}/api/states/{entity_id}",
                     headers=self.headers,
@@ -282,7 +305,8 @@ class HomeAssistantService:
         start_time = time.time()
 
         try:
-            async with aiohttp.ClientSession() as session:
+            session = ha_client.get_session()
+            async with ha_client.timed("call_service"):
                 async with session.post(
                     f"{self.base_url}/api/services/{domain}/{service}",
                     headers=self.headers,
@@ -368,7 +392,8 @@ class HomeAssistantService:
         await self._ensure_config_loaded()
 
         try:
-            async with aiohttp.ClientSession() as session:
+            session = ha_client.get_session()
+            async with ha_client.timed("get_all_entities"):
                 async with session.get(
                     f"{self.base_url}/api/states",
                     headers=self.headers,
@@ -401,6 +426,48 @@ class HomeAssistantService:
         except aiohttp.ClientError as e:
             raise HomeAssistantConnectionError(f"Connection error: {str(e)}")
 
+    async def get_all_states(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the state of every entity with a single /api/states call.
+
+        Returns:
+            Dict of entity_id -> state dict (same shape as get_entity_state)
+
+        Raises:
+            HomeAssistantAPIError: If API call fails
+        """
+        await self._ensure_config_loaded()
+
+        try:
+            session = ha_client.get_session()
+            async with ha_client.timed("get_all_states"):
+                async with session.get(
+                    f"{self.base_url}/api/states",
+                    headers=self.headers,
+                    timeout=aiohttp.ClientTimeout(total=10)
+                ) as response:
+                    if response.status != 200:
+                        raise HomeAssistantAPIError(f"Failed to get states (status {response.status})")
+
+                    entities = await response.json()
+
+                    return {
+                        e.get("entity_id"): {
+                            "entity_id": e.get("entity_id"),
+                            "state": e.get("state"),
+                            "attributes": e.get("attributes", {}),
+                            "available": True,
+                            "last_changed": e.get("last_changed"),
+                            "last_updated": e.get("last_updated")
+                        }
+                        for e in entities
+                    }
+
+        except asyncio.TimeoutError:
+            raise HomeAssistantTimeoutError("Timeout getting states")
+        except aiohttp.ClientError as e:
+            raise HomeAssistantConnectionError(f"Connection error: {str(e)}")
+
     async def update_config_status(self, is_online: bool, ha_version: Optional[str] = None):
         """
         Update configuration status in database.
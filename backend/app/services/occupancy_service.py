@@ -0,0 +1,264 @@
+"""
+Occupancy Service (Phase 8)
+Maintains the materialized daily occupancy series used by reports
+"""
+import logging
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, or_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from app.models.check_in import CheckIn, CheckInStatusEnum
+from app.models.daily_occupancy import DailyOccupancy
+from app.core.datetime_utils import today_thailand
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _day_start(day: date) -> datetime:
+    """Midnight at the start of `day` (naive, Thailand time)"""
+    return datetime.combine(day, time.min)
+
+
+class OccupancyService:
+    """Service for the daily occupancy fact table"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def compute_daily_occupancy(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> Dict[date, int]:
+        """
+        Compute occupied stays per day from check_ins with one range query
+
+        A stay is occupied on day D when it checked in before the end of D and
+        is either still CHECKED_IN or checked out on or after the start of D.
+        The predicates are half-open datetime ranges so the check_in_time index
+        can be used.
+
+        Args:
+            start_date: First day (inclusive)
+            end_date: Last day (inclusive)
+
+        Returns:
+            Dict of day -> occupied stays, with an entry for every day in range
+        """
+        stmt = select(
+            CheckIn.check_in_time,
+            CheckIn.actual_check_out_time,
+            CheckIn.status
+        ).where(
+            and_(
+                CheckIn.check_in_time < _day_start(end_date + timedelta(days=1)),
+                or_(
+                    CheckIn.status == CheckInStatusEnum.CHECKED_IN,
+                    and_(
+                        CheckIn.status == CheckInStatusEnum.CHECKED_OUT,
+                        CheckIn.actual_check_out_time >= _day_start(start_date)
+                    )
+                )
+            )
+        )
+        result = await self.db.execute(stmt)
+
+        # Difference array over the range: +1 on the first covered day,
+        # -1 on the day after the last covered day
+        num_days = (end_date - start_date).days + 1
+        deltas = [0] * (num_days + 1)
+
+        for check_in_time, actual_check_out_time, status in result.all():
+            first = max(check_in_time.date(), start_date)
+            if status == CheckInStatusEnum.CHECKED_IN:
+                last = end_date
+            else:
+                last = min(actual_check_out_time.date(), end_date)
+
+            if last < first:
+                continue
+
+            deltas[(first - start_date).days] += 1
+            deltas[(last - start_date).days + 1] -= 1
+
+        series = {}
+        running = 0
+        for offset in range(num_days):
+            running += deltas[offset]
+            series[start_date + timedelta(days=offset)] = running
+
+        return series
+
+    async def count_occupied_on_date_live(self, day: date) -> int:
+        """
+        Count occupied stays on a single day directly from check_ins
+
+        This is the reference computation the fact table must agree with.
+        Used by the reconciliation script, not on the request path.
+        """
+        stmt = select(func.count(CheckIn.id)).where(
+            and_(
+                CheckIn.check_in_time < _day_start(day + timedelta(days=1)),
+                or_(
+                    CheckIn.status == CheckInStatusEnum.CHECKED_IN,
+                    and_(
+                        CheckIn.status == CheckInStatusEnum.CHECKED_OUT,
+                        CheckIn.actual_check_out_time >= _day_start(day)
+                    )
+                )
+            )
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar() or 0
+
+    async def get_materialized_series(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> Dict[date, int]:
+        """Read stored rows for a date range with a single range scan"""
+        stmt = select(DailyOccupancy.stat_date, DailyOccupancy.occupied_rooms).where(
+            and_(
+                DailyOccupancy.stat_date >= start_date,
+                DailyOccupancy.stat_date <= end_date
+            )
+        )
+        result = await self.db.execute(stmt)
+        return dict(result.all())
+
+    async def refresh_days(self, start_date: date, end_date: date) -> int:
+        """
+        Recompute and store the occupancy rows for a date range
+
+        Days after today are never stored because open stays still count
+        towards them and they change until the day has passed.
+
+        Returns:
+            Number of rows written
+        """
+        end_date = min(end_date, today_thailand())
+        if end_date < start_date:
+            return 0
+
+        series = await self.compute_daily_occupancy(start_date, end_date)
+        return await self._store_series(series)
+
+    async def _store_series(self, series: Dict[date, int]) -> int:
+        """
+        Insert or update rows for the given day -> occupied mapping
+
+        Check-ins, check-outs and the backfill can refresh the same day at
+        the same time, so rows are written with an upsert on stat_date
+        (INSERT ... ON DUPLICATE KEY UPDATE on MySQL) rather than a plain
+        INSERT that would hit the unique index.
+        """
+        if not series:
+            return 0
+
+        existing = await self.get_materialized_series(min(series), max(series))
+        changed = {
+            day: occupied for day, occupied in series.items()
+            if existing.get(day) != occupied
+        }
+        if not changed:
+            return 0
+
+        now = datetime.utcnow()
+        if self.db.get_bind().dialect.name == "mysql":
+            stmt = mysql_insert(DailyOccupancy).values([
+                {"stat_date": day, "occupied_rooms": occupied, "created_at": now, "updated_at": now}
+                for day, occupied in changed.items()
+            ])
+            await self.db.execute(stmt.on_duplicate_key_update(
+                occupied_rooms=stmt.inserted.occupied_rooms,
+                updated_at=stmt.inserted.updated_at
+            ))
+        else:
+            for day, occupied in changed.items():
+                if day in existing:
+                    await self.db.execute(
+                        update(DailyOccupancy)
+                        .where(DailyOccupancy.stat_date == day)
+                        .values(occupied_rooms=occupied, updated_at=now)
+                    )
+                else:
+                    self.db.add(DailyOccupancy(stat_date=day, occupied_rooms=occupied))
+
+        await self.db.commit()
+        return len(changed)
+
+    @staticmethod
+    async def refresh_after_stay_change(since: Optional[date] = None) -> None:
+        """
+        Refresh rows affected by a check-in or check-out
+
+        Runs in its own session after the caller has committed, so a failure
+        here never touches the caller's objects or fails the front-desk
+        operation. The nightly backfill heals any gap.
+
+        Args:
+            since: First day affected by the change (default: today)
+        """
+        today = today_thailand()
+        try:
+            async with AsyncSessionLocal() as db:
+                await OccupancyService(db).refresh_days(min(since or today, today), today)
+        except Exception as e:
+            logger.warning("Failed to refresh daily occupancy since %s: %s", since, e)
+
+    async def get_occupancy_series(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> Dict[date, int]:
+        """
+        Get occupied stays per day for a report range
+
+        Served from the fact table. Days missing from the table (future
+        days, or past days the backfill has not written yet) are computed
+        in memory with one query. Report requests never write: storing rows
+        is left to check-in/check-out refreshes and the nightly backfill.
+        """
+        series = await self.get_materialized_series(start_date, end_date)
+
+        missing: List[date] = [
+            start_date + timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+            if start_date + timedelta(days=offset) not in series
+        ]
+
+        if missing:
+            computed = await self.compute_daily_occupancy(missing[0], missing[-1])
+            for day in missing:
+                series[day] = computed[day]
+
+        return series
+
+    async def reconcile(self, start_date: date, end_date: date) -> List[dict]:
+        """
+        Compare stored rows against the live per-day computation
+
+        Returns:
+            List of mismatches: {"date", "stored", "live"} (stored is None if
+            the row is missing). Days after today are not stored and are
+            skipped.
+        """
+        end_date = min(end_date, today_thailand())
+        stored = await self.get_materialized_series(start_date, end_date)
+
+        mismatches = []
+        current_date = start_date
+        while current_date <= end_date:
+            live = await self.count_occupied_on_date_live(current_date)
+            if stored.get(current_date) != live:
+                mismatches.append({
+                    "date": current_date,
+                    "stored": stored.get(current_date),
+                    "live": live
+                })
+            current_date += timedelta(days=1)
+
+        return mismatches
@@ -3,7 +3,7 @@ Overtime Service
 Handles detection and processing of overtime temporary stays
 """
 import logging
-from sqlalchemy import select, and_
+from sqlalchemy import Select, select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from typing import List, Dict, Any
@@ -13,10 +13,26 @@ from app.models.check_in import CheckIn, CheckInStatusEnum, StayTypeEnum
 from app.models.room import Room, RoomStatus
 from app.core.datetime_utils import now_thailand
 from app.core.websocket import websocket_manager
+from app.services.breaker_outbox_service import BreakerOutboxService
 
 logger = logging.getLogger(__name__)
 
 
+def newly_overtime_query(now: datetime) -> Select:
+    """The stays OvertimeService.is_newly_overtime selects, with room and customer"""
+    return select(CheckIn).options(
+        selectinload(CheckIn.room),
+        selectinload(CheckIn.customer)
+    ).where(
+        and_(
+            CheckIn.stay_type == StayTypeEnum.TEMPORARY,
+            CheckIn.status == CheckInStatusEnum.CHECKED_IN,
+            CheckIn.expected_check_out_time <= now,
+            CheckIn.is_overtime == 0  # Not already marked as overtime
+        )
+    )
+
+
 class OvertimeService:
     """Service for handling overtime detection and processing"""
 
@@ -37,23 +53,46 @@ class OvertimeService:
         now = now_thailand()
 
         # Find all TEMPORARY stays that are CHECKED_IN and past expected_check_out_time
-        stmt = select(CheckIn).options(
-            selectinload(CheckIn.room),
-            selectinload(CheckIn.customer)
-        ).where(
-            and_(
-                CheckIn.stay_type == StayTypeEnum.TEMPORARY,
-                CheckIn.status == CheckInStatusEnum.CHECKED_IN,
-                CheckIn.expected_check_out_time <= now,
-                CheckIn.is_overtime == 0  # Not already marked as overtime
-            )
-        )
+        stmt = newly_overtime_query(now)
 
         result = await self.db.execute(stmt)
-        overtime_check_ins = result.scalars().all()
+        overtime_check_ins = list(result.scalars().all())
+
+        return await self.process_overtime_stays(overtime_check_ins, now)
+
+    @staticmethod
+    def is_newly_overtime(check_in: CheckIn, now: datetime) -> bool:
+        """True for a CHECKED_IN TEMPORARY stay past checkout and not yet flagged"""
+        return (
+            check_in.stay_type == StayTypeEnum.TEMPORARY
+            and check_in.status == CheckInStatusEnum.CHECKED_IN
+            and check_in.expected_check_out_time <= now
+            and not check_in.is_overtime
+        )
+
+    async def process_overtime_stays(
+        self,
+        overtime_check_ins: List[CheckIn],
+        now: datetime,
+        notify_dispatcher: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Flag overtime stays and move their rooms to OCCUPIED_OVERTIME
 
+        Args:
+            overtime_check_ins: Stays past checkout (customer loaded; rooms
+                are read through the session identity map)
+            now: Current Thai time
+            notify_dispatcher: Kick the breaker outbox dispatcher after each
+                room (the hotel tick drains the outbox itself)
+
+        Returns:
+            Same dict as check_and_process_overtime_stays; failed_check_ins
+            is non-empty when a rollback expired the session's objects
+        """
         processed_count = 0
         processed_ids = []
+        failed_ids = []
 
         for check_in in overtime_check_ins:
             try:
@@ -73,24 +112,20 @@ class OvertimeService:
                     old_status = room.status
                     room.status = RoomStatus.OCCUPIED_OVERTIME
 
+                    # ✅ Queue breaker automation to turn OFF power (same commit)
+                    BreakerOutboxService(self.db).enqueue(
+                        room.id, old_status, RoomStatus.OCCUPIED_OVERTIME
+                    )
+
                     await self.db.commit()
                     await self.db.refresh(room)
 
                     processed_count += 1
                     processed_ids.append(check_in.id)
 
-                    # ✅ Trigger breaker automation to turn OFF power automatically
-                    try:
-                        from app.services.breaker_service import BreakerService
-                        breaker_service = BreakerService(self.db)
-                        await breaker_service.auto_control_on_room_status_change(
-                            room_id=room.id,
-                            old_status=old_status,
-                            new_status=RoomStatus.OCCUPIED_OVERTIME
-                        )
-                        logger.info("[OVERTIME] Breaker automation triggered for room %s", room.room_number)
-                    except Exception as breaker_error:
-                        logger.warning("[OVERTIME] Failed to trigger breaker automation for room %s: %s", room.room_number, breaker_error)
+                    if notify_dispatcher:
+                        await BreakerOutboxService.notify_dispatcher()
+                    logger.info("[OVERTIME] Breaker cutoff queued for room %s", room.room_number)
 
                     # Broadcast WebSocket event for real-time UI update
                     await websocket_manager.broadcast({
@@ -121,8 +156,10 @@ class OvertimeService:
                                    room.status.value if room else "N/A")
 
             except Exception as e:
+                check_in_id = check_in.id
                 await self.db.rollback()
-                logger.exception("Error processing overtime for check-in #%d", check_in.id)
+                failed_ids.append(check_in_id)
+                logger.exception("Error processing overtime for check-in #%d", check_in_id)
                 continue
 
         return {
@@ -131,7 +168,8 @@ class OvertimeService:
             "total_checked": len(overtime_check_ins),
             "overtime_found": len(overtime_check_ins),
             "rooms_updated": processed_count,
-            "processed_check_ins": processed_ids
+            "processed_check_ins": processed_ids,
+            "failed_check_ins": failed_ids
         }
 
     async def get_current_overtime_stays(self) -> List[CheckIn]:
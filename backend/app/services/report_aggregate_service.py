@@ -0,0 +1,211 @@
+"""
+Report Aggregate Service (Phase 8)
+GROUP BY queries that feed the reports without loading ORM objects
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, select, func, and_, case, Date
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import AsyncIterator, NamedTuple
+
+from app.models.payment import Payment
+from app.models.check_in import CheckIn, PaymentMethodEnum, StayTypeEnum, CheckInStatusEnum
+from app.models.booking import Booking
+from app.models.customer import Customer
+from app.models.room import Room, RoomStatus
+from app.core.datetime_utils import day_range_bounds
+
+
+CENT = Decimal("0.01")
+
+
+def to_baht(value) -> Decimal:
+    """
+    A SUM of Numeric(10, 2) amounts as an exact Decimal
+
+    MySQL returns DECIMAL sums as Decimal already; SQLite sums in floats,
+    which only round back to whole satang.
+    """
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+class RevenueCell(NamedTuple):
+    """Revenue for one (day, payment method, stay type) combination"""
+    day: date
+    payment_method: PaymentMethodEnum
+    stay_type: StayTypeEnum
+    revenue: Decimal
+    count: int
+    first_payment_id: int
+
+
+class SummaryKpis(NamedTuple):
+    """Every figure shown in the summary report"""
+    total_revenue: Decimal
+    occupied_rooms: int
+    total_rooms: int
+    total_checkins: int
+    total_checkouts: int
+    total_bookings: int
+    total_customers: int
+    new_customers: int
+
+
+def revenue_cells_query(start_date: date, end_date: date) -> Select:
+    """
+    Payment totals per (day, payment method, stay type), ordered by the
+    first payment id in each cell; see stream_revenue_cells
+    """
+    lower, upper = day_range_bounds(start_date, end_date)
+    day = func.date(Payment.payment_time, type_=Date)
+    first_payment_id = func.min(Payment.id)
+
+    return select(
+        day,
+        Payment.payment_method,
+        CheckIn.stay_type,
+        func.sum(Payment.amount),
+        func.count(Payment.id),
+        first_payment_id
+    ).join(CheckIn, Payment.check_in_id == CheckIn.id).where(
+        and_(
+            Payment.payment_time >= lower,
+            Payment.payment_time < upper
+        )
+    ).group_by(
+        day,
+        Payment.payment_method,
+        CheckIn.stay_type
+    ).order_by(first_payment_id)
+
+
+def summary_kpis_query(start_date: date, end_date: date) -> Select:
+    """One row with every SummaryKpis figure, in field order"""
+    lower, upper = day_range_bounds(start_date, end_date)
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+
+    # Inner join like the revenue report: payments without a check-in
+    # are not counted
+    def paid_in_range(column):
+        return select(column).join(CheckIn, Payment.check_in_id == CheckIn.id).where(
+            and_(
+                Payment.payment_time >= lower,
+                Payment.payment_time < upper
+            )
+        ).scalar_subquery()
+
+    total_revenue = paid_in_range(func.coalesce(func.sum(Payment.amount), 0))
+
+    occupied_rooms = select(func.count(Room.id)).where(
+        Room.status == RoomStatus.OCCUPIED
+    ).scalar_subquery()
+
+    total_rooms = select(func.count(Room.id)).where(
+        Room.status != RoomStatus.OUT_OF_SERVICE
+    ).scalar_subquery()
+
+    total_checkins = select(func.count(CheckIn.id)).where(
+        and_(
+            CheckIn.check_in_time >= lower,
+            CheckIn.check_in_time < upper
+        )
+    ).scalar_subquery()
+
+    total_checkouts = select(func.count(CheckIn.id)).where(
+        and_(
+            CheckIn.status == CheckInStatusEnum.CHECKED_OUT,
+            CheckIn.actual_check_out_time >= lower,
+            CheckIn.actual_check_out_time < upper
+        )
+    ).scalar_subquery()
+
+    total_bookings = select(func.count(Booking.id)).where(
+        and_(
+            Booking.check_in_date >= start_date,
+            Booking.check_in_date <= end_date
+        )
+    ).scalar_subquery()
+
+    customers = select(
+        func.count(Customer.id).label("total_customers"),
+        func.coalesce(
+            func.sum(case((Customer.created_at >= thirty_days_ago, 1), else_=0)),
+            0
+        ).label("new_customers")
+    ).subquery()
+
+    return select(
+        total_revenue,
+        occupied_rooms,
+        total_rooms,
+        total_checkins,
+        total_checkouts,
+        total_bookings,
+        customers.c.total_customers,
+        customers.c.new_customers
+    )
+
+
+class ReportAggregateService:
+    """Service for aggregate report queries"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def stream_revenue_cells(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> AsyncIterator[RevenueCell]:
+        """
+        Stream payment totals grouped by day, payment method and stay type
+
+        This is the finest grain any revenue breakdown needs, so totals, the
+        per-method and per-stay-type maps and the day/month series can all be
+        folded from these rows. The range predicate is half-open on
+        payment_time so the payment_time index is used.
+
+        Rows come back ordered by the first payment id in each cell, which
+        keeps the first-seen order of methods and stay types the same as
+        iterating the payments themselves.
+
+        Args:
+            start_date: First day (inclusive)
+            end_date: Last day (inclusive)
+
+        Yields:
+            RevenueCell rows
+        """
+        stmt = revenue_cells_query(start_date, end_date)
+        result = await self.db.stream(stmt)
+        async for day_value, payment_method, stay_type, revenue, count, first_id in result:
+            yield RevenueCell(day_value, payment_method, stay_type, to_baht(revenue), count, first_id)
+
+    async def get_summary_kpis(self, start_date: date, end_date: date) -> SummaryKpis:
+        """
+        Compute the summary report figures in a single round trip
+
+        Each KPI is a small aggregate over one table, so the database does a
+        handful of index-driven counts and sums instead of the full revenue,
+        occupancy, booking and customer reports.
+
+        Args:
+            start_date: First day (inclusive)
+            end_date: Last day (inclusive)
+
+        Returns:
+            SummaryKpis
+        """
+        stmt = summary_kpis_query(start_date, end_date)
+        row = (await self.db.execute(stmt)).one()
+
+        return SummaryKpis(
+            total_revenue=to_baht(row[0]),
+            occupied_rooms=row[1] or 0,
+            total_rooms=row[2] or 0,
+            total_checkins=row[3] or 0,
+            total_checkouts=row[4] or 0,
+            total_bookings=row[5] or 0,
+            total_customers=int(row[6] or 0),
+            new_customers=int(row[7] or 0)
+        )
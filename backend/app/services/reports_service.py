@@ -3,17 +3,20 @@ Reports Service (Phase 8)
 Business logic for generating reports
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, cast, Date
+from sqlalchemy import Select, select, func, and_, Date
 from sqlalchemy.orm import selectinload
 from datetime import date, datetime, timedelta
 from typing import Optional
 from decimal import Decimal
 
 from app.models.payment import Payment
-from app.models.check_in import CheckIn, PaymentMethodEnum, StayTypeEnum, CheckInStatusEnum
+from app.models.check_in import CheckIn, PaymentMethodEnum, StayTypeEnum
 from app.models.booking import Booking, BookingStatusEnum
 from app.models.customer import Customer
 from app.models.room import Room, RoomStatus
+from app.services.occupancy_service import OccupancyService
+from app.services.report_aggregate_service import ReportAggregateService
+from app.core.datetime_utils import day_range_bounds
 from app.schemas.reports import (
     RevenueReportResponse,
     RevenueByPeriod,
@@ -33,6 +36,77 @@ from app.schemas.reports import (
 )
 
 
+def checkins_list_query(start_date: date, end_date: date) -> Select:
+    """
+    Check-ins for the reports table, newest first
+
+    A one-day range is a "last night" report and runs from 12:00 of
+    start_date to 12:00 of end_date; longer ranges cover the full days.
+    """
+    # Check if this is a "last night" query (1 day difference)
+    is_last_night = (end_date - start_date).days == 1
+
+    if is_last_night:
+        # Last night: from 12:00 of start_date to 12:00 of end_date
+        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(hour=12, minute=0, second=0)
+        end_datetime = datetime.combine(end_date, datetime.min.time()).replace(hour=12, minute=0, second=0)
+
+        return (
+            select(CheckIn)
+            .options(
+                selectinload(CheckIn.customer),
+                selectinload(CheckIn.room).selectinload(Room.room_type)
+            )
+            .where(
+                and_(
+                    CheckIn.check_in_time >= start_datetime,
+                    CheckIn.check_in_time < end_datetime
+                )
+            )
+            .order_by(CheckIn.check_in_time.desc())
+        )
+    else:
+        # Other periods: full day range
+        lower, upper = day_range_bounds(start_date, end_date)
+        return (
+            select(CheckIn)
+            .options(
+                selectinload(CheckIn.customer),
+                selectinload(CheckIn.room).selectinload(Room.room_type)
+            )
+            .where(
+                and_(
+                    CheckIn.check_in_time >= lower,
+                    CheckIn.check_in_time < upper
+                )
+            )
+            .order_by(CheckIn.check_in_time.desc())
+        )
+
+
+def checkin_stats_query(start_date: date, end_date: date) -> Select:
+    """(day, stay type, count) rows for the check-ins in a date range, by day"""
+    # The range filter stays on the raw column so the check_in_time
+    # index is used
+    lower, upper = day_range_bounds(start_date, end_date)
+    day = func.date(CheckIn.check_in_time, type_=Date)
+    return (
+        select(
+            day.label("date"),
+            CheckIn.stay_type,
+            func.count(CheckIn.id).label("count")
+        )
+        .where(
+            and_(
+                CheckIn.check_in_time >= lower,
+                CheckIn.check_in_time < upper
+            )
+        )
+        .group_by(day, CheckIn.stay_type)
+        .order_by(day)
+    )
+
+
 class ReportsService:
     """Service for generating various reports"""
 
@@ -56,52 +130,48 @@ class ReportsService:
         Returns:
             RevenueReportResponse with revenue breakdown
         """
-        # Get all payments in date range
-        stmt = select(Payment).join(CheckIn).where(
-            and_(
-                cast(Payment.payment_time, Date) >= start_date,
-                cast(Payment.payment_time, Date) <= end_date
-            )
-        ).options(selectinload(Payment.check_in))
-        result = await self.db.execute(stmt)
-        payments = result.scalars().all()
+        # Aggregate in SQL: one row per (day, payment method, stay type),
+        # summed exactly as DECIMAL. The breakdowns below add those cells as
+        # Decimal too and only turn into floats for the response.
+        cells = ReportAggregateService(self.db).stream_revenue_cells(start_date, end_date)
+
+        total = Decimal(0)
+        total_transactions = 0
+        method_totals = {}
+        stay_type_totals = {}
+        by_period_dict = {}
 
-        # Calculate totals
-        total_revenue = sum(float(p.amount) for p in payments)
-        total_transactions = len(payments)
-        average_transaction = total_revenue / total_transactions if total_transactions > 0 else 0
+        async for cell in cells:
+            total += cell.revenue
+            total_transactions += cell.count
 
-        # By payment method
-        by_payment_method = {}
-        for payment in payments:
-            method = payment.payment_method.value if hasattr(payment.payment_method, 'value') else payment.payment_method
-            by_payment_method[method] = by_payment_method.get(method, 0) + float(payment.amount)
+            method = cell.payment_method.value if hasattr(cell.payment_method, 'value') else cell.payment_method
+            method_totals[method] = method_totals.get(method, Decimal(0)) + cell.revenue
 
-        # By stay type (from check-in)
-        by_stay_type = {}
-        for payment in payments:
-            if payment.check_in:
-                stay_type = payment.check_in.stay_type.value if hasattr(payment.check_in.stay_type, 'value') else payment.check_in.stay_type
-                by_stay_type[stay_type] = by_stay_type.get(stay_type, 0) + float(payment.amount)
+            stay_type = cell.stay_type.value if hasattr(cell.stay_type, 'value') else cell.stay_type
+            stay_type_totals[stay_type] = stay_type_totals.get(stay_type, Decimal(0)) + cell.revenue
 
-        # By period (for chart)
-        by_period_dict = {}
-        for payment in payments:
+            # By period (for chart)
             if group_by == "day":
-                period_key = payment.payment_time.strftime("%Y-%m-%d")
+                period_key = cell.day.strftime("%Y-%m-%d")
             else:  # month
-                period_key = payment.payment_time.strftime("%Y-%m")
+                period_key = cell.day.strftime("%Y-%m")
 
             if period_key not in by_period_dict:
-                by_period_dict[period_key] = {"revenue": 0, "count": 0}
+                by_period_dict[period_key] = {"revenue": Decimal(0), "count": 0}
 
-            by_period_dict[period_key]["revenue"] += float(payment.amount)
-            by_period_dict[period_key]["count"] += 1
+            by_period_dict[period_key]["revenue"] += cell.revenue
+            by_period_dict[period_key]["count"] += cell.count
+
+        total_revenue = float(total)
+        by_payment_method = {method: float(amount) for method, amount in method_totals.items()}
+        by_stay_type = {stay_type: float(amount) for stay_type, amount in stay_type_totals.items()}
+        average_transaction = total_revenue / total_transactions if total_transactions > 0 else 0
 
         by_period = [
             RevenueByPeriod(
                 period=period,
-                revenue=data["revenue"],
+                revenue=float(data["revenue"]),
                 count=data["count"]
             )
             for period, data in sorted(by_period_dict.items())
@@ -156,27 +226,15 @@ class ReportsService:
         available_rooms = status_counts.get(RoomStatus.AVAILABLE, 0)
         occupancy_rate = (occupied_rooms / total_rooms * 100) if total_rooms > 0 else 0
 
-        # By period (daily occupancy for chart)
-        by_period = []
-        current_date = start_date
-        while current_date <= end_date:
-            # Count occupied rooms on this date
-            # (rooms with check-in on or before this date, and check-out after this date)
-            stmt = select(func.count(CheckIn.id)).where(
-                and_(
-                    cast(CheckIn.check_in_time, Date) <= current_date,
-                    or_(
-                        CheckIn.status == CheckInStatusEnum.CHECKED_IN,
-                        and_(
-                            CheckIn.status == CheckInStatusEnum.CHECKED_OUT,
-                            cast(CheckIn.actual_check_out_time, Date) >= current_date
-                        )
-                    )
-                )
-            )
-            result = await self.db.execute(stmt)
-            occupied_on_date = result.scalar() or 0
+        # By period (daily occupancy for chart), served from the
+        # materialized daily_occupancy table instead of one COUNT per day
+        occupied_by_date = await OccupancyService(self.db).get_occupancy_series(
+            start_date, end_date
+        )
 
+        by_period = []
+        for current_date in sorted(occupied_by_date):
+            occupied_on_date = occupied_by_date[current_date]
             period_occupancy = (occupied_on_date / total_rooms * 100) if total_rooms > 0 else 0
 
             by_period.append(OccupancyByPeriod(
@@ -186,8 +244,6 @@ class ReportsService:
                 total_rooms=total_rooms
             ))
 
-            current_date += timedelta(days=1)
-
         return OccupancyReportResponse(
             occupancy_rate=round(occupancy_rate, 2),
             total_rooms=total_rooms,
@@ -371,42 +427,20 @@ class ReportsService:
         Returns:
             SummaryReportResponse with all key metrics
         """
-        # Revenue
-        revenue_report = await self.get_revenue_report(start_date, end_date, "day")
-        total_revenue = revenue_report.total_revenue
-
-        # Occupancy
-        occupancy_report = await self.get_occupancy_report(start_date, end_date)
-        occupancy_rate = occupancy_report.occupancy_rate
-
-        # Check-ins/outs
-        stmt = select(func.count(CheckIn.id)).where(
-            and_(
-                cast(CheckIn.check_in_time, Date) >= start_date,
-                cast(CheckIn.check_in_time, Date) <= end_date
-            )
+        # All KPIs in one round trip instead of building the full sub-reports
+        kpis = await ReportAggregateService(self.db).get_summary_kpis(start_date, end_date)
+
+        # Exact DECIMAL sum, the same figure as the revenue report's total
+        total_revenue = float(kpis.total_revenue)
+        occupancy_rate = round(
+            (kpis.occupied_rooms / kpis.total_rooms * 100) if kpis.total_rooms > 0 else 0,
+            2
         )
-        result = await self.db.execute(stmt)
-        total_checkins = result.scalar() or 0
-
-        stmt = select(func.count(CheckIn.id)).where(
-            and_(
-                CheckIn.status == CheckInStatusEnum.CHECKED_OUT,
-                cast(CheckIn.actual_check_out_time, Date) >= start_date,
-                cast(CheckIn.actual_check_out_time, Date) <= end_date
-            )
-        )
-        result = await self.db.execute(stmt)
-        total_checkouts = result.scalar() or 0
-
-        # Bookings
-        booking_report = await self.get_booking_report(start_date, end_date)
-        total_bookings = booking_report.total_bookings
-
-        # Customers
-        customer_report = await self.get_customer_report(limit=10)
-        total_customers = customer_report.total_customers
-        new_customers = customer_report.new_customers
+        total_checkins = kpis.total_checkins
+        total_checkouts = kpis.total_checkouts
+        total_bookings = kpis.total_bookings
+        total_customers = kpis.total_customers
+        new_customers = kpis.new_customers
 
         # Quick stats
         quick_stats = [
@@ -469,44 +503,7 @@ class ReportsService:
         from app.models.room_type import RoomType
         from app.core.datetime_utils import now_thailand
 
-        # Check if this is a "last night" query (1 day difference)
-        is_last_night = (end_date - start_date).days == 1
-
-        if is_last_night:
-            # Last night: from 12:00 of start_date to 12:00 of end_date
-            start_datetime = datetime.combine(start_date, datetime.min.time()).replace(hour=12, minute=0, second=0)
-            end_datetime = datetime.combine(end_date, datetime.min.time()).replace(hour=12, minute=0, second=0)
-
-            stmt = (
-                select(CheckIn)
-                .options(
-                    selectinload(CheckIn.customer),
-                    selectinload(CheckIn.room).selectinload(Room.room_type)
-                )
-                .where(
-                    and_(
-                        CheckIn.check_in_time >= start_datetime,
-                        CheckIn.check_in_time < end_datetime
-                    )
-                )
-                .order_by(CheckIn.check_in_time.desc())
-            )
-        else:
-            # Other periods: full day range
-            stmt = (
-                select(CheckIn)
-                .options(
-                    selectinload(CheckIn.customer),
-                    selectinload(CheckIn.room).selectinload(Room.room_type)
-                )
-                .where(
-                    and_(
-                        cast(CheckIn.check_in_time, Date) >= start_date,
-                        cast(CheckIn.check_in_time, Date) <= end_date
-                    )
-                )
-                .order_by(CheckIn.check_in_time.desc())
-            )
+        stmt = checkins_list_query(start_date, end_date)
 
         result = await self.db.execute(stmt)
         check_ins = result.unique().scalars().all()
@@ -562,23 +559,7 @@ class ReportsService:
         Returns:
             CheckInStatsResponse with daily stats
         """
-        # Query check-ins grouped by date and stay type
-        stmt = (
-            select(
-                cast(CheckIn.check_in_time, Date).label("date"),
-                CheckIn.stay_type,
-                func.count(CheckIn.id).label("count")
-            )
-            .where(
-                and_(
-                    cast(CheckIn.check_in_time, Date) >= start_date,
-                    cast(CheckIn.check_in_time, Date) <= end_date
-                )
-            )
-            .group_by(cast(CheckIn.check_in_time, Date), CheckIn.stay_type)
-            .order_by(cast(CheckIn.check_in_time, Date))
-        )
-
+        stmt = checkin_stats_query(start_date, end_date)
         result = await self.db.execute(stmt)
         rows = result.all()
 
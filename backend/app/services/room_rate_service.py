@@ -4,7 +4,10 @@ from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from fastapi import HTTPException, status
 from datetime import date
+from decimal import Decimal
 
+from app.core.rate_index import RateEntry, RoomRateIndex
+from app.core.snapshot_cache import room_rate_cache
 from app.models.room_rate import RoomRate, StayType
 from app.models.room_type import RoomType
 from app.schemas.room_rate import RoomRateCreate, RoomRateUpdate
@@ -57,6 +60,62 @@ class RoomRateService:
         )
         return result.scalar_one_or_none()
 
+    async def get_rate_index(self) -> RoomRateIndex:
+        """Interval index of every active rate (cached per process)"""
+        return await room_rate_cache.get_snapshot(self._load_rate_index)
+
+    async def _load_rate_index(self) -> RoomRateIndex:
+        """Read every active rate in one query"""
+        result = await self.db.execute(
+            select(
+                RoomRate.id,
+                RoomRate.room_type_id,
+                RoomRate.stay_type,
+                RoomRate.rate,
+                RoomRate.effective_from,
+                RoomRate.effective_to
+            ).where(RoomRate.is_active == True)
+        )
+        return RoomRateIndex(RateEntry(*row) for row in result.all())
+
+    async def resolve_rate(
+        self,
+        room_type_id: int,
+        stay_type: StayType,
+        check_date: date = None
+    ) -> Optional[RateEntry]:
+        """
+        Rate effective on a date, answered from the rate index
+
+        Args:
+            room_type_id: Room type
+            stay_type: Stay type
+            check_date: Day to price (default: today)
+
+        Returns:
+            RateEntry or None if no active rate covers the date
+        """
+        if check_date is None:
+            check_date = date.today()
+        index = await self.get_rate_index()
+        return index.rate_on(room_type_id, stay_type, check_date)
+
+    async def get_nightly_rates(
+        self,
+        room_type_id: int,
+        stay_type: StayType,
+        start_date: date,
+        end_date: date
+    ) -> List[Optional[Decimal]]:
+        """
+        Price of each night in [start_date, end_date) from the rate index
+
+        Returns:
+            One rate per night (None for nights without an active rate)
+        """
+        index = await self.get_rate_index()
+        return index.nightly_rates(room_type_id, stay_type, start_date, end_date)
+
     async def get_current_rate(
         self,
         room_type_id: int,
@@ -67,24 +126,10 @@ class RoomRateService:
         Get current active rate for a room type and stay type
         If check_date is provided, get the rate effective for that date
         """
-        if check_date is None:
-            check_date = date.today()
-
-        result = await self.db.execute(
-            select(RoomRate).where(
-                and_(
-                    RoomRate.room_type_id == room_type_id,
-                    RoomRate.stay_type == stay_type,
-                    RoomRate.effective_from <= check_date,
-                    or_(
-                        RoomRate.effective_to.is_(None),
-                        RoomRate.effective_to >= check_date
-                    ),
-                    RoomRate.is_active == True
-                )
-            ).order_by(RoomRate.effective_from.desc())
-        )
-        return result.scalars().first()
+        entry = await self.resolve_rate(room_type_id, stay_type, check_date)
+        if entry is None:
+            return None
+        return await self.db.get(RoomRate, entry.id)
 
     async def check_date_overlap(
         self,
@@ -170,6 +215,7 @@ class RoomRateService:
         room_rate = RoomRate(**data.model_dump())
         self.db.add(room_rate)
         await self.db.commit()
+        await room_rate_cache.invalidate()
         await self.db.refresh(room_rate)
         await self.db.refresh(room_rate, ["room_type"])
 
@@ -207,6 +253,7 @@ class RoomRateService:
             setattr(room_rate, field, value)
 
         await self.db.commit()
+        await room_rate_cache.invalidate()
         await self.db.refresh(room_rate)
         await self.db.refresh(room_rate, ["room_type"])
 
@@ -229,6 +276,7 @@ class RoomRateService:
 
         await self.db.delete(room_rate)
         await self.db.commit()
+        await room_rate_cache.invalidate()
 
     async def get_rate_matrix(self) -> List[dict]:
         """
@@ -241,13 +289,14 @@ class RoomRateService:
         )
         room_types = room_types_result.scalars().all()
 
+        index = await self.get_rate_index()
+        today = date.today()
+
         matrix = []
         for room_type in room_types:
-            # Get current overnight rate
-            overnight_rate = await self.get_current_rate(room_type.id, StayType.OVERNIGHT)
-
-            # Get current temporary rate
-            temporary_rate = await self.get_current_rate(room_type.id, StayType.TEMPORARY)
+            # Current overnight and temporary rates
+            overnight_rate = index.rate_on(room_type.id, StayType.OVERNIGHT, today)
+            temporary_rate = index.rate_on(room_type.id, StayType.TEMPORARY, today)
 
             matrix.append({
                 "room_type_id": room_type.id,
@@ -271,7 +320,7 @@ class RoomRateService:
         If rate exists, updates it. If not, creates a new one.
         """
         # Get current rate
-        current_rate = await self.get_current_rate(room_type_id, stay_type)
+        current_rate = await self.resolve_rate(room_type_id, stay_type)
 
         if current_rate:
             # Update existing rate
@@ -9,6 +9,7 @@ from app.models.room import Room, RoomStatus
 from app.models.room_type import RoomType
 from app.models.booking import Booking
 from app.models.check_in import CheckIn
+from app.services.breaker_outbox_service import BreakerOutboxService
 from app.schemas.room import RoomCreate, RoomUpdate, RoomStatusUpdate
 
 
@@ -171,6 +172,12 @@ class RoomService:
         old_status = room.status
         room.status = new_status
 
+        # Breaker auto-control goes through the outbox: the command row is
+        # committed together with the status change and executed by the
+        # Celery dispatcher, so callers never wait on Home Assistant
+        if old_status != new_status:
+            BreakerOutboxService(self.db).enqueue(room.id, old_status, new_status)
+
         await self.db.commit()
         await self.db.refresh(room)
 
@@ -186,21 +193,8 @@ class RoomService:
         #     }
         # })
 
-        # Auto control breaker based on room status change
         if old_status != new_status:
-            try:
-                from app.services.breaker_service import BreakerService
-                breaker_service = BreakerService(self.db)
-                await breaker_service.auto_control_on_room_status_change(
-                    room_id=room.id,
-                    old_status=old_status,
-                    new_status=new_status
-                )
-            except Exception as e:
-                # Log error but don't block room status update
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Failed to auto-control breaker for room {room.id}: {str(e)}", exc_info=True)
+            await BreakerOutboxService.notify_dispatcher()
 
         return room
 
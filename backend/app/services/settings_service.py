@@ -4,29 +4,76 @@ Business logic for system settings management
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
 import json
 
+from app.core.snapshot_cache import settings_cache
 from app.models.system_setting import SystemSetting, SettingDataTypeEnum
 from app.schemas.settings import TelegramSettings, GeneralSettings, SystemSettingsResponse
 
+TELEGRAM_KEYS = (
+    "telegram_bot_token",
+    "telegram_admin_chat_id",
+    "telegram_reception_chat_id",
+    "telegram_housekeeping_chat_id",
+    "telegram_maintenance_chat_id",
+    "telegram_enabled",
+)
+
 
 class SettingsService:
-    """Service for managing system settings"""
+    """
+    Service for managing system settings
+
+    Reads go through the process-wide settings snapshot (one query for all
+    rows, re-validated against a Redis version); writes bump the version.
+    """
 
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _load_all(self) -> Dict[str, Optional[str]]:
+        """Read every setting in one query"""
+        result = await self.db.execute(select(SystemSetting.key, SystemSetting.value))
+        return dict(result.all())
+
     async def get_setting(self, key: str) -> Optional[str]:
         """Get a single setting value by key"""
-        result = await self.db.execute(
-            select(SystemSetting).where(SystemSetting.key == key)
-        )
-        setting = result.scalar_one_or_none()
-        return setting.value if setting else None
+        snapshot = await settings_cache.get_snapshot(self._load_all)
+        return snapshot.get(key)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Get several settings at once
+
+        Args:
+            keys: Setting keys
+
+        Returns:
+            {key: value} with None for keys that are not set
+        """
+        snapshot = await settings_cache.get_snapshot(self._load_all)
+        return {key: snapshot.get(key) for key in keys}
 
     async def set_setting(self, key: str, value: str, data_type: SettingDataTypeEnum = SettingDataTypeEnum.STRING):
         """Set a setting value"""
+        setting = await self._upsert(key, value, data_type)
+
+        await self.db.commit()
+        await settings_cache.invalidate()
+        await self.db.refresh(setting)
+        return setting
+
+    async def set_many(self, items: Iterable[Tuple[str, str, SettingDataTypeEnum]]):
+        """Set several settings in one transaction with one invalidation"""
+        for key, value, data_type in items:
+            await self._upsert(key, value, data_type)
+
+        await self.db.commit()
+        await settings_cache.invalidate()
+
+    async def _upsert(self, key: str, value: str, data_type: SettingDataTypeEnum) -> SystemSetting:
+        """Create or update a setting row without committing"""
         result = await self.db.execute(
             select(SystemSetting).where(SystemSetting.key == key)
         )
@@ -42,38 +89,32 @@ class SettingsService:
                 data_type=data_type
             )
             self.db.add(setting)
-
-        await self.db.commit()
-        await self.db.refresh(setting)
         return setting
 
     async def get_telegram_settings(self) -> TelegramSettings:
         """Get Telegram integration settings"""
-        bot_token = await self.get_setting("telegram_bot_token") or ""
-        admin_chat_id = await self.get_setting("telegram_admin_chat_id") or ""
-        reception_chat_id = await self.get_setting("telegram_reception_chat_id") or ""
-        housekeeping_chat_id = await self.get_setting("telegram_housekeeping_chat_id") or ""
-        maintenance_chat_id = await self.get_setting("telegram_maintenance_chat_id") or ""
-        enabled_str = await self.get_setting("telegram_enabled") or "false"
-        enabled = enabled_str.lower() == "true"
+        values = await self.get_many(TELEGRAM_KEYS)
+        enabled_str = values["telegram_enabled"] or "false"
 
         return TelegramSettings(
-            bot_token=bot_token,
-            admin_chat_id=admin_chat_id,
-            reception_chat_id=reception_chat_id,
-            housekeeping_chat_id=housekeeping_chat_id,
-            maintenance_chat_id=maintenance_chat_id,
-            enabled=enabled
+            bot_token=values["telegram_bot_token"] or "",
+            admin_chat_id=values["telegram_admin_chat_id"] or "",
+            reception_chat_id=values["telegram_reception_chat_id"] or "",
+            housekeeping_chat_id=values["telegram_housekeeping_chat_id"] or "",
+            maintenance_chat_id=values["telegram_maintenance_chat_id"] or "",
+            enabled=enabled_str.lower() == "true"
         )
 
     async def update_telegram_settings(self, settings: TelegramSettings):
         """Update Telegram integration settings"""
-        await self.set_setting("telegram_bot_token", settings.bot_token, SettingDataTypeEnum.STRING)
-        await self.set_setting("telegram_admin_chat_id", settings.admin_chat_id, SettingDataTypeEnum.STRING)
-        await self.set_setting("telegram_reception_chat_id", settings.reception_chat_id, SettingDataTypeEnum.STRING)
-        await self.set_setting("telegram_housekeeping_chat_id", settings.housekeeping_chat_id, SettingDataTypeEnum.STRING)
-        await self.set_setting("telegram_maintenance_chat_id", settings.maintenance_chat_id, SettingDataTypeEnum.STRING)
-        await self.set_setting("telegram_enabled", "true" if settings.enabled else "false", SettingDataTypeEnum.BOOLEAN)
+        await self.set_many([
+            ("telegram_bot_token", settings.bot_token, SettingDataTypeEnum.STRING),
+            ("telegram_admin_chat_id", settings.admin_chat_id, SettingDataTypeEnum.STRING),
+            ("telegram_reception_chat_id", settings.reception_chat_id, SettingDataTypeEnum.STRING),
+            ("telegram_housekeeping_chat_id", settings.housekeeping_chat_id, SettingDataTypeEnum.STRING),
+            ("telegram_maintenance_chat_id", settings.maintenance_chat_id, SettingDataTypeEnum.STRING),
+            ("telegram_enabled", "true" if settings.enabled else "false", SettingDataTypeEnum.BOOLEAN),
+        ])
 
     async def get_temporary_stay_hours(self) -> int:
         """Get temporary stay duration in hours from system_settings, with fallback to config default"""
@@ -88,10 +129,11 @@ class SettingsService:
 
     async def get_general_settings(self) -> GeneralSettings:
         """Get general system settings"""
-        frontend_domain = await self.get_setting("frontend_domain") or "http://localhost:5173"
-        hotel_name = await self.get_setting("hotel_name") or ""
-        hotel_address = await self.get_setting("hotel_address") or ""
-        hotel_phone = await self.get_setting("hotel_phone") or ""
+        values = await self.get_many(("frontend_domain", "hotel_name", "hotel_address", "hotel_phone"))
+        frontend_domain = values["frontend_domain"] or "http://localhost:5173"
+        hotel_name = values["hotel_name"] or ""
+        hotel_address = values["hotel_address"] or ""
+        hotel_phone = values["hotel_phone"] or ""
         temporary_stay_duration_hours = await self.get_temporary_stay_hours()
 
         return GeneralSettings(
@@ -104,11 +146,13 @@ class SettingsService:
 
     async def update_general_settings(self, settings: GeneralSettings):
         """Update general system settings"""
-        await self.set_setting("frontend_domain", settings.frontend_domain, SettingDataTypeEnum.STRING)
-        await self.set_setting("hotel_name", settings.hotel_name, SettingDataTypeEnum.STRING)
-        await self.set_setting("hotel_address", settings.hotel_address, SettingDataTypeEnum.STRING)
-        await self.set_setting("hotel_phone", settings.hotel_phone, SettingDataTypeEnum.STRING)
-        await self.set_setting("temporary_stay_duration_hours", str(settings.temporary_stay_duration_hours), SettingDataTypeEnum.NUMBER)
+        await self.set_many([
+            ("frontend_domain", settings.frontend_domain, SettingDataTypeEnum.STRING),
+            ("hotel_name", settings.hotel_name, SettingDataTypeEnum.STRING),
+            ("hotel_address", settings.hotel_address, SettingDataTypeEnum.STRING),
+            ("hotel_phone", settings.hotel_phone, SettingDataTypeEnum.STRING),
+            ("temporary_stay_duration_hours", str(settings.temporary_stay_duration_hours), SettingDataTypeEnum.NUMBER),
+        ])
 
     async def get_all_settings(self) -> SystemSettingsResponse:
         """Get all system settings"""
@@ -5,16 +5,23 @@ No external library required - uses aiohttp directly
 """
 import logging
 import aiohttp
-from typing import Optional, Dict
+from typing import Iterable, Optional, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.telegram_dispatcher import telegram_dispatcher
 from app.services.settings_service import SettingsService
 
 logger = logging.getLogger(__name__)
 
 
 class TelegramService:
-    """Service for Telegram Bot API integration"""
+    """
+    Service for Telegram Bot API integration
+
+    Notifications (send_notification, housekeeping / maintenance helpers) are
+    queued on the Telegram dispatcher and sent by a Celery worker;
+    send_message and test_connection still call the API directly.
+    """
 
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -24,16 +31,15 @@ class TelegramService:
         """Get bot information using getMe API"""
         url = f"https://api.telegram.org/bot{bot_token}/getMe"
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    data = await response.json()
-                    if data.get("ok"):
-                        return data.get("result")
-                    return None
-            except Exception as e:
-                logger.error("Error getting bot info: %s", e)
+        try:
+            async with telegram_dispatcher.get_session().get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                data = await response.json()
+                if data.get("ok"):
+                    return data.get("result")
                 return None
+        except Exception as e:
+            logger.error("Error getting bot info: %s", e)
+            return None
 
     async def send_message(
         self,
@@ -68,22 +74,68 @@ class TelegramService:
 
         logger.info("Sending Telegram message to chat_id: %s", chat_id)
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    data = await response.json()
+        try:
+            async with telegram_dispatcher.get_session().post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                data = await response.json()
+
+                if data.get("ok"):
+                    logger.info("Telegram message sent successfully")
+                    return True
+                else:
+                    error_desc = data.get("description", "Unknown error")
+                    logger.error("Telegram API error: %s", error_desc)
+                    return False
 
-                    if data.get("ok"):
-                        logger.info("Telegram message sent successfully")
-                        return True
-                    else:
-                        error_desc = data.get("description", "Unknown error")
-                        logger.error("Telegram API error: %s", error_desc)
-                        return False
+        except Exception as e:
+            logger.exception("Error sending Telegram message")
+            return False
 
-            except Exception as e:
-                logger.exception("Error sending Telegram message")
-                return False
+    async def send_notification(
+        self,
+        message: str,
+        target_roles: Iterable[str],
+        notification_type: Optional[str] = None,
+        title: Optional[str] = None,
+        footer: Optional[str] = None
+    ) -> bool:
+        """
+        Queue a notification for one or more role chats
+
+        Args:
+            message: Message body (HTML)
+            target_roles: Roles whose chats receive it (ADMIN, RECEPTION, ...)
+            notification_type: Coalesce key; queued messages of the same type
+                for the same chat are sent as one digest
+            title: Heading shown once above the message or digest
+            footer: Text shown once below the message or digest
+
+        Returns:
+            True if queued for at least one role
+        """
+        return await self.send_notifications(
+            [message], target_roles, notification_type, title=title, footer=footer
+        ) > 0
+
+    async def send_notifications(
+        self,
+        messages: Iterable[str],
+        target_roles: Iterable[str],
+        notification_type: Optional[str] = None,
+        title: Optional[str] = None,
+        footer: Optional[str] = None
+    ) -> int:
+        """Queue several notifications (e.g. one per overtime room) to coalesce into a digest"""
+        messages = list(messages)
+        queued = 0
+        for role in target_roles:
+            queued += await telegram_dispatcher.enqueue_many(
+                messages,
+                target=role,
+                coalesce_key=notification_type,
+                title=title,
+                footer=footer
+            )
+        return queued
 
     async def send_housekeeping_notification(
         self,
@@ -92,7 +144,7 @@ class TelegramService:
         room_type: str,
         frontend_url: str = None
     ):
-        """Send notification for new housekeeping task"""
+        """Queue notification for new housekeeping task"""
         logger.info("Preparing housekeeping notification for task #%d, room %s", task_id, room_number)
 
         settings = await self.settings_service.get_telegram_settings()
@@ -119,7 +171,7 @@ class TelegramService:
             f"<a href=\"{task_url}\"><b>👉 คลิกที่นี่เพื่อดูรายละเอียดและรับงาน 👈</b></a>"
         )
 
-        return await self.send_message(settings.housekeeping_chat_id, message)
+        return await telegram_dispatcher.enqueue(message, target="housekeeping")
 
     async def send_maintenance_notification(
         self,
@@ -130,7 +182,7 @@ class TelegramService:
         priority: str,
         frontend_url: str = None
     ):
-        """Send notification for new maintenance task"""
+        """Queue notification for new maintenance task"""
         logger.info("Preparing maintenance notification for task #%d: %s", task_id, title)
 
         settings = await self.settings_service.get_telegram_settings()
@@ -166,7 +218,7 @@ class TelegramService:
             f"<a href=\"{task_url}\"><b>👉 คลิกที่นี่เพื่อดูรายละเอียดและรับงาน 👈</b></a>"
         )
 
-        return await self.send_message(settings.maintenance_chat_id, message)
+        return await telegram_dispatcher.enqueue(message, target="maintenance")
 
     async def test_connection(self, bot_token: str, chat_id: str) -> tuple[bool, str, Optional[Dict]]:
         """Test Telegram bot connection and send test message"""
@@ -185,16 +237,15 @@ class TelegramService:
             "parse_mode": "HTML"
         }
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    data = await response.json()
+        try:
+            async with telegram_dispatcher.get_session().post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                data = await response.json()
 
-                    if data.get("ok"):
-                        return True, f"Connected successfully! Bot: {bot_info.get('first_name', 'Unknown')}", bot_info
-                    else:
-                        error_desc = data.get("description", "Unknown error")
-                        return False, f"Failed to send message: {error_desc}", bot_info
+                if data.get("ok"):
+                    return True, f"Connected successfully! Bot: {bot_info.get('first_name', 'Unknown')}", bot_info
+                else:
+                    error_desc = data.get("description", "Unknown error")
+                    return False, f"Failed to send message: {error_desc}", bot_info
 
-            except Exception as e:
-                return False, f"Connection error: {str(e)}", bot_info
+        except Exception as e:
+            return False, f"Connection error: {str(e)}", bot_info
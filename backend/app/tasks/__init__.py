@@ -5,6 +5,11 @@ Import all task modules here for autodiscovery
 from app.tasks.celery_app import celery_app
 from app.tasks import booking_tasks
 from app.tasks import breaker_tasks
+from app.tasks import holiday_tasks
+from app.tasks import hotel_tick_tasks
 from app.tasks import overtime_tasks
+from app.tasks import report_tasks
+from app.tasks import retention_tasks
+from app.tasks import telegram_tasks
 
-__all__ = ["celery_app", "booking_tasks", "breaker_tasks", "overtime_tasks"]
+__all__ = ["celery_app", "booking_tasks", "breaker_tasks", "holiday_tasks", "hotel_tick_tasks", "overtime_tasks", "report_tasks", "retention_tasks", "telegram_tasks"]
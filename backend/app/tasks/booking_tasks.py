@@ -17,12 +17,14 @@ from app.models.room import Room, RoomStatus
 from app.models.check_in import CheckIn
 from app.core.datetime_utils import now_thailand, today_thailand
 from app.core.websocket import websocket_manager
+from app.tasks.runtime import async_task
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(name="booking.check_bookings_for_today")
-def check_bookings_for_today():
+@async_task
+async def check_bookings_for_today():
     """
     Celery task: Check bookings for today and update room status to 'reserved'
 
@@ -33,8 +35,7 @@ def check_bookings_for_today():
     - Update room status from 'available' → 'reserved'
     - Broadcast WebSocket event
     """
-    import asyncio
-    return asyncio.run(_async_check_bookings_for_today())
+    return await _async_check_bookings_for_today()
 
 
 async def _async_check_bookings_for_today():
@@ -100,7 +101,8 @@ async def _async_check_bookings_for_today():
 
 
 @shared_task(name="booking.check_booking_check_in_times")
-def check_booking_check_in_times():
+@async_task
+async def check_booking_check_in_times():
     """
     Celery task: Check if guests have checked in on time
 
@@ -113,8 +115,7 @@ def check_booking_check_in_times():
       - No associated check_in record
     - Send Telegram reminder to admin/reception
     """
-    import asyncio
-    return asyncio.run(_async_check_booking_check_in_times())
+    return await _async_check_booking_check_in_times()
 
 
 async def _async_check_booking_check_in_times():
@@ -194,17 +195,17 @@ async def _async_check_booking_check_in_times():
 
 async def _send_overdue_booking_notifications(overdue_bookings: List[dict], db):
     """
-    Send Telegram notifications for overdue bookings
+    Queue one Telegram digest for the overdue bookings
 
     Args:
         overdue_bookings: List of dicts with 'booking' and 'overdue_minutes'
         db: Database session
     """
     try:
+        from html import escape
         from app.services.telegram_service import TelegramService
 
-        telegram_service = TelegramService(db)
-
+        messages = []
         for item in overdue_bookings:
             booking = item['booking']
             overdue_minutes = item['overdue_minutes']
@@ -214,30 +215,27 @@ async def _send_overdue_booking_notifications(overdue_bookings: List[dict], db):
             mins = overdue_minutes % 60
             overdue_str = f"{hours} ชั่วโมง {mins} นาที" if hours > 0 else f"{mins} นาที"
 
-            # Prepare message
-            message = f"""⚠️ **การจองเลยเวลา Check-in**
-
-📅 Booking ID: #{booking.id}
-🏠 ห้อง: {booking.room.room_number}
-👤 ลูกค้า: {booking.customer.full_name}
-📞 โทร: {booking.customer.phone_number}
-📆 วันที่จอง: {booking.check_in_date.strftime('%d/%m/%Y')} (14:00)
-⏰ เลยเวลามาแล้ว: {overdue_str}
-
-💰 เงินมัดจำ: {booking.deposit_amount:,.2f} บาท
-💵 ยอดรวม: {booking.total_amount:,.2f} บาท
-
-กรุณาติดต่อลูกค้าเพื่อยืนยันการเข้าพัก หรือพิจารณายกเลิกการจอง
-"""
-
-            # Send to admin and reception groups
-            await telegram_service.send_notification(
-                message=message,
-                target_roles=["ADMIN", "RECEPTION"],
-                notification_type="booking_overdue"
+            messages.append(
+                f"📅 Booking ID: <b>#{booking.id}</b>\n"
+                f"🏠 ห้อง: {escape(booking.room.room_number)}\n"
+                f"👤 ลูกค้า: {escape(booking.customer.full_name or '')}\n"
+                f"📞 โทร: {escape(booking.customer.phone_number or '')}\n"
+                f"📆 วันที่จอง: {booking.check_in_date.strftime('%d/%m/%Y')} (14:00)\n"
+                f"⏰ เลยเวลามาแล้ว: {overdue_str}\n\n"
+                f"💰 เงินมัดจำ: {booking.deposit_amount:,.2f} บาท\n"
+                f"💵 ยอดรวม: {booking.total_amount:,.2f} บาท"
             )
 
-            logger.info("Sent overdue notification for Booking #%d", booking.id)
+        # Admin and reception each get one message for the whole batch
+        await TelegramService(db).send_notifications(
+            messages,
+            target_roles=["ADMIN", "RECEPTION"],
+            notification_type="booking_overdue",
+            title="⚠️ <b>การจองเลยเวลา Check-in</b>",
+            footer="กรุณาติดต่อลูกค้าเพื่อยืนยันการเข้าพัก หรือพิจารณายกเลิกการจอง"
+        )
+
+        logger.info("Queued overdue notifications for %d bookings", len(messages))
 
     except Exception as e:
         logger.exception("Error sending overdue booking notifications: %s", str(e))
@@ -3,37 +3,42 @@ Breaker Celery Tasks
 
 Automated background tasks for breaker management:
 1. Periodic status synchronization (every 30 seconds)
-2. Process control queue (debouncing and retries)
+2. Dispatch the auto-control command outbox
+   (queued commands run in app.core.breaker_scheduler)
 3. Health check and error monitoring
 4. Enforce breaker-room state consistency (reconciliation)
 """
 import logging
 from celery import shared_task
-from sqlalchemy import select, and_, or_
-from sqlalchemy.orm import selectinload
-from datetime import datetime, timedelta
+from sqlalchemy import select, and_
+from datetime import datetime
 from typing import List
 
 from app.db.session import AsyncSessionLocal
-from app.models.home_assistant import (
-    HomeAssistantBreaker,
-    BreakerControlQueue,
-    BreakerState,
-    QueueStatus,
-    TargetState,
-    TriggerType
-)
-from app.models.room import Room, RoomStatus
+from app.models.home_assistant import HomeAssistantBreaker
 from app.services.breaker_service import BreakerService
+from app.services.breaker_outbox_service import BreakerOutboxService
 from app.services.home_assistant_service import HomeAssistantService
 from app.core.websocket import websocket_manager
+from app.core.redis import get_redis
 from app.core.exceptions import HomeAssistantException
+from app.tasks.retention import requeue_if_incomplete, run_policies
+from app.tasks.runtime import async_task
 
 logger = logging.getLogger(__name__)
 
+# Prevents overlapping sync runs when one takes longer than the schedule
+SYNC_LOCK_KEY = "breaker:sync_all:lock"
+SYNC_LOCK_TIMEOUT_SECONDS = 60
+
+# Single outbox dispatcher at a time, so a room's commands stay in order
+OUTBOX_LOCK_KEY = "breaker:outbox:lock"
+OUTBOX_LOCK_TIMEOUT_SECONDS = 120
+
 
 @shared_task(name="breaker.sync_all_breaker_states")
-def sync_all_breaker_states():
+@async_task
+async def sync_all_breaker_states():
     """
     Celery task: Sync all breaker states from Home Assistant.
 
@@ -45,190 +50,149 @@ def sync_all_breaker_states():
     - Update database
     - Broadcast WebSocket event if state changed
     """
-    import asyncio
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(_async_sync_all_breaker_states())
-    finally:
-        loop.close()
+    return await _async_sync_all_breaker_states()
 
 
 async def _async_sync_all_breaker_states():
     """Async implementation of sync_all_breaker_states"""
-    async with AsyncSessionLocal() as db:
-        try:
-            breaker_service = BreakerService(db)
-            result = await breaker_service.sync_all_breakers()
-
-            # Broadcast WebSocket event
-            await websocket_manager.broadcast({
-                "event": "breaker_states_synced",
-                "data": {
-                    "timestamp": datetime.now().isoformat(),
-                    "total": result["total"],
-                    "success_count": result["success_count"],
-                    "failed_count": result["failed_count"]
-                }
-            })
-
-            return {
-                "success": True,
-                "message": result["message"],
-                "synced_at": datetime.now().isoformat()
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "failed_at": datetime.now().isoformat()
-            }
+    # Skip this run if the previous one is still going (slow HA box)
+    lock = get_redis().lock(SYNC_LOCK_KEY, timeout=SYNC_LOCK_TIMEOUT_SECONDS, blocking=False)
+    try:
+        acquired = await lock.acquire()
+    except Exception as e:
+        logger.warning("Breaker sync lock unavailable, running unlocked: %s", e)
+        lock, acquired = None, True
+
+    if not acquired:
+        logger.info("Previous breaker sync still running, skipping this run")
+        return {
+            "success": True,
+            "skipped": True,
+            "message": "Previous sync still running"
+        }
 
+    try:
+        async with AsyncSessionLocal() as db:
+            try:
+                breaker_service = BreakerService(db)
+                result = await breaker_service.sync_all_breakers()
+
+                # Broadcast only the breakers that actually changed
+                for change in result["changed"]:
+                    await websocket_manager.broadcast_breaker_status_change(
+                        breaker_id=change["breaker_id"],
+                        entity_id=change["entity_id"],
+                        room_id=change["room_id"],
+                        room_number=change["room_number"],
+                        old_state=change["old_state"],
+                        new_state=change["new_state"],
+                        breaker_data={"is_available": change["is_available"]}
+                    )
 
-@shared_task(name="breaker.process_control_queue")
-def process_control_queue():
-    """
-    Celery task: Process pending control queue items.
+                # Broadcast WebSocket event
+                await websocket_manager.broadcast({
+                    "event": "breaker_states_synced",
+                    "data": {
+                        "timestamp": datetime.now().isoformat(),
+                        "mode": result["mode"],
+                        "total": result["total"],
+                        "success_count": result["success_count"],
+                        "failed_count": result["failed_count"],
+                        "changed_count": result["changed_count"]
+                    }
+                })
 
-    Schedule: Every 5 seconds
+                return {
+                    "success": True,
+                    "message": result["message"],
+                    "mode": result["mode"],
+                    "changed_count": result["changed_count"],
+                    "synced_at": datetime.now().isoformat()
+                }
 
-    Actions:
-    - Find queue items where scheduled_at <= NOW and status = PENDING
-    - Execute commands (turn on/off)
-    - Update queue status to COMPLETED or FAILED
-    - Retry failed commands (up to max_retries)
-    - Broadcast WebSocket events
-    """
-    import asyncio
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(_async_process_control_queue())
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "failed_at": datetime.now().isoformat()
+                }
     finally:
-        loop.close()
+        if lock is not None:
+            try:
+                await lock.release()
+            except Exception:
+                pass  # Lock already expired
 
 
-async def _async_process_control_queue():
-    """Async implementation of process_control_queue"""
-    async with AsyncSessionLocal() as db:
-        try:
-            # Find pending queue items ready for execution
-            now = datetime.now()
-            stmt = select(BreakerControlQueue).where(
-                and_(
-                    BreakerControlQueue.scheduled_at <= now,
-                    BreakerControlQueue.status == QueueStatus.PENDING
-                )
-            ).order_by(
-                BreakerControlQueue.priority,  # Higher priority first
-                BreakerControlQueue.scheduled_at
-            ).limit(50)  # Process max 50 items per run
+@shared_task(name="breaker.dispatch_command_outbox")
+@async_task
+async def dispatch_command_outbox():
+    """
+    Celery task: Execute breaker auto-control commands from the outbox.
 
-            result = await db.execute(stmt)
-            queue_items = list(result.scalars().all())
+    Triggered right after each room status commit, plus every 30 seconds
+    as a safety net (broker hiccup, worker restart, retries).
 
-            if not queue_items:
-                return {
-                    "success": True,
-                    "message": "No pending queue items",
-                    "processed": 0
-                }
+    Actions:
+    - Claim pending BreakerCommandOutbox rows in id order
+    - Coalesce rows per room and turn the breaker ON/OFF once
+    - Record the commit → command delay on each row
+    """
+    return await _async_dispatch_command_outbox()
 
-            breaker_service = BreakerService(db)
-            processed_count = 0
-            success_count = 0
-            failed_count = 0
 
-            for queue_item in queue_items:
-                # Mark as processing
-                queue_item.status = QueueStatus.PROCESSING
-                await db.commit()
+async def _async_dispatch_command_outbox():
+    """Async implementation of dispatch_command_outbox"""
+    totals = {"dispatched": 0, "coalesced": 0, "failed": 0}
 
-                try:
-                    # Get room status if available
-                    breaker = await breaker_service.get_by_id(queue_item.breaker_id)
-                    room_status_before = None
-                    room_status_after = None
-
-                    if breaker and breaker.room:
-                        room_status_before = breaker.room.status.value
-                        room_status_after = breaker.room.status.value
-
-                    # Execute command
-                    if queue_item.target_state == TargetState.ON:
-                        await breaker_service.turn_on(
-                            breaker_id=queue_item.breaker_id,
-                            trigger_type=queue_item.trigger_type,
-                            triggered_by=queue_item.triggered_by,
-                            room_status_before=room_status_before,
-                            room_status_after=room_status_after
-                        )
-                    else:
-                        await breaker_service.turn_off(
-                            breaker_id=queue_item.breaker_id,
-                            trigger_type=queue_item.trigger_type,
-                            triggered_by=queue_item.triggered_by,
-                            room_status_before=room_status_before,
-                            room_status_after=room_status_after
-                        )
-
-                    # Mark as completed
-                    queue_item.status = QueueStatus.COMPLETED
-                    queue_item.error_message = None
-                    await db.commit()
-
-                    success_count += 1
-                    processed_count += 1
-
-                    # Broadcast WebSocket event
-                    await websocket_manager.broadcast({
-                        "event": "breaker_state_changed",
-                        "data": {
-                            "breaker_id": queue_item.breaker_id,
-                            "entity_id": breaker.entity_id if breaker else None,
-                            "new_state": queue_item.target_state.value,
-                            "trigger_type": queue_item.trigger_type.value,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    })
-
-                except Exception as e:
-                    # Handle failure
-                    queue_item.retry_count += 1
-                    queue_item.error_message = str(e)
-
-                    if queue_item.retry_count >= queue_item.max_retries:
-                        # Max retries reached, mark as failed
-                        queue_item.status = QueueStatus.FAILED
-                        failed_count += 1
-                        processed_count += 1
-                    else:
-                        # Retry with exponential backoff
-                        queue_item.status = QueueStatus.PENDING
-                        queue_item.scheduled_at = now + timedelta(seconds=3 * (queue_item.retry_count + 1))
-
-                    await db.commit()
+    while True:
+        lock = get_redis().lock(OUTBOX_LOCK_KEY, timeout=OUTBOX_LOCK_TIMEOUT_SECONDS, blocking=False)
+        try:
+            acquired = await lock.acquire()
+        except Exception as e:
+            logger.warning("Breaker outbox lock unavailable, running unlocked: %s", e)
+            lock, acquired = None, True
 
-            return {
-                "success": True,
-                "message": f"Processed {processed_count} queue items",
-                "processed": processed_count,
-                "success_count": success_count,
-                "failed_count": failed_count,
-                "processed_at": datetime.now().isoformat()
-            }
+        if not acquired:
+            # The running dispatcher re-checks for new rows before it exits
+            return {"success": True, "skipped": True, **totals}
 
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await BreakerOutboxService(db).dispatch_pending()
+                for key in totals:
+                    totals[key] += result[key]
         except Exception as e:
+            logger.error("Breaker outbox dispatch failed: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e),
                 "failed_at": datetime.now().isoformat()
             }
+        finally:
+            if lock is not None:
+                try:
+                    await lock.release()
+                except Exception:
+                    pass  # Lock already expired
+
+        # A kick that arrived while we held the lock was skipped; drain its rows
+        if result["failed"]:
+            break
+        async with AsyncSessionLocal() as db:
+            if not await BreakerOutboxService(db).has_pending():
+                break
+
+    return {
+        "success": True,
+        **totals,
+        "processed_at": datetime.now().isoformat()
+    }
 
 
 @shared_task(name="breaker.health_check")
-def health_check():
+@async_task
+async def health_check():
     """
     Celery task: Health check for Home Assistant connection and breakers.
 
@@ -240,13 +204,7 @@ def health_check():
     - Check breakers with consecutive errors >= 3
     - Send admin notification if issues found
     """
-    import asyncio
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(_async_health_check())
-    finally:
-        loop.close()
+    return await _async_health_check()
 
 
 async def _async_health_check():
@@ -312,121 +270,89 @@ async def _async_health_check():
 
 
 @shared_task(name="breaker.cleanup_old_queue_items")
-def cleanup_old_queue_items():
+@async_task
+async def cleanup_old_queue_items():
     """
     Celery task: Clean up old completed/failed queue items.
 
     Schedule: Daily at 3:00 AM
 
     Actions:
-    - Delete queue items older than 7 days with status COMPLETED or FAILED
+    - Delete COMPLETED/FAILED queue items older than
+      RETENTION_BREAKER_QUEUE_DAYS (default 7), in id-range batches
+    - Re-queue itself if RETENTION_MAX_SECONDS ran out first
     """
-    import asyncio
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(_async_cleanup_old_queue_items())
-    finally:
-        loop.close()
+    return await _async_cleanup_old_queue_items()
 
 
 async def _async_cleanup_old_queue_items():
     """Async implementation of cleanup_old_queue_items"""
-    async with AsyncSessionLocal() as db:
-        try:
-            # Delete items older than 7 days
-            cutoff_date = datetime.now() - timedelta(days=7)
-
-            stmt = select(BreakerControlQueue).where(
-                and_(
-                    BreakerControlQueue.created_at < cutoff_date,
-                    or_(
-                        BreakerControlQueue.status == QueueStatus.COMPLETED,
-                        BreakerControlQueue.status == QueueStatus.FAILED
-                    )
-                )
-            )
-
-            result = await db.execute(stmt)
-            old_items = list(result.scalars().all())
-
-            for item in old_items:
-                await db.delete(item)
-
-            await db.commit()
-
-            return {
-                "success": True,
-                "message": f"Deleted {len(old_items)} old queue items",
-                "deleted_count": len(old_items),
-                "cleaned_at": datetime.now().isoformat()
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "failed_at": datetime.now().isoformat()
-            }
+    try:
+        results = await run_policies(["breaker_queue"])
+        deleted_count = sum(r["deleted"] for r in results)
+
+        return {
+            "success": True,
+            "message": f"Deleted {deleted_count} old queue items",
+            "deleted_count": deleted_count,
+            "policies": results,
+            "requeued": await requeue_if_incomplete(cleanup_old_queue_items, results),
+            "cleaned_at": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "failed_at": datetime.now().isoformat()
+        }
 
 
 @shared_task(name="breaker.cleanup_old_activity_logs")
-def cleanup_old_activity_logs():
+@async_task
+async def cleanup_old_activity_logs():
     """
     Celery task: Clean up old activity logs.
 
     Schedule: Weekly on Sunday at 4:00 AM
 
     Actions:
-    - Delete activity logs older than 90 days
+    - Delete successful STATUS_SYNC logs older than
+      RETENTION_BREAKER_SYNC_LOG_DAYS (their counts and latency are kept in
+      breaker_sync_rollups)
+    - Delete all activity logs older than RETENTION_BREAKER_ACTIVITY_LOG_DAYS
+    - Deletes run in id-range batches, not row by row
+    - Re-queue itself if RETENTION_MAX_SECONDS ran out first
     """
-    import asyncio
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(_async_cleanup_old_activity_logs())
-    finally:
-        loop.close()
+    return await _async_cleanup_old_activity_logs()
 
 
 async def _async_cleanup_old_activity_logs():
     """Async implementation of cleanup_old_activity_logs"""
-    from app.models.home_assistant import BreakerActivityLog
-
-    async with AsyncSessionLocal() as db:
-        try:
-            # Delete logs older than 90 days
-            cutoff_date = datetime.now() - timedelta(days=90)
-
-            stmt = select(BreakerActivityLog).where(
-                BreakerActivityLog.created_at < cutoff_date
-            )
-
-            result = await db.execute(stmt)
-            old_logs = list(result.scalars().all())
-
-            for log in old_logs:
-                await db.delete(log)
-
-            await db.commit()
-
-            return {
-                "success": True,
-                "message": f"Deleted {len(old_logs)} old activity logs",
-                "deleted_count": len(old_logs),
-                "cleaned_at": datetime.now().isoformat()
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "failed_at": datetime.now().isoformat()
-            }
+    try:
+        results = await run_policies(["breaker_sync_logs", "breaker_activity_logs"])
+        deleted_count = sum(r["deleted"] for r in results)
+
+        return {
+            "success": True,
+            "message": f"Deleted {deleted_count} old activity logs",
+            "deleted_count": deleted_count,
+            "policies": results,
+            "requeued": await requeue_if_incomplete(cleanup_old_activity_logs, results),
+            "cleaned_at": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "failed_at": datetime.now().isoformat()
+        }
 
 
 @shared_task(name="breaker.enforce_breaker_room_state")
-def enforce_breaker_room_state():
+@async_task
+async def enforce_breaker_room_state():
     """
     Celery task: Enforce breaker state matches room status.
 
@@ -439,110 +365,17 @@ def enforce_breaker_room_state():
     Logic:
     - Find breakers that are ON + auto_control_enabled + linked to a room
     - Check if room status should have breaker OFF
-    - If breaker has been ON for >= 10 minutes (via last_state_update), turn OFF
+    - If breaker has been ON for >= 10 minutes (via state_changed_at), turn OFF
     """
-    import asyncio
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(_async_enforce_breaker_room_state())
-    finally:
-        loop.close()
+    return await _async_enforce_breaker_room_state()
 
 
 async def _async_enforce_breaker_room_state():
     """Async implementation of enforce_breaker_room_state"""
-    OVERRIDE_TIMEOUT_MINUTES = 10
-
     async with AsyncSessionLocal() as db:
         try:
-            cutoff_time = datetime.now() - timedelta(minutes=OVERRIDE_TIMEOUT_MINUTES)
-
-            # Find breakers that are ON, auto-controlled, linked to a room,
-            # and last_state_update is older than 10 minutes ago
-            stmt = (
-                select(HomeAssistantBreaker)
-                .options(selectinload(HomeAssistantBreaker.room))
-                .where(and_(
-                    HomeAssistantBreaker.is_active == True,
-                    HomeAssistantBreaker.auto_control_enabled == True,
-                    HomeAssistantBreaker.is_available == True,
-                    HomeAssistantBreaker.current_state == BreakerState.ON,
-                    HomeAssistantBreaker.room_id.isnot(None),
-                    HomeAssistantBreaker.last_state_update <= cutoff_time,
-                ))
-            )
-
-            result = await db.execute(stmt)
-            breakers = list(result.scalars().all())
-
-            if not breakers:
-                return {
-                    "success": True,
-                    "message": "No mismatched breakers found",
-                    "turned_off": 0
-                }
-
-            # Room statuses that require breaker OFF
-            off_statuses = [
-                RoomStatus.AVAILABLE,
-                RoomStatus.RESERVED,
-                RoomStatus.OUT_OF_SERVICE,
-            ]
-
             breaker_service = BreakerService(db)
-            turned_off_count = 0
-
-            for breaker in breakers:
-                if not breaker.room:
-                    continue
-
-                if breaker.room.status not in off_statuses:
-                    continue
-
-                # Mismatch: breaker ON but room should be OFF, for > 10 min
-                logger.info(
-                    f"[BREAKER ENFORCE] Mismatch detected: breaker {breaker.id} "
-                    f"(entity={breaker.entity_id}) is ON but room {breaker.room.room_number} "
-                    f"is {breaker.room.status.value}. ON since {breaker.last_state_update}. "
-                    f"Auto turning OFF after {OVERRIDE_TIMEOUT_MINUTES} min override timeout."
-                )
-
-                try:
-                    await breaker_service.turn_off(
-                        breaker_id=breaker.id,
-                        trigger_type=TriggerType.SYSTEM,
-                        triggered_by=None,
-                        room_status_before=breaker.room.status.value,
-                        room_status_after=breaker.room.status.value,
-                    )
-                    turned_off_count += 1
-
-                    await websocket_manager.broadcast({
-                        "event": "breaker_state_changed",
-                        "data": {
-                            "breaker_id": breaker.id,
-                            "entity_id": breaker.entity_id,
-                            "new_state": "OFF",
-                            "trigger_type": "SYSTEM",
-                            "reason": "enforce_room_state",
-                            "room_number": breaker.room.room_number,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    })
-
-                except Exception as e:
-                    logger.error(
-                        f"[BREAKER ENFORCE] Failed to turn off breaker {breaker.id}: {e}",
-                        exc_info=True
-                    )
-
-            return {
-                "success": True,
-                "message": f"Enforced {turned_off_count} breakers",
-                "turned_off": turned_off_count,
-                "checked_at": datetime.now().isoformat()
-            }
+            return await breaker_service.enforce_room_state()
 
         except Exception as e:
             logger.error(f"[BREAKER ENFORCE] Task failed: {e}", exc_info=True)
@@ -35,23 +35,42 @@ celery_app.conf.beat_schedule = {
         'task': 'booking.check_booking_check_in_times',
         'schedule': crontab(minute='*/30'),
     },
+    # Phase 8: Backfill materialized daily occupancy for the last 7 days
+    # Runs daily at 00:15 Thai time
+    'backfill-daily-occupancy': {
+        'task': 'report.backfill_daily_occupancy',
+        'schedule': crontab(hour=0, minute=15),
+    },
     # Phase 8: Send daily summary report
     # Runs every day at 8:00 AM Thai time
     'send-daily-summary-report': {
         'task': 'send_daily_summary_report',
         'schedule': crontab(hour=8, minute=0),
     },
+    # Holidays: Refresh stored public holidays for this year and next
+    # Runs weekly on Monday at 2:00 AM
+    'refresh-public-holidays': {
+        'task': 'holidays.refresh_public_holidays',
+        'schedule': crontab(hour=2, minute=0, day_of_week=1),
+    },
     # Breaker: Sync all breaker states from Home Assistant
     # Runs every 10 seconds
     'sync-all-breaker-states': {
         'task': 'breaker.sync_all_breaker_states',
         'schedule': 10.0,  # Every 10 seconds
     },
-    # Breaker: Process control queue (debouncing and retries)
-    # Runs every 5 seconds
-    'process-breaker-control-queue': {
-        'task': 'breaker.process_control_queue',
-        'schedule': 5.0,  # Every 5 seconds
+    # Breaker: Dispatch auto-control outbox (safety net; normally kicked on commit)
+    # Runs every 30 seconds
+    'dispatch-breaker-command-outbox': {
+        'task': 'breaker.dispatch_command_outbox',
+        'schedule': 30.0,  # Every 30 seconds
+    },
+    # Telegram: Send queued notifications and due retries (safety net;
+    # normally kicked on enqueue)
+    # Runs every 15 seconds
+    'dispatch-telegram-outbox': {
+        'task': 'telegram.dispatch_outbox',
+        'schedule': 15.0,  # Every 15 seconds
     },
     # Breaker: Health check for Home Assistant and breakers
     # Runs every 5 minutes
@@ -59,30 +78,32 @@ celery_app.conf.beat_schedule = {
         'task': 'breaker.health_check',
         'schedule': crontab(minute='*/5'),
     },
-    # Breaker: Clean up old queue items (older than 7 days)
+    # Breaker: Clean up old queue items (RETENTION_BREAKER_QUEUE_DAYS)
     # Runs daily at 3:00 AM
     'cleanup-old-breaker-queue-items': {
         'task': 'breaker.cleanup_old_queue_items',
         'schedule': crontab(hour=3, minute=0),
     },
-    # Breaker: Clean up old activity logs (older than 90 days)
+    # Breaker: Clean up old activity logs (sync successes, then everything past retention)
     # Runs weekly on Sunday at 4:00 AM
     'cleanup-old-breaker-activity-logs': {
         'task': 'breaker.cleanup_old_activity_logs',
         'schedule': crontab(hour=4, minute=0, day_of_week=0),
     },
-    # Overtime: Check and process overtime temporary stays
-    # Runs every 1 minute to detect 3-hour limit violations
-    'check-and-process-overtime': {
-        'task': 'overtime.check_and_process_overtime',
-        'schedule': 60.0,  # Every 60 seconds (1 minute)
+    # Retention: Purge read notifications / completed orders past retention
+    # Runs daily at 3:30 AM
+    'purge-expired-rows': {
+        'task': 'retention.purge_expired_rows',
+        'schedule': crontab(hour=3, minute=30),
     },
-    # Breaker: Enforce breaker-room state consistency
-    # If breaker is manually ON but room is AVAILABLE for > 10 min, auto-OFF
-    # Runs every 60 seconds
-    'enforce-breaker-room-state': {
-        'task': 'breaker.enforce_breaker_room_state',
+    # Hotel tick: overtime detection → breaker reconciliation → outbox dispatch
+    # over one rooms/check-ins/breakers snapshot (replaces the separate
+    # overtime and enforce-breaker-room-state jobs)
+    # Runs every 60 seconds; a tick not started within 50 s is dropped
+    'hotel-tick': {
+        'task': 'hotel.tick',
         'schedule': 60.0,  # Every 60 seconds (1 minute)
+        'options': {'expires': 50},
     },
 }
 
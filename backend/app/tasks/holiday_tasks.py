@@ -0,0 +1,60 @@
+"""
+Holiday Celery Tasks
+
+Keeps the local public holiday store (app/services/holiday_service.py)
+up to date, so the booking calendar never waits on the holiday API.
+"""
+import logging
+from datetime import datetime
+from typing import List, Optional
+from celery import shared_task
+
+from app.db.session import AsyncSessionLocal
+from app.services.holiday_service import HolidayService
+from app.core.datetime_utils import today_thailand
+from app.tasks.runtime import async_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="holidays.refresh_public_holidays")
+@async_task
+async def refresh_public_holidays(years: Optional[List[int]] = None):
+    """
+    Celery task: Refresh stored public holidays.
+
+    Schedule: Every Monday at 02:00 Thai time (this year and next); also
+    queued by the calendar when a year is missing or stale
+
+    Args:
+        years: Years to refresh (default: this year and next)
+    """
+    return await _async_refresh_public_holidays(years)
+
+
+async def _async_refresh_public_holidays(years: Optional[List[int]]):
+    """Async implementation of refresh_public_holidays"""
+    if not years:
+        this_year = today_thailand().year
+        years = [this_year, this_year + 1]
+
+    refreshed, failed = {}, {}
+    for year in years:
+        async with AsyncSessionLocal() as db:
+            try:
+                refreshed[year] = await HolidayService(db).refresh_year(year)
+            except Exception as e:
+                # Keep the stored (or bundled) holidays until the next run
+                await db.rollback()
+                logger.warning("Public holiday refresh for %s failed: %s", year, e)
+                failed[year] = str(e)
+
+    if refreshed:
+        logger.info("Public holidays refreshed: %s", refreshed)
+
+    return {
+        "success": not failed,
+        "refreshed": refreshed,
+        "failed": failed,
+        "processed_at": datetime.now().isoformat()
+    }
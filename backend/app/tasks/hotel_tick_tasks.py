@@ -0,0 +1,227 @@
+"""
+Hotel Tick Celery Task
+
+One per-minute pipeline replacing the separate overtime and breaker
+enforcement beat jobs, which each opened a session and re-read rooms,
+check-ins and breakers every minute.
+
+Each tick loads a snapshot once:
+- active rooms
+- CHECKED_IN stays (with customer)
+- active breakers
+
+and runs the stages over it in order:
+1. overtime   - flag TEMPORARY stays past checkout, rooms → OCCUPIED_OVERTIME
+2. reconcile  - turn OFF breakers left ON in rooms that should be dark
+3. dispatch   - drain the breaker command outbox (including the cutoffs
+                queued by stage 1)
+
+Stage timings are kept in Redis (hotel:tick:metrics) and served by
+GET /api/v1/settings/hotel-tick/metrics. A Redis lock stops a
+slow tick from overlapping the next one; the beat entry also expires
+queued ticks so they never stack up behind a stalled worker.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple
+
+from celery import shared_task
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.db.session import AsyncSessionLocal
+from app.models.check_in import CheckIn, CheckInStatusEnum
+from app.models.home_assistant import HomeAssistantBreaker
+from app.models.room import Room
+from app.services.breaker_service import BreakerService
+from app.services.overtime_service import OvertimeService
+from app.core.datetime_utils import now_thailand
+from app.core.redis import get_redis
+from app.tasks.breaker_tasks import _async_dispatch_command_outbox
+from app.tasks.overtime_tasks import _send_overtime_notifications
+from app.tasks.runtime import async_task
+
+logger = logging.getLogger(__name__)
+
+TICK_LOCK_KEY = "hotel:tick:lock"
+TICK_LOCK_TIMEOUT_SECONDS = 55
+METRICS_KEY = "hotel:tick:metrics"
+
+
+class HotelSnapshot(NamedTuple):
+    """Rows every stage of one tick works from"""
+    rooms_by_id: Dict[int, Room]
+    check_ins: List[CheckIn]
+    breakers: List[HomeAssistantBreaker]
+
+
+async def load_snapshot(db) -> HotelSnapshot:
+    """Load rooms, current stays and breakers with one query each"""
+    rooms = (await db.execute(select(Room).where(Room.is_active == True))).scalars().all()
+
+    check_ins = (await db.execute(
+        select(CheckIn)
+        .options(selectinload(CheckIn.customer))
+        .where(CheckIn.status == CheckInStatusEnum.CHECKED_IN)
+    )).scalars().all()
+
+    breakers = (await db.execute(
+        select(HomeAssistantBreaker).where(HomeAssistantBreaker.is_active == True)
+    )).scalars().all()
+
+    return HotelSnapshot(
+        rooms_by_id={room.id: room for room in rooms},
+        check_ins=list(check_ins),
+        breakers=list(breakers)
+    )
+
+
+@shared_task(name="hotel.tick")
+@async_task
+async def hotel_tick():
+    """
+    Celery task: Run the per-minute hotel pipeline.
+
+    Schedule: Every 60 seconds (expires after 50 s if not started)
+
+    Actions:
+    - Load rooms / check-ins / breakers once
+    - Overtime detection, breaker reconciliation, outbox dispatch
+    - Record per-stage timings
+    """
+    return await _async_hotel_tick()
+
+
+async def _async_hotel_tick() -> Dict[str, Any]:
+    """Async implementation of hotel_tick"""
+    lock = get_redis().lock(TICK_LOCK_KEY, timeout=TICK_LOCK_TIMEOUT_SECONDS, blocking=False)
+    try:
+        acquired = await lock.acquire()
+    except Exception as e:
+        logger.warning("Hotel tick lock unavailable, running unlocked: %s", e)
+        lock, acquired = None, True
+
+    if not acquired:
+        logger.warning("Previous hotel tick still running, skipping this tick")
+        await _record_skip()
+        return {"success": True, "skipped": True}
+
+    timings: Dict[str, float] = {}
+    results: Dict[str, Any] = {}
+    tick_started = time.perf_counter()
+
+    try:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            snapshot = await load_snapshot(db)
+            timings["snapshot"] = _elapsed_ms(started)
+
+            started = time.perf_counter()
+            try:
+                now = now_thailand()
+                overtime_service = OvertimeService(db)
+                candidates = [c for c in snapshot.check_ins if overtime_service.is_newly_overtime(c, now)]
+                results["overtime"] = await overtime_service.process_overtime_stays(
+                    candidates, now, notify_dispatcher=False
+                )
+                if results["overtime"]["rooms_updated"] > 0:
+                    await _send_overtime_notifications(results["overtime"]["processed_check_ins"], db)
+            except Exception as e:
+                logger.error("Hotel tick overtime stage failed: %s", e, exc_info=True)
+                results["overtime"] = {"success": False, "error": str(e)}
+            timings["overtime"] = _elapsed_ms(started)
+
+            started = time.perf_counter()
+            try:
+                if results["overtime"].get("failed_check_ins") or not results["overtime"].get("success"):
+                    # A rollback expired the snapshot rows; reload them
+                    snapshot = await load_snapshot(db)
+                results["reconcile"] = await BreakerService(db).enforce_room_state(
+                    breakers=snapshot.breakers,
+                    rooms_by_id=snapshot.rooms_by_id
+                )
+            except Exception as e:
+                logger.error("Hotel tick reconcile stage failed: %s", e, exc_info=True)
+                results["reconcile"] = {"success": False, "error": str(e)}
+            timings["reconcile"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        results["dispatch"] = await _async_dispatch_command_outbox()
+        timings["dispatch"] = _elapsed_ms(started)
+
+    except Exception as e:
+        logger.error("Hotel tick failed: %s", e, exc_info=True)
+        return {
+            "success": False,
+            "error": str(e),
+            "failed_at": datetime.now().isoformat()
+        }
+    finally:
+        if lock is not None:
+            try:
+                await lock.release()
+            except Exception:
+                pass  # Lock already expired
+
+    timings["total"] = _elapsed_ms(tick_started)
+    await _record_timings(timings)
+
+    return {
+        "success": True,
+        "timings_ms": timings,
+        "rooms": len(snapshot.rooms_by_id),
+        "check_ins": len(snapshot.check_ins),
+        "breakers": len(snapshot.breakers),
+        "overtime_rooms": results["overtime"].get("rooms_updated", 0),
+        "breakers_turned_off": results["reconcile"].get("turned_off", 0),
+        "outbox_dispatched": results["dispatch"].get("dispatched", 0),
+        "ticked_at": datetime.now().isoformat()
+    }
+
+
+async def get_tick_metrics() -> Dict[str, Dict[str, float]]:
+    """
+    Per-stage timings since the counters were created
+
+    Returns:
+        {"overtime": {"runs": 10, "last_ms": 4.2, "avg_ms": 3.9, "max_ms": 12.0}, ...,
+         "ticks": {"skipped": 0}}
+    """
+    raw = await get_redis().hgetall(METRICS_KEY)
+    metrics: Dict[str, Dict[str, float]] = {}
+    for field, value in raw.items():
+        stage, _, counter = field.rpartition(":")
+        metrics.setdefault(stage, {})[counter] = float(value)
+    for stage in metrics.values():
+        if stage.get("runs"):
+            stage["avg_ms"] = round(stage.pop("total_ms", 0) / stage["runs"], 1)
+    return metrics
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _record_timings(timings: Dict[str, float]):
+    """Update last/total/max/runs per stage, ignoring Redis errors"""
+    try:
+        redis = get_redis()
+        current_max = await redis.hmget(METRICS_KEY, [f"{stage}:max_ms" for stage in timings])
+        pipe = redis.pipeline(transaction=False)
+        for (stage, elapsed), previous_max in zip(timings.items(), current_max, strict=True):
+            pipe.hincrby(METRICS_KEY, f"{stage}:runs", 1)
+            pipe.hincrbyfloat(METRICS_KEY, f"{stage}:total_ms", elapsed)
+            pipe.hset(METRICS_KEY, f"{stage}:last_ms", elapsed)
+            if previous_max is None or elapsed > float(previous_max):
+                pipe.hset(METRICS_KEY, f"{stage}:max_ms", elapsed)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to record hotel tick metrics: %s", e)
+
+
+async def _record_skip():
+    try:
+        await get_redis().hincrby(METRICS_KEY, "ticks:skipped", 1)
+    except Exception:
+        pass
@@ -8,12 +8,14 @@ import logging
 
 from app.db.session import AsyncSessionLocal
 from app.services.overtime_service import OvertimeService
+from app.tasks.runtime import async_task
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(name="overtime.check_and_process_overtime")
-def check_and_process_overtime():
+@async_task
+async def check_and_process_overtime():
     """
     Celery task: Check and process overtime temporary stays
 
@@ -32,8 +34,7 @@ def check_and_process_overtime():
     Returns:
         Dict with processing results
     """
-    import asyncio
-    return asyncio.run(_async_check_and_process_overtime())
+    return await _async_check_and_process_overtime()
 
 
 async def _async_check_and_process_overtime():
@@ -69,61 +70,60 @@ async def _async_check_and_process_overtime():
 
 async def _send_overtime_notifications(check_in_ids: list, db):
     """
-    Send Telegram notifications for overtime stays
+    Queue one Telegram digest for the stays that went overtime
 
     Args:
         check_in_ids: List of check-in IDs that went overtime
         db: Database session
     """
     try:
+        from html import escape
+        from sqlalchemy import select
+        from sqlalchemy.orm import selectinload
         from app.services.telegram_service import TelegramService
         from app.models.check_in import CheckIn
-        from sqlalchemy.orm import selectinload
 
-        telegram_service = TelegramService(db)
-
-        for check_in_id in check_in_ids:
-            # Fetch check-in with relationships
-            check_in = await db.get(
-                CheckIn,
-                check_in_id,
-                options=[
-                    selectinload(CheckIn.room),
-                    selectinload(CheckIn.customer)
-                ]
-            )
-
-            if not check_in:
-                continue
+        result = await db.execute(
+            select(CheckIn)
+            .options(selectinload(CheckIn.room), selectinload(CheckIn.customer))
+            .where(CheckIn.id.in_(check_in_ids))
+        )
+        check_ins = result.scalars().all()
 
+        messages = []
+        for check_in in check_ins:
             # Format overtime duration
-            hours = check_in.overtime_minutes // 60
-            mins = check_in.overtime_minutes % 60
+            overtime_minutes = check_in.overtime_minutes or 0
+            hours = overtime_minutes // 60
+            mins = overtime_minutes % 60
             overtime_str = f"{hours} ชั่วโมง {mins} นาที" if hours > 0 else f"{mins} นาที"
 
-            # Prepare message
-            message = f"""⚠️ **หมดเวลาเข้าพัก - ตัดไฟอัตโนมัติ**
-
-🏠 ห้อง: {check_in.room.room_number}
-👤 ลูกค้า: {check_in.customer.full_name if check_in.customer else 'N/A'}
-📞 โทร: {check_in.customer.phone_number if check_in.customer else 'N/A'}
-⏰ เข้าพัก: {check_in.check_in_time.strftime('%H:%M น.')}
-⏰ หมดเวลา: {check_in.expected_check_out_time.strftime('%H:%M น.')}
-⏱️ เกินเวลามาแล้ว: {overtime_str}
-
-🔌 **ระบบได้ตัดไฟห้องอัตโนมัติแล้ว**
-
-กรุณาติดต่อลูกค้าเพื่อดำเนินการ Check-out หรือเปลี่ยนประเภทการเข้าพัก
-"""
+            customer = check_in.customer
+            messages.append(
+                f"🏠 ห้อง: <b>{escape(check_in.room.room_number)}</b>\n"
+                f"👤 ลูกค้า: {escape(customer.full_name or '') if customer else 'N/A'}\n"
+                f"📞 โทร: {escape(customer.phone_number or '') if customer else 'N/A'}\n"
+                f"⏰ เข้าพัก: {check_in.check_in_time.strftime('%H:%M น.')}\n"
+                f"⏰ หมดเวลา: {check_in.expected_check_out_time.strftime('%H:%M น.')}\n"
+                f"⏱️ เกินเวลามาแล้ว: {overtime_str}"
+            )
 
-            # Send to admin and reception groups
-            await telegram_service.send_notification(
-                message=message,
-                target_roles=["ADMIN", "RECEPTION"],
-                notification_type="overtime_alert"
+        if not messages:
+            return
+
+        # Admin and reception each get one message for all rooms in the burst
+        await TelegramService(db).send_notifications(
+            messages,
+            target_roles=["ADMIN", "RECEPTION"],
+            notification_type="overtime_alert",
+            title="⚠️ <b>หมดเวลาเข้าพัก - ตัดไฟอัตโนมัติ</b>",
+            footer=(
+                "🔌 <b>ระบบได้ตัดไฟห้องอัตโนมัติแล้ว</b>\n\n"
+                "กรุณาติดต่อลูกค้าเพื่อดำเนินการ Check-out หรือเปลี่ยนประเภทการเข้าพัก"
             )
+        )
 
-            logger.info("Sent overtime notification for Check-in #%d, Room %s", check_in_id, check_in.room.room_number)
+        logger.info("Queued overtime notifications for %d check-ins", len(messages))
 
     except Exception as e:
         logger.exception("Error sending overtime notifications: %s", str(e))
@@ -8,16 +8,19 @@ from sqlalchemy import select
 from app.tasks.celery_app import celery_app
 from app.db.session import AsyncSessionLocal
 from app.services.reports_service import ReportsService
+from app.services.occupancy_service import OccupancyService
 from app.services.settings_service import SettingsService
 from app.services.telegram_service import TelegramService
-import asyncio
+from app.core.datetime_utils import today_thailand
+from app.tasks.runtime import async_task
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 @celery_app.task(name="send_daily_summary_report")
-def send_daily_summary_report():
+@async_task
+async def send_daily_summary_report():
     """
     Send daily summary report to admin group via Telegram
 
@@ -29,7 +32,7 @@ def send_daily_summary_report():
     - Occupancy rate (yesterday)
     - New bookings (yesterday)
     """
-    asyncio.run(_send_daily_summary_report_async())
+    await _send_daily_summary_report_async()
 
 
 async def _send_daily_summary_report_async():
@@ -48,58 +51,82 @@ async def _send_daily_summary_report_async():
             settings_service = SettingsService(db)
             telegram_settings = await settings_service.get_telegram_settings()
 
-            if not telegram_settings.get('enabled'):
+            if not telegram_settings.enabled:
                 logger.info("Telegram is disabled, skipping daily summary")
                 return
 
-            admin_chat_id = telegram_settings.get('admin_chat_id')
-            if not admin_chat_id:
+            if not telegram_settings.admin_chat_id:
                 logger.warning("No admin chat ID configured, skipping daily summary")
                 return
 
+            general_settings = await settings_service.get_general_settings()
+            average = summary.total_revenue / summary.total_checkins if summary.total_checkins > 0 else 0
+
             # Format message
             message = f"""
-📊 **สรุปประจำวัน** - {yesterday.strftime('%d/%m/%Y')}
+📊 <b>สรุปประจำวัน</b> - {yesterday.strftime('%d/%m/%Y')}
 
-💰 **รายได้**
+💰 <b>รายได้</b>
    └ รวม: ฿{summary.total_revenue:,.2f}
-   └ เฉลี่ย/รายการ: ฿{summary.total_revenue / summary.total_checkins if summary.total_checkins > 0 else 0:,.2f}
+   └ เฉลี่ย/รายการ: ฿{average:,.2f}
 
-🏨 **อัตราเข้าพัก**
+🏨 <b>อัตราเข้าพัก</b>
    └ {summary.occupancy_rate:.1f}% ของห้องทั้งหมด
 
-📥 **เช็คอิน/เช็คเอาท์**
+📥 <b>เช็คอิน/เช็คเอาท์</b>
    └ เช็คอิน: {summary.total_checkins} ครั้ง
    └ เช็คเอาท์: {summary.total_checkouts} ครั้ง
 
-📅 **การจอง**
+📅 <b>การจอง</b>
    └ การจองใหม่: {summary.total_bookings} รายการ
 
-👥 **ลูกค้า**
+👥 <b>ลูกค้า</b>
    └ ลูกค้าใหม่: {summary.new_customers} คน
 
 ---
 ⏰ รายงาน ณ เวลา: {datetime.now().strftime('%H:%M น.')}
-🔗 ดูรายละเอียดเพิ่มเติม: [Dashboard](http://localhost:5173/reports)
+🔗 ดูรายละเอียดเพิ่มเติม: <a href="{general_settings.frontend_domain}/reports">Dashboard</a>
             """.strip()
 
-            # Send via Telegram
+            # Queue for the Telegram dispatcher
             telegram_service = TelegramService(db)
-            bot_token = telegram_settings.get('bot_token')
-
-            if bot_token:
-                success = await telegram_service.send_message_direct(
-                    bot_token=bot_token,
-                    chat_id=admin_chat_id,
-                    message=message
-                )
-
-                if success:
-                    logger.info("Daily summary sent successfully for %s", yesterday)
-                else:
-                    logger.error("Failed to send daily summary for %s", yesterday)
+            if await telegram_service.send_notification(message, target_roles=["ADMIN"]):
+                logger.info("Daily summary queued for %s", yesterday)
             else:
-                logger.warning("No bot token configured")
+                logger.error("Failed to queue daily summary for %s", yesterday)
 
         except Exception as e:
             logger.exception("Error sending daily summary report: %s", str(e))
+
+
+@shared_task(name="report.backfill_daily_occupancy")
+@async_task
+async def backfill_daily_occupancy(days: int = 7):
+    """
+    Re-derive the materialized daily occupancy rows for recent days
+
+    Schedule: Every day at 00:15 Thai time
+
+    Heals any gap left by a failed incremental refresh after check-in or
+    check-out, and stores yesterday's final value.
+    """
+    return await _backfill_daily_occupancy_async(days)
+
+
+async def _backfill_daily_occupancy_async(days: int) -> dict:
+    """Async implementation of daily occupancy backfill"""
+    async with AsyncSessionLocal() as db:
+        try:
+            end_date = today_thailand()
+            start_date = end_date - timedelta(days=days)
+
+            written = await OccupancyService(db).refresh_days(start_date, end_date)
+            logger.info(
+                "Daily occupancy backfill %s..%s: %d rows written",
+                start_date, end_date, written
+            )
+            return {"success": True, "rows_written": written}
+
+        except Exception as e:
+            logger.exception("Error backfilling daily occupancy: %s", str(e))
+            return {"success": False, "error": str(e)}
@@ -0,0 +1,226 @@
+"""
+Retention Engine
+Set-based, chunked purges of expired rows for the cleanup tasks
+
+Each policy names a table, the timestamp column that ages its rows, how
+many days to keep and optional extra filters. A purge finds the id range of
+the expired rows once, then walks it with bounded
+`DELETE ... WHERE id BETWEEN :low AND :high AND <age/filters>` batches,
+committing after each batch, so no statement holds locks for long.
+
+A run stops starting batches after RETENTION_MAX_SECONDS so it never holds
+the (solo) worker for long; the calling task then re-queues itself with
+requeue_if_incomplete and the next run picks up where this one stopped.
+
+Retention days are configured with the RETENTION_* settings; 0 keeps rows
+forever.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.home_assistant import (
+    BreakerControlQueue,
+    BreakerActivityLog,
+    BreakerAction,
+    ActionStatus,
+    QueueStatus
+)
+from app.models.notification import Notification
+from app.models.order import Order, OrderStatusEnum
+
+logger = logging.getLogger(__name__)
+
+# Log progress every N batches
+PROGRESS_LOG_EVERY = 20
+
+
+class RetentionPolicy(NamedTuple):
+    """What to purge from one table"""
+    name: str
+    model: Any
+    age_column: Any
+    retention_days: Callable[[], int]
+    filters: Tuple = ()
+    utc: bool = False  # age_column stores UTC (datetime.utcnow defaults)
+
+
+POLICIES: Dict[str, RetentionPolicy] = {
+    policy.name: policy
+    for policy in (
+        RetentionPolicy(
+            name="breaker_queue",
+            model=BreakerControlQueue,
+            age_column=BreakerControlQueue.created_at,
+            retention_days=lambda: settings.RETENTION_BREAKER_QUEUE_DAYS,
+            filters=(BreakerControlQueue.status.in_([QueueStatus.COMPLETED, QueueStatus.FAILED]),),
+        ),
+        RetentionPolicy(
+            # Counts and latency are kept in breaker_sync_rollups
+            name="breaker_sync_logs",
+            model=BreakerActivityLog,
+            age_column=BreakerActivityLog.created_at,
+            retention_days=lambda: settings.RETENTION_BREAKER_SYNC_LOG_DAYS,
+            filters=(
+                BreakerActivityLog.action == BreakerAction.STATUS_SYNC,
+                BreakerActivityLog.status == ActionStatus.SUCCESS,
+            ),
+        ),
+        RetentionPolicy(
+            name="breaker_activity_logs",
+            model=BreakerActivityLog,
+            age_column=BreakerActivityLog.created_at,
+            retention_days=lambda: settings.RETENTION_BREAKER_ACTIVITY_LOG_DAYS,
+        ),
+        RetentionPolicy(
+            name="notifications",
+            model=Notification,
+            age_column=Notification.created_at,
+            retention_days=lambda: settings.RETENTION_NOTIFICATION_DAYS,
+            filters=(Notification.is_read == True,),
+            utc=True,
+        ),
+        RetentionPolicy(
+            name="orders",
+            model=Order,
+            age_column=Order.created_at,
+            retention_days=lambda: settings.RETENTION_ORDER_DAYS,
+            filters=(Order.status == OrderStatusEnum.COMPLETED,),
+            utc=True,
+        ),
+    )
+}
+
+
+async def purge_policy(
+    db: AsyncSession,
+    policy: RetentionPolicy,
+    batch_size: Optional[int] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Delete the rows a policy has expired, one id range per transaction
+
+    Args:
+        db: Database session (committed after every batch)
+        policy: Policy to apply
+        batch_size: Width of each id range (default RETENTION_BATCH_SIZE)
+        deadline: time.monotonic() value after which the purge stops early;
+            the rest is picked up by the next run
+
+    Returns:
+        Progress metrics for the policy
+    """
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+
+    days = policy.retention_days()
+    metrics: Dict[str, Any] = {
+        "policy": policy.name,
+        "table": policy.model.__tablename__,
+        "retention_days": days,
+        "deleted": 0,
+        "batches": 0,
+        "completed": True,
+        "elapsed_ms": 0,
+    }
+    if days <= 0:
+        metrics["skipped"] = True
+        return metrics
+
+    now = datetime.utcnow() if policy.utc else datetime.now()
+    cutoff = now - timedelta(days=days)
+    metrics["cutoff"] = cutoff.isoformat()
+    conditions = [policy.age_column < cutoff, *policy.filters]
+
+    id_column = policy.model.id
+    result = await db.execute(
+        select(func.min(id_column), func.max(id_column)).where(*conditions)
+    )
+    low, high = result.one()
+    started = time.monotonic()
+
+    while low is not None and low <= high:
+        if deadline is not None and time.monotonic() >= deadline:
+            metrics["completed"] = False
+            break
+
+        upper = min(low + batch_size - 1, high)
+        result = await db.execute(
+            delete(policy.model)
+            .where(id_column.between(low, upper), *conditions)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+        metrics["deleted"] += result.rowcount or 0
+        metrics["batches"] += 1
+        low = upper + 1
+
+        if metrics["batches"] % PROGRESS_LOG_EVERY == 0:
+            logger.info(
+                "Retention %s: %s rows in %s batches, at id %s of %s",
+                policy.name, metrics["deleted"], metrics["batches"], low, high
+            )
+
+    elapsed = time.monotonic() - started
+    metrics["elapsed_ms"] = int(elapsed * 1000)
+    metrics["rows_per_second"] = int(metrics["deleted"] / elapsed) if elapsed > 0 else None
+    logger.info(
+        "Retention %s: deleted %s rows older than %s in %s batches (%s ms)",
+        policy.name, metrics["deleted"], cutoff, metrics["batches"], metrics["elapsed_ms"]
+    )
+    return metrics
+
+
+async def run_policies(names: Sequence[str], max_seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Apply several policies in order with one shared time budget
+
+    Args:
+        names: Keys of POLICIES
+        max_seconds: Stop starting new batches after this many seconds
+            (default RETENTION_MAX_SECONDS)
+
+    Returns:
+        Metrics per policy
+    """
+    if max_seconds is None:
+        max_seconds = settings.RETENTION_MAX_SECONDS
+    deadline = time.monotonic() + max_seconds
+
+    results = []
+    async with AsyncSessionLocal() as db:
+        for name in names:
+            results.append(await purge_policy(db, POLICIES[name], deadline=deadline))
+    return results
+
+
+async def requeue_if_incomplete(task, results: List[Dict[str, Any]], **kwargs) -> bool:
+    """
+    Queue another run of `task` when the time budget cut a purge short
+
+    Publishing runs in a thread so a slow broker never blocks the event loop.
+
+    Args:
+        task: Celery task that ran the policies
+        results: Metrics returned by run_policies
+        **kwargs: Task arguments for the next run
+
+    Returns:
+        True if another run was queued
+    """
+    if all(result["completed"] for result in results):
+        return False
+    try:
+        await asyncio.to_thread(task.apply_async, kwargs=kwargs, retry=False)
+    except Exception as e:
+        logger.warning("Failed to re-queue %s, the next scheduled run continues: %s", task.name, e)
+        return False
+    return True
@@ -0,0 +1,48 @@
+"""
+Retention Celery Tasks
+
+Purges expired notifications and orders with the chunked retention engine
+(breaker tables are purged by the breaker cleanup tasks).
+"""
+import logging
+from typing import List, Optional
+from celery import shared_task
+
+from app.tasks.retention import run_policies, requeue_if_incomplete, POLICIES
+from app.tasks.runtime import async_task
+
+logger = logging.getLogger(__name__)
+
+# Policies not already covered by the breaker cleanup tasks
+DEFAULT_POLICIES = ["notifications", "orders"]
+
+
+@shared_task(name="retention.purge_expired_rows")
+@async_task
+async def purge_expired_rows(policies: Optional[List[str]] = None):
+    """
+    Celery task: Delete expired rows for the given retention policies.
+
+    Schedule: Daily at 3:30 AM; re-queues itself if RETENTION_MAX_SECONDS
+    runs out before every policy is done
+
+    Args:
+        policies: Policy names from app.tasks.retention.POLICIES
+            (default: notifications and orders)
+    """
+    names = policies or DEFAULT_POLICIES
+    unknown = [name for name in names if name not in POLICIES]
+    if unknown:
+        return {"success": False, "error": f"Unknown retention policies: {unknown}"}
+
+    try:
+        results = await run_policies(names)
+        return {
+            "success": True,
+            "deleted_count": sum(r["deleted"] for r in results),
+            "policies": results,
+            "requeued": await requeue_if_incomplete(purge_expired_rows, results, policies=names)
+        }
+    except Exception as e:
+        logger.error("Retention purge failed: %s", e, exc_info=True)
+        return {"success": False, "error": str(e)}
@@ -0,0 +1,96 @@
+"""
+Celery Worker Async Runtime
+
+One event loop per worker process, kept for the life of the process, so
+the aiomysql pool, the Redis client and the Home Assistant HTTP session are
+opened once and reused by every task instead of being rebuilt (or, worse,
+reused from a closed loop) on each 10 s / 60 s tick.
+
+- worker_process_init: create the loop and a fresh engine for the forked
+  child (prefork pool)
+- worker_process_shutdown: close pools and the loop
+- async_task: decorator that turns an `async def` into a Celery task body
+  running on the worker loop
+
+With the solo pool (docker-compose) there is no fork; the loop is created
+on the first task. Tasks must not run concurrently in one process on this
+loop, so thread/gevent pools are not supported.
+
+Usage:
+    @shared_task(name="breaker.health_check")
+    @async_task
+    async def health_check():
+        return await _async_health_check()
+"""
+from functools import wraps
+from typing import Any, Awaitable, Callable, Coroutine, Optional, TypeVar
+import asyncio
+import logging
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from app.db import session as db_session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """The persistent event loop of this process (created lazily)"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion on the worker loop"""
+    return get_worker_loop().run_until_complete(coro)
+
+
+def async_task(func: Callable[..., Awaitable[T]]) -> Callable[..., T]:
+    """Decorator: expose an async function as a synchronous Celery task body"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return run_async(func(*args, **kwargs))
+    return wrapper
+
+
+@worker_process_init.connect
+def init_worker_runtime(**kwargs):
+    """Give the forked worker its own loop and database engine"""
+    global _loop
+    _loop = None
+    get_worker_loop()
+    db_session.rebind_engine()
+    logger.info("Worker async runtime initialised")
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_runtime(**kwargs):
+    """Close the shared pools and the loop"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+
+    from app.core.redis import close_redis
+    from app.core.home_assistant_client import ha_client
+    from app.core.telegram_dispatcher import telegram_dispatcher
+
+    async def close_pools():
+        await ha_client.close()
+        await telegram_dispatcher.close()
+        await close_redis()
+        await db_session.engine.dispose()
+
+    try:
+        _loop.run_until_complete(close_pools())
+    except Exception as e:
+        logger.warning("Failed to close worker pools cleanly: %s", e)
+    finally:
+        _loop.close()
+        _loop = None
@@ -0,0 +1,89 @@
+"""
+Telegram Celery Tasks
+
+Drains the outbound Telegram queue filled by request handlers and tasks
+(see app/core/telegram_dispatcher.py).
+"""
+import logging
+from datetime import datetime
+from celery import shared_task
+
+from app.core.redis import get_redis
+from app.core.telegram_dispatcher import telegram_dispatcher, OUTBOX_KEY
+from app.tasks.runtime import async_task
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_LOCK_KEY = "telegram:outbox:lock"
+DISPATCH_LOCK_TIMEOUT_SECONDS = 120
+# One run's whole budget, well under the lock timeout: a send that starts
+# just before the deadline can still wait for a rate-limit token and take
+# up to the request timeout
+DRAIN_MAX_SECONDS = 50
+
+
+@shared_task(name="telegram.dispatch_outbox")
+@async_task
+async def dispatch_outbox():
+    """
+    Celery task: Send queued Telegram notifications.
+
+    Schedule: Kicked on enqueue; every 15 seconds as a safety net and for
+    due retries
+
+    Actions:
+    - Coalesce queued messages per chat into digests
+    - Send them under per-chat and global rate limits
+    - Re-queue failures with backoff
+    - Re-queue itself when messages are left after DRAIN_MAX_SECONDS, so
+      other tasks on the worker get their turn
+    """
+    return await _async_dispatch_outbox()
+
+
+async def _async_dispatch_outbox():
+    """Async implementation of dispatch_outbox"""
+    lock = get_redis().lock(DISPATCH_LOCK_KEY, timeout=DISPATCH_LOCK_TIMEOUT_SECONDS, blocking=False)
+    try:
+        acquired = await lock.acquire()
+    except Exception as e:
+        logger.warning("Telegram outbox lock unavailable, running unlocked: %s", e)
+        lock, acquired = None, True
+
+    if not acquired:
+        # The running dispatcher re-queues itself if messages are left
+        return {"success": True, "skipped": True}
+
+    try:
+        result = await telegram_dispatcher.drain(max_seconds=DRAIN_MAX_SECONDS)
+    except Exception as e:
+        logger.error("Telegram outbox dispatch failed: %s", e, exc_info=True)
+        return {
+            "success": False,
+            "error": str(e),
+            "failed_at": datetime.now().isoformat()
+        }
+    finally:
+        if lock is not None:
+            try:
+                await lock.release()
+            except Exception:
+                pass  # Lock already expired
+
+    # Out of time, or a kick arrived while we held the lock and was skipped:
+    # run again as a new task instead of looping here
+    if await get_redis().llen(OUTBOX_KEY):
+        await telegram_dispatcher.notify_worker()
+
+    if result["sent"] or result["dropped"]:
+        logger.info(
+            "Telegram outbox: sent %d messages for %d queued (%d coalesced, %d retried, %d dropped, %d requeued)",
+            result["sent"], result["queued"], result["coalesced"], result["retried"], result["dropped"],
+            result["requeued"]
+        )
+
+    return {
+        "success": True,
+        **result,
+        "processed_at": datetime.now().isoformat()
+    }
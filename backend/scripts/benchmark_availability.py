@@ -0,0 +1,178 @@
+"""
+Room Availability Benchmark
+เปรียบเทียบการหาห้องว่างแบบเดิม (ตรวจทีละห้อง) กับ availability engine (interval index)
+
+Default: synthetic bookings for N rooms over D days, in memory.
+- per-room:  for every room and every night, scan that room's bookings
+             (what one overlap query per room per search amounts to)
+- engine:    AvailabilityIndex built once, then the room x night matrix
+
+--db: against the configured database (run scripts/seed_data.py first)
+- per-room:  BookingService.check_room_availability for every room and
+             every night (the client-side loop)
+- engine:    AvailabilityService.get_matrix for all rooms in one call
+
+Usage:
+    docker-compose exec backend python scripts/benchmark_availability.py
+    docker-compose exec backend python scripts/benchmark_availability.py --rooms 100 --days 365 --repeat 10
+    docker-compose exec backend python scripts/benchmark_availability.py --db --days 30
+
+Options:
+    --rooms N    Synthetic rooms (default: 100)
+    --days N     Nights in the searched range (default: 365)
+    --repeat N   Timed runs per path (default: 5)
+    --db         Use the configured database instead of synthetic data
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.datetime_utils import today_thailand
+from app.services.availability_service import (
+    AvailabilityIndex,
+    AvailabilityService,
+    StayInterval,
+    BOOKED,
+    FREE,
+)
+
+
+def synthetic_bookings(rooms: int, start, days: int):
+    """Back-to-back stays of 1-7 nights with gaps, ~60% occupancy"""
+    rng = random.Random(42)
+    by_room = {}
+    booking_id = 0
+    for room_id in range(1, rooms + 1):
+        day = start - timedelta(days=rng.randint(0, 5))
+        intervals = []
+        while day < start + timedelta(days=days):
+            day += timedelta(days=rng.randint(0, 4))
+            nights = rng.randint(1, 7)
+            booking_id += 1
+            intervals.append(StayInterval(day, day + timedelta(days=nights), BOOKED, booking_id=booking_id))
+            day += timedelta(days=nights)
+        by_room[room_id] = intervals
+    return by_room
+
+
+def per_room_matrix(by_room, start, days: int):
+    """Every night of every room checked against that room's bookings"""
+    matrix = {}
+    for room_id, intervals in by_room.items():
+        nights = []
+        for offset in range(days):
+            night = start + timedelta(days=offset)
+            taken = any(interval.start <= night < interval.end for interval in intervals)
+            nights.append(BOOKED if taken else FREE)
+        matrix[room_id] = nights
+    return matrix
+
+
+def engine_matrix(by_room, start, days: int):
+    """Index once, then sweep each room"""
+    index = AvailabilityIndex(by_room)
+    end = start + timedelta(days=days)
+    return {room_id: index.night_statuses(room_id, start, end) for room_id in by_room}
+
+
+def timed(func, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, result
+
+
+async def timed_async(func, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, result
+
+
+def summarize(name: str, timings):
+    print(f"   {name:10s} median {statistics.median(timings):10.2f} ms   max {max(timings):10.2f} ms")
+
+
+async def run_db(days: int, repeat: int) -> int:
+    from sqlalchemy import select
+    from app.db.session import AsyncSessionLocal
+    from app.models.room import Room
+    from app.services.booking_service import BookingService
+
+    start = today_thailand()
+    end = start + timedelta(days=days)
+
+    async with AsyncSessionLocal() as db:
+        room_ids = (await db.execute(select(Room.id).where(Room.is_active == True))).scalars().all()
+        print(f"   {len(room_ids)} rooms x {days} nights from {start}")
+
+        async def per_room():
+            service = BookingService(db)
+            free = {}
+            for room_id in room_ids:
+                free[room_id] = [
+                    await service.check_room_availability(room_id, start + timedelta(days=offset), start + timedelta(days=offset + 1))
+                    for offset in range(days)
+                ]
+            return free
+
+        async def engine():
+            return await AvailabilityService(db).get_matrix(start, end, room_ids)
+
+        legacy_ms, _ = await timed_async(per_room, repeat)
+        engine_ms, _ = await timed_async(engine, repeat)
+
+    summarize("per-room", legacy_ms)
+    summarize("engine", engine_ms)
+    print(f"\n   ⚡ {statistics.median(legacy_ms) / statistics.median(engine_ms):.1f}x faster")
+    return 0
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark room availability lookups")
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", action="store_true")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🏨 Availability benchmark")
+    print("=" * 70)
+
+    if args.db:
+        return await run_db(args.days, args.repeat)
+
+    start = today_thailand()
+    by_room = synthetic_bookings(args.rooms, start, args.days)
+    total = sum(len(intervals) for intervals in by_room.values())
+    print(f"   {args.rooms} rooms x {args.days} nights, {total} synthetic bookings")
+
+    legacy_ms, legacy = timed(lambda: per_room_matrix(by_room, start, args.days), args.repeat)
+    engine_ms, engine = timed(lambda: engine_matrix(by_room, start, args.days), args.repeat)
+
+    if legacy != engine:
+        print("\n❌ Engine matrix differs from the per-room result")
+        return 1
+
+    summarize("per-room", legacy_ms)
+    summarize("engine", engine_ms)
+    print(f"\n   ⚡ {statistics.median(legacy_ms) / statistics.median(engine_ms):.1f}x faster, results identical")
+    print("\n✅ Done")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
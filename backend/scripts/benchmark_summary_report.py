@@ -0,0 +1,210 @@
+"""
+Summary Report Benchmark
+เปรียบเทียบความเร็ว summary report แบบเดิม (เรียก sub-reports ทั้งหมด) กับแบบใหม่ (aggregate queries)
+
+Usage:
+    # Against the configured database (run scripts/seed_data.py first)
+    docker-compose exec backend python scripts/benchmark_summary_report.py
+
+    # Against a throwaway SQLite fixture seeded with synthetic stays (needs aiosqlite)
+    python scripts/benchmark_summary_report.py --sqlite /tmp/summary_bench.db --seed-days 365
+
+Options:
+    --start / --end   Report range (default: last 30 days)
+    --repeat N        Timed runs per path (default: 20)
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, func, and_, cast, Date
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import AsyncSessionLocal
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.models.user import User, UserRole
+from app.models.room_type import RoomType
+from app.models.room import Room, RoomStatus
+from app.models.customer import Customer
+from app.models.check_in import CheckIn, CheckInStatusEnum, PaymentMethodEnum, StayTypeEnum
+from app.models.payment import Payment
+from app.models.booking import Booking, BookingStatusEnum
+from app.services.reports_service import ReportsService
+from app.schemas.reports import SummaryReportResponse, QuickStat
+from app.core.datetime_utils import today_thailand
+
+
+async def legacy_summary_report(db, start_date: date, end_date: date) -> SummaryReportResponse:
+    """The previous get_summary_report: build every sub-report, keep a few numbers"""
+    service = ReportsService(db)
+
+    revenue_report = await service.get_revenue_report(start_date, end_date, "day")
+    total_revenue = revenue_report.total_revenue
+
+    occupancy_report = await service.get_occupancy_report(start_date, end_date)
+    occupancy_rate = occupancy_report.occupancy_rate
+
+    stmt = select(func.count(CheckIn.id)).where(
+        and_(
+            cast(CheckIn.check_in_time, Date) >= start_date,
+            cast(CheckIn.check_in_time, Date) <= end_date
+        )
+    )
+    total_checkins = (await db.execute(stmt)).scalar() or 0
+
+    stmt = select(func.count(CheckIn.id)).where(
+        and_(
+            CheckIn.status == CheckInStatusEnum.CHECKED_OUT,
+            cast(CheckIn.actual_check_out_time, Date) >= start_date,
+            cast(CheckIn.actual_check_out_time, Date) <= end_date
+        )
+    )
+    total_checkouts = (await db.execute(stmt)).scalar() or 0
+
+    booking_report = await service.get_booking_report(start_date, end_date)
+    customer_report = await service.get_customer_report(limit=10)
+
+    return SummaryReportResponse(
+        total_revenue=total_revenue,
+        occupancy_rate=occupancy_rate,
+        total_checkins=total_checkins,
+        total_checkouts=total_checkouts,
+        total_bookings=booking_report.total_bookings,
+        total_customers=customer_report.total_customers,
+        new_customers=customer_report.new_customers,
+        quick_stats=[
+            QuickStat(label="รายได้รวม", value=f"฿{total_revenue:,.2f}",
+                      trend="up" if total_revenue > 0 else "neutral"),
+            QuickStat(label="อัตราเข้าพัก", value=f"{occupancy_rate:.1f}%",
+                      trend="up" if occupancy_rate > 50 else "down"),
+            QuickStat(label="จำนวนเช็คอิน", value=str(total_checkins), trend="neutral"),
+            QuickStat(label="การจองทั้งหมด", value=str(booking_report.total_bookings), trend="neutral"),
+        ],
+        start_date=start_date,
+        end_date=end_date
+    )
+
+
+async def seed_fixture(session_factory, days: int):
+    """Create the schema and a year-ish of synthetic stays, payments and bookings"""
+    rng = random.Random(42)
+    today = today_thailand()
+
+    async with session_factory() as db:
+        user = User(username="bench", password_hash="x", full_name="Benchmark", role=UserRole.ADMIN)
+        room_type = RoomType(name="Standard", max_guests=2)
+        db.add_all([user, room_type])
+        await db.flush()
+
+        rooms = [
+            Room(room_number=f"{100 + i}", room_type_id=room_type.id, floor=1 + i // 10,
+                 status=rng.choice([RoomStatus.AVAILABLE, RoomStatus.OCCUPIED, RoomStatus.CLEANING]))
+            for i in range(30)
+        ]
+        customers = [Customer(full_name=f"Guest {i}", phone_number=f"08{i:08d}") for i in range(500)]
+        db.add_all(rooms + customers)
+        await db.flush()
+
+        for offset in range(days, 0, -1):
+            day = today - timedelta(days=offset)
+            for _ in range(rng.randint(5, 25)):
+                check_in_time = datetime.combine(day, datetime.min.time()) + timedelta(hours=rng.randint(12, 23))
+                stay_type = rng.choice(list(StayTypeEnum))
+                check_out_time = check_in_time + timedelta(hours=3 if stay_type == StayTypeEnum.TEMPORARY else 22)
+                amount = Decimal(rng.choice([300, 350, 500, 800, 1200]))
+                check_in = CheckIn(
+                    customer_id=rng.choice(customers).id, room_id=rng.choice(rooms).id,
+                    stay_type=stay_type, check_in_time=check_in_time,
+                    expected_check_out_time=check_out_time, actual_check_out_time=check_out_time,
+                    base_amount=amount, total_amount=amount,
+                    status=CheckInStatusEnum.CHECKED_OUT, created_by=user.id
+                )
+                db.add(check_in)
+                await db.flush()
+                db.add(Payment(
+                    check_in_id=check_in.id, amount=amount,
+                    payment_method=rng.choice(list(PaymentMethodEnum)),
+                    payment_time=check_out_time, created_by=user.id
+                ))
+            for _ in range(rng.randint(0, 5)):
+                db.add(Booking(
+                    customer_id=rng.choice(customers).id, room_id=rng.choice(rooms).id,
+                    check_in_date=day, check_out_date=day + timedelta(days=1),
+                    number_of_nights=1, total_amount=Decimal(800), deposit_amount=Decimal(200),
+                    status=rng.choice(list(BookingStatusEnum)), created_by=user.id
+                ))
+
+        await db.commit()
+
+
+async def time_path(session_factory, func_, start_date, end_date, repeat: int):
+    """Run one path `repeat` times with a fresh session each time"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            result = await func_(db, start_date, end_date)
+            timings.append((time.perf_counter() - started) * 1000)
+    return result, timings
+
+
+async def new_summary_report(db, start_date, end_date):
+    return await ReportsService(db).get_summary_report(start_date, end_date)
+
+
+async def main():
+    today = today_thailand()
+    parser = argparse.ArgumentParser(description="Benchmark summary report paths")
+    parser.add_argument("--start", type=date.fromisoformat, default=today - timedelta(days=30))
+    parser.add_argument("--end", type=date.fromisoformat, default=today)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--sqlite", help="Path of a SQLite fixture to create and use")
+    parser.add_argument("--seed-days", type=int, default=365)
+    args = parser.parse_args()
+
+    session_factory = AsyncSessionLocal
+    if args.sqlite:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{args.sqlite}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        print(f"🌱 Seeding {args.seed_days} days into {args.sqlite} ...")
+        await seed_fixture(session_factory, args.seed_days)
+
+    print("=" * 70)
+    print(f"📊 Summary report benchmark: {args.start} → {args.end}, {args.repeat} runs each")
+    print("=" * 70)
+
+    legacy, legacy_ms = await time_path(session_factory, legacy_summary_report, args.start, args.end, args.repeat)
+    current, current_ms = await time_path(session_factory, new_summary_report, args.start, args.end, args.repeat)
+
+    for name, timings in (("legacy (sub-reports)", legacy_ms), ("aggregate queries", current_ms)):
+        print(f"   {name:22s} median {statistics.median(timings):8.2f} ms   "
+              f"min {min(timings):8.2f} ms   max {max(timings):8.2f} ms")
+
+    speedup = statistics.median(legacy_ms) / statistics.median(current_ms)
+    print(f"\n   ⚡ Speedup: {speedup:.1f}x")
+
+    if legacy.model_dump() != current.model_dump():
+        print("\n❌ Outputs differ:")
+        print(f"   legacy:  {legacy.model_dump()}")
+        print(f"   current: {current.model_dump()}")
+        sys.exit(1)
+
+    print("\n✅ Outputs identical")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Celery Task Runtime Benchmark
+วัด overhead ต่อ task: แบบเดิม (event loop + connection pool ใหม่ทุกครั้ง) เทียบกับ worker runtime (loop/engine ถาวร)
+
+Each simulated task opens a session, runs `SELECT 1` and reads one Redis
+key - the fixed cost every beat task pays before doing real work.
+
+- legacy:  asyncio.new_event_loop() per task, fresh engine + Redis client,
+           disposed at the end (the only safe form of the old pattern)
+- runtime: app.tasks.runtime.run_async on the persistent worker loop with
+           the shared engine and Redis client
+
+Usage:
+    docker-compose exec celery-worker python scripts/benchmark_task_runtime.py
+    docker-compose exec celery-worker python scripts/benchmark_task_runtime.py --iterations 500 --no-redis
+
+Options:
+    --iterations N   Simulated tasks per path (default: 200)
+    --no-redis       Skip the Redis read
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import redis.asyncio as aioredis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db import session as db_session
+from app.tasks.runtime import run_async
+
+
+async def task_body(session_factory, redis_client):
+    """What every beat task does before its real work"""
+    async with session_factory() as db:
+        await db.execute(text("SELECT 1"))
+    if redis_client is not None:
+        await redis_client.get("benchmark:task_runtime")
+
+
+def legacy_task(use_redis: bool) -> float:
+    """One task the old way: new loop, new pools, torn down afterwards"""
+    started = time.perf_counter()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    async def run():
+        engine = db_session.create_engine()
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True) if use_redis else None
+        try:
+            await task_body(session_factory, redis_client)
+        finally:
+            if redis_client is not None:
+                await redis_client.aclose()
+            await engine.dispose()
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+    return (time.perf_counter() - started) * 1000
+
+
+def runtime_task(use_redis: bool) -> float:
+    """One task on the persistent worker loop"""
+    started = time.perf_counter()
+
+    async def run():
+        await task_body(db_session.AsyncSessionLocal, get_redis() if use_redis else None)
+
+    run_async(run())
+    return (time.perf_counter() - started) * 1000
+
+
+def summarize(name: str, timings):
+    ordered = sorted(timings)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    print(f"   {name:10s} median {statistics.median(ordered):8.2f} ms   "
+          f"p95 {p95:8.2f} ms   max {ordered[-1]:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-task async runtime overhead")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--no-redis", action="store_true")
+    args = parser.parse_args()
+    use_redis = not args.no_redis
+
+    print("=" * 70)
+    print(f"⏱️  Task runtime benchmark: {args.iterations} simulated tasks per path")
+    print("=" * 70)
+
+    legacy_ms = [legacy_task(use_redis) for _ in range(args.iterations)]
+
+    # Warm-up: the first task on the persistent loop opens the pools
+    first_ms = runtime_task(use_redis)
+    runtime_ms = [runtime_task(use_redis) for _ in range(args.iterations)]
+
+    summarize("legacy", legacy_ms)
+    summarize("runtime", runtime_ms)
+    print(f"   (first runtime task, opening pools: {first_ms:.2f} ms)")
+
+    speedup = statistics.median(legacy_ms) / statistics.median(runtime_ms)
+    print(f"\n   ⚡ Per-task overhead: {speedup:.1f}x lower")
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
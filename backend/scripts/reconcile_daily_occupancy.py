@@ -0,0 +1,64 @@
+"""
+Daily Occupancy Reconciliation Script
+ตรวจสอบตาราง daily_occupancy เทียบกับการคำนวณจาก check_ins โดยตรง
+
+Usage:
+    docker-compose exec backend python scripts/reconcile_daily_occupancy.py
+    docker-compose exec backend python scripts/reconcile_daily_occupancy.py --start 2026-01-01 --end 2026-01-31
+    docker-compose exec backend python scripts/reconcile_daily_occupancy.py --fix
+
+Exits with status 1 when mismatches remain.
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import AsyncSessionLocal
+from app.services.occupancy_service import OccupancyService
+from app.core.datetime_utils import today_thailand
+
+
+def parse_args():
+    today = today_thailand()
+    parser = argparse.ArgumentParser(description="Reconcile daily_occupancy against check_ins")
+    parser.add_argument("--start", type=date.fromisoformat, default=today - timedelta(days=30))
+    parser.add_argument("--end", type=date.fromisoformat, default=today)
+    parser.add_argument("--fix", action="store_true", help="Rewrite mismatched days")
+    return parser.parse_args()
+
+
+async def main() -> int:
+    """Compare stored rows with the live per-day count"""
+    args = parse_args()
+
+    async with AsyncSessionLocal() as db:
+        service = OccupancyService(db)
+
+        print("=" * 70)
+        print(f"🏨 Daily occupancy reconciliation: {args.start} → {args.end}")
+        print("=" * 70)
+
+        mismatches = await service.reconcile(args.start, args.end)
+        for item in mismatches:
+            print(f"   ❌ {item['date']}: stored={item['stored']} live={item['live']}")
+
+        if mismatches and args.fix:
+            written = await service.refresh_days(args.start, args.end)
+            print(f"\n   🔧 Rewrote {written} rows")
+            mismatches = await service.reconcile(args.start, args.end)
+
+        if mismatches:
+            print(f"\n❌ {len(mismatches)} mismatched days")
+            return 1
+
+        print("\n✅ daily_occupancy matches check_ins")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,190 @@
+"""
+Booking Concurrency Stress Test
+ยิงคำขอจองห้องเดียวกันพร้อมกันหลายรายการ เพื่อตรวจว่าไม่เกิดการจองซ้ำ
+
+Runs BookingService.create_booking concurrently, each call in its own
+session (one connection per request, like the API):
+- same room:    N parallel bookings of one room for the same nights;
+                exactly one must succeed, the rest must be rejected
+- other rooms:  one booking per room for the same nights, on the rooms
+                next to the target (by id) that have no bookings at all;
+                all must succeed (neither the room lock nor any lock on
+                the bookings index may block neighbouring rooms, and
+                rooms without bookings are where gap locks would land)
+
+Bookings are placed far in the future on nights that are free and are
+deleted afterwards unless --keep is given. Needs a seeded database
+(scripts/seed_data.py) with at least one customer and one admin user.
+
+Usage:
+    docker-compose exec backend python scripts/stress_booking_concurrency.py
+    docker-compose exec backend python scripts/stress_booking_concurrency.py --requests 50 --rounds 5
+    docker-compose exec backend python scripts/stress_booking_concurrency.py --room-id 3 --keep
+
+Options:
+    --requests N   Parallel requests per round (default: 20)
+    --rounds N     Rounds, each on new nights (default: 3)
+    --room-id ID   Room to hammer (default: first active room)
+    --keep         Keep the created bookings
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, delete
+from app.db.session import AsyncSessionLocal
+from app.models.booking import Booking
+from app.models.customer import Customer
+from app.models.room import Room, RoomStatus
+from app.models.user import User
+from app.schemas.booking import BookingCreate
+from app.services.booking_service import BookingService
+from app.core.datetime_utils import today_thailand
+
+# Far enough ahead that real bookings are unlikely, and never "today"
+# (a same-day booking also changes the room status)
+FIRST_OFFSET_DAYS = 700
+
+
+async def try_booking(room_id: int, customer_id: int, user_id: int, check_in, nights: int):
+    """One create_booking call in its own session; returns (booking_id, error)"""
+    async with AsyncSessionLocal() as db:
+        try:
+            booking = await BookingService(db).create_booking(
+                BookingCreate(
+                    customer_id=customer_id,
+                    room_id=room_id,
+                    check_in_date=check_in,
+                    check_out_date=check_in + timedelta(days=nights),
+                    total_amount=Decimal("1000"),
+                    notes="stress_booking_concurrency"
+                ),
+                created_by_user_id=user_id
+            )
+            return booking.id, None
+        except ValueError as e:
+            return None, str(e)
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+
+async def free_start(room_ids, start, nights: int):
+    """First night on or after `start` with [night, night + nights) free in every room"""
+    async with AsyncSessionLocal() as db:
+        service = BookingService(db)
+        night = start
+        while True:
+            checks = [
+                await service.check_room_availability(room_id, night, night + timedelta(days=nights))
+                for room_id in room_ids
+            ]
+            if all(checks):
+                return night
+            night += timedelta(days=1)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Fire parallel bookings at one room")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--room-id", type=int, default=None)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🔒 Booking concurrency stress test")
+    print("=" * 70)
+
+    async with AsyncSessionLocal() as db:
+        room_stmt = select(Room.id).where(
+            Room.is_active == True,
+            Room.status != RoomStatus.OUT_OF_SERVICE
+        ).order_by(Room.id)
+        room_ids = (await db.execute(room_stmt)).scalars().all()
+        booked_room_ids = set((await db.execute(select(Booking.room_id).distinct())).scalars().all())
+        customer_id = (await db.execute(select(Customer.id).limit(1))).scalar()
+        user_id = (await db.execute(select(User.id).where(User.is_active == True).limit(1))).scalar()
+
+    if not room_ids or customer_id is None or user_id is None:
+        print("\n❌ Need at least one room, customer and user (run scripts/seed_data.py)")
+        return 1
+
+    target = args.room_id or room_ids[0]
+    # Nearest rooms first; rooms with bookings are skipped
+    others = sorted(
+        (room_id for room_id in room_ids if room_id != target and room_id not in booked_room_ids),
+        key=lambda room_id: abs(room_id - target)
+    )[:args.requests]
+    if not others:
+        print("\n⚠️  No room without bookings; skipping the other-rooms check")
+    created = []
+    failed = False
+    night = today_thailand() + timedelta(days=FIRST_OFFSET_DAYS)
+
+    try:
+        for round_number in range(1, args.rounds + 1):
+            nights = 1 + round_number % 3
+            night = await free_start([target] + others, night, nights)
+            print(f"\n📅 Round {round_number}: {night} x {nights} nights")
+
+            # Same room, same nights
+            started = time.perf_counter()
+            results = await asyncio.gather(*[
+                try_booking(target, customer_id, user_id, night, nights)
+                for _ in range(args.requests)
+            ])
+            elapsed = (time.perf_counter() - started) * 1000
+            booked = [booking_id for booking_id, _ in results if booking_id]
+            errors = sorted({error for _, error in results if error})
+            created.extend(booked)
+
+            status = "✅" if len(booked) == 1 else "❌"
+            print(f"   {status} room {target}: {len(booked)}/{args.requests} succeeded in {elapsed:.0f} ms")
+            for error in errors:
+                print(f"      - {error}")
+            if len(booked) != 1:
+                failed = True
+
+            # Different rooms, same nights
+            if others:
+                started = time.perf_counter()
+                results = await asyncio.gather(*[
+                    try_booking(room_id, customer_id, user_id, night, nights)
+                    for room_id in others
+                ])
+                elapsed = (time.perf_counter() - started) * 1000
+                booked = [booking_id for booking_id, _ in results if booking_id]
+                created.extend(booked)
+
+                status = "✅" if len(booked) == len(others) else "❌"
+                print(f"   {status} {len(others)} other rooms: {len(booked)} succeeded in {elapsed:.0f} ms")
+                for error in sorted({error for _, error in results if error}):
+                    print(f"      - {error}")
+                if len(booked) != len(others):
+                    failed = True
+
+            night += timedelta(days=nights)
+    finally:
+        if created and not args.keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(Booking).where(Booking.id.in_(created)))
+                await db.commit()
+            print(f"\n🧹 Deleted {len(created)} test bookings")
+
+    if failed:
+        print("\n❌ Double booking or unexpected rejection detected")
+        return 1
+
+    print("\n✅ No double bookings")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,80 @@
+"""
+Shared test fixtures
+
+Tests run against an in-memory SQLite database (aiosqlite) created from the
+models. Redis is pointed at a closed port, so every Redis-backed cache takes
+its "Redis unavailable" path and reads straight from the database.
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+os.environ.setdefault("DEBUG", "false")
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.db.base import Base
+from app.core.snapshot_cache import room_rate_cache, settings_cache
+
+
+@pytest.fixture
+async def engine():
+    """Fresh in-memory database with every table"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def db(engine):
+    """Session on the test database"""
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def empty_snapshot_caches():
+    """Per-process snapshot caches must not leak between tests"""
+    room_rate_cache._snapshot = None
+    settings_cache._snapshot = None
+    yield
+    room_rate_cache._snapshot = None
+    settings_cache._snapshot = None
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active"""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries(engine):
+    """Usage: with count_queries() as counter: ...; counter.count"""
+    return lambda: QueryCounter(engine)
@@ -0,0 +1,78 @@
+"""
+Booking writes lock the room and check conflicts with a plain read taken
+after the lock.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.datetime_utils import today_thailand
+from app.models import Customer, Room, RoomType, User
+from app.models.user import UserRole
+from app.schemas.booking import BookingCreate, BookingUpdate
+from app.services.booking_service import BookingService
+
+
+async def seed(db):
+    user = User(username="reception", password_hash="x", full_name="Reception", role=UserRole.RECEPTION)
+    room_type = RoomType(name="Standard")
+    db.add_all([user, room_type])
+    await db.flush()
+    rooms = [Room(room_number=f"{n}", room_type_id=room_type.id, floor=1) for n in (101, 102)]
+    customer = Customer(full_name="Guest")
+    db.add_all([*rooms, customer])
+    await db.commit()
+    # Plain IDs: a rejected booking rolls back, which expires loaded objects
+    return user.id, [room.id for room in rooms], customer.id
+
+
+def booking(room_id, customer_id, first_night, nights):
+    return BookingCreate(
+        customer_id=customer_id, room_id=room_id,
+        check_in_date=first_night, check_out_date=first_night + timedelta(days=nights),
+        total_amount=Decimal("800") * nights
+    )
+
+
+async def test_overlapping_booking_is_rejected_only_for_the_same_room(db):
+    user_id, (room, neighbour), customer = await seed(db)
+    night = today_thailand() + timedelta(days=30)
+    service = BookingService(db)
+
+    await service.create_booking(booking(room, customer, night, 2), user_id)
+
+    with pytest.raises(ValueError):
+        await service.create_booking(booking(room, customer, night + timedelta(days=1), 2), user_id)
+    await service.create_booking(booking(neighbour, customer, night, 2), user_id)
+
+
+async def test_date_change_checks_the_other_bookings_of_the_room(db):
+    user_id, (room, _), customer = await seed(db)
+    night = today_thailand() + timedelta(days=30)
+    service = BookingService(db)
+    first_id = (await service.create_booking(booking(room, customer, night, 2), user_id)).id
+    await service.create_booking(booking(room, customer, night + timedelta(days=5), 2), user_id)
+
+    with pytest.raises(ValueError):
+        await service.update_booking(
+            first_id, BookingUpdate(check_out_date=night + timedelta(days=6)), user_id
+        )
+
+    moved = await service.update_booking(
+        first_id, BookingUpdate(check_out_date=night + timedelta(days=5)), user_id
+    )
+    assert moved.number_of_nights == 5
+
+
+async def test_pending_changes_are_not_committed_by_a_booking(db):
+    user_id, (room, _), customer = await seed(db)
+    night = today_thailand() + timedelta(days=30)
+    db.add(Customer(full_name="Not saved yet"))
+
+    with pytest.raises(RuntimeError):
+        await BookingService(db).create_booking(booking(room, customer, night, 2), user_id)
+
+    await db.rollback()
+    assert await db.scalar(select(func.count(Customer.id))) == 1
@@ -0,0 +1,84 @@
+"""
+Outbox rows are reclaimed as stuck by the time they were claimed, not by
+the time they were created, and a failed breaker command is retried until
+MAX_DISPATCH_ATTEMPTS, then left FAILED.
+"""
+from datetime import datetime, timedelta
+
+from app.models import Room, RoomType
+from app.models.home_assistant import (
+    BreakerCommandOutbox,
+    BreakerState,
+    HomeAssistantBreaker,
+    QueueStatus,
+)
+from app.services import breaker_service
+from app.services.breaker_outbox_service import (
+    MAX_DISPATCH_ATTEMPTS,
+    PROCESSING_TIMEOUT_SECONDS,
+    BreakerOutboxService,
+)
+
+
+async def test_old_row_is_not_reclaimed_right_after_claim(db):
+    room_type = RoomType(name="Standard")
+    db.add(room_type)
+    await db.flush()
+    room = Room(room_number="101", room_type_id=room_type.id, floor=1)
+    db.add(room)
+    await db.flush()
+    # Created long before the dispatcher got to it (e.g. a backlog)
+    db.add(BreakerCommandOutbox(
+        room_id=room.id, room_status_before="AVAILABLE", room_status_after="OCCUPIED",
+        status=QueueStatus.PENDING, created_at=datetime.now() - timedelta(hours=1)
+    ))
+    await db.commit()
+    service = BreakerOutboxService(db)
+
+    (claimed,) = await service._claim_batch()
+    assert claimed.status == QueueStatus.PROCESSING
+    assert claimed.claimed_at is not None
+
+    # Still being processed: a concurrent dispatcher must not take it
+    assert await service._claim_batch() == []
+
+    claimed.claimed_at = datetime.now() - timedelta(seconds=PROCESSING_TIMEOUT_SECONDS + 1)
+    await db.commit()
+    assert [item.id for item in await service._claim_batch()] == [claimed.id]
+
+
+class UnreachableHomeAssistant:
+    def __init__(self, db):
+        pass
+
+    async def get_entity_state(self, entity_id):
+        raise ConnectionError("Home Assistant is down")
+
+
+async def test_failed_command_is_retried_then_marked_failed(db, monkeypatch):
+    monkeypatch.setattr(breaker_service, "HomeAssistantService", UnreachableHomeAssistant)
+    room_type = RoomType(name="Standard")
+    db.add(room_type)
+    await db.flush()
+    room = Room(room_number="101", room_type_id=room_type.id, floor=1)
+    db.add(room)
+    await db.flush()
+    db.add(HomeAssistantBreaker(
+        entity_id="switch.room_101", friendly_name="Breaker 101", room_id=room.id,
+        is_available=False, current_state=BreakerState.OFF
+    ))
+    item = BreakerCommandOutbox(
+        room_id=room.id, room_status_before="AVAILABLE", room_status_after="OCCUPIED",
+        status=QueueStatus.PENDING, created_at=datetime.now()
+    )
+    db.add(item)
+    await db.commit()
+    service = BreakerOutboxService(db)
+
+    for attempt in range(1, MAX_DISPATCH_ATTEMPTS + 1):
+        assert (await service.dispatch_pending())["failed"] == 1
+        assert item.attempts == attempt
+        assert item.error_message
+
+    assert item.status == QueueStatus.FAILED
+    assert (await service.dispatch_pending())["failed"] == 0
@@ -0,0 +1,99 @@
+"""
+Bulk breaker sync: hourly rollups accumulate on any database, an unchanged
+sync writes no breaker rows, and state_changed_at only moves on a real
+state change, so enforce_room_state still fires while syncs keep running.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.models.home_assistant import (
+    BreakerActivityLog,
+    BreakerState,
+    BreakerSyncRollup,
+    HomeAssistantBreaker,
+)
+from app.models.room import Room, RoomStatus
+from app.models.room_type import RoomType
+from app.services.breaker_service import ENFORCE_OVERRIDE_MINUTES, BreakerService
+
+
+class FakeHomeAssistant:
+    def __init__(self, states):
+        self.states = states
+
+    async def get_all_states(self):
+        return self.states
+
+    async def turn_off(self, entity_id):
+        self.states[entity_id] = {"state": "off", "attributes": {}, "available": True}
+        return {"response_time_ms": 5}
+
+
+async def test_unchanged_sync_writes_no_rows_and_rolls_up(db, count_queries):
+    long_ago = datetime.now() - timedelta(hours=1)
+    db.add_all([
+        HomeAssistantBreaker(
+            entity_id=f"switch.room_{number}", friendly_name=f"Breaker {number}",
+            is_available=True, current_state=BreakerState.ON,
+            ha_attributes={}, last_state_update=long_ago
+        )
+        for number in (101, 102)
+    ])
+    await db.commit()
+
+    service = BreakerService(db)
+    service.ha_service = FakeHomeAssistant({
+        f"switch.room_{number}": {"state": "on", "attributes": {}, "available": True}
+        for number in (101, 102)
+    })
+
+    with count_queries() as counter:
+        for _ in range(2):
+            result = await service.sync_all_breakers()
+            assert result["changed_count"] == 0
+
+    assert not [sql for sql in counter.statements if sql.startswith("UPDATE home_assistant_breakers")]
+    breakers = (await db.execute(select(HomeAssistantBreaker))).scalars().all()
+    assert all(breaker.last_state_update.replace(tzinfo=None) == long_ago for breaker in breakers)
+
+    rollups = (await db.execute(select(BreakerSyncRollup))).scalars().all()
+    assert sorted(rollup.sync_count for rollup in rollups) == [2, 2]
+    assert all(rollup.changed_count == 0 for rollup in rollups)
+    assert (await db.execute(select(func.count(BreakerActivityLog.id)))).scalar() == 0
+
+
+async def test_override_enforced_while_syncs_continue(db):
+    room_type = RoomType(name="Standard")
+    db.add(room_type)
+    await db.flush()
+    room = Room(room_number="101", room_type_id=room_type.id, floor=1, status=RoomStatus.AVAILABLE)
+    db.add(room)
+    await db.flush()
+    db.add(HomeAssistantBreaker(
+        entity_id="switch.room_101", friendly_name="Breaker 101", room_id=room.id,
+        is_available=True, current_state=BreakerState.OFF, ha_attributes={}
+    ))
+    await db.commit()
+
+    service = BreakerService(db)
+    service.ha_service = FakeHomeAssistant({
+        "switch.room_101": {"state": "on", "attributes": {}, "available": True}
+    })
+
+    # Switched on by hand: the change is stamped once, later syncs leave it
+    await service.sync_all_breakers()
+    breaker = (await db.execute(select(HomeAssistantBreaker))).scalar_one()
+    switched_on_at = breaker.state_changed_at
+    assert breaker.current_state == BreakerState.ON and switched_on_at is not None
+
+    await service.sync_all_breakers()
+    assert breaker.state_changed_at == switched_on_at
+    assert (await service.enforce_room_state())["turned_off"] == 0
+
+    breaker.state_changed_at = datetime.now() - timedelta(minutes=ENFORCE_OVERRIDE_MINUTES + 1)
+    await db.commit()
+    await service.sync_all_breakers()
+
+    assert (await service.enforce_room_state())["turned_off"] == 1
+    assert breaker.current_state == BreakerState.OFF
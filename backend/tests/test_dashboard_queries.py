@@ -0,0 +1,98 @@
+"""
+Dashboard room cards must be built from a fixed number of queries,
+independent of the number of rooms and of the check-in history.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.core.datetime_utils import now_thailand, today_thailand
+from app.models import Booking, CheckIn, Customer, Room, RoomRate, RoomType, User
+from app.models.booking import BookingStatusEnum
+from app.models.check_in import CheckInStatusEnum, StayTypeEnum
+from app.models.room import RoomStatus
+from app.models.room_rate import StayType
+from app.models.user import UserRole
+from app.services.dashboard_service import DashboardService
+
+MAX_QUERIES = 4
+
+
+async def seed_rooms(db, rooms: int):
+    """`rooms` rooms: a third occupied (with past stays), a third reserved for today"""
+    user = User(username="reception", password_hash="x", full_name="Reception", role=UserRole.RECEPTION)
+    room_type = RoomType(name="Standard")
+    db.add_all([user, room_type])
+    await db.flush()
+
+    db.add_all([
+        RoomRate(room_type_id=room_type.id, stay_type=StayType.OVERNIGHT, rate=Decimal("800"), effective_from=date(2020, 1, 1)),
+        RoomRate(room_type_id=room_type.id, stay_type=StayType.TEMPORARY, rate=Decimal("300"), effective_from=date(2020, 1, 1)),
+    ])
+
+    now = now_thailand()
+    today = today_thailand()
+    for number in range(rooms):
+        status = (RoomStatus.OCCUPIED, RoomStatus.RESERVED, RoomStatus.AVAILABLE)[number % 3]
+        room = Room(room_number=f"{number + 100}", room_type_id=room_type.id, floor=1 + number // 20, status=status)
+        customer = Customer(full_name=f"Guest {number}", phone_number=f"08{number:08d}")
+        db.add_all([room, customer])
+        await db.flush()
+
+        for days_ago in (30, 20, 10):
+            db.add(CheckIn(
+                customer_id=customer.id, room_id=room.id, stay_type=StayTypeEnum.OVERNIGHT,
+                check_in_time=now - timedelta(days=days_ago),
+                expected_check_out_time=now - timedelta(days=days_ago - 1),
+                status=CheckInStatusEnum.CHECKED_OUT, created_by=user.id
+            ))
+
+        if status == RoomStatus.OCCUPIED:
+            db.add(CheckIn(
+                customer_id=customer.id, room_id=room.id, stay_type=StayTypeEnum.OVERNIGHT,
+                check_in_time=now - timedelta(hours=2),
+                expected_check_out_time=now + timedelta(hours=20),
+                status=CheckInStatusEnum.CHECKED_IN, created_by=user.id
+            ))
+        elif status == RoomStatus.RESERVED:
+            db.add(Booking(
+                customer_id=customer.id, room_id=room.id,
+                check_in_date=today, check_out_date=today + timedelta(days=1),
+                number_of_nights=1, total_amount=Decimal("800"),
+                status=BookingStatusEnum.CONFIRMED, created_by=user.id
+            ))
+
+    await db.commit()
+
+
+async def dashboard_query_count(engine, count_queries, rooms: int):
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        await seed_rooms(db, rooms)
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        with count_queries() as counter:
+            cards = await DashboardService(db).get_all_rooms_with_details()
+
+    assert len(cards) == rooms
+    occupied = [card for card in cards if card.status == RoomStatus.OCCUPIED]
+    reserved = [card for card in cards if card.status == RoomStatus.RESERVED]
+    assert all(card.check_in_id and card.customer_name for card in occupied)
+    assert all(card.booking_id and card.booking_customer_name for card in reserved)
+    assert all(card.overnight_rate == Decimal("800") for card in cards)
+    return counter.count
+
+
+async def test_room_cards_query_count_is_constant(engine, count_queries):
+    small = await dashboard_query_count(engine, count_queries, 10)
+
+    async with engine.begin() as conn:
+        for table in ("bookings", "check_ins", "rooms", "customers", "room_rates", "room_types", "users"):
+            await conn.exec_driver_sql(f"DELETE FROM {table}")
+    from app.core.snapshot_cache import room_rate_cache
+    room_rate_cache._snapshot = None
+
+    large = await dashboard_query_count(engine, count_queries, 30)
+
+    assert small == large
+    assert large <= MAX_QUERIES
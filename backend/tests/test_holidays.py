@@ -0,0 +1,58 @@
+"""
+Public holidays: bundled lunar dates map to their names, and an empty API
+answer never wipes the stored year.
+"""
+from datetime import date, datetime
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.core import thai_holidays
+from app.core.thai_holidays import LUNAR_NAMES, bundled_holidays
+from app.models.public_holiday import PublicHolidayRecord
+from app.services.holiday_service import HolidayService
+
+
+def test_year_with_fewer_lunar_dates_keeps_names_in_order(monkeypatch):
+    lunar_dates = [date(2030, 2, 18), date(2030, 5, 16)]
+    monkeypatch.setitem(thai_holidays.LUNAR_HOLIDAYS, 2030, lunar_dates)
+
+    lunar = [(day, name_en) for day, _, name_en in bundled_holidays(2030) if day in lunar_dates]
+
+    assert lunar == [(lunar_dates[0], LUNAR_NAMES[0][1]), (lunar_dates[1], LUNAR_NAMES[1][1])]
+
+
+async def test_empty_api_answer_keeps_stored_rows(db, monkeypatch):
+    db.add(PublicHolidayRecord(
+        year=2027, holiday_date=date(2027, 1, 1), name="วันขึ้นปีใหม่",
+        name_en="New Year's Day", fetched_at=datetime(2026, 1, 1)
+    ))
+    await db.commit()
+
+    real_client = httpx.AsyncClient
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=[]))
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: real_client(transport=transport, **kwargs))
+
+    with pytest.raises(ValueError):
+        await HolidayService(db).refresh_year(2027)
+
+    stored = await db.execute(select(func.count(PublicHolidayRecord.id)).where(PublicHolidayRecord.year == 2027))
+    assert stored.scalar() == 1
+
+
+def test_bundled_lunar_dates_are_in_order_for_every_year():
+    for year, lunar_dates in thai_holidays.LUNAR_HOLIDAYS.items():
+        assert all(day.year == year for day in lunar_dates), year
+        assert lunar_dates == sorted(lunar_dates), year
+        # Buddhist Lent starts the day after Asanha Bucha
+        if len(lunar_dates) == 4:
+            assert (lunar_dates[3] - lunar_dates[2]).days == 1, year
+
+
+def test_year_without_lunar_dates_warns(caplog):
+    with caplog.at_level("WARNING", logger=thai_holidays.__name__):
+        holidays = bundled_holidays(2099)
+
+    assert len(holidays) == len(thai_holidays.FIXED_HOLIDAYS)
+    assert "2099" in caplog.text
@@ -0,0 +1,36 @@
+"""
+The pooled Home Assistant session follows the event loop and never leaks
+the previous loop's session.
+"""
+import asyncio
+
+from app.core.home_assistant_client import HomeAssistantClient, LatencyHistogram
+
+
+async def open_session(client):
+    return client.get_session()
+
+
+def test_previous_loop_session_released_on_new_loop():
+    client = HomeAssistantClient()
+    first = asyncio.run(open_session(client))
+
+    async def second_loop():
+        session = client.get_session()
+        assert session is not first
+        assert first.closed
+        assert client.get_session() is session
+        await client.close()
+        assert session.closed
+
+    asyncio.run(second_loop())
+
+
+def test_histogram_buckets_cover_every_label():
+    histogram = LatencyHistogram(buckets_ms=(10, 100))
+    histogram.observe("get_state", "ok", 5)
+    histogram.observe("get_state", "ok", 500)
+
+    (series,) = histogram.snapshot()
+
+    assert series["buckets"] == {"le_10ms": 1, "le_100ms": 0, "le_inf": 1}
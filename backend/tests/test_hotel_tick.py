@@ -0,0 +1,192 @@
+"""
+The hotel tick runs its stages over one snapshot: overtime flags the stay
+and queues the breaker cutoff, reconcile turns off a breaker left on in an
+empty room, dispatch drains the outbox. A failing stage does not stop the
+later ones, and a tick that finds the lock taken does nothing.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models import CheckIn, Customer, Room, RoomType, User
+from app.models.check_in import CheckInStatusEnum, StayTypeEnum
+from app.models.home_assistant import (
+    BreakerCommandOutbox,
+    BreakerState,
+    HomeAssistantBreaker,
+    QueueStatus,
+)
+from app.models.room import RoomStatus
+from app.models.user import UserRole
+from app.services import breaker_service
+from app.services.breaker_service import ENFORCE_OVERRIDE_MINUTES, BreakerService
+from app.services.overtime_service import OvertimeService
+from app.tasks import breaker_tasks, hotel_tick_tasks
+
+
+class FakeHomeAssistant:
+    turned_off = []
+
+    def __init__(self, db):
+        pass
+
+    async def get_entity_state(self, entity_id):
+        return {"state": "on", "attributes": {}, "available": True}
+
+    async def turn_off(self, entity_id):
+        self.turned_off.append(entity_id)
+        return {"response_time_ms": 1}
+
+
+@pytest.fixture
+def session_factory(engine, monkeypatch):
+    """Point the tick, the outbox dispatcher and Home Assistant at test doubles"""
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(hotel_tick_tasks, "AsyncSessionLocal", factory)
+    monkeypatch.setattr(breaker_tasks, "AsyncSessionLocal", factory)
+    monkeypatch.setattr(breaker_service, "HomeAssistantService", FakeHomeAssistant)
+    monkeypatch.setattr(FakeHomeAssistant, "turned_off", [])
+    return factory
+
+
+async def seed_hotel(db):
+    """
+    Room 101: temporary stay past checkout, breaker ON
+    Room 102: AVAILABLE, breaker switched ON by hand long ago
+    Room 103: inactive; plus an inactive breaker and a checked-out stay
+    """
+    user = User(username="reception", password_hash="x", full_name="Reception", role=UserRole.RECEPTION)
+    room_type = RoomType(name="Standard")
+    customer = Customer(full_name="Guest")
+    db.add_all([user, room_type, customer])
+    await db.flush()
+
+    occupied = Room(room_number="101", room_type_id=room_type.id, floor=1, status=RoomStatus.OCCUPIED)
+    empty = Room(room_number="102", room_type_id=room_type.id, floor=1, status=RoomStatus.AVAILABLE)
+    inactive = Room(room_number="103", room_type_id=room_type.id, floor=1, is_active=False)
+    db.add_all([occupied, empty, inactive])
+    await db.flush()
+
+    now = datetime.now()
+    db.add_all([
+        CheckIn(
+            customer_id=customer.id, room_id=occupied.id, stay_type=StayTypeEnum.TEMPORARY,
+            check_in_time=now - timedelta(hours=4), expected_check_out_time=now - timedelta(hours=1),
+            status=CheckInStatusEnum.CHECKED_IN, created_by=user.id
+        ),
+        CheckIn(
+            customer_id=customer.id, room_id=empty.id, stay_type=StayTypeEnum.TEMPORARY,
+            check_in_time=now - timedelta(hours=8), expected_check_out_time=now - timedelta(hours=5),
+            status=CheckInStatusEnum.CHECKED_OUT, created_by=user.id
+        ),
+        HomeAssistantBreaker(
+            entity_id="switch.room_101", friendly_name="Breaker 101", room_id=occupied.id,
+            is_available=True, current_state=BreakerState.ON, state_changed_at=now - timedelta(hours=4)
+        ),
+        HomeAssistantBreaker(
+            entity_id="switch.room_102", friendly_name="Breaker 102", room_id=empty.id,
+            is_available=True, current_state=BreakerState.ON, last_state_update=now,
+            state_changed_at=now - timedelta(minutes=ENFORCE_OVERRIDE_MINUTES + 5)
+        ),
+        HomeAssistantBreaker(
+            entity_id="switch.spare", friendly_name="Spare", is_active=False,
+            is_available=True, current_state=BreakerState.ON
+        ),
+    ])
+    await db.commit()
+
+
+async def breaker_states(session_factory):
+    async with session_factory() as db:
+        rows = (await db.execute(select(HomeAssistantBreaker.entity_id, HomeAssistantBreaker.current_state))).all()
+    return dict(rows)
+
+
+async def test_tick_runs_every_stage_over_one_snapshot(db, session_factory):
+    await seed_hotel(db)
+
+    result = await hotel_tick_tasks._async_hotel_tick()
+
+    assert result["success"]
+    assert (result["rooms"], result["check_ins"], result["breakers"]) == (2, 1, 2)
+    assert set(result["timings_ms"]) == {"snapshot", "overtime", "reconcile", "dispatch", "total"}
+
+    # overtime: room flagged and its cutoff queued; dispatch: cutoff sent
+    assert result["overtime_rooms"] == 1
+    assert result["outbox_dispatched"] == 1
+    async with session_factory() as check:
+        room = (await check.execute(select(Room).where(Room.room_number == "101"))).scalar_one()
+        outbox = (await check.execute(select(BreakerCommandOutbox))).scalar_one()
+    assert room.status == RoomStatus.OCCUPIED_OVERTIME
+    assert outbox.status == QueueStatus.COMPLETED
+
+    # reconcile: the manual override in the empty room is undone even
+    # though the breaker was synced just now
+    assert result["breakers_turned_off"] == 1
+    assert sorted(FakeHomeAssistant.turned_off) == ["switch.room_101", "switch.room_102"]
+    states = await breaker_states(session_factory)
+    assert states["switch.room_101"] == states["switch.room_102"] == BreakerState.OFF
+    assert states["switch.spare"] == BreakerState.ON
+
+
+async def test_failed_overtime_stage_does_not_stop_the_others(db, session_factory, monkeypatch):
+    await seed_hotel(db)
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("overtime broke")
+    monkeypatch.setattr(OvertimeService, "process_overtime_stays", broken)
+
+    result = await hotel_tick_tasks._async_hotel_tick()
+
+    assert result["success"]
+    assert result["overtime_rooms"] == 0
+    assert result["breakers_turned_off"] == 1
+    assert FakeHomeAssistant.turned_off == ["switch.room_102"]
+
+
+async def test_failed_reconcile_stage_does_not_stop_dispatch(db, session_factory, monkeypatch):
+    await seed_hotel(db)
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("reconcile broke")
+    monkeypatch.setattr(BreakerService, "enforce_room_state", broken)
+
+    result = await hotel_tick_tasks._async_hotel_tick()
+
+    assert result["success"]
+    assert result["overtime_rooms"] == 1
+    assert result["breakers_turned_off"] == 0
+    assert result["outbox_dispatched"] == 1
+    assert FakeHomeAssistant.turned_off == ["switch.room_101"]
+
+
+class BusyRedis:
+    """Another tick holds the lock"""
+
+    def __init__(self):
+        self.counters = {}
+
+    def lock(self, name, timeout, blocking):
+        return self
+
+    async def acquire(self):
+        return False
+
+    async def hincrby(self, key, field, amount):
+        self.counters[field] = self.counters.get(field, 0) + amount
+
+
+async def test_tick_skips_while_previous_tick_holds_the_lock(session_factory, monkeypatch):
+    redis = BusyRedis()
+    monkeypatch.setattr(hotel_tick_tasks, "get_redis", lambda: redis)
+
+    async def must_not_load(db):
+        raise AssertionError("a skipped tick must not load the snapshot")
+    monkeypatch.setattr(hotel_tick_tasks, "load_snapshot", must_not_load)
+
+    result = await hotel_tick_tasks._async_hotel_tick()
+
+    assert result == {"success": True, "skipped": True}
+    assert redis.counters == {"ticks:skipped": 1}
@@ -0,0 +1,66 @@
+"""
+Daily occupancy series: report reads never write, refreshes upsert.
+"""
+from datetime import timedelta
+
+from sqlalchemy import func, select
+
+from app.core.datetime_utils import now_thailand, today_thailand
+from app.models import CheckIn, Customer, Room, RoomType, User
+from app.models.check_in import CheckInStatusEnum, StayTypeEnum
+from app.models.daily_occupancy import DailyOccupancy
+from app.models.user import UserRole
+from app.services.occupancy_service import OccupancyService
+
+
+async def seed_stay(db, days_ago: int, nights: int):
+    """One checked-out stay starting `days_ago` days ago"""
+    user = User(username=f"u{days_ago}", password_hash="x", full_name="User", role=UserRole.RECEPTION)
+    room_type = RoomType(name=f"Type {days_ago}")
+    db.add_all([user, room_type])
+    await db.flush()
+    room = Room(room_number=f"{days_ago}", room_type_id=room_type.id, floor=1)
+    customer = Customer(full_name="Guest")
+    db.add_all([room, customer])
+    await db.flush()
+
+    start = now_thailand() - timedelta(days=days_ago)
+    db.add(CheckIn(
+        customer_id=customer.id, room_id=room.id, stay_type=StayTypeEnum.OVERNIGHT,
+        check_in_time=start, expected_check_out_time=start + timedelta(days=nights),
+        actual_check_out_time=start + timedelta(days=nights),
+        status=CheckInStatusEnum.CHECKED_OUT, created_by=user.id
+    ))
+    await db.commit()
+
+
+async def stored_rows(db) -> int:
+    return (await db.execute(select(func.count(DailyOccupancy.id)))).scalar()
+
+
+async def test_report_series_is_computed_without_writing(db):
+    await seed_stay(db, days_ago=5, nights=2)
+    today = today_thailand()
+    service = OccupancyService(db)
+
+    series = await service.get_occupancy_series(today - timedelta(days=7), today)
+
+    assert series == await service.compute_daily_occupancy(today - timedelta(days=7), today)
+    assert await stored_rows(db) == 0
+
+
+async def test_refresh_days_upserts_existing_rows(db):
+    await seed_stay(db, days_ago=5, nights=2)
+    today = today_thailand()
+    start = today - timedelta(days=7)
+    service = OccupancyService(db)
+
+    # A stale row for one day, as left by an earlier refresh
+    db.add(DailyOccupancy(stat_date=today - timedelta(days=4), occupied_rooms=9))
+    await db.commit()
+
+    written = await service.refresh_days(start, today)
+
+    assert written == 8
+    assert await service.get_materialized_series(start, today) == await service.compute_daily_occupancy(start, today)
+    assert await service.refresh_days(start, today) == 0
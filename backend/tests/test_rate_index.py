@@ -0,0 +1,110 @@
+"""
+The room rate index answers every night exactly like the per-night
+room_rates query it replaced: inclusive effective_from/effective_to,
+latest start wins on overlaps, no rate for nights between periods.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, or_, select
+
+from app.models import RoomType
+from app.models.room_rate import RoomRate, StayType
+from app.services.room_rate_service import RoomRateService
+
+WINDOW_START = date(2026, 12, 1)
+WINDOW_END = date(2027, 2, 1)
+
+# (stay type, rate, effective_from, effective_to, is_active)
+PERIODS = [
+    (StayType.OVERNIGHT, "800", date(2026, 12, 5), date(2026, 12, 20), True),
+    # Starts inside the first period: wins from its first night
+    (StayType.OVERNIGHT, "1200", date(2026, 12, 15), date(2026, 12, 25), True),
+    # Short promotion inside the second one; after it the second resumes
+    (StayType.OVERNIGHT, "600", date(2026, 12, 18), date(2026, 12, 18), True),
+    # Gap 26-31 December, then open-ended
+    (StayType.OVERNIGHT, "900", date(2027, 1, 1), None, True),
+    # Inactive rows are ignored
+    (StayType.OVERNIGHT, "5000", date(2026, 12, 1), None, False),
+    (StayType.TEMPORARY, "300", date(2026, 12, 10), date(2027, 1, 10), True),
+]
+
+
+async def seed_rates(db):
+    room_type = RoomType(name="Standard")
+    db.add(room_type)
+    await db.flush()
+    db.add_all([
+        RoomRate(
+            room_type_id=room_type.id, stay_type=stay_type, rate=Decimal(rate),
+            effective_from=effective_from, effective_to=effective_to, is_active=is_active
+        )
+        for stay_type, rate, effective_from, effective_to, is_active in PERIODS
+    ])
+    await db.commit()
+    return room_type.id
+
+
+async def legacy_rate_on(db, room_type_id, stay_type, day):
+    """The per-night query RoomRateService.get_current_rate ran before the index"""
+    result = await db.execute(
+        select(RoomRate.rate).where(
+            and_(
+                RoomRate.room_type_id == room_type_id,
+                RoomRate.stay_type == stay_type,
+                RoomRate.effective_from <= day,
+                or_(RoomRate.effective_to.is_(None), RoomRate.effective_to >= day),
+                RoomRate.is_active == True
+            )
+        ).order_by(RoomRate.effective_from.desc())
+    )
+    return result.scalars().first()
+
+
+def nights(start, end):
+    return [start + timedelta(days=offset) for offset in range((end - start).days)]
+
+
+async def test_rate_on_matches_per_night_query(db):
+    room_type_id = await seed_rates(db)
+    index = await RoomRateService(db).get_rate_index()
+
+    for stay_type in StayType:
+        for day in nights(WINDOW_START, WINDOW_END):
+            entry = index.rate_on(room_type_id, stay_type, day)
+            expected = await legacy_rate_on(db, room_type_id, stay_type, day)
+            assert (entry.rate if entry else None) == expected, (stay_type, day)
+
+
+async def test_nightly_rates_match_per_night_query_for_every_stay(db):
+    room_type_id = await seed_rates(db)
+    index = await RoomRateService(db).get_rate_index()
+
+    expected = {
+        day: await legacy_rate_on(db, room_type_id, StayType.OVERNIGHT, day)
+        for day in nights(WINDOW_START, WINDOW_END)
+    }
+    days = sorted(expected)
+    for first in range(0, len(days), 3):
+        for last in range(first, min(first + 21, len(days))):
+            start, end = days[first], days[last] + timedelta(days=1)
+            rates = index.nightly_rates(room_type_id, StayType.OVERNIGHT, start, end)
+            assert rates == [expected[day] for day in nights(start, end)], (start, end)
+
+
+async def test_boundaries_overlaps_and_gaps(db):
+    room_type_id = await seed_rates(db)
+    index = await RoomRateService(db).get_rate_index()
+
+    rates = index.nightly_rates(room_type_id, StayType.OVERNIGHT, date(2026, 12, 4), date(2027, 1, 2))
+    by_night = dict(zip(nights(date(2026, 12, 4), date(2027, 1, 2)), rates, strict=True))
+
+    assert by_night[date(2026, 12, 4)] is None  # before the first period
+    assert by_night[date(2026, 12, 5)] == Decimal("800")  # effective_from is inclusive
+    assert by_night[date(2026, 12, 15)] == Decimal("1200")  # later start wins
+    assert by_night[date(2026, 12, 18)] == Decimal("600")  # one-day period
+    assert by_night[date(2026, 12, 19)] == Decimal("1200")  # overlapped period resumes
+    assert by_night[date(2026, 12, 25)] == Decimal("1200")  # effective_to is inclusive
+    assert by_night[date(2026, 12, 26)] is None  # between periods
+    assert by_night[date(2027, 1, 1)] == Decimal("900")
+    assert index.nightly_rates(room_type_id, StayType.OVERNIGHT, date(2027, 1, 5), date(2027, 1, 5)) == []
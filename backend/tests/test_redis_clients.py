@@ -0,0 +1,26 @@
+"""
+Per-loop Redis clients are tracked and closed.
+"""
+import asyncio
+
+from app.core import redis as redis_module
+from app.core.redis import close_redis, get_redis
+
+
+async def open_client():
+    return get_redis()
+
+
+def test_client_per_loop_and_closed_loops_dropped():
+    first = asyncio.run(open_client())
+
+    async def second_loop():
+        client = get_redis()
+        assert client is not first
+        assert client is get_redis()
+        # The first loop is closed: its client is no longer tracked
+        assert list(redis_module._clients.values()) == [client]
+        await close_redis()
+        assert not redis_module._clients
+
+    asyncio.run(second_loop())
@@ -0,0 +1,86 @@
+"""
+Report, dashboard and overtime queries must keep using an index.
+
+The statements come from the same query builders ReportsService,
+ReportAggregateService, DashboardService and OvertimeService run. The test runs
+MySQL `EXPLAIN` on each one and fails when a watched table (check_ins,
+payments) is read with access type ALL.
+
+EXPLAIN plans are MySQL-specific, so the test is skipped unless
+MYSQL_TEST_DATABASE_URL points at a seeded MySQL database, e.g.
+
+    MYSQL_TEST_DATABASE_URL=mysql+aiomysql://user:pass@db/hotel pytest tests/test_report_query_plans.py
+
+On a near-empty table the optimizer may legitimately prefer a full scan;
+run ANALYZE TABLE on the watched tables after seeding.
+"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.services.dashboard_service import revenue_today_query, stay_type_counts_query
+from app.services.overtime_service import newly_overtime_query
+from app.services.report_aggregate_service import (
+    revenue_cells_query,
+    summary_kpis_query,
+)
+from app.services.reports_service import checkin_stats_query, checkins_list_query
+
+MYSQL_URL = os.environ.get("MYSQL_TEST_DATABASE_URL")
+WATCHED_TABLES = ("check_ins", "payments")
+REPORT_DAYS = 30
+
+pytestmark = pytest.mark.skipif(not MYSQL_URL, reason="MYSQL_TEST_DATABASE_URL is not set")
+
+
+def build_queries(days: int):
+    """(name, statement) pairs built by the services themselves"""
+    now = datetime.now()
+    end_date = now.date()
+    start_date = end_date - timedelta(days=days - 1)
+    today_start = datetime.combine(end_date, datetime.min.time())
+
+    return [
+        ("reports.checkins_list", checkins_list_query(start_date, end_date)),
+        ("reports.checkins_last_night", checkins_list_query(end_date - timedelta(days=1), end_date)),
+        ("reports.checkin_stats", checkin_stats_query(start_date, end_date)),
+        ("reports.revenue_cells", revenue_cells_query(start_date, end_date)),
+        ("reports.summary_kpis", summary_kpis_query(start_date, end_date)),
+        ("dashboard.stay_type_counts", stay_type_counts_query(today_start)),
+        ("dashboard.revenue_today", revenue_today_query(today_start)),
+        ("overtime.scan", newly_overtime_query(now)),
+    ]
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.fixture
+async def mysql_engine():
+    engine = create_async_engine(MYSQL_URL)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+QUERIES = build_queries(REPORT_DAYS)
+
+
+@pytest.mark.parametrize("name, stmt", QUERIES, ids=[name for name, _ in QUERIES])
+async def test_query_uses_an_index(mysql_engine, name, stmt):
+    async with mysql_engine.connect() as conn:
+        result = await conn.execute(text("EXPLAIN " + compile_sql(stmt)))
+        rows = [dict(row._mapping) for row in result]
+
+    scanned = [
+        f"table={row.get('table')} type={row.get('type')} rows={row.get('rows')}"
+        for row in rows
+        if row.get("table") in WATCHED_TABLES and row.get("type") == "ALL"
+    ]
+    assert not scanned, f"{name} full-scans: {'; '.join(scanned)}"
@@ -0,0 +1,130 @@
+"""
+The retention engine deletes exactly the expired rows its policy selects,
+walks the id range in batches, stops at the deadline and resumes where it
+stopped, and leaves tables alone when retention is 0 days.
+"""
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.home_assistant import (
+    ActionStatus,
+    BreakerAction,
+    BreakerActivityLog,
+    HomeAssistantBreaker,
+    TriggerType,
+)
+from app.models.notification import Notification, NotificationTypeEnum, TargetRoleEnum
+from app.tasks.retention import POLICIES, purge_policy, requeue_if_incomplete
+
+OLD = datetime.now() - timedelta(days=400)
+RECENT = datetime.now() - timedelta(days=1)
+
+
+async def seed_logs(db, rows):
+    """Activity logs from (action, status, created_at), in id order; returns their ids"""
+    breaker = HomeAssistantBreaker(entity_id="switch.room_101", friendly_name="Breaker 101")
+    db.add(breaker)
+    await db.flush()
+    logs = [
+        BreakerActivityLog(
+            breaker_id=breaker.id, action=action, trigger_type=TriggerType.SYSTEM,
+            status=status, created_at=created_at
+        )
+        for action, status, created_at in rows
+    ]
+    db.add_all(logs)
+    await db.commit()
+    return [log.id for log in logs]
+
+
+async def remaining_ids(db, model):
+    return list((await db.execute(select(model.id).order_by(model.id))).scalars().all())
+
+
+async def test_batches_cover_the_whole_id_range(db):
+    sync_ok = (BreakerAction.STATUS_SYNC, ActionStatus.SUCCESS)
+    ids = await seed_logs(db, [
+        (*sync_ok, RECENT if position in (3, 4) else OLD) for position in range(10)
+    ])
+
+    metrics = await purge_policy(db, POLICIES["breaker_activity_logs"], batch_size=3)
+
+    # Ids 1..10 in ranges of 3: [1-3] [4-6] [7-9] [10]
+    assert metrics["batches"] == 4
+    assert metrics["deleted"] == 8
+    assert metrics["completed"]
+    assert await remaining_ids(db, BreakerActivityLog) == ids[3:5]
+
+
+async def test_sync_log_policy_keeps_failures_and_other_actions(db):
+    ids = await seed_logs(db, [
+        (BreakerAction.STATUS_SYNC, ActionStatus.SUCCESS, OLD),
+        (BreakerAction.STATUS_SYNC, ActionStatus.FAILED, OLD),
+        (BreakerAction.TURN_ON, ActionStatus.SUCCESS, OLD),
+        (BreakerAction.STATUS_SYNC, ActionStatus.SUCCESS, RECENT),
+    ])
+
+    metrics = await purge_policy(db, POLICIES["breaker_sync_logs"])
+
+    assert metrics["deleted"] == 1
+    assert await remaining_ids(db, BreakerActivityLog) == ids[1:]
+
+
+async def test_notification_policy_only_deletes_read_rows(db):
+    kind, role = list(NotificationTypeEnum)[0], list(TargetRoleEnum)[0]
+    old_utc = datetime.utcnow() - timedelta(days=400)
+    notifications = [
+        Notification(notification_type=kind, target_role=role, title="t", message="m",
+                     is_read=is_read, created_at=created_at)
+        for is_read, created_at in ((True, old_utc), (False, old_utc), (True, datetime.utcnow()))
+    ]
+    db.add_all(notifications)
+    await db.commit()
+    ids = [notification.id for notification in notifications]
+
+    metrics = await purge_policy(db, POLICIES["notifications"])
+
+    assert metrics["deleted"] == 1
+    assert await remaining_ids(db, Notification) == ids[1:]
+
+
+async def test_deadline_stops_the_purge_and_next_run_resumes(db):
+    sync_ok = (BreakerAction.STATUS_SYNC, ActionStatus.SUCCESS)
+    await seed_logs(db, [(*sync_ok, OLD)] * 5)
+    policy = POLICIES["breaker_activity_logs"]
+
+    cut_short = await purge_policy(db, policy, batch_size=2, deadline=time.monotonic() - 1)
+    assert (cut_short["deleted"], cut_short["completed"]) == (0, False)
+
+    resumed = await purge_policy(db, policy, batch_size=2)
+    assert (resumed["deleted"], resumed["batches"], resumed["completed"]) == (5, 3, True)
+    assert await remaining_ids(db, BreakerActivityLog) == []
+
+
+async def test_zero_days_keeps_everything(db, monkeypatch):
+    monkeypatch.setattr("app.tasks.retention.settings.RETENTION_BREAKER_ACTIVITY_LOG_DAYS", 0)
+    ids = await seed_logs(db, [(BreakerAction.STATUS_SYNC, ActionStatus.SUCCESS, OLD)] * 3)
+
+    metrics = await purge_policy(db, POLICIES["breaker_activity_logs"])
+
+    assert metrics["skipped"] and metrics["deleted"] == 0
+    assert await remaining_ids(db, BreakerActivityLog) == ids
+
+
+async def test_incomplete_run_requeues_its_task():
+    class FakeTask:
+        name = "retention.purge_expired_rows"
+
+        def __init__(self):
+            self.calls = []
+
+        def apply_async(self, **options):
+            self.calls.append(options)
+
+    task = FakeTask()
+
+    assert not await requeue_if_incomplete(task, [{"completed": True}])
+    assert await requeue_if_incomplete(task, [{"completed": True}, {"completed": False}], policies=["orders"])
+    assert task.calls == [{"kwargs": {"policies": ["orders"]}, "retry": False}]
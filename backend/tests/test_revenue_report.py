@@ -0,0 +1,135 @@
+"""
+The GROUP BY revenue report must give the same breakdown as the per-payment
+ORM loop it replaced, with every figure summed exactly as Decimal.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import and_, select
+from sqlalchemy.orm import selectinload
+
+from app.core.datetime_utils import day_range_bounds
+from app.models import CheckIn, Customer, Payment, Room, RoomType, User
+from app.models.check_in import CheckInStatusEnum, PaymentMethodEnum, StayTypeEnum
+from app.models.user import UserRole
+from app.schemas.reports import RevenueByPeriod, RevenueReportResponse
+from app.services.reports_service import ReportsService
+
+START = date(2026, 1, 24)
+END = date(2026, 2, 13)
+
+WHOLE_BAHT = ["500", "800", "300", "1200", "800", "350", "2500", "800", "300", "450"]
+# 0.1 + 0.2 != 0.3 in floats: a float running sum drifts, the report must not
+WITH_SATANG = ["0.10", "0.20", "800.55", "300.30", "0.70", "1200.15", "0.10", "999.99", "0.20", "450.45", "0.35"]
+
+
+async def seed_payments(db, amounts):
+    """Payments in id order, three per (day, method, stay type) cell"""
+    user = User(username="cashier", password_hash="x", full_name="Cashier", role=UserRole.RECEPTION)
+    room_type = RoomType(name="Standard")
+    db.add_all([user, room_type])
+    await db.flush()
+    room = Room(room_number="101", room_type_id=room_type.id, floor=1)
+    customer = Customer(full_name="Guest")
+    db.add_all([room, customer])
+    await db.flush()
+
+    methods = list(PaymentMethodEnum)
+    stay_types = list(StayTypeEnum)
+    for position, amount in enumerate(amounts):
+        cell = position // 3
+        paid_at = datetime(2026, 1, 24) + timedelta(days=cell * 5, hours=position % 3)
+        check_in = CheckIn(
+            customer_id=customer.id, room_id=room.id, stay_type=stay_types[cell % 2],
+            check_in_time=paid_at, expected_check_out_time=paid_at + timedelta(hours=3),
+            status=CheckInStatusEnum.CHECKED_OUT, created_by=user.id
+        )
+        db.add(check_in)
+        await db.flush()
+        db.add(Payment(
+            check_in_id=check_in.id, amount=Decimal(amount),
+            payment_method=methods[cell % len(methods)],
+            payment_time=paid_at, created_by=user.id
+        ))
+    await db.commit()
+
+
+async def legacy_revenue_report(db, start_date, end_date, group_by):
+    """The ORM loop the aggregate path replaced, summing Decimals (date filter made half-open)"""
+    lower, upper = day_range_bounds(start_date, end_date)
+    stmt = select(Payment).join(CheckIn).where(
+        and_(Payment.payment_time >= lower, Payment.payment_time < upper)
+    ).options(selectinload(Payment.check_in)).order_by(Payment.id)
+    payments = (await db.execute(stmt)).scalars().all()
+
+    total_revenue = float(sum((p.amount for p in payments), Decimal(0)))
+    total_transactions = len(payments)
+    average_transaction = total_revenue / total_transactions if total_transactions > 0 else 0
+
+    by_payment_method = {}
+    for payment in payments:
+        method = payment.payment_method.value
+        by_payment_method[method] = by_payment_method.get(method, Decimal(0)) + payment.amount
+
+    by_stay_type = {}
+    for payment in payments:
+        if payment.check_in:
+            stay_type = payment.check_in.stay_type.value
+            by_stay_type[stay_type] = by_stay_type.get(stay_type, Decimal(0)) + payment.amount
+
+    by_period_dict = {}
+    for payment in payments:
+        period_key = payment.payment_time.strftime("%Y-%m-%d" if group_by == "day" else "%Y-%m")
+        if period_key not in by_period_dict:
+            by_period_dict[period_key] = {"revenue": Decimal(0), "count": 0}
+        by_period_dict[period_key]["revenue"] += payment.amount
+        by_period_dict[period_key]["count"] += 1
+
+    return RevenueReportResponse(
+        total_revenue=total_revenue,
+        total_transactions=total_transactions,
+        average_transaction=average_transaction,
+        by_payment_method={method: float(amount) for method, amount in by_payment_method.items()},
+        by_stay_type={stay_type: float(amount) for stay_type, amount in by_stay_type.items()},
+        by_period=[
+            RevenueByPeriod(period=period, revenue=float(data["revenue"]), count=data["count"])
+            for period, data in sorted(by_period_dict.items())
+        ],
+        start_date=start_date,
+        end_date=end_date
+    )
+
+
+@pytest.mark.parametrize("amounts", [WHOLE_BAHT, WITH_SATANG], ids=["whole-baht", "satang"])
+@pytest.mark.parametrize("group_by", ["day", "month"])
+async def test_revenue_report_matches_legacy_loop(db, amounts, group_by):
+    await seed_payments(db, amounts)
+
+    expected = await legacy_revenue_report(db, START, END, group_by)
+    actual = await ReportsService(db).get_revenue_report(START, END, group_by)
+
+    assert expected.total_transactions > 0
+    assert actual.model_dump_json() == expected.model_dump_json()
+
+
+async def test_satang_revenue_is_exact(db):
+    await seed_payments(db, WITH_SATANG)
+
+    report = await ReportsService(db).get_revenue_report(START, END, "day")
+
+    float_running_sum = sum(float(Decimal(amount)) for amount in WITH_SATANG)
+    exact = float(sum(Decimal(amount) for amount in WITH_SATANG))
+    assert float_running_sum != exact  # guard: the fixture tells the two apart
+    assert report.total_revenue == exact
+
+
+@pytest.mark.parametrize("amounts", [WHOLE_BAHT, WITH_SATANG], ids=["whole-baht", "satang"])
+async def test_summary_revenue_matches_revenue_report(db, amounts):
+    await seed_payments(db, amounts)
+    service = ReportsService(db)
+
+    summary = await service.get_summary_report(START, END)
+    revenue = await service.get_revenue_report(START, END, "day")
+
+    assert summary.total_revenue == revenue.total_revenue
@@ -0,0 +1,69 @@
+"""
+Room deltas replace the full room events only for clients that opt in,
+a transfer delta rebuilds the whole new room card, and a delta that cannot
+be recorded sends delta clients a resync.
+"""
+import json
+
+from app.core.room_state_stream import STAY_FIELDS_CLEARED, room_deltas_for_event
+from app.core.websocket import ClientConnection, ConnectionManager, Subscription
+
+TRANSFER = {
+    "event": "room_transferred",
+    "data": {
+        "check_in_id": 7,
+        "customer_name": "Guest",
+        "customer_phone": "0800000000",
+        "stay_type": "overnight",
+        "check_in_time": "2026-10-17T14:00:00+07:00",
+        "expected_check_out_time": "2026-10-18T12:00:00+07:00",
+        "is_overtime": False,
+        "overtime_minutes": None,
+        "old_room_id": 1,
+        "old_room_status": "cleaning",
+        "new_room_id": 2,
+        "new_room_status": "occupied",
+    },
+}
+
+
+def test_transfer_delta_carries_full_new_card():
+    (old_room, old_changes), (new_room, new_changes) = room_deltas_for_event(TRANSFER)
+
+    assert (old_room, new_room) == (1, 2)
+    assert old_changes == {"status": "cleaning", **STAY_FIELDS_CLEARED}
+    assert set(new_changes) == {"status", *STAY_FIELDS_CLEARED}
+    assert new_changes["status"] == "occupied"
+    assert all(new_changes[field] == TRANSFER["data"][field] for field in STAY_FIELDS_CLEARED)
+
+
+def test_deltas_replace_full_events_only_when_subscribed():
+    legacy = Subscription()
+    delta_client = Subscription(deltas=True)
+
+    for event in ("room_status_changed", "room_transferred"):
+        assert legacy.matches(event, {1}, None)
+        assert not delta_client.matches(event, {1}, None)
+
+    assert not legacy.matches("room_delta", {1}, None)
+    assert delta_client.matches("room_delta", {1}, None)
+    assert delta_client.matches("check_in_created", {1}, None)
+
+
+async def test_delta_clients_resync_when_delta_cannot_be_recorded():
+    """Redis is down in tests, so the room delta is lost"""
+    manager = ConnectionManager()
+    legacy = ClientConnection(None, "legacy", Subscription())
+    delta_client = ClientConnection(None, "deltas", Subscription(deltas=True, events={"room_delta"}))
+    manager.active_connections = {"legacy": legacy, "deltas": delta_client}
+
+    await manager.broadcast({
+        "event": "room_status_changed",
+        "data": {"room_id": 1, "old_status": "available", "new_status": "occupied"},
+    })
+
+    def events(connection):
+        return [json.loads(text)["event"] for text, _, _ in connection.queue]
+
+    assert events(legacy) == ["room_status_changed"]
+    assert events(delta_client) == ["resync_required"]
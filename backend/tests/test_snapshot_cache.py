@@ -0,0 +1,138 @@
+"""
+Snapshot caches serve reads from memory, reload when another process bumps
+the Redis version, fall back to the TTL while Redis is down, and rebuild
+after a settings write.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import snapshot_cache
+from app.core.snapshot_cache import (
+    SNAPSHOT_TTL_SECONDS,
+    VERSION_CHECK_SECONDS,
+    SnapshotCache,
+)
+from app.models.system_setting import SettingDataTypeEnum, SystemSetting
+from app.services.settings_service import SettingsService
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.reads = 0
+
+    async def get(self, key):
+        self.reads += 1
+        return self.values.get(key)
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key) or 0) + 1)
+
+
+class DownRedis:
+    async def get(self, key):
+        raise ConnectionError("redis is down")
+
+    async def incr(self, key):
+        raise ConnectionError("redis is down")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manual monotonic clock for the cache module"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(snapshot_cache, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def counting_loader():
+    """Loader returning {"load": n} on its n-th call"""
+    calls = []
+
+    async def load():
+        calls.append(None)
+        return {"load": len(calls)}
+    return load, calls
+
+
+async def test_reads_within_check_window_skip_redis(clock, monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(snapshot_cache, "get_redis", lambda: redis)
+    cache = SnapshotCache("test:version")
+    load, calls = counting_loader()
+
+    assert await cache.get_snapshot(load) == {"load": 1}
+    reads_after_load = redis.reads
+    clock.now += VERSION_CHECK_SECONDS
+    assert await cache.get_snapshot(load) == {"load": 1}
+    assert redis.reads == reads_after_load
+
+    # Past the window the version is checked; unchanged, so no reload
+    clock.now += 1
+    assert await cache.get_snapshot(load) == {"load": 1}
+    assert redis.reads == reads_after_load + 1
+    assert len(calls) == 1
+
+
+async def test_version_bump_from_another_process_reloads(clock, monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(snapshot_cache, "get_redis", lambda: redis)
+    cache, other_process = SnapshotCache("test:version"), SnapshotCache("test:version")
+    load, calls = counting_loader()
+
+    await cache.get_snapshot(load)
+    await other_process.invalidate()
+
+    # Stale until the next version check, then reloaded
+    assert await cache.get_snapshot(load) == {"load": 1}
+    clock.now += VERSION_CHECK_SECONDS + 1
+    assert await cache.get_snapshot(load) == {"load": 2}
+    assert len(calls) == 2
+
+
+async def test_invalidate_drops_the_local_snapshot_at_once(clock, monkeypatch):
+    monkeypatch.setattr(snapshot_cache, "get_redis", FakeRedis)
+    cache = SnapshotCache("test:version")
+    load, calls = counting_loader()
+
+    await cache.get_snapshot(load)
+    await cache.invalidate()
+
+    assert await cache.get_snapshot(load) == {"load": 2}
+
+
+async def test_ttl_bounds_the_snapshot_while_redis_is_down(clock, monkeypatch):
+    monkeypatch.setattr(snapshot_cache, "get_redis", DownRedis)
+    cache = SnapshotCache("test:version")
+    load, calls = counting_loader()
+
+    await cache.get_snapshot(load)
+    clock.now += SNAPSHOT_TTL_SECONDS
+    assert await cache.get_snapshot(load) == {"load": 1}
+
+    clock.now += 1
+    assert await cache.get_snapshot(load) == {"load": 2}
+    assert len(calls) == 2
+
+
+async def test_settings_write_rebuilds_the_snapshot(db, count_queries):
+    db.add(SystemSetting(key="telegram_enabled", value="false", data_type=SettingDataTypeEnum.BOOLEAN))
+    await db.commit()
+    service = SettingsService(db)
+
+    assert await service.get_setting("telegram_enabled") == "false"
+    with count_queries() as counter:
+        assert await service.get_many(["telegram_enabled", "missing"]) == {
+            "telegram_enabled": "false", "missing": None
+        }
+    assert counter.count == 0
+
+    await service.set_setting("telegram_enabled", "true", SettingDataTypeEnum.BOOLEAN)
+    await service.set_many([("telegram_bot_token", "123:abc", SettingDataTypeEnum.STRING)])
+
+    with count_queries() as counter:
+        assert await service.get_many(["telegram_enabled", "telegram_bot_token"]) == {
+            "telegram_enabled": "true", "telegram_bot_token": "123:abc"
+        }
+    assert counter.count == 1
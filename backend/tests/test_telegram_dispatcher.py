@@ -0,0 +1,94 @@
+"""
+Telegram digests always fit in one message and are never cut mid-markup,
+and a drain stops at its deadline, handing unsent messages back in order.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.core import telegram_dispatcher as dispatcher_module
+from app.core.telegram_dispatcher import (
+    MAX_MESSAGE_LENGTH,
+    OUTBOX_KEY,
+    TelegramDispatcher,
+)
+from app.services.settings_service import SettingsService
+
+TITLE = "⏰ <b>แจ้งเตือนเกินเวลา</b>"
+FOOTER = "<i>ระบบจัดการโรงแรม</i>"
+
+
+def render_all(group):
+    return [
+        TelegramDispatcher._render(chunk, TITLE, FOOTER)
+        for chunk in TelegramDispatcher._chunk(group, TITLE, FOOTER)
+    ]
+
+
+def test_many_messages_are_split_into_fitting_digests():
+    group = [{"text": f"<b>ห้อง {n}</b>\nเกินเวลา {n} นาที " + "x" * 150} for n in range(100)]
+
+    texts = render_all(group)
+
+    assert len(texts) > 1
+    assert all(len(text) <= MAX_MESSAGE_LENGTH for text in texts)
+    assert sum(text.count("<b>ห้อง ") for text in texts) == 100
+
+
+def test_oversize_message_is_split_at_line_breaks():
+    lines = [f"<b>ห้อง {n}</b>: <code>{'y' * 40}</code>" for n in range(300)]
+    group = [{"text": "\n".join(lines)}]
+
+    texts = render_all(group)
+
+    assert len(texts) > 1
+    assert all(len(text) <= MAX_MESSAGE_LENGTH for text in texts)
+    # Every line arrives whole, so every tag is closed in the message it opens in
+    sent_lines = [line for text in texts for line in text.split("\n")]
+    assert [line for line in sent_lines if line.startswith("<b>ห้อง ")] == lines
+    assert all(text.count("<code>") == text.count("</code>") for text in texts)
+
+
+class FakeRedis:
+    """Just the list operations drain uses"""
+
+    def __init__(self, queued):
+        self.lists = {OUTBOX_KEY: list(queued)}
+
+    async def eval(self, *args):
+        return 0
+
+    async def lpop(self, key, count):
+        items, self.lists[key] = self.lists[key][:count], self.lists[key][count:]
+        return items
+
+    async def lpush(self, key, *values):
+        for value in values:
+            self.lists[key].insert(0, value)
+
+
+async def test_drain_stops_at_deadline_and_requeues_the_rest(monkeypatch):
+    queued = [
+        json.dumps({"id": str(n), "chat_id": f"chat-{n}", "text": f"message {n}", "attempts": 0})
+        for n in range(4)
+    ]
+    redis = FakeRedis(queued)
+    monkeypatch.setattr(dispatcher_module, "get_redis", lambda: redis)
+
+    async def telegram_settings(self):
+        return SimpleNamespace(enabled=True, bot_token="token")
+    monkeypatch.setattr(SettingsService, "get_telegram_settings", telegram_settings)
+
+    dispatcher = TelegramDispatcher()
+
+    async def slow_send(bot_token, chat_id, text, parse_mode):
+        await asyncio.sleep(0.2)  # e.g. waiting for a rate-limit token
+        return True, None, False
+    monkeypatch.setattr(dispatcher, "_send", slow_send)
+
+    stats = await dispatcher.drain(max_seconds=0.1)
+
+    assert (stats["sent"], stats["requeued"]) == (1, 3)
+    assert [json.loads(payload)["text"] for payload in redis.lists[OUTBOX_KEY]] == [
+        "message 1", "message 2", "message 3"
+    ]
@@ -0,0 +1,35 @@
+"""
+Dashboard WebSocket subscriptions: the role comes from the access token,
+and an empty rooms/floors filter means every room.
+"""
+import pytest
+
+from app.api.v1.endpoints.websocket import (
+    _build_subscription,
+    _role_from_token,
+    _split_csv,
+)
+from app.core.security import create_access_token
+
+
+def test_role_comes_from_token():
+    token = create_access_token({"sub": "3", "role": "housekeeping"})
+
+    assert _role_from_token(token) == "housekeeping"
+    assert _role_from_token(None) is None
+    with pytest.raises(ValueError):
+        _role_from_token("not-a-token")
+
+
+async def test_empty_room_filters_match_every_room():
+    subscription = await _build_subscription(rooms=_split_csv(""), floors=_split_csv(""))
+
+    assert subscription.rooms is None and subscription.floors is None
+    assert subscription.matches("room_status_changed", {5}, None)
+
+
+async def test_room_filter_still_applies():
+    subscription = await _build_subscription(rooms=["1", "2"])
+
+    assert subscription.matches("room_status_changed", {2}, None)
+    assert not subscription.matches("room_status_changed", {5}, None)